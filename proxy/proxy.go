@@ -69,6 +69,8 @@ type TorrentsRequest struct {
 	Downloaders     []DownloaderConfig `json:"downloaders"`
 	IncludeComment  bool               `json:"include_comment,omitempty"`
 	IncludeTrackers bool               `json:"include_trackers,omitempty"`
+	// DetailHashes 不为空时，只返回这些种子并为其获取 comment 和 trackers（调用方已缓存其余种子的详情）
+	DetailHashes []string `json:"detail_hashes,omitempty"`
 }
 type ServerStats struct {
 	DownloaderID  string `json:"downloader_id"`
@@ -274,7 +276,7 @@ func formatBytes(bytes int64) string {
 
 // ======================= 核心业务逻辑 (无变动) =======================
 
-func fetchTorrentsForDownloader(wg *sync.WaitGroup, config DownloaderConfig, includeComment, includeTrackers bool, resultsChan chan<- []NormalizedTorrent, errChan chan<- error) {
+func fetchTorrentsForDownloader(wg *sync.WaitGroup, config DownloaderConfig, includeComment, includeTrackers bool, detailHashes []string, resultsChan chan<- []NormalizedTorrent, errChan chan<- error) {
 	defer wg.Done()
 	if config.Type != "qbittorrent" {
 		resultsChan <- []NormalizedTorrent{}
@@ -312,6 +314,19 @@ func fetchTorrentsForDownloader(wg *sync.WaitGroup, config DownloaderConfig, inc
 			errChan <- fmt.Errorf("[%s] 自定义HTTP客户端登录失败: %v", config.Host, err)
 			return
 		}
+		if len(detailHashes) > 0 {
+			detailSet := make(map[string]bool, len(detailHashes))
+			for _, h := range detailHashes {
+				detailSet[h] = true
+			}
+			filtered := normalizedList[:0]
+			for _, t := range normalizedList {
+				if detailSet[t.Hash] {
+					filtered = append(filtered, t)
+				}
+			}
+			normalizedList = filtered
+		}
 		for i := range normalizedList {
 			torrent := &normalizedList[i]
 			params := url.Values{}
@@ -896,7 +911,7 @@ func allTorrentsHandler(w http.ResponseWriter, r *http.Request) {
 	errChan := make(chan error, len(req.Downloaders))
 	for _, config := range req.Downloaders {
 		wg.Add(1)
-		go fetchTorrentsForDownloader(&wg, config, req.IncludeComment, req.IncludeTrackers, resultsChan, errChan)
+		go fetchTorrentsForDownloader(&wg, config, req.IncludeComment, req.IncludeTrackers, req.DetailHashes, resultsChan, errChan)
 	}
 	wg.Wait()
 	close(resultsChan)
@@ -7,9 +7,17 @@ import time
 import json
 from datetime import datetime, timedelta
 
+from database import BATCH_RECORDS_SORT_COLUMNS, SEED_PARAMETERS_SORT_COLUMNS
+from utils.lookup_payloads import invalidate_lookup_payloads, lookup_payloads
+from utils.pagination import (count_cache, decode_cursor, encode_cursor,
+                              invalidate_counts)
+
 # 创建蓝图
 cross_seed_data_bp = Blueprint('cross_seed_data', __name__, url_prefix="/api")
 
+GLOBAL_MAPPINGS_PATH = os.path.join(os.path.dirname(__file__),
+                                    '../configs/global_mappings.yaml')
+
 
 def generate_reverse_mappings():
     """Generate reverse mappings from standard keys to Chinese display names"""
@@ -18,13 +26,11 @@ def generate_reverse_mappings():
         from config import config_manager
 
         # First try to read from global_mappings.yaml
-        global_mappings_path = os.path.join(os.path.dirname(__file__),
-                                            '../configs/global_mappings.yaml')
         global_mappings = {}
 
-        if os.path.exists(global_mappings_path):
+        if os.path.exists(GLOBAL_MAPPINGS_PATH):
             try:
-                with open(global_mappings_path, 'r', encoding='utf-8') as f:
+                with open(GLOBAL_MAPPINGS_PATH, 'r', encoding='utf-8') as f:
                     config_data = yaml.safe_load(f)
                     global_mappings = config_data.get('global_standard_keys',
                                                       {})
@@ -93,38 +99,85 @@ def generate_reverse_mappings():
         }
 
 
-@cross_seed_data_bp.route('/cross-seed-data/unique-paths', methods=['GET'])
-def get_unique_save_paths():
-    """获取seed_parameters表中所有唯一的保存路径"""
+def _query_unique_save_paths(db_manager):
+    """查询seed_parameters表中所有唯一的保存路径"""
+    conn = db_manager._get_connection()
+    cursor = db_manager._get_cursor(conn)
     try:
-        # 获取数据库管理器
-        db_manager = current_app.config['DB_MANAGER']
-        conn = db_manager._get_connection()
-        cursor = db_manager._get_cursor(conn)
+        cursor.execute(
+            "SELECT DISTINCT save_path FROM seed_parameters WHERE save_path IS NOT NULL AND save_path != '' ORDER BY save_path"
+        )
+        return [dict(row)['save_path'] for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
 
-        # 查询所有唯一的保存路径
-        if db_manager.db_type == "postgresql":
-            query = "SELECT DISTINCT save_path FROM seed_parameters WHERE save_path IS NOT NULL AND save_path != '' ORDER BY save_path"
-            cursor.execute(query)
-        else:
-            query = "SELECT DISTINCT save_path FROM seed_parameters WHERE save_path IS NOT NULL AND save_path != '' ORDER BY save_path"
-            cursor.execute(query)
 
-        rows = cursor.fetchall()
+def _query_target_sites(db_manager):
+    """查询所有目标站点（用于前端筛选选项）"""
+    conn = db_manager._get_connection()
+    cursor = db_manager._get_cursor(conn)
+    try:
+        cursor.execute(
+            "SELECT nickname FROM sites WHERE migration IN (2, 3) ORDER BY nickname"
+        )
+        return [
+            dict(row)['nickname'] for row in cursor.fetchall()
+            if dict(row)['nickname']
+        ]
+    finally:
+        cursor.close()
+        conn.close()
 
-        # 将结果转换为列表
-        if isinstance(rows, list):
-            # PostgreSQL返回的是字典列表
-            unique_paths = [
-                row['save_path'] for row in rows if row['save_path']
-            ]
+
+def _global_mappings_signature():
+    """global_mappings.yaml 的修改时间与大小，文件变化时反向映射表重新生成。"""
+    try:
+        stat = os.stat(GLOBAL_MAPPINGS_PATH)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+@cross_seed_data_bp.route('/cross-seed-data/lookups', methods=['GET'])
+def get_cross_seed_lookups():
+    """
+    获取转种数据页面的查找数据（反向映射表、唯一保存路径、目标站点列表）。
+
+    响应带有基于内容的 ETag，请求头 If-None-Match 与当前版本一致时返回 304。
+    """
+    try:
+        db_manager = current_app.config['DB_MANAGER']
+        body, version = lookup_payloads.build_payload({
+            "reverse_mappings":
+            (generate_reverse_mappings, _global_mappings_signature()),
+            "unique_paths": (lambda: _query_unique_save_paths(db_manager),
+                             None),
+            "target_sites": (lambda: _query_target_sites(db_manager), None),
+        })
+
+        etag = f'"{version}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = current_app.response_class(status=304)
         else:
-            # MySQL和SQLite返回的是元组列表
-            unique_paths = [row[0] for row in rows if row[0]]
+            response = current_app.response_class(
+                body, mimetype='application/json')
+        response.headers['ETag'] = etag
+        # 浏览器每次都带 If-None-Match 重新验证
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    except Exception as e:
+        logging.error(f"获取转种查找数据时出错: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
 
-        cursor.close()
-        conn.close()
 
+@cross_seed_data_bp.route('/cross-seed-data/unique-paths', methods=['GET'])
+def get_unique_save_paths():
+    """获取seed_parameters表中所有唯一的保存路径"""
+    try:
+        db_manager = current_app.config['DB_MANAGER']
+        unique_paths = lookup_payloads.get(
+            "unique_paths", lambda: _query_unique_save_paths(db_manager))
         return jsonify({"success": True, "unique_paths": unique_paths})
     except Exception as e:
         logging.error(f"获取唯一保存路径时出错: {e}")
@@ -146,6 +199,9 @@ def get_cross_seed_data():
         exclude_target_sites_filter = request.args.get('exclude_target_sites',
                                                        '').strip()
         review_status_filter = request.args.get('review_status', '').strip()
+        # 键集分页游标（上一页响应中的 next_cursor），提供时不再使用 OFFSET
+        cursor_values = decode_cursor(request.args.get('cursor', '').strip(),
+                                      len(SEED_PARAMETERS_SORT_COLUMNS))
 
         # 限制页面大小
         page_size = min(page_size, 100)
@@ -162,31 +218,12 @@ def get_cross_seed_data():
         where_conditions = []
         params = []
 
-        # 搜索查询条件
+        # 搜索查询条件（使用全文搜索索引）
         if search_query:
-            if db_manager.db_type == "postgresql":
-                where_conditions.append(
-                    "(title ILIKE %s OR torrent_id ILIKE %s OR subtitle ILIKE %s)"
-                )
-                params.extend([
-                    f"%{search_query}%", f"%{search_query}%",
-                    f"%{search_query}%"
-                ])
-            elif db_manager.db_type == "mysql":
-                where_conditions.append(
-                    "(title LIKE %s OR torrent_id LIKE %s OR subtitle LIKE %s)"
-                )
-                params.extend([
-                    f"%{search_query}%", f"%{search_query}%",
-                    f"%{search_query}%"
-                ])
-            else:  # sqlite
-                where_conditions.append(
-                    "(title LIKE ? OR torrent_id LIKE ? OR subtitle LIKE ?)")
-                params.extend([
-                    f"%{search_query}%", f"%{search_query}%",
-                    f"%{search_query}%"
-                ])
+            search_condition, search_params = db_manager.build_seed_search_condition(
+                search_query)
+            where_conditions.append(search_condition)
+            params.extend(search_params)
 
         # 保存路径筛选条件 - 支持多个路径筛选（精确匹配）
         if path_filters_str:
@@ -286,52 +323,18 @@ def get_cross_seed_data():
                         where_conditions.append(error_condition)
                         params.extend(['%禁转%', '%"无法识别"%', '%"value": ""%'])
 
-        # 目标站点排除筛选条件
+        # 目标站点排除筛选条件（支持逗号分隔多个站点）
         if exclude_target_sites_filter:
-            # 现在是单选,不需要分割逗号
-            exclude_site = exclude_target_sites_filter.strip()
-            if exclude_site:
-                logging.info(f"排除目标站点筛选: {exclude_site}")
-
-                # 简化子查询逻辑,避免参数不匹配问题
-                if db_manager.db_type == "postgresql":
-                    subquery = """
-                        SELECT DISTINCT sp.hash
-                        FROM seed_parameters sp
-                        WHERE sp.hash IN (
-                            SELECT DISTINCT t1.hash
-                            FROM torrents t1
-                            WHERE t1.name IN (
-                                SELECT DISTINCT t2.name
-                                FROM torrents t2
-                                WHERE t2.sites = %s
-                            )
-                        )
-                    """
-                    where_conditions.append(
-                        f"seed_parameters.hash NOT IN ({subquery})")
-                    params.append(exclude_site)
-                else:
-                    # MySQL 和 SQLite - 直接在WHERE子句中嵌入子查询
-                    placeholder = '%s' if db_manager.db_type == "mysql" else '?'
-                    where_conditions.append(f"""
-                        seed_parameters.hash NOT IN (
-                            SELECT DISTINCT sp.hash
-                            FROM seed_parameters sp
-                            WHERE sp.hash IN (
-                                SELECT DISTINCT t1.hash
-                                FROM torrents t1
-                                WHERE t1.name IN (
-                                    SELECT DISTINCT t2.name
-                                    FROM torrents t2
-                                    WHERE t2.sites = {placeholder}
-                                )
-                            )
-                        )
-                    """)
-                    params.append(exclude_site)
-
-                logging.info(f"排除站点参数: {exclude_site}")
+            exclude_sites = [
+                site.strip() for site in exclude_target_sites_filter.split(',')
+                if site.strip()
+            ]
+            if exclude_sites:
+                logging.info(f"排除目标站点筛选: {exclude_sites}")
+                exclude_condition, exclude_params = db_manager.build_exclude_sites_condition(
+                    exclude_sites)
+                where_conditions.append(exclude_condition)
+                params.extend(exclude_params)
 
         # 组合WHERE子句
         where_clause = ""
@@ -343,38 +346,37 @@ def get_cross_seed_data():
             logging.info(f"完整WHERE子句: {where_clause}")
             logging.info(f"所有查询参数: {params}")
 
-        # 先查询总数
-        count_query = f"SELECT COUNT(*) as total FROM seed_parameters {where_clause}"
-        if db_manager.db_type == "postgresql":
-            cursor.execute(count_query, params)
-        else:
-            cursor.execute(count_query, params)
-        total_result = cursor.fetchone()
-        total_count = total_result[0] if isinstance(
-            total_result, tuple) else total_result['total']
+        # 总数使用缓存（过期后后台刷新），不再每页都执行 COUNT(*)
+        total_count = count_cache.get(db_manager, "seed_parameters",
+                                      where_clause, params)
 
         # 查询当前页的数据，只获取前端需要显示的列
-        if db_manager.db_type == "postgresql":
-            query = f"""
-                SELECT hash, torrent_id, site_name, nickname, save_path, title, subtitle, type, medium, video_codec,
-                       audio_codec, resolution, team, source, tags, title_components, is_deleted, is_reviewed, updated_at
-                FROM seed_parameters
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(query, params + [page_size, offset])
-        else:
-            placeholder = "?" if db_manager.db_type == "sqlite" else "%s"
-            query = f"""
-                SELECT hash, torrent_id, site_name, nickname, save_path, title, subtitle, type, medium, video_codec,
-                       audio_codec, resolution, team, source, tags, title_components, is_deleted, is_reviewed, updated_at
-                FROM seed_parameters
-                {where_clause}
-                ORDER BY created_at DESC
-                LIMIT {placeholder} OFFSET {placeholder}
-            """
-            cursor.execute(query, params + [page_size, offset])
+        query_conditions = list(where_conditions)
+        query_params = list(params)
+        if cursor_values:
+            keyset_condition, keyset_params = db_manager.build_keyset_condition(
+                SEED_PARAMETERS_SORT_COLUMNS, cursor_values)
+            query_conditions.append(keyset_condition)
+            query_params.extend(keyset_params)
+        query_where = ("WHERE " + " AND ".join(query_conditions)
+                       if query_conditions else "")
+        order_by = ", ".join(f"{col} DESC" for col in SEED_PARAMETERS_SORT_COLUMNS)
+
+        placeholder = db_manager.get_placeholder()
+        query = f"""
+            SELECT hash, torrent_id, site_name, nickname, save_path, title, subtitle, type, medium, video_codec,
+                   audio_codec, resolution, team, source, tags, title_components, is_deleted, is_reviewed, updated_at,
+                   created_at
+            FROM seed_parameters
+            {query_where}
+            ORDER BY {order_by}
+            LIMIT {placeholder}
+        """
+        query_params.append(page_size)
+        if not cursor_values:
+            query += f" OFFSET {placeholder}"
+            query_params.append(offset)
+        cursor.execute(query, query_params)
 
         rows = cursor.fetchall()
 
@@ -439,46 +441,19 @@ def get_cross_seed_data():
             # Add unrecognized field to item
             item['unrecognized'] = unrecognized_value
 
-        # 获取所有目标站点（用于前端筛选选项）
-        cursor.execute(
-            "SELECT nickname FROM sites WHERE migration IN (2, 3) ORDER BY nickname"
-        )
-        target_sites_rows = cursor.fetchall()
-        if isinstance(target_sites_rows, list):
-            # PostgreSQL返回的是字典列表
-            target_sites_list = [
-                row['nickname'] for row in target_sites_rows if row['nickname']
-            ]
-        else:
-            # MySQL和SQLite返回的是元组列表
-            target_sites_list = [row[0] for row in target_sites_rows if row[0]]
-
-        # 获取所有唯一的保存路径（用于路径树）
-        if db_manager.db_type == "postgresql":
-            path_query = "SELECT DISTINCT save_path FROM seed_parameters WHERE save_path IS NOT NULL AND save_path != '' ORDER BY save_path"
-            cursor.execute(path_query)
-        else:
-            path_query = "SELECT DISTINCT save_path FROM seed_parameters WHERE save_path IS NOT NULL AND save_path != '' ORDER BY save_path"
-            cursor.execute(path_query)
-
-        path_rows = cursor.fetchall()
-
-        # 将结果转换为列表
-        if isinstance(path_rows, list):
-            # PostgreSQL返回的是字典列表
-            unique_paths = [
-                row['save_path'] for row in path_rows if row['save_path']
-            ]
-        else:
-            # MySQL和SQLite返回的是元组列表
-            unique_paths = [row[0] for row in path_rows if row[0]]
-
         cursor.close()
         conn.close()
 
-        # Generate reverse mappings
-        reverse_mappings = generate_reverse_mappings()
+        # 下一页的游标：本页最后一行的排序键
+        next_cursor = None
+        if len(data) == page_size:
+            last = data[-1]
+            next_cursor = encode_cursor(
+                [last[col] for col in SEED_PARAMETERS_SORT_COLUMNS])
+        for item in data:
+            item.pop('created_at', None)
 
+        # 反向映射表、保存路径、目标站点等查找数据由 /cross-seed-data/lookups 单独提供
         return jsonify({
             "success": True,
             "data": data,
@@ -486,9 +461,7 @@ def get_cross_seed_data():
             "total": total_count,
             "page": page,
             "page_size": page_size,
-            "reverse_mappings": reverse_mappings,
-            "unique_paths": unique_paths,  # 添加唯一路径数据
-            "target_sites": target_sites_list  # 添加目标站点列表
+            "next_cursor": next_cursor
         })
     except Exception as e:
         logging.error(f"获取转种数据时出错: {e}")
@@ -555,6 +528,8 @@ def delete_cross_seed_data():
                 deleted_count += 1
 
             conn.commit()
+            invalidate_lookup_payloads("unique_paths")
+            invalidate_counts("seed_parameters")
 
             return jsonify({
                 "success": True,
@@ -583,6 +558,8 @@ def delete_cross_seed_data():
                 cursor.execute(delete_query, (torrent_id, site_name))
 
             conn.commit()
+            invalidate_lookup_payloads("unique_paths")
+            invalidate_counts("seed_parameters")
 
             return jsonify({
                 "success": True,
@@ -663,6 +640,7 @@ def add_batch_enhance_record():
 
         cursor.execute(sql, params)
         conn.commit()
+        invalidate_counts("batch_enhance_records")
 
         cursor.close()
         conn.close()
@@ -687,6 +665,10 @@ def get_batch_enhance_records():
         start_time = request.args.get('start_time', '').strip()
         end_time = request.args.get('end_time', '').strip()
 
+        # 键集分页游标（上一页响应中的 next_cursor），提供时不再使用 OFFSET
+        cursor_values = decode_cursor(request.args.get('cursor', '').strip(),
+                                      len(BATCH_RECORDS_SORT_COLUMNS))
+
         # 限制页面大小
         page_size = min(page_size, 200)
         offset = (page - 1) * page_size
@@ -697,23 +679,18 @@ def get_batch_enhance_records():
         cursor = db_manager._get_cursor(conn)
 
         # 构建查询条件
+        ph = db_manager.get_placeholder()
         where_conditions = []
         params = []
 
         # 状态筛选
         if status:
-            if db_manager.db_type == "postgresql":
-                where_conditions.append("status = %s")
-            else:
-                where_conditions.append("status = ?")
+            where_conditions.append(f"status = {ph}")
             params.append(status)
 
         # 批次ID筛选
         if batch_id:
-            if db_manager.db_type == "postgresql":
-                where_conditions.append("batch_id = %s")
-            else:
-                where_conditions.append("batch_id = ?")
+            where_conditions.append(f"batch_id = {ph}")
             params.append(batch_id)
 
         # 搜索条件
@@ -725,7 +702,7 @@ def get_batch_enhance_records():
                 params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
             else:
                 where_conditions.append(
-                    "(torrent_id LIKE ? OR source_site LIKE ? OR target_site LIKE ?)"
+                    f"(torrent_id LIKE {ph} OR source_site LIKE {ph} OR target_site LIKE {ph})"
                 )
                 params.extend([f"%{search}%", f"%{search}%", f"%{search}%"])
 
@@ -734,10 +711,7 @@ def get_batch_enhance_records():
             try:
                 start_dt = datetime.fromisoformat(
                     start_time.replace('Z', '+00:00'))
-                if db_manager.db_type == "postgresql":
-                    where_conditions.append("processed_at >= %s")
-                else:
-                    where_conditions.append("processed_at >= ?")
+                where_conditions.append(f"processed_at >= {ph}")
                 params.append(start_dt)
             except ValueError:
                 pass
@@ -746,10 +720,7 @@ def get_batch_enhance_records():
             try:
                 end_dt = datetime.fromisoformat(end_time.replace(
                     'Z', '+00:00'))
-                if db_manager.db_type == "postgresql":
-                    where_conditions.append("processed_at <= %s")
-                else:
-                    where_conditions.append("processed_at <= ?")
+                where_conditions.append(f"processed_at <= {ph}")
                 params.append(end_dt)
             except ValueError:
                 pass
@@ -759,33 +730,34 @@ def get_batch_enhance_records():
         if where_conditions:
             where_clause = "WHERE " + " AND ".join(where_conditions)
 
-        # 查询总数
-        count_query = f"SELECT COUNT(*) as total FROM batch_enhance_records {where_clause}"
-        cursor.execute(count_query, params)
-        total_result = cursor.fetchone()
-        total_count = total_result[0] if isinstance(
-            total_result, tuple) else total_result['total']
+        # 总数使用缓存（过期后后台刷新），不再每页都执行 COUNT(*)
+        total_count = count_cache.get(db_manager, "batch_enhance_records",
+                                      where_clause, params)
 
         # 查询数据
-        if db_manager.db_type == "postgresql":
-            query = f"""
-                SELECT id, title, batch_id, torrent_id, source_site, target_site, video_size_gb, status, success_url, error_detail, downloader_add_result, processed_at, progress
-                FROM batch_enhance_records
-                {where_clause}
-                ORDER BY processed_at DESC
-                LIMIT %s OFFSET %s
-            """
-            cursor.execute(query, params + [page_size, offset])
-        else:
-            placeholder = "?" if db_manager.db_type == "sqlite" else "%s"
-            query = f"""
-                SELECT id, title, batch_id, torrent_id, source_site, target_site, video_size_gb, status, success_url, error_detail, downloader_add_result, processed_at, progress
-                FROM batch_enhance_records
-                {where_clause}
-                ORDER BY processed_at DESC
-                LIMIT {placeholder} OFFSET {placeholder}
-            """
-            cursor.execute(query, params + [page_size, offset])
+        query_conditions = list(where_conditions)
+        query_params = list(params)
+        if cursor_values:
+            keyset_condition, keyset_params = db_manager.build_keyset_condition(
+                BATCH_RECORDS_SORT_COLUMNS, cursor_values)
+            query_conditions.append(keyset_condition)
+            query_params.extend(keyset_params)
+        query_where = ("WHERE " + " AND ".join(query_conditions)
+                       if query_conditions else "")
+        order_by = ", ".join(f"{col} DESC" for col in BATCH_RECORDS_SORT_COLUMNS)
+
+        query = f"""
+            SELECT id, title, batch_id, torrent_id, source_site, target_site, video_size_gb, status, success_url, error_detail, downloader_add_result, processed_at, progress
+            FROM batch_enhance_records
+            {query_where}
+            ORDER BY {order_by}
+            LIMIT {ph}
+        """
+        query_params.append(page_size)
+        if not cursor_values:
+            query += f" OFFSET {ph}"
+            query_params.append(offset)
+        cursor.execute(query, query_params)
 
         rows = cursor.fetchall()
 
@@ -811,13 +783,20 @@ def get_batch_enhance_records():
         cursor.close()
         conn.close()
 
+        # 下一页的游标：本页最后一行的排序键
+        next_cursor = None
+        if len(records) == page_size:
+            next_cursor = encode_cursor(
+                [records[-1][col] for col in BATCH_RECORDS_SORT_COLUMNS])
+
         return jsonify({
             "success": True,
             "records": records,
             "total": total_count,
             "page": page,
             "page_size": page_size,
-            "batch_ids": batch_ids
+            "batch_ids": batch_ids,
+            "next_cursor": next_cursor
         })
 
     except Exception as e:
@@ -838,6 +817,7 @@ def clear_batch_enhance_records():
         cursor.execute("DELETE FROM batch_enhance_records")
         deleted_count = cursor.rowcount
         conn.commit()
+        invalidate_counts("batch_enhance_records")
 
         cursor.close()
         conn.close()
@@ -874,6 +854,7 @@ def clear_batch_records_by_id(batch_id):
 
         deleted_count = cursor.rowcount
         conn.commit()
+        invalidate_counts("batch_enhance_records")
 
         cursor.close()
         conn.close()
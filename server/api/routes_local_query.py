@@ -6,7 +6,7 @@ from flask import Blueprint, jsonify
 from collections import defaultdict
 from config import config_manager, DATA_DIR
 from utils.media_helper import _get_downloader_proxy_config
-import requests
+from utils.proxy_client import proxy_client
 
 logger = logging.getLogger(__name__)
 
@@ -67,9 +67,10 @@ def check_remote_file_exists(proxy_config, remote_path):
     :param remote_path: 远程路径
     :return: (exists, is_file, size) 元组
     """
+    base_url = proxy_config['proxy_base_url']
     try:
-        response = requests.post(
-            f"{proxy_config['proxy_base_url']}/api/file/check",
+        response = proxy_client.session(base_url).post(
+            f"{base_url}/api/file/check",
             json={"remote_path": remote_path},
             timeout=30)
         response.raise_for_status()
@@ -90,39 +91,14 @@ def check_remote_file_exists(proxy_config, remote_path):
 
 def batch_check_remote_files(proxy_config, remote_paths):
     """
-    通过代理批量检查远程文件是否存在
+    通过代理批量检查远程文件是否存在（分块并发请求，失败的块拆分重试）
 
     :param proxy_config: 代理配置字典，包含 proxy_base_url
     :param remote_paths: 远程路径列表
-    :return: 字典 {path: (exists, is_file, size)}
+    :return: (字典 {path: (exists, is_file, size)}, 未能检查的路径列表)
     """
-    if not remote_paths:
-        return {}
-
-    try:
-        response = requests.post(
-            f"{proxy_config['proxy_base_url']}/api/file/batch-check",
-            json={"remote_paths": remote_paths},
-            timeout=180  # 批量检查可能需要更长时间
-        )
-        response.raise_for_status()
-        result = response.json()
-
-        if result.get("success"):
-            results_dict = {}
-            for item in result.get("results", []):
-                path = item.get("path")
-                exists = item.get("exists", False)
-                is_file = item.get("is_file", False)
-                size = item.get("size", 0)
-                results_dict[path] = (exists, is_file, size)
-            return results_dict
-        else:
-            logger.error(f"代理批量文件检查失败: {result.get('message', '未知错误')}")
-            return {}
-    except Exception as e:
-        logger.error(f"调用代理批量检查文件失败: {e}")
-        return {}
+    return proxy_client.check_remote_paths(proxy_config['proxy_base_url'],
+                                           remote_paths)
 
 
 @local_query_bp.route("/scan/cache", methods=["GET"])
@@ -281,9 +257,9 @@ def scan_local_files():
                 remote_downloaders.add(dl_id)
                 logger.info(
                     f"下载器 {dl.get('name')} (ID: {dl_id}) 使用代理，将跳过本地文件检查")
-            print(
-                f"[DEBUG] 下载器: {dl.get('name')} (ID: {dl_id}), 远程: {dl_id in remote_downloaders}, 映射数: {len(dl.get('path_mappings', []))}"
-            )
+            logger.debug("下载器: %s (ID: %s), 远程: %s, 映射数: %d",
+                         dl.get('name'), dl_id, dl_id in remote_downloaders,
+                         len(dl.get('path_mappings', [])))
 
         db_manager = local_query_bp.db_manager
         conn = db_manager._get_connection()
@@ -313,21 +289,20 @@ def scan_local_files():
         def apply_path_mapping(remote_path, downloader_id):
             """将远程路径映射为本地路径"""
             mappings = path_mappings_by_downloader.get(downloader_id, [])
-            print(
-                f"[DEBUG] apply_path_mapping: 远程路径={remote_path}, 下载器ID={downloader_id}, 映射规则数={len(mappings)}"
-            )
+            logger.debug("apply_path_mapping: 远程路径=%s, 下载器ID=%s, 映射规则数=%d",
+                         remote_path, downloader_id, len(mappings))
             for mapping in mappings:
                 remote = mapping.get("remote", "").rstrip("/")
                 local = mapping.get("local", "").rstrip("/")
-                print(f"[DEBUG]   检查映射: remote={remote}, local={local}")
+                logger.debug("  检查映射: remote=%s, local=%s", remote, local)
                 if remote and local:
                     # 确保完整匹配路径段，避免 /pt 匹配 /pt2
                     if remote_path == remote or remote_path.startswith(remote +
                                                                        "/"):
                         mapped = remote_path.replace(remote, local, 1)
-                        print(f"[DEBUG]   ✓ 匹配成功! 映射后={mapped}")
+                        logger.debug("  ✓ 匹配成功! 映射后=%s", mapped)
                         return mapped
-            print(f"[DEBUG]   ✗ 无匹配映射，返回原路径={remote_path}")
+            logger.debug("  ✗ 无匹配映射，返回原路径=%s", remote_path)
             return remote_path  # 如果没有匹配的映射，返回原路径
 
         # 2. 按 save_path 进行初次分组，并应用路径映射
@@ -350,9 +325,8 @@ def scan_local_files():
                 original_path = row_data['save_path']
                 row_data['is_remote'] = True
                 remote_torrents_by_path[original_path].append(row_data)
-                print(
-                    f"[DEBUG] 远程种子: {row_data['name'][:50]} | 路径: {original_path}"
-                )
+                logger.debug("远程种子: %s | 路径: %s", row_data['name'][:50],
+                             original_path)
             else:
                 # 本地下载器：应用路径映射
                 original_path = row_data['save_path']
@@ -360,9 +334,8 @@ def scan_local_files():
                 row_data['local_path'] = mapped_path  # 保存映射后的本地路径
                 row_data['is_remote'] = False
                 local_torrents_by_path[mapped_path].append(row_data)
-                print(
-                    f"[DEBUG] 本地种子: {row_data['name'][:50]} | 原始: {original_path} | 映射: {mapped_path}"
-                )
+                logger.debug("本地种子: %s | 原始: %s | 映射: %s",
+                             row_data['name'][:50], original_path, mapped_path)
 
         # 3. 初始化扫描结果
         missing_files = []
@@ -419,7 +392,7 @@ def scan_local_files():
                     if torrent_name in filenames or torrent_name in dirnames:
                         return os.path.join(dirpath, torrent_name)
             except Exception as e:
-                logger.debug(f"搜索 {root_path} 时出错: {str(e)}")
+                logger.debug("搜索 %s 时出错: %s", root_path, e)
             return None
 
         # 辅助函数：收集目录树中所有文件和文件夹的名称
@@ -431,17 +404,17 @@ def scan_local_files():
                     all_items.update(dirnames)
                     all_items.update(filenames)
             except Exception as e:
-                logger.debug(f"收集 {root_path} 时出错: {str(e)}")
+                logger.debug("收集 %s 时出错: %s", root_path, e)
             return all_items
 
         # 4. 遍历所有路径进行扫描（包括没有种子的路径）
         for local_path in all_local_paths_to_scan:
             path_torrents = local_torrents_by_path.get(local_path, [])
-            print(f"[DEBUG] 扫描本地路径: {local_path} | 种子数: {len(path_torrents)}")
+            logger.debug("扫描本地路径: %s | 种子数: %d", local_path, len(path_torrents))
 
             # 如果路径不存在，记录缺失的种子
             if not os.path.exists(local_path):
-                print(f"[DEBUG] 路径不存在: {local_path}")
+                logger.debug("路径不存在: %s", local_path)
                 if path_torrents:  # 只有当有种子记录时才报告缺失
                     missing_groups_by_name = defaultdict(list)
                     for torrent in path_torrents:
@@ -469,16 +442,16 @@ def scan_local_files():
                 all_items_in_tree = collect_all_items_in_tree(local_path)
                 local_items = set(os.listdir(local_path))  # 只用于孤立文件检测
                 total_local_items += len(local_items)
-                print(
-                    f"[DEBUG] 路径存在，当前层级 {len(local_items)} 个项目，整个目录树 {len(all_items_in_tree)} 个项目"
-                )
+                logger.debug("路径存在，当前层级 %d 个项目，整个目录树 %d 个项目",
+                             len(local_items), len(all_items_in_tree))
 
                 torrents_by_name_in_path = defaultdict(list)
                 for torrent in path_torrents:
                     torrents_by_name_in_path[torrent['name']].append(torrent)
 
                 torrent_names_in_path = set(torrents_by_name_in_path.keys())
-                print(f"[DEBUG] 期望的种子名称: {list(torrent_names_in_path)[:3]}...")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("期望的种子名称: %s...", list(torrent_names_in_path)[:3])
 
                 # 找出缺失的文件组 - 在整个目录树中查找
                 missing_names = set()
@@ -493,11 +466,11 @@ def scan_local_files():
                         found_path = find_torrent_in_tree(local_path, name)
                         if found_path:
                             synced_names_with_location[name] = found_path
-                            print(f"[DEBUG] 在子目录中找到种子: {name} -> {found_path}")
+                            logger.debug("在子目录中找到种子: %s -> %s", name, found_path)
                         else:
                             missing_names.add(name)
                 
-                print(f"[DEBUG] 缺失的文件: {len(missing_names)} 个")
+                logger.debug("缺失的文件: %d 个", len(missing_names))
                 for name in missing_names:
                     torrent_group = torrents_by_name_in_path[name]
                     # 使用第一个种子的信息
@@ -532,7 +505,7 @@ def scan_local_files():
                     
                     # 跳过所有文件夹，只检测孤立文件
                     if not is_file:
-                        print(f"[DEBUG] 跳过文件夹 {item_name}")
+                        logger.debug("跳过文件夹 %s", item_name)
                         continue
                     
                     # 检查这个文件是否在某个被种子引用的文件夹内
@@ -542,10 +515,10 @@ def scan_local_files():
                             # 检查文件是否在种子文件夹内
                             if full_path.startswith(ref_folder + os.sep):
                                 is_inside_torrent_folder = True
-                                print(f"[DEBUG] 文件 {item_name} 在种子文件夹 {ref_folder} 内，跳过")
+                                logger.debug("文件 %s 在种子文件夹 %s 内，跳过", item_name, ref_folder)
                                 break
                         except Exception as e:
-                            logger.debug(f"检查文件路径时出错: {str(e)}")
+                            logger.debug("检查文件路径时出错: %s", e)
                     
                     # 如果文件在种子文件夹内，不算孤立文件
                     if is_inside_torrent_folder:
@@ -555,7 +528,7 @@ def scan_local_files():
                     try:
                         size = os.path.getsize(full_path)
                     except Exception as e:
-                        logger.debug(f"无法获取大小 {full_path}: {str(e)}")
+                        logger.debug("无法获取大小 %s: %s", full_path, e)
 
                     # 尝试找到原始的远程路径
                     # 优先从该路径下的种子获取，否则尝试反向映射本地路径到远程路径
@@ -609,7 +582,10 @@ def scan_local_files():
                 logger.error(f"扫描路径 {local_path} 时出错: {str(e)}")
 
         # 5. 处理远程下载器的路径（通过代理批量检查文件）
+        # 先按下载器汇总所有需要检查的路径，每个下载器只做一次分块并发检查
         proxy_configs = {}  # 缓存代理配置
+        remote_groups = []  # (下载器ID, 远程路径, {种子名称: [种子]})
+        paths_by_downloader = defaultdict(list)
         for remote_path, path_torrents in remote_torrents_by_path.items():
             # 获取第一个种子的下载器ID和代理配置
             first_torrent = path_torrents[0]
@@ -620,8 +596,7 @@ def scan_local_files():
                 proxy_configs[downloader_id] = _get_downloader_proxy_config(
                     downloader_id)
 
-            proxy_config = proxy_configs[downloader_id]
-            if not proxy_config:
+            if not proxy_configs[downloader_id]:
                 logger.warning(f"下载器 {downloader_id} 没有代理配置，跳过检查")
                 continue
 
@@ -630,20 +605,30 @@ def scan_local_files():
             for torrent in path_torrents:
                 torrents_by_name_in_path[torrent['name']].append(torrent)
 
-            # 构建需要检查的路径列表
-            paths_to_check = []
-            for name in torrents_by_name_in_path.keys():
-                full_remote_path = os.path.join(remote_path, name)
-                paths_to_check.append(full_remote_path)
-
-            # 批量检查所有文件
-            logger.info(f"批量检查远程路径 {remote_path} 下的 {len(paths_to_check)} 个文件")
-            check_results = batch_check_remote_files(proxy_config,
-                                                     paths_to_check)
-
-            # 处理检查结果
+            remote_groups.append(
+                (downloader_id, remote_path, torrents_by_name_in_path))
+            paths_by_downloader[downloader_id].extend(
+                os.path.join(remote_path, name)
+                for name in torrents_by_name_in_path.keys())
+
+        # 批量检查所有文件
+        check_results = {}
+        unchecked_paths = set()
+        for downloader_id, paths_to_check in paths_by_downloader.items():
+            logger.info(
+                f"批量检查下载器 {downloader_id} 的 {len(paths_to_check)} 个远程文件")
+            results, failed = batch_check_remote_files(
+                proxy_configs[downloader_id], paths_to_check)
+            check_results.update(results)
+            unchecked_paths.update(failed)
+
+        # 处理检查结果
+        for downloader_id, remote_path, torrents_by_name_in_path in remote_groups:
             for name, torrent_group in torrents_by_name_in_path.items():
                 full_remote_path = os.path.join(remote_path, name)
+                if full_remote_path in unchecked_paths:
+                    # 检查失败的路径既不算缺失也不算正常同步，只计入统计
+                    continue
                 exists, is_file, size = check_results.get(
                     full_remote_path, (False, False, 0))
 
@@ -683,7 +668,8 @@ def scan_local_files():
             "orphaned_count": len(orphaned_files),
             "synced_count": len(synced_torrents),
             "remote_torrents_count": remote_torrents_count,  # 添加远程种子计数
-            "skipped_remote": remote_torrents_count > 0  # 标记是否跳过了远程种子
+            "skipped_remote": remote_torrents_count > 0,  # 标记是否跳过了远程种子
+            "remote_unchecked_count": len(unchecked_paths)  # 远程检查失败（未能确认是否存在）的路径数
         }
 
         result = {
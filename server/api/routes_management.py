@@ -2,8 +2,11 @@
 
 import logging
 import copy
+import time
 import cloudscraper
-import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from threading import Lock
 from flask import Blueprint, jsonify, request
 from urllib.parse import urlparse
 
@@ -11,6 +14,8 @@ from urllib.parse import urlparse
 from core import services
 from database import reconcile_historical_data
 from utils.downloader_id_helper import generate_downloader_id_from_host, validate_downloader_id
+from utils.lookup_payloads import invalidate_lookup_payloads
+from utils.proxy_client import get_proxy_base_url, proxy_client
 
 # 导入下载器客户端 API
 from qbittorrentapi import Client, APIConnectionError
@@ -23,48 +28,11 @@ management_bp = Blueprint("management_api", __name__, url_prefix="/api")
 def _get_proxy_downloader_info(client_config, config_manager):
     """通过代理获取下载器信息。"""
     try:
-        # 从下载器配置的host中提取IP地址作为代理服务器地址
-        host_value = client_config['host']
-
-        # 如果host已经包含协议，直接解析；否则添加http://前缀
-        if host_value.startswith(('http://', 'https://')):
-            parsed_url = urlparse(host_value)
-        else:
-            parsed_url = urlparse(f"http://{host_value}")
-
-        proxy_ip = parsed_url.hostname
-        if not proxy_ip:
-            # 如果无法解析，使用备用方法
-            if '://' in host_value:
-                proxy_ip = host_value.split('://')[1].split(':')[0].split('/')[0]
-            else:
-                proxy_ip = host_value.split(':')[0]
-
-        proxy_port = client_config.get('proxy_port', 9090)  # 默认9090
-        proxy_base_url = f"http://{proxy_ip}:{proxy_port}"
-        logging.info(f"使用代理服务器: {proxy_base_url}")
-
-        # 构造代理请求数据
-        proxy_downloader_config = {
-            "id": client_config['id'],
-            "type": client_config['type'],
-            "host": "http://127.0.0.1:" + str(parsed_url.port or 8080),
-            "username": client_config.get('username', ''),
-            "password": client_config.get('password', '')
-        }
-
-        # 发送请求到代理获取统计信息
-        response = requests.post(f"{proxy_base_url}/api/stats/server",
-                                 json=[proxy_downloader_config],
-                                 timeout=30)
-        response.raise_for_status()
-
-        stats_data = response.json()
-        if stats_data and len(stats_data) > 0:
-            return stats_data[0]  # 返回第一个下载器的统计信息
-        else:
+        logging.info(f"使用代理服务器: {get_proxy_base_url(client_config)}")
+        stats = proxy_client.get_stats(client_config, timeout=30)
+        if not stats:
             logging.warning(f"代理返回空的统计信息 for '{client_config['name']}'")
-            return None
+        return stats
 
     except Exception as e:
         logging.error(f"通过代理获取 '{client_config['name']}' 统计信息失败: {e}")
@@ -198,6 +166,7 @@ def update_site_details():
     if not site_data.get("id"):
         return jsonify({"success": False, "message": "必须提供站点ID。"}), 400
     if db_manager.update_site_details(site_data):
+        invalidate_lookup_payloads("target_sites")
         return jsonify({
             "success": True,
             "message": f"站点 '{site_data.get('nickname')}' 的信息已成功更新。"
@@ -220,6 +189,7 @@ def delete_site():
     if not site_id:
         return jsonify({"success": False, "message": "必须提供站点ID。"}), 400
     if db_manager.delete_site(site_id):
+        invalidate_lookup_payloads("target_sites")
         return jsonify({"success": True, "message": "站点已成功删除。"})
     else:
         return jsonify({
@@ -474,7 +444,7 @@ def update_settings():
                 from core.migrations.migrate_downloader_ids import (
                     create_migration_table,
                     save_migration_mapping,
-                    migrate_table_ids,
+                    migrate_all_tables,
                     migrate_batch_enhance_records
                 )
                 
@@ -485,19 +455,10 @@ def update_settings():
                     # 保存迁移映射
                     if save_migration_mapping(management_bp.db_manager, id_changes):
                         # 迁移各个表
-                        tables_to_migrate = [
-                            ("traffic_stats", "downloader_id"),
-                            ("torrents", "downloader_id"),
-                            ("torrent_upload_stats", "downloader_id"),
-                            ("seed_parameters", "downloader_id")
-                        ]
-                        
-                        migration_success = True
-                        for table_name, id_column in tables_to_migrate:
-                            if not migrate_table_ids(management_bp.db_manager, table_name, id_column):
-                                logging.error(f"迁移表 {table_name} 失败")
-                                migration_success = False
-                                break
+                        failed_table = migrate_all_tables(management_bp.db_manager)
+                        if failed_table:
+                            logging.error(f"迁移表 {failed_table} 失败")
+                        migration_success = failed_table is None
                         
                         if migration_success:
                             # 迁移 batch_enhance_records 中的JSON数据
@@ -609,6 +570,103 @@ def test_connection():
         }), 200
 
 
+# --- 下载器状态 ---
+# DataTracker 运行时直接读取其维护的状态快照；快照中缺失的下载器
+# （如 DataTracker 未在当前进程运行、刚启用的下载器）才会并发探测，探测结果短时间缓存。
+DOWNLOADER_PROBE_TTL = 60
+TRAFFIC_SUMMARY_TTL = 60
+_probe_cache = {}
+_probe_cache_lock = Lock()
+_traffic_summary_cache = {"expires_at": 0, "data": {}}
+
+
+def _probe_downloader(client_config, config_manager):
+    """直接连接下载器获取版本号，返回 {"status", "version", "error"}。"""
+    try:
+        if client_config.get("use_proxy", False) and client_config["type"] == "qbittorrent":
+            proxy_stats = _get_proxy_downloader_info(client_config, config_manager)
+            if not proxy_stats:
+                return {"status": "连接失败", "version": None, "error": "通过代理连接失败"}
+            version = proxy_stats.get("version", "未知")
+        elif client_config["type"] == "qbittorrent":
+            api_config = services._prepare_api_config(client_config)
+            client = Client(**api_config)
+            client.auth_log_in()
+            version = client.app.version
+        elif client_config["type"] == "transmission":
+            api_config = services._prepare_api_config(client_config)
+            client = TrClient(**api_config)
+            version = client.get_session().version
+        else:
+            return {"status": "连接失败", "version": None, "error": "无效的客户端类型"}
+        return {"status": "已连接", "version": version, "error": None}
+    except Exception as e:
+        return {"status": "连接失败", "version": None, "error": str(e)}
+
+
+def _probe_downloaders(client_configs, config_manager):
+    """并发探测多个下载器，结果按下载器配置缓存 DOWNLOADER_PROBE_TTL 秒。"""
+    now = time.monotonic()
+    results, to_probe = {}, []
+    with _probe_cache_lock:
+        for client_config in client_configs:
+            # 修改了连接相关的配置后缓存自动失效
+            signature = tuple(
+                client_config.get(key) for key in ("type", "host", "username",
+                                                   "password", "use_proxy",
+                                                   "proxy_port"))
+            cached = _probe_cache.get(client_config["id"])
+            if cached and cached[0] > now and cached[1] == signature:
+                results[client_config["id"]] = cached[2]
+            else:
+                to_probe.append((client_config, signature))
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=min(8, len(to_probe))) as executor:
+            futures = {
+                executor.submit(_probe_downloader, client_config, config_manager):
+                (client_config, signature)
+                for client_config, signature in to_probe
+            }
+            for future in as_completed(futures):
+                client_config, signature = futures[future]
+                results[client_config["id"]] = future.result()
+                with _probe_cache_lock:
+                    _probe_cache[client_config["id"]] = (
+                        time.monotonic() + DOWNLOADER_PROBE_TTL, signature,
+                        results[client_config["id"]])
+    return results
+
+
+def _get_traffic_summary(db_manager, downloader_ids):
+    """从数据库获取今日/累计流量（DataTracker 不可用时的后备），结果缓存 TRAFFIC_SUMMARY_TTL 秒。"""
+    now = time.monotonic()
+    if _traffic_summary_cache["expires_at"] > now:
+        return _traffic_summary_cache["data"]
+
+    day_start = datetime.now().strftime("%Y-%m-%d 00:00:00")
+    try:
+        summary = db_manager.get_downloader_traffic_summary(
+            day_start, downloader_ids)
+    except Exception as e:
+        logging.error(f"获取下载器统计信息时数据库出错: {e}", exc_info=True)
+        return {}
+
+    data = {}
+    for downloader_id, row in summary.items():
+        data[downloader_id] = {
+            "today_dl": max(0, (row["day_max_dl"] or 0) - (row["day_start_dl"] or 0)),
+            "today_ul": max(0, (row["day_max_ul"] or 0) - (row["day_start_ul"] or 0)),
+            "total_dl": row["total_dl"] or 0,
+            "total_ul": row["total_ul"] or 0,
+        }
+    _traffic_summary_cache.update({
+        "expires_at": now + TRAFFIC_SUMMARY_TTL,
+        "data": data
+    })
+    return data
+
+
 @management_bp.route("/downloader_info")
 def get_downloader_info_api():
     """获取所有已配置下载器的状态和统计信息。"""
@@ -626,133 +684,46 @@ def get_downloader_info_api():
         for d in cfg_downloaders
     }
 
-    conn, cursor = None, None
-    try:
-        conn = db_manager._get_connection()
-        cursor = db_manager._get_cursor(conn)
-
-        # 获取累计上传和下载量 - 使用最新的累计值
-        cursor.execute(
-            """SELECT downloader_id,
-                      MAX(cumulative_downloaded) as total_dl,
-                      MAX(cumulative_uploaded) as total_ul
-               FROM traffic_stats
-               WHERE cumulative_downloaded > 0 OR cumulative_uploaded > 0
-               GROUP BY downloader_id"""
-        )
-        totals = {r["downloader_id"]: dict(r) for r in cursor.fetchall()}
-
-        # 获取今日上传和下载量 - 使用和 InfoView.vue 相同的逻辑，计算今日内的总增量
-        from datetime import datetime, timedelta
-
-        # 查询今日内每个下载器的总增量，类似于 routes_stats.py 中的 chart_data 逻辑
-        if db_manager.db_type == "postgresql":
-            today_query = """SELECT
-                                downloader_id,
-                                GREATEST(0,
-                                    (MAX(cumulative_downloaded) - MIN(cumulative_downloaded))::bigint
-                                ) as today_dl,
-                                GREATEST(0,
-                                    (MAX(cumulative_uploaded) - MIN(cumulative_uploaded))::bigint
-                                ) as today_ul
-                             FROM traffic_stats
-                             WHERE stat_datetime::date = CURRENT_DATE
-                             GROUP BY downloader_id"""
-            cursor.execute(today_query)
-        elif db_manager.db_type == "mysql":
-            today_query = """SELECT
-                                downloader_id,
-                                GREATEST(0,
-                                    MAX(cumulative_downloaded) - MIN(cumulative_downloaded)
-                                ) as today_dl,
-                                GREATEST(0,
-                                    MAX(cumulative_uploaded) - MIN(cumulative_uploaded)
-                                ) as today_ul
-                             FROM traffic_stats
-                             WHERE DATE(stat_datetime) = CURDATE()
-                             GROUP BY downloader_id"""
-            cursor.execute(today_query)
-        else:  # SQLite
-            today_query = """SELECT
-                                downloader_id,
-                                CASE WHEN MAX(cumulative_downloaded) - MIN(cumulative_downloaded) > 0 
-                                     THEN MAX(cumulative_downloaded) - MIN(cumulative_downloaded) 
-                                     ELSE 0 END as today_dl,
-                                CASE WHEN MAX(cumulative_uploaded) - MIN(cumulative_uploaded) > 0 
-                                     THEN MAX(cumulative_uploaded) - MIN(cumulative_uploaded) 
-                                     ELSE 0 END as today_ul
-                             FROM traffic_stats
-                             WHERE DATE(stat_datetime) = DATE('now', 'localtime')
-                             GROUP BY downloader_id"""
-            cursor.execute(today_query)
-
-        today_stats = {r["downloader_id"]: dict(r) for r in cursor.fetchall()}
-    except Exception as e:
-        logging.error(f"获取下载器统计信息时数据库出错: {e}", exc_info=True)
-        totals, today_stats = {}, {}
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+    tracker = services.data_tracker_thread
+    snapshot = (tracker.get_downloader_status()
+                if tracker and tracker.is_alive() else {})
+
+    # 快照中没有的已启用下载器才需要探测
+    missing = [
+        d for d in cfg_downloaders if d.get("enabled", False) and d["id"] not in snapshot
+    ]
+    if missing:
+        probes = _probe_downloaders(missing, config_manager)
+        traffic = _get_traffic_summary(db_manager,
+                                       [d["id"] for d in cfg_downloaders])
+        for d in missing:
+            snapshot[d["id"]] = {
+                **probes[d["id"]],
+                **traffic.get(d["id"], {
+                    "today_dl": 0,
+                    "today_ul": 0,
+                    "total_dl": 0,
+                    "total_ul": 0
+                })
+            }
 
     from utils import format_bytes
 
     for d_id, d_info in info.items():
         if not d_info["enabled"]:
             continue
-        client_config = next(
-            (item for item in cfg_downloaders if item["id"] == d_id), None)
-
-        # 确保从数据库获取的值是数字类型
-        today_dl = today_stats.get(d_id, {}).get("today_dl", 0)
-        today_ul = today_stats.get(d_id, {}).get("today_ul", 0)
-        total_dl = totals.get(d_id, {}).get("total_dl", 0)
-        total_ul = totals.get(d_id, {}).get("total_ul", 0)
-
-        # 转换为整数（处理可能的字符串类型）
-        try:
-            today_dl = int(float(today_dl))
-            today_ul = int(float(today_ul))
-            total_dl = int(float(total_dl))
-            total_ul = int(float(total_ul))
-        except (ValueError, TypeError):
-            today_dl = today_ul = total_dl = total_ul = 0
-
+        status = snapshot[d_id]
         d_info["details"] = {
-            "今日下载量": format_bytes(today_dl),
-            "今日上传量": format_bytes(today_ul),
-            "累计下载量": format_bytes(total_dl),
-            "累计上传量": format_bytes(total_ul),
+            "今日下载量": format_bytes(status["today_dl"]),
+            "今日上传量": format_bytes(status["today_ul"]),
+            "累计下载量": format_bytes(status["total_dl"]),
+            "累计上传量": format_bytes(status["total_ul"]),
         }
-        try:
-            # 检查是否需要使用代理
-            use_proxy = client_config.get("use_proxy", False)
-
-            if use_proxy and d_info["type"] == "qbittorrent":
-                # 使用代理获取下载器信息
-                proxy_stats = _get_proxy_downloader_info(
-                    client_config, config_manager)
-                if proxy_stats:
-                    d_info["details"]["版本"] = proxy_stats.get("version", "未知")
-                    d_info["status"] = "已连接"
-                else:
-                    d_info["status"] = "连接失败"
-                    d_info["details"]["错误信息"] = "通过代理连接失败"
-            elif d_info["type"] == "qbittorrent":
-                api_config = services._prepare_api_config(client_config)
-                client = Client(**api_config)
-                client.auth_log_in()
-                d_info["details"]["版本"] = client.app.version
-                d_info["status"] = "已连接"
-            elif d_info["type"] == "transmission":
-                api_config = services._prepare_api_config(client_config)
-                client = TrClient(**api_config)
-                d_info["details"]["版本"] = client.get_session().version
-                d_info["status"] = "已连接"
-        except Exception as e:
-            d_info["status"] = "连接失败"
-            d_info["details"]["错误信息"] = str(e)
+        d_info["status"] = status["status"]
+        if status["error"]:
+            d_info["details"]["错误信息"] = status["error"]
+        else:
+            d_info["details"]["版本"] = status["version"] or "未知"
     return jsonify(list(info.values()))
 
 
@@ -976,11 +947,13 @@ def execute_migration_api():
     data = request.json or {}
     backup = data.get("backup", True)
     auto_cleanup = data.get("auto_cleanup", True)
+    full_backup = data.get("full_backup", False)
     
     try:
         from core.migrations.migrate_downloader_ids import execute_migration
         
-        result = execute_migration(db_manager, config_manager, backup=backup, auto_cleanup=auto_cleanup)
+        result = execute_migration(db_manager, config_manager, backup=backup, auto_cleanup=auto_cleanup,
+                                   full_backup=full_backup)
         
         if result["success"]:
             # 迁移成功后重启服务
@@ -5,15 +5,13 @@ import uuid
 import re
 import os
 import requests
-import urllib.parse
 import json
 from flask import Blueprint, jsonify, request, Response, stream_with_context
-from bs4 import BeautifulSoup
-from utils import upload_data_title, upload_data_screenshot, upload_data_poster, upload_data_movie_info, add_torrent_to_downloader, extract_tags_from_mediainfo, extract_origin_from_description, extract_resolution_from_mediainfo
+from utils import parse_html, upload_data_title, upload_data_screenshot, upload_data_poster, upload_data_movie_info, add_torrent_to_downloader, extract_tags_from_mediainfo, extract_origin_from_description, extract_resolution_from_mediainfo
 from core.migrator import TorrentMigrator
 
 # 导入种子参数模型
-from models.seed_parameter import SeedParameter
+from models.seed_parameter import SeedParameter, batched_writes
 
 # --- [新增] 导入 config_manager ---
 # 确保能够访问到全局的 config_manager 实例
@@ -21,6 +19,7 @@ from config import config_manager
 
 # --- [新增] 导入日志流管理器 ---
 from utils.log_streamer import log_streamer
+from utils.fetch_cache import fetch_cache
 
 migrate_bp = Blueprint("migrate_api", __name__, url_prefix="/api")
 
@@ -1085,68 +1084,55 @@ def migrate_publish():
                     SOURCE_COOKIE = source_info.get("cookie", "")
                     source_torrent_id = context.get("source_torrent_id", "")
 
+                    # 获取站点代码用于缓存键和文件名前缀
+                    source_site_code = source_info.get("site", source_site_name.lower())
+
                     if SOURCE_BASE_URL and SOURCE_COOKIE and source_torrent_id:
-                        # 获取详情页以找到下载链接
-                        response = scraper.get(
-                            f"{SOURCE_BASE_URL}/details.php",
-                            headers={"Cookie": SOURCE_COOKIE},
-                            params={
-                                "id": source_torrent_id,
-                                "hit": "1"
-                            },
-                            timeout=180)
-                        response.raise_for_status()
-                        response.encoding = "utf-8"
-
-                        from bs4 import BeautifulSoup
-                        soup = BeautifulSoup(response.text, "html.parser")
-                        download_link_tag = soup.select_one(
-                            f'a.index[href^="download.php?id={source_torrent_id}"]'
-                        )
+                        # [新增] 优先使用抓取缓存中的种子文件，命中时无需请求源站点
+                        cached_torrent = fetch_cache.get_cached_torrent(
+                            source_site_code, source_torrent_id)
+                        download_link_tag = None
+                        if not cached_torrent:
+                            # 获取详情页以找到下载链接
+                            details_html = fetch_cache.get_page(
+                                source_site_code,
+                                source_torrent_id,
+                                lambda extra_headers: scraper.get(
+                                    f"{SOURCE_BASE_URL}/details.php",
+                                    headers={
+                                        "Cookie": SOURCE_COOKIE,
+                                        **extra_headers
+                                    },
+                                    params={
+                                        "id": source_torrent_id,
+                                        "hit": "1"
+                                    },
+                                    timeout=180),
+                                is_valid=lambda html:
+                                f"download.php?id={source_torrent_id}" in html)
+
+                            soup = parse_html(details_html)
+                            download_link_tag = soup.select_one(
+                                f'a.index[href^="download.php?id={source_torrent_id}"]'
+                            )
 
-                        if download_link_tag:
+                        if cached_torrent or download_link_tag:
                             # 下载种子文件
-                            torrent_response = scraper.get(
-                                f"{SOURCE_BASE_URL}/{download_link_tag['href']}",
-                                headers={"Cookie": SOURCE_COOKIE},
-                                timeout=180,
-                            )
-                            torrent_response.raise_for_status()
-
-                            # 从响应头中尝试获取文件名
-                            content_disposition = torrent_response.headers.get(
-                                'content-disposition')
-                            torrent_filename = "unknown.torrent"
-                            if content_disposition:
-                                # 尝试匹配filename*（支持UTF-8编码）和filename
-                                filename_match = re.search(
-                                    r'filename\*="?UTF-8\'\'([^"]+)"?',
-                                    content_disposition, re.IGNORECASE)
-                                if filename_match:
-                                    torrent_filename = filename_match.group(1)
-                                    # URL解码文件名（UTF-8编码）
-                                    torrent_filename = urllib.parse.unquote(
-                                        torrent_filename, encoding='utf-8')
-                                else:
-                                    # 尝试匹配普通的filename
-                                    filename_match = re.search(
-                                        r'filename="?([^"]+)"?',
-                                        content_disposition)
-                                    if filename_match:
-                                        torrent_filename = filename_match.group(
-                                            1)
-                                        # URL解码文件名
-                                        torrent_filename = urllib.parse.unquote(
-                                            torrent_filename)
+                            torrent_content, torrent_filename = cached_torrent or fetch_cache.get_torrent(
+                                source_site_code,
+                                source_torrent_id,
+                                lambda: scraper.get(
+                                    f"{SOURCE_BASE_URL}/{download_link_tag['href']}",
+                                    headers={"Cookie": SOURCE_COOKIE},
+                                    timeout=180,
+                                ),
+                                default_filename="unknown.torrent")
 
                             # 使用统一的种子目录
                             from config import TEMP_DIR
                             torrent_dir = os.path.join(TEMP_DIR, "torrents")
                             os.makedirs(torrent_dir, exist_ok=True)
 
-                            # 获取站点代码用于文件名前缀
-                            source_site_code = source_info.get("site", source_site_name.lower())
-
                             # 保存种子文件，添加站点-ID-前缀
                             try:
                                 # 对文件名进行文件系统安全的处理
@@ -1168,7 +1154,7 @@ def migrate_publish():
                                 original_torrent_path = os.path.join(
                                     torrent_dir, prefixed_filename)
                                 with open(original_torrent_path, "wb") as f:
-                                    f.write(torrent_response.content)
+                                    f.write(torrent_content)
                                 logging.info(f"种子文件已保存: {prefixed_filename}")
                             except OSError as e:
                                 # 如果文件名有问题，使用默认名称
@@ -1177,7 +1163,7 @@ def migrate_publish():
                                 original_torrent_path = os.path.join(
                                     torrent_dir, prefixed_filename)
                                 with open(original_torrent_path, "wb") as f:
-                                    f.write(torrent_response.content)
+                                    f.write(torrent_content)
 
                             logging.info(
                                 f"重新下载种子文件成功: {original_torrent_path}")
@@ -1925,9 +1911,8 @@ def update_preview_data():
 
             # 创建一个模拟的HTML soup对象用于提取器
             # 由于我们已经有提取的数据，我们可以创建一个简单的soup对象
-            from bs4 import BeautifulSoup
             mock_html = f"<html><body><h1 id='top'>{review_data.get('title', '')}</h1></body></html>"
-            mock_soup = BeautifulSoup(mock_html, 'html.parser')
+            mock_soup = parse_html(mock_html)
 
             # 初始化提取器
             from core.extractors.extractor import Extractor, ParameterMapper
@@ -2230,6 +2215,29 @@ def batch_fetch_seed_data():
         }), 500
 
 
+def _preload_torrents_by_name(db_manager, torrent_names, chunk_size=500):
+    """按名称批量查询 torrents 表（排除已不存在的种子），返回 {名称: [种子记录]}。"""
+    ph = db_manager.get_placeholder()
+    names = list(dict.fromkeys(torrent_names))
+    torrents_by_name = {}
+    conn = db_manager._get_connection()
+    cursor = db_manager._get_cursor(conn)
+    try:
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            cursor.execute(
+                f"SELECT hash, name, save_path, size, sites, details, downloader_id FROM torrents "
+                f"WHERE name IN ({', '.join([ph] * len(chunk))}) AND state != {ph}",
+                chunk + ["不存在"])
+            for row in cursor.fetchall():
+                row = dict(row)
+                torrents_by_name.setdefault(row["name"], []).append(row)
+    finally:
+        cursor.close()
+        conn.close()
+    return torrents_by_name
+
+
 def _process_batch_fetch(task_id, torrent_names, source_sites_priority,
                          db_manager):
     """后台处理批量获取任务"""
@@ -2241,217 +2249,64 @@ def _process_batch_fetch(task_id, torrent_names, source_sites_priority,
     REQUEST_INTERVAL = 5
 
     try:
-        for torrent_name in torrent_names:
-            if task_id not in BATCH_FETCH_TASKS:
-                logging.warning(f"任务 {task_id} 已被取消")
-                break
-
-            try:
-                # 查询该名称的所有种子记录
-                conn = db_manager._get_connection()
-                cursor = db_manager._get_cursor(conn)
-
-                if db_manager.db_type == "sqlite":
-                    cursor.execute(
-                        "SELECT hash, name, save_path, size, sites, details, downloader_id FROM torrents WHERE name = ? AND state != ?",
-                        (torrent_name, "不存在"))
-                else:  # postgresql or mysql
-                    cursor.execute(
-                        "SELECT hash, name, save_path, size, sites, details, downloader_id FROM torrents WHERE name = %s AND state != %s",
-                        (torrent_name, "不存在"))
-
-                torrents = [dict(row) for row in cursor.fetchall()]
-                cursor.close()
-                conn.close()
-
-                if not torrents:
-                    BATCH_FETCH_TASKS[task_id]["results"].append({
-                        "name":
-                        torrent_name,
-                        "status":
-                        "skipped",
-                        "reason":
-                        "未找到种子记录"
-                    })
-                    BATCH_FETCH_TASKS[task_id]["skipped"] += 1
-                    BATCH_FETCH_TASKS[task_id]["processed"] += 1
-                    continue
+        # 一次查询预加载本批所有名称的种子记录，站点信息在任务内复用
+        torrents_by_name = _preload_torrents_by_name(db_manager, torrent_names)
+        site_infos = {}
+        # 已标记为成功、参数仍在写入缓冲区中的结果：(种子ID, 英文站点名) -> 结果条目
+        buffered_results = {}
+
+        def get_site_info(nickname):
+            if nickname not in site_infos:
+                site_infos[nickname] = db_manager.get_site_by_nickname(nickname)
+            return site_infos[nickname]
+
+        # 获取到的种子参数先进入写入缓冲区，按数量或时间合并提交，任务结束前全部写入
+        with batched_writes(db_manager) as write_buffer:
+            for torrent_name in torrent_names:
+                if task_id not in BATCH_FETCH_TASKS:
+                    logging.warning(f"任务 {task_id} 已被取消")
+                    break
 
-                # 按优先级查找可用的源站点
-                source_found = None
-                for priority_site in source_sites_priority:
-                    # 获取站点信息
-                    source_info = db_manager.get_site_by_nickname(
-                        priority_site)
-                    if not source_info or not source_info.get("cookie"):
-                        continue
+                try:
+                    # 该名称的所有种子记录（任务开始时已一次性预加载）
+                    torrents = [
+                        dict(torrent)
+                        for torrent in torrents_by_name.get(torrent_name, [])
+                    ]
 
-                    # 检查该站点的migration状态
-                    if source_info.get("migration", 0) not in [1, 3]:
+                    if not torrents:
+                        BATCH_FETCH_TASKS[task_id]["results"].append({
+                            "name":
+                            torrent_name,
+                            "status":
+                            "skipped",
+                            "reason":
+                            "未找到种子记录"
+                        })
+                        BATCH_FETCH_TASKS[task_id]["skipped"] += 1
+                        BATCH_FETCH_TASKS[task_id]["processed"] += 1
                         continue
 
-                    # 查找该站点的种子记录
-                    for torrent in torrents:
-                        if torrent.get("sites") == priority_site:
-                            # 提取种子ID
-                            comment = torrent.get("details", "")
-                            torrent_id = None
-
-                            if comment:
-                                # 尝试从comment中提取ID
-                                import re
-                                id_match = re.search(r'id=(\d+)', comment)
-                                if id_match:
-                                    torrent_id = id_match.group(1)
-                                elif re.match(r'^\d+$', comment.strip()):
-                                    torrent_id = comment.strip()
-
-                            if torrent_id:
-                                source_found = {
-                                    "site": priority_site,
-                                    "site_info": source_info,
-                                    "torrent_id": torrent_id,
-                                    "torrent": torrent
-                                }
-                                break
-
-                    if source_found:
-                        break
-
-                # 第二阶段：如果优先级站点都没有找到，使用 IYUU 查询
-                if not source_found:
-                    try:
-                        # 导入 IYUU 线程
-                        from core.iyuu import iyuu_thread
-
-                        if iyuu_thread and iyuu_thread.is_alive():
-                            # 获取种子大小（使用第一个种子的大小，因为同名种子大小应该相同）
-                            torrent_size = 0
-                            if torrents:
-                                torrent_size = torrents[0].get('size', 0)
-
-                            logging.info(
-                                f"优先级站点未找到，尝试使用 IYUU 查询: {torrent_name} (大小: {torrent_size} 字节)"
-                            )
-
-                            # 执行 IYUU 查询
-                            result_stats = iyuu_thread._process_single_torrent(
-                                torrent_name, torrent_size)
-
-                            if result_stats and result_stats.get(
-                                    'total_found', 0) > 0:
-                                logging.info(
-                                    f"IYUU 查询找到 {result_stats['total_found']} 条记录，重新查询数据库"
-                                )
-
-                                # 重新查询数据库，获取更新后的种子记录
-                                conn = db_manager._get_connection()
-                                cursor = db_manager._get_cursor(conn)
-
-                                if db_manager.db_type == "sqlite":
-                                    cursor.execute(
-                                        "SELECT hash, name, save_path, sites, details, downloader_id FROM torrents WHERE name = ? AND state != ?",
-                                        (torrent_name, "不存在"))
-                                else:  # postgresql or mysql
-                                    cursor.execute(
-                                        "SELECT hash, name, save_path, sites, details, downloader_id FROM torrents WHERE name = %s AND state != %s",
-                                        (torrent_name, "不存在"))
-
-                                updated_torrents = [
-                                    dict(row) for row in cursor.fetchall()
-                                ]
-                                cursor.close()
-                                conn.close()
-
-                                if updated_torrents:
-                                    torrents = updated_torrents
-                                    logging.info(f"IYUU 查询后重新检查优先级站点")
-
-                                    # 重新按优先级查找可用的源站点
-                                    for priority_site in source_sites_priority:
-                                        # 获取站点信息
-                                        source_info = db_manager.get_site_by_nickname(
-                                            priority_site)
-                                        if not source_info or not source_info.get(
-                                                "cookie"):
-                                            continue
-
-                                        # 检查该站点的migration状态
-                                        if source_info.get("migration",
-                                                           0) not in [1, 3]:
-                                            continue
-
-                                        # 查找该站点的种子记录（在更新后的torrents中）
-                                        for torrent in torrents:
-                                            if torrent.get(
-                                                    "sites") == priority_site:
-                                                # 提取种子ID
-                                                comment = torrent.get(
-                                                    "details", "")
-                                                torrent_id = None
-
-                                                if comment:
-                                                    # 尝试从comment中提取ID
-                                                    import re
-                                                    id_match = re.search(
-                                                        r'id=(\d+)', comment)
-                                                    if id_match:
-                                                        torrent_id = id_match.group(
-                                                            1)
-                                                    elif re.match(
-                                                            r'^\d+$',
-                                                            comment.strip()):
-                                                        torrent_id = comment.strip(
-                                                        )
-
-                                                if torrent_id:
-                                                    source_found = {
-                                                        "site": priority_site,
-                                                        "site_info":
-                                                        source_info,
-                                                        "torrent_id":
-                                                        torrent_id,
-                                                        "torrent": torrent
-                                                    }
-                                                    logging.info(
-                                                        f"IYUU 查询后在优先级站点中找到: {priority_site}"
-                                                    )
-                                                    break
-
-                                        if source_found:
-                                            break
-                                else:
-                                    logging.info(f"IYUU 查询未找到新的种子记录")
-                        else:
-                            logging.warning("IYUU 线程未运行，跳过 IYUU 查询")
-                    except Exception as e:
-                        logging.error(f"IYUU 查询失败: {e}", exc_info=True)
-
-                # 第三阶段：如果 IYUU 查询后还是没有找到，在其他存在的源站点中查找
-                if not source_found:
-                    # 获取所有已存在的站点名称（排除已经在优先级列表中的）
-                    existing_sites = set()
-                    for torrent in torrents:
-                        site_name = torrent.get("sites")
-                        if site_name and site_name not in source_sites_priority:
-                            existing_sites.add(site_name)
-
-                    # 在这些其他站点中查找可用的源站点
-                    for site_name in existing_sites:
+                    # 按优先级查找可用的源站点
+                    source_found = None
+                    for priority_site in source_sites_priority:
                         # 获取站点信息
-                        source_info = db_manager.get_site_by_nickname(
-                            site_name)
+                        source_info = get_site_info(
+                            priority_site)
                         if not source_info or not source_info.get("cookie"):
                             continue
+
                         # 检查该站点的migration状态
                         if source_info.get("migration", 0) not in [1, 3]:
                             continue
+
                         # 查找该站点的种子记录
                         for torrent in torrents:
-                            if torrent.get("sites") == site_name:
+                            if torrent.get("sites") == priority_site:
                                 # 提取种子ID
                                 comment = torrent.get("details", "")
                                 torrent_id = None
+
                                 if comment:
                                     # 尝试从comment中提取ID
                                     import re
@@ -2460,107 +2315,273 @@ def _process_batch_fetch(task_id, torrent_names, source_sites_priority,
                                         torrent_id = id_match.group(1)
                                     elif re.match(r'^\d+$', comment.strip()):
                                         torrent_id = comment.strip()
+
                                 if torrent_id:
                                     source_found = {
-                                        "site": site_name,
+                                        "site": priority_site,
                                         "site_info": source_info,
                                         "torrent_id": torrent_id,
                                         "torrent": torrent
                                     }
                                     break
+
                         if source_found:
                             break
 
-                if not source_found:
-                    BATCH_FETCH_TASKS[task_id]["results"].append({
-                        "name":
-                        torrent_name,
-                        "status":
-                        "failed",
-                        "reason":
-                        "未找到可用的源站点"
-                    })
-                    BATCH_FETCH_TASKS[task_id]["failed"] += 1
-                    BATCH_FETCH_TASKS[task_id]["processed"] += 1
-                    continue
+                    # 第二阶段：如果优先级站点都没有找到，使用 IYUU 查询
+                    if not source_found:
+                        try:
+                            # 导入 IYUU 线程
+                            from core.iyuu import iyuu_thread
 
-                # 获取种子数据
-                try:
-                    # 检查该站点的最后请求时间，如果间隔不足则等待
-                    current_site = source_found["site"]
-                    if current_site in site_last_request_time:
-                        elapsed = time.time(
-                        ) - site_last_request_time[current_site]
-                        if elapsed < REQUEST_INTERVAL:
-                            wait_time = REQUEST_INTERVAL - elapsed
-                            logging.info(
-                                f"站点 {current_site} 请求间隔不足，等待 {wait_time:.1f} 秒..."
-                            )
-                            time.sleep(wait_time)
+                            if iyuu_thread and iyuu_thread.is_alive():
+                                # 获取种子大小（使用第一个种子的大小，因为同名种子大小应该相同）
+                                torrent_size = 0
+                                if torrents:
+                                    torrent_size = torrents[0].get('size', 0)
+
+                                logging.info(
+                                    f"优先级站点未找到，尝试使用 IYUU 查询: {torrent_name} (大小: {torrent_size} 字节)"
+                                )
 
-                    # 记录本次请求时间
-                    site_last_request_time[current_site] = time.time()
+                                # 执行 IYUU 查询
+                                result_stats = iyuu_thread._process_single_torrent(
+                                    torrent_name, torrent_size)
 
-                    migrator = TorrentMigrator(
-                        source_site_info=source_found["site_info"],
-                        target_site_info=None,
-                        search_term=source_found["torrent_id"],
-                        save_path=source_found["torrent"].get("save_path", ""),
-                        torrent_name=torrent_name,
-                        downloader_id=source_found["torrent"].get(
-                            "downloader_id"),
-                        config_manager=config_manager,
-                        db_manager=db_manager)
+                                if result_stats and result_stats.get(
+                                        'total_found', 0) > 0:
+                                    logging.info(
+                                        f"IYUU 查询找到 {result_stats['total_found']} 条记录，重新查询数据库"
+                                    )
 
-                    result = migrator.prepare_review_data()
+                                    # 重新查询数据库，获取更新后的种子记录
+                                    conn = db_manager._get_connection()
+                                    cursor = db_manager._get_cursor(conn)
+
+                                    if db_manager.db_type == "sqlite":
+                                        cursor.execute(
+                                            "SELECT hash, name, save_path, sites, details, downloader_id FROM torrents WHERE name = ? AND state != ?",
+                                            (torrent_name, "不存在"))
+                                    else:  # postgresql or mysql
+                                        cursor.execute(
+                                            "SELECT hash, name, save_path, sites, details, downloader_id FROM torrents WHERE name = %s AND state != %s",
+                                            (torrent_name, "不存在"))
+
+                                    updated_torrents = [
+                                        dict(row) for row in cursor.fetchall()
+                                    ]
+                                    cursor.close()
+                                    conn.close()
+
+                                    if updated_torrents:
+                                        torrents = updated_torrents
+                                        logging.info(f"IYUU 查询后重新检查优先级站点")
+
+                                        # 重新按优先级查找可用的源站点
+                                        for priority_site in source_sites_priority:
+                                            # 获取站点信息
+                                            source_info = get_site_info(
+                                                priority_site)
+                                            if not source_info or not source_info.get(
+                                                    "cookie"):
+                                                continue
+
+                                            # 检查该站点的migration状态
+                                            if source_info.get("migration",
+                                                               0) not in [1, 3]:
+                                                continue
+
+                                            # 查找该站点的种子记录（在更新后的torrents中）
+                                            for torrent in torrents:
+                                                if torrent.get(
+                                                        "sites") == priority_site:
+                                                    # 提取种子ID
+                                                    comment = torrent.get(
+                                                        "details", "")
+                                                    torrent_id = None
+
+                                                    if comment:
+                                                        # 尝试从comment中提取ID
+                                                        import re
+                                                        id_match = re.search(
+                                                            r'id=(\d+)', comment)
+                                                        if id_match:
+                                                            torrent_id = id_match.group(
+                                                                1)
+                                                        elif re.match(
+                                                                r'^\d+$',
+                                                                comment.strip()):
+                                                            torrent_id = comment.strip(
+                                                            )
+
+                                                    if torrent_id:
+                                                        source_found = {
+                                                            "site": priority_site,
+                                                            "site_info":
+                                                            source_info,
+                                                            "torrent_id":
+                                                            torrent_id,
+                                                            "torrent": torrent
+                                                        }
+                                                        logging.info(
+                                                            f"IYUU 查询后在优先级站点中找到: {priority_site}"
+                                                        )
+                                                        break
 
-                    if "review_data" in result:
+                                            if source_found:
+                                                break
+                                    else:
+                                        logging.info(f"IYUU 查询未找到新的种子记录")
+                            else:
+                                logging.warning("IYUU 线程未运行，跳过 IYUU 查询")
+                        except Exception as e:
+                            logging.error(f"IYUU 查询失败: {e}", exc_info=True)
+
+                    # 第三阶段：如果 IYUU 查询后还是没有找到，在其他存在的源站点中查找
+                    if not source_found:
+                        # 获取所有已存在的站点名称（排除已经在优先级列表中的）
+                        existing_sites = set()
+                        for torrent in torrents:
+                            site_name = torrent.get("sites")
+                            if site_name and site_name not in source_sites_priority:
+                                existing_sites.add(site_name)
+
+                        # 在这些其他站点中查找可用的源站点
+                        for site_name in existing_sites:
+                            # 获取站点信息
+                            source_info = get_site_info(
+                                site_name)
+                            if not source_info or not source_info.get("cookie"):
+                                continue
+                            # 检查该站点的migration状态
+                            if source_info.get("migration", 0) not in [1, 3]:
+                                continue
+                            # 查找该站点的种子记录
+                            for torrent in torrents:
+                                if torrent.get("sites") == site_name:
+                                    # 提取种子ID
+                                    comment = torrent.get("details", "")
+                                    torrent_id = None
+                                    if comment:
+                                        # 尝试从comment中提取ID
+                                        import re
+                                        id_match = re.search(r'id=(\d+)', comment)
+                                        if id_match:
+                                            torrent_id = id_match.group(1)
+                                        elif re.match(r'^\d+$', comment.strip()):
+                                            torrent_id = comment.strip()
+                                    if torrent_id:
+                                        source_found = {
+                                            "site": site_name,
+                                            "site_info": source_info,
+                                            "torrent_id": torrent_id,
+                                            "torrent": torrent
+                                        }
+                                        break
+                            if source_found:
+                                break
+
+                    if not source_found:
                         BATCH_FETCH_TASKS[task_id]["results"].append({
                             "name":
                             torrent_name,
                             "status":
-                            "success",
-                            "source_site":
-                            source_found["site"]
+                            "failed",
+                            "reason":
+                            "未找到可用的源站点"
                         })
-                        BATCH_FETCH_TASKS[task_id]["success"] += 1
-                        logging.info(
-                            f"批量获取成功: {torrent_name} from {source_found['site']}"
-                        )
-                    else:
+                        BATCH_FETCH_TASKS[task_id]["failed"] += 1
+                        BATCH_FETCH_TASKS[task_id]["processed"] += 1
+                        continue
+
+                    # 获取种子数据
+                    try:
+                        # 检查该站点的最后请求时间，如果间隔不足则等待
+                        current_site = source_found["site"]
+                        if current_site in site_last_request_time:
+                            elapsed = time.time(
+                            ) - site_last_request_time[current_site]
+                            if elapsed < REQUEST_INTERVAL:
+                                wait_time = REQUEST_INTERVAL - elapsed
+                                logging.info(
+                                    f"站点 {current_site} 请求间隔不足，等待 {wait_time:.1f} 秒..."
+                                )
+                                time.sleep(wait_time)
+
+                        # 记录本次请求时间
+                        site_last_request_time[current_site] = time.time()
+
+                        migrator = TorrentMigrator(
+                            source_site_info=source_found["site_info"],
+                            target_site_info=None,
+                            search_term=source_found["torrent_id"],
+                            save_path=source_found["torrent"].get("save_path", ""),
+                            torrent_name=torrent_name,
+                            downloader_id=source_found["torrent"].get(
+                                "downloader_id"),
+                            config_manager=config_manager,
+                            db_manager=db_manager)
+
+                        result = migrator.prepare_review_data()
+
+                        if "review_data" in result:
+                            result_entry = {
+                                "name": torrent_name,
+                                "status": "success",
+                                "source_site": source_found["site"]
+                            }
+                            BATCH_FETCH_TASKS[task_id]["results"].append(
+                                result_entry)
+                            BATCH_FETCH_TASKS[task_id]["success"] += 1
+                            buffered_results[(
+                                source_found["torrent_id"],
+                                source_found["site_info"].get("site"))] = result_entry
+                            logging.info(
+                                f"批量获取成功: {torrent_name} from {source_found['site']}"
+                            )
+                        else:
+                            BATCH_FETCH_TASKS[task_id]["results"].append({
+                                "name":
+                                torrent_name,
+                                "status":
+                                "failed",
+                                "reason":
+                                result.get("logs", "未知错误")
+                            })
+                            BATCH_FETCH_TASKS[task_id]["failed"] += 1
+
+                    except Exception as e:
                         BATCH_FETCH_TASKS[task_id]["results"].append({
                             "name":
                             torrent_name,
                             "status":
                             "failed",
                             "reason":
-                            result.get("logs", "未知错误")
+                            str(e)
                         })
                         BATCH_FETCH_TASKS[task_id]["failed"] += 1
+                        logging.error(f"批量获取失败: {torrent_name}, 错误: {e}")
+
+                    BATCH_FETCH_TASKS[task_id]["processed"] += 1
 
                 except Exception as e:
                     BATCH_FETCH_TASKS[task_id]["results"].append({
-                        "name":
-                        torrent_name,
-                        "status":
-                        "failed",
-                        "reason":
-                        str(e)
+                        "name": torrent_name,
+                        "status": "failed",
+                        "reason": str(e)
                     })
                     BATCH_FETCH_TASKS[task_id]["failed"] += 1
-                    logging.error(f"批量获取失败: {torrent_name}, 错误: {e}")
-
-                BATCH_FETCH_TASKS[task_id]["processed"] += 1
+                    BATCH_FETCH_TASKS[task_id]["processed"] += 1
+                    logging.error(f"处理种子 {torrent_name} 时发生错误: {e}")
 
-            except Exception as e:
-                BATCH_FETCH_TASKS[task_id]["results"].append({
-                    "name": torrent_name,
-                    "status": "failed",
-                    "reason": str(e)
-                })
-                BATCH_FETCH_TASKS[task_id]["failed"] += 1
-                BATCH_FETCH_TASKS[task_id]["processed"] += 1
-                logging.error(f"处理种子 {torrent_name} 时发生错误: {e}")
+        # 参数未能写入数据库的种子改记为失败
+        for _, torrent_id, site_name in write_buffer.failed_keys:
+            result_entry = buffered_results.pop((torrent_id, site_name), None)
+            if result_entry is None or task_id not in BATCH_FETCH_TASKS:
+                continue
+            result_entry.update(status="failed", reason="种子参数保存到数据库失败")
+            BATCH_FETCH_TASKS[task_id]["success"] -= 1
+            BATCH_FETCH_TASKS[task_id]["failed"] += 1
 
         # 标记任务完成
         if task_id in BATCH_FETCH_TASKS:
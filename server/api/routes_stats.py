@@ -2,12 +2,17 @@
 
 import logging
 import copy
-from flask import Blueprint, jsonify, request
+import json
+import queue
+import time
+from flask import Blueprint, jsonify, request, Response, stream_with_context
 from datetime import datetime, timedelta
 from collections import defaultdict
 
 # 从项目根目录导入核心模块
 from core import services
+from utils.speed_broadcaster import (speed_broadcaster, MAX_REPLAY_TICKS,
+                                     STREAM_MAX_SECONDS, STREAM_RETRY_MS)
 
 # --- Blueprint Setup ---
 stats_bp = Blueprint("stats_api", __name__, url_prefix="/api")
@@ -458,6 +463,56 @@ def get_recent_speed_data_api():
     })
 
 
+@stats_bp.route("/speed_stream")
+def speed_stream_api():
+    """
+    实时速度推送流 (Server-Sent Events)。
+
+    连接时先推送最近 replay 秒（默认60秒）的完整快照 (type=snapshot)，
+    之后每次采集推送一次增量 (type=tick)：
+    - t: 时间标签 (HH:MM:SS)
+    - d: {下载器ID: [上传速度, 下载速度]}，只包含发生变化的下载器
+    - n: 下载器列表 [{id, name}]，仅在列表变化时附带
+
+    每个连接占用一个工作线程：同时在线的订阅者达到上限时返回 503（前端改用轮询）；
+    单个连接最长保持 STREAM_MAX_SECONDS 秒后由服务端关闭，EventSource 按 retry 间隔自动重连。
+    """
+    try:
+        replay_seconds = int(request.args.get("replay", "60"))
+    except ValueError:
+        return jsonify({"error": "无效的回放秒数参数"}), 400
+    replay_seconds = max(0, min(replay_seconds, MAX_REPLAY_TICKS))
+
+    subscriber, snapshot = speed_broadcaster.subscribe(replay_seconds)
+    if subscriber is None:
+        return jsonify({"error": "实时速度推送连接数已达上限，请稍后重试"}), 503
+
+    def generate():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            yield snapshot
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    yield subscriber.get(timeout=min(15, remaining))
+                except queue.Empty:
+                    # 心跳，保持连接
+                    yield f"data: {json.dumps({'type': 'heartbeat'})}\n\n"
+        finally:
+            speed_broadcaster.unsubscribe(subscriber)
+
+    return Response(stream_with_context(generate()),
+                    mimetype="text/event-stream",
+                    headers={
+                        "Cache-Control": "no-cache",
+                        "X-Accel-Buffering": "no",
+                        "Connection": "keep-alive"
+                    })
+
+
 @stats_bp.route("/speed_chart_data")
 def get_speed_chart_data_api():
     """获取历史速度图表数据。"""
@@ -6,9 +6,10 @@ import jwt  # type: ignore
 import atexit
 import hmac
 import hashlib
+import threading
 import time
 from typing import cast
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, Response, g, send_from_directory, request, jsonify
 from flask_cors import CORS
 
 # 从项目根目录导入核心模块
@@ -16,11 +17,13 @@ from config import get_db_config, config_manager
 from database import DatabaseManager, reconcile_historical_data
 from core.services import start_data_tracker, stop_data_tracker
 from core.iyuu import start_iyuu_thread, stop_iyuu_thread
+from core.runtime import is_background_process
+from core.startup import startup_timings
+from utils.metrics import HTTP_REQUEST_SECONDS, metrics
+from utils.logging_setup import configure_logging
 
-# --- 日志基础配置 ---
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - [PID:%(process)d] - %(levelname)s - %(message)s")
+# --- 日志基础配置（异步写出、限流，LOG_LEVEL / LOG_VERBOSE_MODULES 控制级别） ---
+configure_logging()
 logging.info("=== Flask 应用日志系统已初始化 ===")
 
 
@@ -29,6 +32,7 @@ def cleanup_old_tmp_structure():
     清理旧的 tmp 目录结构，只保留：
     - server/data/tmp/torrents/ 目录（并清理其中的 JSON 文件）
     - server/data/tmp/batch-enhancer.log 文件
+    - server/data/tmp/fetch_cache/ 目录（详情页/种子文件抓取缓存）
     删除其他所有文件和目录（包括 extracted_data）
     
     注意：开发环境下不执行清理
@@ -44,7 +48,7 @@ def cleanup_old_tmp_structure():
     print("开始清理旧的 tmp 目录结构...")
     
     # 要保留的项目
-    keep_items = {"torrents", "batch-enhancer.log"}
+    keep_items = {"torrents", "batch-enhancer.log", "fetch_cache"}
     
     try:
         if not os.path.exists(TEMP_DIR):
@@ -102,6 +106,89 @@ def cleanup_old_tmp_structure():
         print(f"清理 tmp 目录时发生错误: {e}")
 
 
+def get_server_port():
+    """根据 DEV_ENV 环境变量返回服务监听端口。"""
+    if os.getenv("DEV_ENV") == "true":
+        # 开发环境
+        return 35274
+    # 生产环境
+    return 5274
+
+
+# 应用退出时设置，尚未执行的后台启动阶段不再执行
+_startup_stop_event = threading.Event()
+
+
+def start_background_services(db_manager):
+    """
+    在后台线程中执行耗时的启动阶段并启动后台线程（数据追踪和IYUU），只应在后台服务进程中调用。
+
+    与下载器同步统计基线在 DataTracker 开始记录之前完成；Web 请求不必等待这些阶段。
+    """
+
+    def _start_tracker():
+        logging.info("正在启动数据追踪线程...")
+        start_data_tracker(db_manager, config_manager)
+
+    def _start_iyuu():
+        logging.info("正在启动IYUU后台线程...")
+        start_iyuu_thread(db_manager, config_manager)
+
+    _startup_stop_event.clear()
+    startup_timings.run_in_background([
+        ("reconcile_downloaders",
+         lambda: reconcile_historical_data(db_manager, config_manager.get())),
+        ("aggregate_hourly_traffic", db_manager.aggregate_hourly_traffic),
+        ("start_data_tracker", _start_tracker),
+        ("start_iyuu", _start_iyuu),
+    ], stop_event=_startup_stop_event)
+
+
+def stop_background_services():
+    """停止后台线程，DataTracker 停止时会将缓冲区中的流量数据写入数据库。"""
+    logging.info("正在清理后台线程...")
+    _startup_stop_event.set()
+    try:
+        stop_data_tracker()
+    except Exception as e:
+        logging.error(f"停止数据追踪线程失败: {e}", exc_info=True)
+
+    try:
+        stop_iyuu_thread()
+    except Exception as e:
+        logging.error(f"停止IYUU线程失败: {e}", exc_info=True)
+
+    logging.info("后台线程清理完成。")
+
+
+def _migrate_downloader_ids(db_manager):
+    """自动执行下载器ID迁移（如果需要），失败时记录日志并继续启动。"""
+    try:
+        from utils.downloader_id_helper import generate_migration_mapping
+        from core.migrations.migrate_downloader_ids import execute_migration
+
+        # 检查是否需要迁移
+        migration_mapping = generate_migration_mapping(config_manager.get())
+
+        if migration_mapping:
+            logging.info(f"检测到 {len(migration_mapping)} 个下载器需要迁移ID，开始自动迁移...")
+            for mapping in migration_mapping:
+                logging.info(f"  - {mapping['name']}: {mapping['old_id']} -> {mapping['new_id']}")
+
+            # 执行迁移
+            result = execute_migration(db_manager, config_manager, backup=True)
+
+            if result["success"]:
+                logging.info(f"下载器ID迁移完成！成功迁移 {result['migrated_count']} 个下载器")
+            else:
+                logging.error(f"下载器ID迁移失败: {result.get('message', '未知错误')}")
+        else:
+            logging.info("所有下载器ID已是基于IP:端口的格式，无需迁移")
+    except Exception as e:
+        logging.error(f"检查或执行下载器ID迁移时出错: {e}", exc_info=True)
+        logging.warning("将继续启动应用...")
+
+
 def create_app():
     """
     应用工厂函数：创建并配置 Flask 应用实例。
@@ -134,44 +221,24 @@ def create_app():
     })
 
     # --- 步骤 0: 清理旧的 tmp 目录结构 ---
-    cleanup_old_tmp_structure()
+    with startup_timings.phase("cleanup_tmp"):
+        cleanup_old_tmp_structure()
 
     # --- 步骤 1: 初始化核心依赖 (数据库和配置) ---
     logging.info("正在初始化数据库和配置...")
-    db_config = get_db_config()
-    db_manager = DatabaseManager(db_config)
-    db_manager.init_db()  # 确保数据库和表结构存在
+    with startup_timings.phase("init_db"):
+        db_config = get_db_config()
+        db_manager = DatabaseManager(db_config)
+        db_manager.init_db()  # 确保数据库和表结构存在
 
     # --- 步骤 2: 自动执行下载器ID迁移（如果需要）---
     logging.info("检查是否需要执行下载器ID迁移...")
-    try:
-        from utils.downloader_id_helper import generate_migration_mapping
-        from core.migrations.migrate_downloader_ids import execute_migration
-        
-        # 检查是否需要迁移
-        migration_mapping = generate_migration_mapping(config_manager.get())
-        
-        if migration_mapping:
-            logging.info(f"检测到 {len(migration_mapping)} 个下载器需要迁移ID，开始自动迁移...")
-            for mapping in migration_mapping:
-                logging.info(f"  - {mapping['name']}: {mapping['old_id']} -> {mapping['new_id']}")
-            
-            # 执行迁移
-            result = execute_migration(db_manager, config_manager, backup=True)
-            
-            if result["success"]:
-                logging.info(f"下载器ID迁移完成！成功迁移 {result['migrated_count']} 个下载器")
-            else:
-                logging.error(f"下载器ID迁移失败: {result.get('message', '未知错误')}")
-        else:
-            logging.info("所有下载器ID已是基于IP:端口的格式，无需迁移")
-    except Exception as e:
-        logging.error(f"检查或执行下载器ID迁移时出错: {e}", exc_info=True)
-        logging.warning("将继续启动应用...")
+    with startup_timings.phase("migrate_downloader_ids"):
+        _migrate_downloader_ids(db_manager)
 
-    # --- 步骤 3: 与下载器同步，建立统计基线 ---
-    # 这个函数现在从 database.py 导入
-    reconcile_historical_data(db_manager, config_manager.get())
+    # --- 步骤 3: 与下载器同步统计基线、初始数据聚合 ---
+    # 这两步可能耗时较长（离线的下载器、大量原始流量数据），
+    # 由 start_background_services 在后台线程中执行，不再阻塞 Web 服务启动
 
     # 动态内部认证token验证函数
     def validate_internal_token(token):
@@ -257,6 +324,23 @@ def create_app():
         logging.info("使用基于认证信息的动态JWT密钥（重启后需要重新登录）")
         return dynamic_secret
 
+    # 请求耗时统计：在认证中间件之前注册，被拒绝的请求同样计时
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_latency(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            # 使用路由模板而不是实际路径，避免每个种子ID产生一个标签值
+            route = request.url_rule.rule if request.url_rule else "<unmatched>"
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started,
+                                         method=request.method,
+                                         route=route,
+                                         status=response.status_code)
+        return response
+
     @app.before_request
     def jwt_guard():
         if not request.path.startswith("/api"):
@@ -299,6 +383,9 @@ def create_app():
 
         # 正常JWT认证流程
         auth_header = request.headers.get("Authorization", "")
+        # EventSource 无法设置请求头，实时速度推送流允许通过查询参数传递 token
+        if not auth_header and request.path == "/api/speed_stream" and request.args.get("token"):
+            auth_header = f"Bearer {request.args.get('token')}"
         try:
             # 仅调试日志，生产可根据需要调整级别
             logging.debug(
@@ -367,31 +454,26 @@ def create_app():
         return jsonify({
             "status": "healthy",
             "service": "pt-nexus-core",
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "startup": startup_timings.snapshot()
         }), 200
 
-    # --- 步骤 5: 执行初始数据聚合 ---
-    logging.info("正在执行初始数据聚合...")
-    try:
-        db_manager.aggregate_hourly_traffic()
-        logging.info("初始数据聚合完成。")
-    except Exception as e:
-        logging.error(f"初始数据聚合失败: {e}")
+    # --- 性能指标端点（Prometheus 文本格式） ---
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        """导出本进程的计数器与直方图"""
+        return Response(metrics.render(),
+                        content_type="text/plain; version=0.0.4; charset=utf-8")
 
-    # --- 步骤 6: 启动后台数据追踪服务 ---
+    # --- 步骤 5: 启动后台数据追踪服务（含下载器同步和初始数据聚合） ---
+    # 生产模式 (gunicorn) 下由 gunicorn.conf.py 在选定的 worker 中启动
     logging.info("正在启动后台数据追踪服务...")
-    # 检查是否在调试模式下运行
-    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-        logging.info("正在启动数据追踪线程...")
-        start_data_tracker(db_manager, config_manager)
-
-        # # --- 启动IYUU后台线程 ---
-        logging.info("正在启动IYUU后台线程...")
-        start_iyuu_thread(db_manager, config_manager)
+    if is_background_process():
+        start_background_services(db_manager)
     else:
-        logging.info("检测到调试监控进程，跳过后台线程启动。")
+        logging.info("当前进程不是后台服务进程，跳过后台线程启动。")
 
-    # --- 步骤 7: 配置前端静态文件服务 ---
+    # --- 步骤 6: 配置前端静态文件服务 ---
     # 这个路由处理所有非 API 请求，将其指向前端应用
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
@@ -414,34 +496,12 @@ if __name__ == "__main__":
     flask_app = create_app()
 
     # 注册应用退出时的清理函数
-    def cleanup():
-        logging.info("正在清理后台线程...")
-        try:
-            from core.services import stop_data_tracker
-            stop_data_tracker()
-        except Exception as e:
-            logging.error(f"停止数据追踪线程失败: {e}", exc_info=True)
-
-        try:
-            from core.iyuu import stop_iyuu_thread
-            stop_iyuu_thread()
-        except Exception as e:
-            logging.error(f"停止IYUU线程失败: {e}", exc_info=True)
+    atexit.register(stop_background_services)
 
-        logging.info("后台线程清理完成。")
-
-    atexit.register(cleanup)
-
-    # 根据 DEV_ENV 环境变量设置端口
-    if os.getenv("DEV_ENV") == "true":
-        # 开发环境
-        port = 35274
-    else:
-        # 生产环境
-        port = 5274
+    port = get_server_port()
 
     logging.info(f"以开发模式启动 Flask 服务器，监听端口 http://0.0.0.0:{port} ...")
+    logging.info("生产环境请使用: gunicorn -c gunicorn.conf.py wsgi:app")
 
-    # 运行 Flask 应用
-    # debug=False 是生产环境推荐的设置
+    # 运行 Flask 应用（Werkzeug 开发服务器，带重载器）
     flask_app.run(host="0.0.0.0", port=port, debug=True)
@@ -106,7 +106,24 @@ class ConfigManager:
                 "downloaderIds": []
             },
             # --- [新增] 已删除的站点列表 ---
-            "deleted_sites": []
+            "deleted_sites": [],
+            # --- [新增] 详情页/种子文件抓取缓存设置 ---
+            "fetch_cache": {
+                "enabled": True,
+                "ttl_minutes": 60,  # 详情页缓存直接命中的有效期（分钟）
+                "max_size_mb": 500  # 缓存目录容量上限（MB），超出后按 LRU 淘汰
+            },
+            # --- [新增] PT-Gen 影片信息缓存与对冲请求设置 ---
+            "ptgen_cache": {
+                "enabled": True,
+                "ttl_days": 7,  # 按豆瓣/IMDb ID 缓存的影片信息有效期（天）
+                "hedge_delay_seconds": 3  # 上一个 API 超过该时间未返回时提前请求下一个
+            },
+            # --- [新增] 种子参数大文本列（简介、MediaInfo、截图、声明）压缩存储 ---
+            "seed_storage": {
+                "compress_large_text": False,
+                "min_size_bytes": 1024  # 小于该长度的文本不压缩
+            }
         }
 
     def load(self):
@@ -205,6 +222,27 @@ class ConfigManager:
                     if "anonymous_upload" not in self._config["upload_settings"]:
                         self._config["upload_settings"]["anonymous_upload"] = True
 
+                # --- [新增] 抓取缓存配置兼容 ---
+                if "fetch_cache" not in self._config:
+                    self._config["fetch_cache"] = default_conf["fetch_cache"]
+                else:
+                    for key, value in default_conf["fetch_cache"].items():
+                        self._config["fetch_cache"].setdefault(key, value)
+
+                # --- [新增] PT-Gen 缓存配置兼容 ---
+                if "ptgen_cache" not in self._config:
+                    self._config["ptgen_cache"] = default_conf["ptgen_cache"]
+                else:
+                    for key, value in default_conf["ptgen_cache"].items():
+                        self._config["ptgen_cache"].setdefault(key, value)
+
+                # --- [新增] 种子参数压缩存储配置兼容 ---
+                if "seed_storage" not in self._config:
+                    self._config["seed_storage"] = default_conf["seed_storage"]
+                else:
+                    for key, value in default_conf["seed_storage"].items():
+                        self._config["seed_storage"].setdefault(key, value)
+
             except (json.JSONDecodeError, IOError) as e:
                 logging.error(f"无法读取或解析 {CONFIG_FILE}: {e}。将加载一个安全的默认配置。")
                 self._config = default_conf
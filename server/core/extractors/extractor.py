@@ -18,6 +18,8 @@ import requests
 import os
 import urllib.parse
 
+from utils.html_parser import get_html_parser, parse_html, html_to_bbcode
+
 CONFIG_DIR = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "configs")
 from .sites.audiences import AudiencesSpecialExtractor
@@ -377,21 +379,19 @@ class Extractor:
             extracted_data["intro"]["douban_link"] = douban_link
 
             # Process description content to extract quotes, images, and body text
-            descr_html_string = str(descr_container)
-            corrected_descr_html = re.sub(r'</?br\s*/?>',
-                                          '<br/>',
-                                          descr_html_string,
-                                          flags=re.IGNORECASE)
-            corrected_descr_html = re.sub(r'(<img[^>]*[^/])>', r'\1 />',
-                                          corrected_descr_html)
-
-            try:
-                from bs4 import BeautifulSoup as BS
-                descr_container_soup = BS(corrected_descr_html, "lxml")
-            except ImportError:
-                descr_container_soup = BS(corrected_descr_html, "html.parser")
-
-            bbcode = self._html_to_bbcode(descr_container_soup)
+            # lxml 解析时已将 </br>、未闭合的 <img> 等规范化，可直接复用页面解析结果，无需二次解析
+            if get_html_parser() == "lxml":
+                bbcode = self._html_to_bbcode(descr_container)
+            else:
+                descr_html_string = str(descr_container)
+                corrected_descr_html = re.sub(r'</?br\s*/?>',
+                                              '<br/>',
+                                              descr_html_string,
+                                              flags=re.IGNORECASE)
+                corrected_descr_html = re.sub(r'(<img[^>]*[^/])>', r'\1 />',
+                                              corrected_descr_html)
+                descr_container_soup = parse_html(corrected_descr_html)
+                bbcode = self._html_to_bbcode(descr_container_soup)
 
             # Clean nested quotes
             original_bbcode = bbcode
@@ -971,40 +971,7 @@ class Extractor:
         Returns:
             BBCode string
         """
-        import re
-        content = []
-        if not hasattr(tag, "contents"):
-            return ""
-        for child in tag.contents:
-            if isinstance(child, str):
-                content.append(child.replace("\xa0", " "))
-            elif child.name == "br":
-                content.append("\n")
-            elif child.name == "fieldset":
-                content.append(
-                    f"[quote]{self._html_to_bbcode(child).strip()}[/quote]")
-            elif child.name == "legend":
-                continue
-            elif child.name == "b":
-                content.append(f"[b]{self._html_to_bbcode(child)}[/b]")
-            elif child.name == "img" and child.get("src"):
-                content.append(f"[img]{child['src']}[/img]")
-            elif child.name == "a" and child.get("href"):
-                content.append(
-                    f"[url={child['href']}]{self._html_to_bbcode(child)}[/url]"
-                )
-            elif (child.name == "span" and child.get("style") and
-                  (match := re.search(r"color:\s*([^;]+)", child["style"]))):
-                content.append(
-                    f"[color={match.group(1).strip()}]{self._html_to_bbcode(child)}[/color]"
-                )
-            elif child.name == "font" and child.get("size"):
-                content.append(
-                    f"[size={child['size']}]{self._html_to_bbcode(child)}[/size]"
-                )
-            else:
-                content.append(self._html_to_bbcode(child))
-        return "".join(content)
+        return html_to_bbcode(tag)
 
 
 # [新增] 定义音频编码的层级（权重），数字越大越优先
@@ -7,8 +7,8 @@ Audiences特殊站点种子详情参数提取器
 import re
 import os
 import yaml
-from bs4 import BeautifulSoup
-from utils import extract_tags_from_mediainfo, extract_origin_from_description
+from bs4 import Comment, Tag
+from utils import extract_tags_from_mediainfo, extract_origin_from_description, parse_html
 from config import TEMP_DIR
 
 # 加载内容过滤配置
@@ -177,15 +177,16 @@ class AudiencesSpecialExtractor:
             # 检查是否是引用标题
             legend = quote_element.select_one("legend")
             if legend and "引用" in legend.get_text():
-                # 获取引用内容（排除legend）
-                quote_content = ""
+                # 获取引用内容的纯文本（排除legend），直接遍历子节点，无需重新解析HTML
+                quote_parts = []
                 for child in quote_element.children:
-                    if child != legend:
-                        quote_content += str(child)
-
-                # 清理引用内容
-                quote_text = BeautifulSoup(quote_content,
-                                           "html.parser").get_text().strip()
+                    if child == legend or isinstance(child, Comment):
+                        continue
+                    if isinstance(child, Tag):
+                        quote_parts.append(child.get_text())
+                    else:
+                        quote_parts.append(str(child))
+                quote_text = "".join(quote_parts).strip()
                 if quote_text:
                     # 过滤掉不需要的声明和信息
                     if not self._is_unwanted_declaration(quote_text):
@@ -215,7 +216,7 @@ class AudiencesSpecialExtractor:
             flags=re.DOTALL)
 
         # 清理HTML标签获取纯文本
-        body_soup = BeautifulSoup(body_content, "html.parser")
+        body_soup = parse_html(body_content)
         body = body_soup.get_text().strip()
 
         # 过滤掉ARUTU相关工具的声明信息
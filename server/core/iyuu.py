@@ -8,6 +8,11 @@ import hashlib
 from threading import Thread
 from collections import defaultdict
 from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+from utils.metrics import IYUU_REQUEST_SECONDS, IYUU_WAIT_SECONDS
+
+logger = logging.getLogger(__name__)
 
 
 class IYUUThread(Thread):
@@ -22,7 +27,7 @@ class IYUUThread(Thread):
         self.interval = 21600  # 6小时
 
     def run(self):
-        print("IYUUThread 线程已启动，每6小时执行一次查询任务。")
+        logger.info("IYUUThread 线程已启动，每6小时执行一次查询任务。")
         # 等待5秒再开始执行，避免与主程序启动冲突
         time.sleep(5)
 
@@ -300,7 +305,7 @@ class IYUUThread(Thread):
                 logging.warning("IYUU Token未配置，跳过IYUU搜索。")
                 return result_stats if return_stats else None
 
-            print(f"开始执行IYUU搜索，共 {len(agg_torrents)} 个种子组")
+            logger.info("开始执行IYUU搜索，共 %s 个种子组", len(agg_torrents))
 
             # 获取过滤后的sid_sha1和站点列表，只包含在torrents表中存在的站点
             sid_sha1, all_sites = get_filtered_sid_sha1_and_sites(
@@ -329,7 +334,7 @@ class IYUUThread(Thread):
 
             # 获取数据库中现有的站点信息 (keyed by nickname)
             existing_sites = self._get_existing_sites()
-            print(f"数据库中存在 {len(existing_sites)} 个配置站点")
+            logger.info("数据库中存在 %s 个配置站点", len(existing_sites))
 
             # 处理所有种子组
             test_torrents = list(agg_torrents.items())
@@ -355,7 +360,7 @@ class IYUUThread(Thread):
                         log_iyuu_message(skip_message, "INFO")
                         continue
 
-                print(f"[{i+1}/{total_torrents}] 🔍 正在处理种子组: {name}")
+                logger.debug("[%s/%s] 🔍 正在处理种子组: %s", i + 1, total_torrents, name)
 
                 # 获取优先hash列表和过滤后的种子列表
                 priority_hashes, filtered_torrents = self._get_priority_hash_for_torrent_group(
@@ -424,9 +429,8 @@ class IYUUThread(Thread):
                 # 如果成功查询到结果，继续处理
                 # 打印搜索结果并筛选现有站点
                 if not results:
-                    print(
-                        f"[{i+1}/{total_torrents}] 种子 {selected_hash[:8]}... 未在其他站点发现。"
-                    )
+                    logger.debug("[%d/%d] 种子 %s... 未在其他站点发现。", i + 1,
+                                 total_torrents, selected_hash[:8])
                 else:
                     # 筛选出现在数据库中的站点
                     matched_sites = []
@@ -661,9 +665,9 @@ class IYUUThread(Thread):
                 updated_count += cursor.rowcount
 
             conn.commit()
-            print(f"🔄 已更新 {updated_count} 条种子记录的iyuu_last_check时间")
+            logger.info("🔄 已更新 %s 条种子记录的iyuu_last_check时间", updated_count)
             if filled_details_count > 0:
-                print(f"✅ 已为 {filled_details_count} 条种子记录填入详情链接")
+                logger.info("✅ 已为 %s 条种子记录填入详情链接", filled_details_count)
 
         except Exception as e:
             logging.error(f"更新种子记录iyuu_last_check时间和详情链接时出错: {e}",
@@ -724,8 +728,8 @@ class IYUUThread(Thread):
             # 找出缺失的站点
             missing_sites = iyuu_sites - existing_sites
 
-            print(
-                f"发现 {len(missing_sites)} 个缺失的站点: {', '.join(missing_sites)}")
+            logger.info("发现 %d 个缺失的站点: %s", len(missing_sites),
+                        ', '.join(missing_sites))
 
             # 为每个缺失的站点添加记录
             for site_name in missing_sites:
@@ -785,10 +789,13 @@ class IYUUThread(Thread):
                             current_time,  # last_seen设为当前时间
                             current_time  # iyuu_last_check设为当前时间
                         ))
-                print(f"✅ 已为站点 '{site_name}' 添加种子记录")
+                logger.debug("✅ 已为站点 '%s' 添加种子记录", site_name)
 
+            if missing_sites:
+                # 新增了同名种子的站点，同步站点存在表
+                self.db_manager.refresh_torrent_site_presence(cursor, [torrent_name])
             conn.commit()
-            print(f"成功处理 {len(missing_sites)} 个缺失站点的种子记录")
+            logger.info("成功处理 %s 个缺失站点的种子记录", len(missing_sites))
 
             # 返回统计信息
             if return_count:
@@ -917,7 +924,7 @@ class IYUUThread(Thread):
 
     def stop(self):
         """停止线程"""
-        print("正在停止 IYUUThread 线程...")
+        logger.info("正在停止 IYUUThread 线程...")
         self._is_running = False
 
 
@@ -1088,8 +1095,9 @@ def make_api_request(method: str,
             time_since_last_request = current_time - _last_request_time
             if time_since_last_request < _rate_limit_delay:
                 sleep_time = _rate_limit_delay - time_since_last_request
-                print(f"请求频率控制: 等待 {sleep_time:.2f} 秒")
+                logger.debug("请求频率控制: 等待 %.2f 秒", sleep_time)
                 time.sleep(sleep_time)
+                IYUU_WAIT_SECONDS.observe(sleep_time, reason="rate_limit")
 
             # 更新最后请求时间
             _last_request_time = time.time()
@@ -1102,20 +1110,29 @@ def make_api_request(method: str,
                 # 使用 update 方法将传入的 headers 合并进来
                 final_headers.update(kwargs.pop('headers'))
 
-            if method.upper() == 'GET':
-                response = requests.get(url,
-                                        headers=final_headers,
-                                        timeout=20,
-                                        **kwargs)
-            elif method.upper() == 'POST':
-                response = requests.post(url,
-                                         headers=final_headers,
-                                         timeout=20,
-                                         **kwargs)
-            else:
+            if method.upper() not in ('GET', 'POST'):
                 raise ValueError("Unsupported HTTP method")
 
-            response.raise_for_status()  # 如果状态码不是 2xx，则抛出异常
+            request_started = time.perf_counter()
+            request_result = "error"
+            try:
+                if method.upper() == 'GET':
+                    response = requests.get(url,
+                                            headers=final_headers,
+                                            timeout=20,
+                                            **kwargs)
+                else:
+                    response = requests.post(url,
+                                             headers=final_headers,
+                                             timeout=20,
+                                             **kwargs)
+                response.raise_for_status()  # 如果状态码不是 2xx，则抛出异常
+                request_result = "ok"
+            finally:
+                IYUU_REQUEST_SECONDS.observe(time.perf_counter() -
+                                             request_started,
+                                             endpoint=urlparse(url).path,
+                                             result=request_result)
 
             data = response.json()
             if data.get("code") != 0:
@@ -1134,6 +1151,7 @@ def make_api_request(method: str,
                     "WARNING")
                 log_iyuu_message(f"等待 {wait_time} 秒后重试...", "INFO")
                 time.sleep(wait_time)
+                IYUU_WAIT_SECONDS.observe(wait_time, reason="retry")
             else:
                 raise Exception(error_msg)
         except json.JSONDecodeError as e:
@@ -1145,6 +1163,7 @@ def make_api_request(method: str,
                     "WARNING")
                 log_iyuu_message(f"等待 {wait_time} 秒后重试...", "INFO")
                 time.sleep(wait_time)
+                IYUU_WAIT_SECONDS.observe(wait_time, reason="retry")
             else:
                 raise Exception(error_msg)
         except Exception as e:
@@ -1160,40 +1179,41 @@ def make_api_request(method: str,
                     "WARNING")
                 log_iyuu_message(f"等待 {wait_time} 秒后重试...", "INFO")
                 time.sleep(wait_time)
+                IYUU_WAIT_SECONDS.observe(wait_time, reason="retry")
             else:
                 raise e
 
 
 def get_supported_sites(token: str) -> list:
     """获取 IYUU 支持的所有可辅种站点列表"""
-    print("正在获取 IYUU 支持的可辅种站点列表...")
+    logger.info("正在获取 IYUU 支持的可辅种站点列表...")
     url = f"{API_BASE}/reseed/sites/index"
     response_data = make_api_request("GET", url, token)
     sites = response_data.get("data", {}).get("sites", [])
-    print(f"从API获取到的可辅种站点数量: {len(sites) if response_data.get('data') else 0}")
+    logger.debug("从API获取到的可辅种站点数量: %s", len(sites) if response_data.get('data') else 0)
     if not sites:
         raise Exception("未能获取到可辅种站点列表，请检查 Token 或 IYUU 服务状态。")
-    print(f"成功获取到 {len(sites)} 个可辅种站点信息。")
+    logger.info("成功获取到 %s 个可辅种站点信息。", len(sites))
     return sites
 
 
 def get_sid_sha1(token: str, all_sites: list) -> str:
     """根据站点列表上报并获取 sid_sha1"""
-    print("正在生成站点校验哈希 (sid_sha1)...")
-    print(f"接收到的站点数量: {len(all_sites)}")
+    logger.info("正在生成站点校验哈希 (sid_sha1)...")
+    logger.debug("接收到的站点数量: %s", len(all_sites))
 
     # 打印前几个站点的信息用于调试
     for i, site in enumerate(all_sites[:5]):
-        print(f"站点 {i+1}: ID={site.get('id')}, 名称={site.get('nickname')}")
+        logger.debug("站点 %s: ID=%s, 名称=%s", i + 1, site.get('id'), site.get('nickname'))
 
     site_ids = [site['id'] for site in all_sites]
-    print(f"提取的站点ID数量: {len(site_ids)}")
+    logger.debug("提取的站点ID数量: %s", len(site_ids))
 
     if not site_ids:
         raise Exception("站点ID列表为空，无法生成sid_sha1")
 
     payload = {"sid_list": site_ids}
-    print(f"发送的payload: {payload}")
+    logger.debug("发送的payload: %s", payload)
 
     url = f"{API_BASE}/reseed/sites/reportExisting"
 
@@ -1208,13 +1228,13 @@ def get_sid_sha1(token: str, all_sites: list) -> str:
     sid_sha1 = response_data.get("data", {}).get("sid_sha1")
     if not sid_sha1:
         raise Exception("未能从 API 获取 sid_sha1。")
-    print("成功生成 sid_sha1。")
+    logger.info("成功生成 sid_sha1。")
     return sid_sha1
 
 
 def get_filtered_sid_sha1_and_sites(token: str, db_manager) -> tuple:
     """获取过滤后的sid_sha1和站点列表，只包含在torrents表中存在的站点"""
-    print("=== 开始获取过滤后的sid_sha1和站点列表 ===")
+    logger.info("=== 开始获取过滤后的sid_sha1和站点列表 ===")
 
     # 初始化缓存管理器
     from config import DATA_DIR
@@ -1248,8 +1268,8 @@ def get_filtered_sid_sha1_and_sites(token: str, db_manager) -> tuple:
         conn.close()
 
         torrent_sites_list = list(torrent_sites)
-        print(f"torrents表中存在的站点数量: {len(torrent_sites_list)}")
-        print(f"站点列表: {', '.join(torrent_sites_list)}")
+        logger.info("torrents表中存在的站点数量: %s", len(torrent_sites_list))
+        logger.debug("站点列表: %s", ', '.join(torrent_sites_list))
 
     except Exception as e:
         logging.error(f"获取torrents表中的站点信息时出错: {e}", exc_info=True)
@@ -1266,13 +1286,13 @@ def get_filtered_sid_sha1_and_sites(token: str, db_manager) -> tuple:
     # 3. 缓存无效或需要更新，重新获取IYUU支持的所有可辅种站点
     try:
         supported_sites = get_supported_sites(token)
-        print(f"获取到 {len(supported_sites)} 个IYUU支持的可辅种站点")
+        logger.info("获取到 %s 个IYUU支持的可辅种站点", len(supported_sites))
     except Exception as e:
         logging.error(f"获取IYUU支持站点列表失败: {e}")
         raise
 
     # 在获取站点列表和后续请求之间添加额外延迟
-    print("等待额外延迟以避免请求频率过快...")
+    logger.info("等待额外延迟以避免请求频率过快...")
     time.sleep(2)
 
     # 4. 从数据库获取 site -> nickname 映射
@@ -1327,14 +1347,14 @@ def get_filtered_sid_sha1_and_sites(token: str, db_manager) -> tuple:
             filtered_sites.append(site)
             processed_site_ids.add(iyuu_id)
 
-    print(f"过滤后得到 {len(filtered_site_ids)} 个支持的站点ID")
-    print(f"站点ID列表: {filtered_site_ids}")
+    logger.info("过滤后得到 %s 个支持的站点ID", len(filtered_site_ids))
+    logger.debug("站点ID列表: %s", filtered_site_ids)
 
     if not filtered_site_ids:
         raise Exception("没有找到在torrents表中存在的IYUU支持站点")
 
     # 在发送reportExisting请求前添加额外延迟
-    print("准备发送reportExisting请求，等待额外延迟...")
+    logger.info("准备发送reportExisting请求，等待额外延迟...")
     time.sleep(2)
 
     # 5. 构建sid_sha1
@@ -1352,7 +1372,7 @@ def get_filtered_sid_sha1_and_sites(token: str, db_manager) -> tuple:
         sid_sha1 = response_data.get("data", {}).get("sid_sha1")
         if not sid_sha1:
             raise Exception("未能从 API 获取 sid_sha1。")
-        print(f"成功生成过滤后的 sid_sha1: {sid_sha1}")
+        logger.info("成功生成过滤后的 sid_sha1: %s", sid_sha1)
 
         # 6. 保存缓存
         cache.save_cache(sid_sha1, filtered_sites, torrent_sites_list)
@@ -1378,7 +1398,7 @@ def query_cross_seed(token: str,
     Returns:
         list: 辅种信息列表
     """
-    print(f"正在为种子 {infohash[:8]}... 查询辅种信息...")
+    logger.debug("正在为种子 %s... 查询辅种信息...", infohash[:8])
     url = f"{API_BASE}/reseed/index/index"
 
     for attempt in range(max_retries):
@@ -1425,6 +1445,7 @@ def query_cross_seed(token: str,
                     "WARNING")
                 log_iyuu_message(f"等待 {wait_time} 秒后重试...", "INFO")
                 time.sleep(wait_time)
+                IYUU_WAIT_SECONDS.observe(wait_time, reason="retry")
             else:
                 log_iyuu_message(f"查询辅种信息失败，已达到最大重试次数: {error_msg}", "ERROR")
                 raise e
@@ -1449,24 +1470,24 @@ def log_iyuu_message(message, level="INFO"):
     if len(iyuu_logs) > 100:
         iyuu_logs.pop(0)
 
-    # 同时打印到控制台
-    print(f"[IYUU-{level}] {timestamp} {message}")
+    # 同时写入日志（记录调用方的位置，限流按调用位置区分）
+    logger.log(getattr(logging, level, logging.INFO), "[IYUU] %s", message,
+               stacklevel=2)
 
 
 def start_iyuu_thread(db_manager, config_manager):
     """初始化并启动全局 IYUUThread 线程实例。"""
     global iyuu_thread
-    # 检查是否在调试模式下运行，避免重复启动
-    import os
-    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
-        # 在调试模式下，这是监控进程，不需要启动线程
-        print("检测到调试监控进程，跳过IYUU线程启动。")
+    # 只在后台服务进程中启动，避免重载器监控进程或多个 worker 重复启动
+    from core.runtime import is_background_process
+    if not is_background_process():
+        logger.info("当前进程不是后台服务进程，跳过IYUU线程启动。")
         return iyuu_thread
 
     if iyuu_thread is None or not iyuu_thread.is_alive():
         iyuu_thread = IYUUThread(db_manager, config_manager)
         iyuu_thread.start()
-        print("已创建并启动新的 IYUUThread 实例。")
+        logger.info("已创建并启动新的 IYUUThread 实例。")
     return iyuu_thread
 
 
@@ -1476,5 +1497,5 @@ def stop_iyuu_thread():
     if iyuu_thread and iyuu_thread.is_alive():
         iyuu_thread.stop()
         iyuu_thread.join(timeout=10)
-        print("IYUUThread 线程已停止。")
+        logger.info("IYUUThread 线程已停止。")
     iyuu_thread = None
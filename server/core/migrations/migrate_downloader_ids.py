@@ -1,11 +1,28 @@
 """
 下载器ID迁移脚本
 将基于UUID的ID迁移到基于IP的ID
+
+各表通过与 downloader_id_migration 映射表关联的单条 UPDATE 完成迁移，
+按主键前导列分批执行并逐批提交（进度写入日志），大表迁移不会长时间锁表；
+中途失败后重新执行会从未迁移的行继续。备份默认只复制需要迁移的行。
 """
+import json
 import logging
 from datetime import datetime
 from utils.downloader_id_helper import generate_migration_mapping
 
+# 需要迁移的表: (表名, 下载器ID列, 分批使用的列（主键前导列）, 与下载器ID组成主键的其他列)
+# 第四项不为空时，目标ID下已存在相同主键的行会被跳过，避免主键冲突
+MIGRATION_TABLES = [
+    ("traffic_stats", "downloader_id", "stat_datetime", ("stat_datetime", )),
+    ("torrents", "downloader_id", "hash", ()),
+    ("torrent_upload_stats", "downloader_id", "hash", ("hash", )),
+    ("seed_parameters", "downloader_id", "hash", ()),
+]
+
+# 每批迁移的行数
+MIGRATION_CHUNK_SIZE = 20000
+
 
 def create_migration_table(db_manager):
     """创建ID迁移映射表"""
@@ -56,39 +73,42 @@ def create_migration_table(db_manager):
         conn.close()
 
 
-def backup_tables(db_manager):
-    """备份关键数据表"""
+def backup_tables(db_manager, backup_suffix=None, affected_only=True):
+    """
+    备份关键数据表
+
+    Args:
+        backup_suffix: 备份表后缀，默认使用当前时间
+        affected_only: 只备份下载器ID在迁移映射表中的行（需先保存迁移映射）；
+                       False 时复制整张表
+
+    Returns:
+        str: 备份表后缀，失败时返回 None
+    """
     conn = db_manager._get_connection()
     cursor = db_manager._get_cursor(conn)
-    backup_suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    tables_to_backup = [
-        "traffic_stats",
-        "torrents",
-        "torrent_upload_stats",
-        "seed_parameters"
-    ]
-    
+    backup_suffix = backup_suffix or datetime.now().strftime("%Y%m%d_%H%M%S")
+
     try:
-        for table in tables_to_backup:
+        for table, id_column, _, _ in MIGRATION_TABLES:
             backup_table = f"{table}_backup_{backup_suffix}"
-            
-            if db_manager.db_type == "postgresql":
-                cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-            elif db_manager.db_type == "mysql":
-                cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-            else:  # SQLite
+            if affected_only:
+                cursor.execute(
+                    f"CREATE TABLE {backup_table} AS SELECT * FROM {table} "
+                    f"WHERE {id_column} IN (SELECT old_id FROM downloader_id_migration)"
+                )
+            else:
                 cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-            
+
             logging.info(f"表 {table} 备份为 {backup_table}")
-        
+
         conn.commit()
         logging.info("所有关键表备份完成")
-        return True
+        return backup_suffix
     except Exception as e:
         logging.error(f"备份表失败: {e}", exc_info=True)
         conn.rollback()
-        return False
+        return None
     finally:
         cursor.close()
         conn.close()
@@ -143,116 +163,153 @@ def save_migration_mapping(db_manager, migration_mapping):
         conn.close()
 
 
-def migrate_table_ids(db_manager, table_name, id_column):
-    """迁移指定表中的下载器ID"""
+def _build_migration_update_sql(db_manager, table_name, id_column, key_columns,
+                                range_conditions):
+    """
+    构造将 table_name 中旧下载器ID替换为新ID的集合式 UPDATE 语句。
+
+    key_columns 不为空时跳过目标ID下已存在相同主键的行；range_conditions 中的列名使用
+    占位前缀 "{ref}."，按数据库方言替换为表别名。
+    """
+    if db_manager.db_type == "sqlite":
+        ref = table_name
+    else:
+        ref = "t"
+    ranges = [cond.format(ref=ref) for cond in range_conditions]
+    key_match = "".join(f" AND c.{k} = {ref}.{k}" for k in key_columns)
+
+    if db_manager.db_type == "mysql":
+        # MySQL 的 UPDATE 子查询中不能引用被更新的表，冲突检查使用 LEFT JOIN 反连接
+        conflict_join = ""
+        conditions = list(ranges)
+        if key_columns:
+            conflict_join = f" LEFT JOIN {table_name} c ON c.{id_column} = m.new_id{key_match}"
+            conditions.append(f"c.{id_column} IS NULL")
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return (f"UPDATE {table_name} t JOIN downloader_id_migration m ON t.{id_column} = m.old_id"
+                f"{conflict_join} SET t.{id_column} = m.new_id{where}")
+
+    if db_manager.db_type == "postgresql":
+        conditions = [f"t.{id_column} = m.old_id"] + ranges
+        if key_columns:
+            conditions.append(
+                f"NOT EXISTS (SELECT 1 FROM {table_name} c WHERE c.{id_column} = m.new_id{key_match})"
+            )
+        return (f"UPDATE {table_name} t SET {id_column} = m.new_id FROM downloader_id_migration m "
+                f"WHERE {' AND '.join(conditions)}")
+
+    # SQLite
+    conditions = [f"{id_column} IN (SELECT old_id FROM downloader_id_migration)"] + ranges
+    if key_columns:
+        conditions.append(
+            f"NOT EXISTS (SELECT 1 FROM downloader_id_migration m JOIN {table_name} c "
+            f"ON c.{id_column} = m.new_id WHERE m.old_id = {ref}.{id_column}{key_match})")
+    return (f"UPDATE {table_name} SET {id_column} = (SELECT m.new_id FROM downloader_id_migration m "
+            f"WHERE m.old_id = {table_name}.{id_column}) WHERE {' AND '.join(conditions)}")
+
+
+def migrate_table_ids(db_manager, table_name, id_column,
+                      chunk_size=MIGRATION_CHUNK_SIZE, progress_callback=None):
+    """
+    迁移指定表中的下载器ID
+
+    按分批列的取值范围分批执行集合式 UPDATE，每批提交一次并报告进度。
+
+    Args:
+        progress_callback: 可选，每批完成后调用 progress_callback(table_name, 已迁移行数, 总行数)
+    """
+    table_info = next((t for t in MIGRATION_TABLES if t[0] == table_name), None)
+    chunk_column = table_info[2] if table_info else None
+    key_columns = table_info[3] if table_info else ()
+    ph = db_manager.get_placeholder()
+
     conn = db_manager._get_connection()
     cursor = db_manager._get_cursor(conn)
-    
+
     try:
-        # 获取所有迁移映射
-        cursor.execute("SELECT old_id, new_id FROM downloader_id_migration")
-        mappings = {row["old_id"]: row["new_id"] for row in cursor.fetchall()}
-        
-        if not mappings:
-            logging.info(f"没有迁移映射，跳过表 {table_name}")
+        cursor.execute(
+            f"SELECT COUNT(*) AS total FROM {table_name} "
+            f"WHERE {id_column} IN (SELECT old_id FROM downloader_id_migration)")
+        total = cursor.fetchone()["total"]
+
+        if not total:
+            logging.info(f"表 {table_name} 中没有需要迁移的记录")
             return True
-        
-        # 使用临时列方法避免主键冲突
-        # 1. 检查是否有复合主键或唯一约束涉及该列
-        temp_column = f"__{id_column}_temp__"
-        
+
         try:
-            # 添加临时列
-            if db_manager.db_type == "postgresql":
-                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {temp_column} VARCHAR(36)")
-            elif db_manager.db_type == "mysql":
-                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {temp_column} VARCHAR(36)")
-            else:  # SQLite
-                cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {temp_column} TEXT")
-            
-            # 将新ID值复制到临时列（仅对需要迁移的记录）
             updated_count = 0
-            for old_id, new_id in mappings.items():
-                if db_manager.db_type == "postgresql":
-                    cursor.execute(
-                        f"UPDATE {table_name} SET {temp_column} = %s WHERE {id_column} = %s",
-                        (new_id, old_id)
-                    )
-                elif db_manager.db_type == "mysql":
-                    cursor.execute(
-                        f"UPDATE {table_name} SET {temp_column} = %s WHERE {id_column} = %s",
-                        (new_id, old_id)
-                    )
-                else:  # SQLite
-                    cursor.execute(
-                        f"UPDATE {table_name} SET {temp_column} = ? WHERE {id_column} = ?",
-                        (new_id, old_id)
-                    )
-                updated_count += cursor.rowcount
-            
-            # 更新原列的值
-            if db_manager.db_type == "postgresql":
-                cursor.execute(f"UPDATE {table_name} SET {id_column} = {temp_column} WHERE {temp_column} IS NOT NULL")
-            elif db_manager.db_type == "mysql":
-                cursor.execute(f"UPDATE {table_name} SET {id_column} = {temp_column} WHERE {temp_column} IS NOT NULL")
-            else:  # SQLite
-                cursor.execute(f"UPDATE {table_name} SET {id_column} = {temp_column} WHERE {temp_column} IS NOT NULL")
-            
-            # 删除临时列
-            if db_manager.db_type == "postgresql":
-                cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {temp_column}")
-            elif db_manager.db_type == "mysql":
-                cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {temp_column}")
-            else:  # SQLite
-                # SQLite不支持DROP COLUMN，跳过
-                pass
-            
-            conn.commit()
+            lower = None
+            while True:
+                upper = None
+                if chunk_column:
+                    # 本批的上界：从下界起第 chunk_size 条待迁移记录的分批列取值
+                    boundary_sql = (
+                        f"SELECT {chunk_column} FROM {table_name} "
+                        f"WHERE {id_column} IN (SELECT old_id FROM downloader_id_migration)")
+                    if lower is not None:
+                        boundary_sql += f" AND {chunk_column} > {ph}"
+                    boundary_sql += f" ORDER BY {chunk_column} LIMIT 1 OFFSET {chunk_size - 1}"
+                    cursor.execute(boundary_sql, () if lower is None else (lower, ))
+                    row = cursor.fetchone()
+                    upper = row[chunk_column] if row else None
+
+                range_conditions, params = [], []
+                if lower is not None:
+                    range_conditions.append(f"{{ref}}.{chunk_column} > {ph}")
+                    params.append(lower)
+                if upper is not None:
+                    range_conditions.append(f"{{ref}}.{chunk_column} <= {ph}")
+                    params.append(upper)
+
+                cursor.execute(
+                    _build_migration_update_sql(db_manager, table_name, id_column,
+                                                key_columns, range_conditions),
+                    tuple(params))
+                updated_count += max(cursor.rowcount, 0)
+                conn.commit()
+
+                logging.info(
+                    f"表 {table_name} 迁移进度: {updated_count}/{total} "
+                    f"({min(updated_count * 100 // total, 100)}%)")
+                if progress_callback:
+                    progress_callback(table_name, updated_count, total)
+
+                if upper is None:
+                    break
+                lower = upper
+
+            skipped = total - updated_count
+            if skipped > 0:
+                logging.warning(
+                    f"表 {table_name} 中有 {skipped} 条记录的新ID下已存在相同主键的记录，保留原ID")
             logging.info(f"表 {table_name} 中更新了 {updated_count} 条记录")
             return True
-            
-        except Exception as temp_e:
-            # 如果临时列方法失败，尝试直接更新（适用于没有约束冲突的情况）
-            logging.warning(f"临时列方法失败: {temp_e}，尝试直接更新...")
+
+        except Exception as set_e:
+            # 集合式更新失败（例如多个旧ID映射到同一新ID产生主键冲突），降级为逐个映射更新
+            logging.warning(f"集合式更新失败: {set_e}，尝试逐个映射直接更新...")
             conn.rollback()
-            
-            # 删除临时列（如果存在）
-            try:
-                if db_manager.db_type != "sqlite":
-                    cursor.execute(f"ALTER TABLE {table_name} DROP COLUMN {temp_column}")
-                    conn.commit()
-            except:
-                pass
-            
-            # 降级到直接更新
+
+            cursor.execute("SELECT old_id, new_id FROM downloader_id_migration")
+            mappings = {row["old_id"]: row["new_id"] for row in cursor.fetchall()}
+
             updated_count = 0
             for old_id, new_id in mappings.items():
                 try:
-                    if db_manager.db_type == "postgresql":
-                        cursor.execute(
-                            f"UPDATE {table_name} SET {id_column} = %s WHERE {id_column} = %s",
-                            (new_id, old_id)
-                        )
-                    elif db_manager.db_type == "mysql":
-                        cursor.execute(
-                            f"UPDATE {table_name} SET {id_column} = %s WHERE {id_column} = %s",
-                            (new_id, old_id)
-                        )
-                    else:  # SQLite
-                        cursor.execute(
-                            f"UPDATE {table_name} SET {id_column} = ? WHERE {id_column} = ?",
-                            (new_id, old_id)
-                        )
+                    cursor.execute(
+                        f"UPDATE {table_name} SET {id_column} = {ph} WHERE {id_column} = {ph}",
+                        (new_id, old_id)
+                    )
                     updated_count += cursor.rowcount
                     conn.commit()
                 except Exception as update_e:
                     # 单条更新失败，记录但继续
                     logging.warning(f"无法更新 {table_name} 中的ID {old_id}->{new_id}: {update_e}")
                     conn.rollback()
-            
+
             logging.info(f"表 {table_name} 中更新了 {updated_count} 条记录（直接更新方式，可能有冲突被跳过）")
             return True
-            
+
     except Exception as e:
         logging.error(f"迁移表 {table_name} 失败: {e}", exc_info=True)
         conn.rollback()
@@ -262,70 +319,76 @@ def migrate_table_ids(db_manager, table_name, id_column):
         conn.close()
 
 
+def migrate_all_tables(db_manager, chunk_size=MIGRATION_CHUNK_SIZE,
+                       progress_callback=None):
+    """
+    依次迁移 MIGRATION_TABLES 中的所有表
+
+    Returns:
+        str: 迁移失败的表名；全部成功时返回 None
+    """
+    for table_name, id_column, _, _ in MIGRATION_TABLES:
+        if not migrate_table_ids(db_manager, table_name, id_column,
+                                 chunk_size=chunk_size,
+                                 progress_callback=progress_callback):
+            return table_name
+    return None
+
+
 def migrate_batch_enhance_records(db_manager):
     """迁移 batch_enhance_records 表中JSON字段里的下载器ID"""
     conn = db_manager._get_connection()
     cursor = db_manager._get_cursor(conn)
-    
+    ph = db_manager.get_placeholder()
+
     try:
         # 获取所有迁移映射
         cursor.execute("SELECT old_id, new_id FROM downloader_id_migration")
         mappings = {row["old_id"]: row["new_id"] for row in cursor.fetchall()}
-        
+
         if not mappings:
             logging.info("没有迁移映射，跳过 batch_enhance_records")
             return True
-        
-        # 获取所有记录
-        cursor.execute("SELECT id, downloader_add_result FROM batch_enhance_records")
+
+        # 只读取JSON中包含旧ID的记录
+        like_conditions = " OR ".join(
+            [f"downloader_add_result LIKE {ph}"] * len(mappings))
+        cursor.execute(
+            f"SELECT id, downloader_add_result FROM batch_enhance_records WHERE {like_conditions}",
+            tuple(f"%{old_id}%" for old_id in mappings))
         records = cursor.fetchall()
-        
-        updated_count = 0
-        import json
-        
+
+        updates = []
         for record in records:
             record_id = record["id"]
             result_json = record["downloader_add_result"]
-            
+
             if not result_json:
                 continue
-            
+
             try:
                 result_data = json.loads(result_json)
                 modified = False
-                
+
                 # 遍历JSON中的所有下载器ID并替换
                 for old_id, new_id in mappings.items():
                     if old_id in result_data:
                         result_data[new_id] = result_data.pop(old_id)
                         modified = True
-                
+
                 if modified:
-                    new_json = json.dumps(result_data, ensure_ascii=False)
-                    
-                    if db_manager.db_type == "postgresql":
-                        cursor.execute(
-                            "UPDATE batch_enhance_records SET downloader_add_result = %s WHERE id = %s",
-                            (new_json, record_id)
-                        )
-                    elif db_manager.db_type == "mysql":
-                        cursor.execute(
-                            "UPDATE batch_enhance_records SET downloader_add_result = %s WHERE id = %s",
-                            (new_json, record_id)
-                        )
-                    else:  # SQLite
-                        cursor.execute(
-                            "UPDATE batch_enhance_records SET downloader_add_result = ? WHERE id = ?",
-                            (new_json, record_id)
-                        )
-                    
-                    updated_count += 1
+                    updates.append((json.dumps(result_data, ensure_ascii=False), record_id))
             except json.JSONDecodeError:
                 logging.warning(f"记录 {record_id} 的JSON格式无效，跳过")
                 continue
-        
+
+        if updates:
+            cursor.executemany(
+                f"UPDATE batch_enhance_records SET downloader_add_result = {ph} WHERE id = {ph}",
+                updates)
+
         conn.commit()
-        logging.info(f"batch_enhance_records 表中更新了 {updated_count} 条记录")
+        logging.info(f"batch_enhance_records 表中更新了 {len(updates)} 条记录")
         return True
     except Exception as e:
         logging.error(f"迁移 batch_enhance_records 失败: {e}", exc_info=True)
@@ -340,14 +403,11 @@ def cleanup_backup_tables(db_manager, backup_suffix):
     """清理备份表"""
     conn = db_manager._get_connection()
     cursor = db_manager._get_cursor(conn)
-    
+
     tables_to_cleanup = [
-        f"traffic_stats_backup_{backup_suffix}",
-        f"torrents_backup_{backup_suffix}",
-        f"torrent_upload_stats_backup_{backup_suffix}",
-        f"seed_parameters_backup_{backup_suffix}"
+        f"{table}_backup_{backup_suffix}" for table, _, _, _ in MIGRATION_TABLES
     ]
-    
+
     try:
         for table in tables_to_cleanup:
             try:
@@ -355,7 +415,7 @@ def cleanup_backup_tables(db_manager, backup_suffix):
                 logging.info(f"已删除备份表: {table}")
             except Exception as e:
                 logging.warning(f"删除备份表 {table} 失败: {e}")
-        
+
         conn.commit()
         logging.info("备份表清理完成")
         return True
@@ -368,115 +428,78 @@ def cleanup_backup_tables(db_manager, backup_suffix):
         conn.close()
 
 
-def execute_migration(db_manager, config_manager, backup=True, auto_cleanup=True):
+def execute_migration(db_manager, config_manager, backup=True, auto_cleanup=True,
+                      full_backup=False, progress_callback=None):
     """
     执行完整的ID迁移流程
-    
+
     Args:
         db_manager: 数据库管理器
         config_manager: 配置管理器
         backup: 是否备份表（默认True）
         auto_cleanup: 迁移成功后是否自动删除备份表（默认True）
-        
+        full_backup: 备份整张表（默认False，只备份需要迁移的行）
+        progress_callback: 可选，各表每批迁移完成后调用 progress_callback(表名, 已迁移行数, 总行数)
+
     Returns:
         dict: 包含迁移结果的字典
     """
     logging.info("开始执行下载器ID迁移...")
     backup_suffix = None
-    
+
     # 1. 创建迁移表
     if not create_migration_table(db_manager):
         return {"success": False, "message": "创建迁移表失败"}
-    
+
     # 2. 生成迁移映射
     config = config_manager.get()
     migration_mapping = generate_migration_mapping(config)
-    
+
     if not migration_mapping:
         logging.info("所有下载器ID已是基于IP的格式，无需迁移")
         return {"success": True, "message": "无需迁移", "migrated_count": 0}
-    
+
     logging.info(f"发现 {len(migration_mapping)} 个需要迁移的下载器")
-    
-    # 3. 备份表
-    if backup:
-        backup_suffix = datetime.now().strftime("%Y%m%d_%H%M%S")
-        # 临时修改backup_tables以返回suffix
-        conn = db_manager._get_connection()
-        cursor = db_manager._get_cursor(conn)
-        
-        tables_to_backup = [
-            "traffic_stats",
-            "torrents",
-            "torrent_upload_stats",
-            "seed_parameters"
-        ]
-        
-        try:
-            for table in tables_to_backup:
-                backup_table = f"{table}_backup_{backup_suffix}"
-                
-                if db_manager.db_type == "postgresql":
-                    cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-                elif db_manager.db_type == "mysql":
-                    cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-                else:  # SQLite
-                    cursor.execute(f"CREATE TABLE {backup_table} AS SELECT * FROM {table}")
-                
-                logging.info(f"表 {table} 备份为 {backup_table}")
-            
-            conn.commit()
-            logging.info("所有关键表备份完成")
-        except Exception as e:
-            logging.error(f"备份表失败: {e}", exc_info=True)
-            conn.rollback()
-            cursor.close()
-            conn.close()
-            return {"success": False, "message": "备份表失败"}
-        finally:
-            cursor.close()
-            conn.close()
-    
-    # 4. 保存迁移映射
+
+    # 3. 保存迁移映射（只备份受影响的行时，备份依赖映射表）
     if not save_migration_mapping(db_manager, migration_mapping):
         return {"success": False, "message": "保存迁移映射失败"}
-    
+
+    # 4. 备份表
+    if backup:
+        backup_suffix = backup_tables(db_manager, affected_only=not full_backup)
+        if not backup_suffix:
+            return {"success": False, "message": "备份表失败"}
+
     # 5. 迁移各个表
-    tables_to_migrate = [
-        ("traffic_stats", "downloader_id"),
-        ("torrents", "downloader_id"),
-        ("torrent_upload_stats", "downloader_id"),
-        ("seed_parameters", "downloader_id")
-    ]
-    
-    for table_name, id_column in tables_to_migrate:
-        if not migrate_table_ids(db_manager, table_name, id_column):
-            logging.error(f"迁移失败！备份表已保留: *_backup_{backup_suffix}")
-            return {"success": False, "message": f"迁移表 {table_name} 失败"}
-    
+    failed_table = migrate_all_tables(db_manager, progress_callback=progress_callback)
+    if failed_table:
+        logging.error(f"迁移失败！备份表已保留: *_backup_{backup_suffix}")
+        return {"success": False, "message": f"迁移表 {failed_table} 失败"}
+
     # 6. 迁移 batch_enhance_records 中的JSON数据
     if not migrate_batch_enhance_records(db_manager):
         logging.error(f"迁移失败！备份表已保留: *_backup_{backup_suffix}")
         return {"success": False, "message": "迁移 batch_enhance_records 失败"}
-    
+
     # 7. 更新配置文件中的下载器ID
     for mapping in migration_mapping:
         for downloader in config["downloaders"]:
             if downloader["id"] == mapping["old_id"]:
                 downloader["id"] = mapping["new_id"]
                 logging.info(f"更新配置: {downloader['name']} ID从 {mapping['old_id']} 改为 {mapping['new_id']}")
-    
+
     if not config_manager.save(config):
         logging.error(f"保存配置失败！备份表已保留: *_backup_{backup_suffix}")
         return {"success": False, "message": "保存配置失败"}
-    
+
     # 8. 迁移成功，根据参数决定是否清理备份表
     if backup and backup_suffix and auto_cleanup:
         logging.info("迁移成功，正在清理备份表...")
         cleanup_backup_tables(db_manager, backup_suffix)
     elif backup and backup_suffix:
         logging.info(f"迁移成功！备份表已保留: *_backup_{backup_suffix}")
-    
+
     logging.info("下载器ID迁移完成！")
     return {
         "success": True,
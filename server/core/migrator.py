@@ -1,7 +1,7 @@
 # core/migrator.py
 
 import cloudscraper
-from bs4 import BeautifulSoup, Tag
+from bs4 import Tag
 from loguru import logger
 import re
 import json
@@ -18,8 +18,8 @@ import urllib.parse
 from io import StringIO
 from typing import Dict, Any, Optional, List
 from config import TEMP_DIR, DATA_DIR
-from utils import ensure_scheme, upload_data_mediaInfo, upload_data_title, extract_tags_from_mediainfo, extract_origin_from_description
-from utils.image_validator import is_image_url_valid_robust
+from utils import ensure_scheme, parse_html, html_to_bbcode, upload_data_mediaInfo, upload_data_title, extract_tags_from_mediainfo, extract_origin_from_description
+from utils.image_validator import validate_image_urls
 from utils.completion_checker import check_completion_status, add_completion_tag_if_needed
 
 # 导入种子参数模型
@@ -27,6 +27,10 @@ from models.seed_parameter import SeedParameter
 
 # 导入日志流管理器
 from utils.log_streamer import log_streamer
+from utils.metrics import PUBLISH_SECONDS
+
+# 导入详情页/种子文件抓取缓存
+from utils.fetch_cache import fetch_cache
 
 # 导入新的Extractor和ParameterMapper
 from core.extractors.extractor import Extractor, ParameterMapper
@@ -457,41 +461,20 @@ class TorrentMigrator:
             # 构造下载链接
             download_url = f"{self.SOURCE_BASE_URL}/download.php?id={torrent_id}"
 
-            # 下载种子文件
-            torrent_response = self.scraper.get(
-                download_url,
-                headers={"Cookie": self.SOURCE_COOKIE},
-                timeout=180,
-            )
-            torrent_response.raise_for_status()
-
-            # 从响应头中尝试获取文件名，这是最准确的方式
-            content_disposition = torrent_response.headers.get(
-                'content-disposition')
-            torrent_filename = f"{torrent_id}.torrent"  # 默认文件名
-            if content_disposition:
-                # 尝试匹配filename*（支持UTF-8编码）和filename
-                filename_match = re.search(r'filename\*="?UTF-8\'\'([^"]+)"?',
-                                           content_disposition, re.IGNORECASE)
-                if filename_match:
-                    torrent_filename = filename_match.group(1)
-                    # URL解码文件名（UTF-8编码）
-                    torrent_filename = urllib.parse.unquote(torrent_filename,
-                                                            encoding='utf-8')
-                else:
-                    # 尝试匹配普通的filename
-                    filename_match = re.search(r'filename="?([^"]+)"?',
-                                               content_disposition)
-                    if filename_match:
-                        torrent_filename = filename_match.group(1)
-                        # URL解码文件名
-                        torrent_filename = urllib.parse.unquote(
-                            torrent_filename)
+            # 下载种子文件（优先使用抓取缓存）
+            torrent_content, torrent_filename = fetch_cache.get_torrent(
+                self.SOURCE_SITE_CODE,
+                torrent_id,
+                lambda: self.scraper.get(
+                    download_url,
+                    headers={"Cookie": self.SOURCE_COOKIE},
+                    timeout=180,
+                ))
 
             # 保存种子文件到临时目录
             torrent_path = os.path.join(temp_dir, torrent_filename)
             with open(torrent_path, "wb") as f:
-                f.write(torrent_response.content)
+                f.write(torrent_content)
 
             self.logger.success(f"种子文件已下载并保存到: {torrent_path}")
             return torrent_path
@@ -584,7 +567,7 @@ class TorrentMigrator:
 
                     html_content = "".join(html_parts)
                     print(f"构造的HTML内容长度: {len(html_content)}")
-                    soup = BeautifulSoup(html_content, "html.parser")
+                    soup = parse_html(html_content)
 
                     # 使用统一的数据提取方法
                     extracted_data = self._extract_data_by_site_type(
@@ -679,42 +662,9 @@ class TorrentMigrator:
         return None
 
     def _html_to_bbcode(self, tag):
-        content = []
-        if not hasattr(tag, "contents"):
-            return ""
-        for child in tag.contents:
-            if isinstance(child, str):
-                content.append(child.replace("\xa0", " "))
-            elif child.name == "br":
-                content.append("\n")
-            elif child.name == "fieldset":
-                content.append(
-                    f"[quote]{self._html_to_bbcode(child).strip()}[/quote]")
-            elif child.name == "legend":
-                continue
-            elif child.name == "b":
-                content.append(f"[b]{self._html_to_bbcode(child)}[/b]")
-            elif child.name == "img" and child.get("src"):
-                content.append(f"[img]{child['src']}[/img]")
-            elif child.name == "a" and child.get("href"):
-                content.append(
-                    f"[url={child['href']}]{self._html_to_bbcode(child)}[/url]"
-                )
-            elif (child.name == "span" and child.get("style") and
-                  (match := re.search(r"color:\s*([^;]+)", child["style"]))):
-                content.append(
-                    f"[color={match.group(1).strip()}]{self._html_to_bbcode(child)}[/color]"
-                )
-            elif child.name == "font" and child.get("size"):
-                content.append(
-                    f"[size={child['size']}]{self._html_to_bbcode(child)}[/size]"
-                )
-            else:
-                content.append(self._html_to_bbcode(child))
-
         # [新增] 处理BBCode中的图片链接格式和清理不需要的标签
         from utils.formatters import process_bbcode_images_and_cleanup
-        bbcode_result = "".join(content)
+        bbcode_result = html_to_bbcode(tag)
         return process_bbcode_images_and_cleanup(bbcode_result)
 
     def _extract_data_by_site_type(self, soup, torrent_id):
@@ -755,6 +705,7 @@ class TorrentMigrator:
 
         return standardized_params
 
+    @PUBLISH_SECONDS.timed(stage="prepare")
     def prepare_review_data(self):
         """重构后的方法：获取、解析信息，并输出标准化参数。"""
         try:
@@ -786,21 +737,27 @@ class TorrentMigrator:
 
             self.logger.info(f"正在获取种子(ID: {torrent_id})的详细信息...")
 
-            response = self.scraper.get(
-                f"{self.SOURCE_BASE_URL}/details.php",
-                headers={"Cookie": self.SOURCE_COOKIE},
-                params={
-                    "id": torrent_id,
-                    "hit": "1"
-                },
-                timeout=180,
-            )
-            response.raise_for_status()
-            response.encoding = "utf-8"
+            # [新增] 详情页通过抓取缓存获取，重复操作无需再次请求源站点
+            details_html = fetch_cache.get_page(
+                self.SOURCE_SITE_CODE,
+                torrent_id,
+                lambda extra_headers: self.scraper.get(
+                    f"{self.SOURCE_BASE_URL}/details.php",
+                    headers={
+                        "Cookie": self.SOURCE_COOKIE,
+                        **extra_headers
+                    },
+                    params={
+                        "id": torrent_id,
+                        "hit": "1"
+                    },
+                    timeout=180,
+                ),
+                is_valid=lambda html: f"download.php?id={torrent_id}" in html)
 
             self.logger.success("详情页请求成功！")
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = parse_html(details_html)
 
             # Pre-check for acknowledgment statement on the raw description
             descr_container_for_check = soup.select_one("div#kdescr")
@@ -816,35 +773,15 @@ class TorrentMigrator:
                 f'a.index[href^="download.php?id={torrent_id}"]')
             if not download_link_tag:
                 raise Exception("在详情页未找到种子下载链接。")
-            torrent_response = self.scraper.get(
-                f"{self.SOURCE_BASE_URL}/{download_link_tag['href']}",
-                headers={"Cookie": self.SOURCE_COOKIE},
-                timeout=180,
-            )
-            torrent_response.raise_for_status()
-
-            # 从响应头中尝试获取文件名，这是最准确的方式
-            content_disposition = torrent_response.headers.get(
-                'content-disposition')
-            torrent_filename = "default.torrent"  # 设置一个默认值
-            if content_disposition:
-                # 尝试匹配filename*（支持UTF-8编码）和filename
-                filename_match = re.search(r'filename\*="?UTF-8\'\'([^"]+)"?',
-                                           content_disposition, re.IGNORECASE)
-                if filename_match:
-                    torrent_filename = filename_match.group(1)
-                    # URL解码文件名（UTF-8编码）
-                    torrent_filename = urllib.parse.unquote(torrent_filename,
-                                                            encoding='utf-8')
-                else:
-                    # 尝试匹配普通的filename
-                    filename_match = re.search(r'filename="?([^"]+)"?',
-                                               content_disposition)
-                    if filename_match:
-                        torrent_filename = filename_match.group(1)
-                        # URL解码文件名
-                        torrent_filename = urllib.parse.unquote(
-                            torrent_filename)
+            torrent_content, torrent_filename = fetch_cache.get_torrent(
+                self.SOURCE_SITE_CODE,
+                torrent_id,
+                lambda: self.scraper.get(
+                    f"{self.SOURCE_BASE_URL}/{download_link_tag['href']}",
+                    headers={"Cookie": self.SOURCE_COOKIE},
+                    timeout=180,
+                ),
+                default_filename="default.torrent")
 
             # 使用统一的数据提取方法
             extracted_data = self._extract_data_by_site_type(soup, torrent_id)
@@ -864,6 +801,14 @@ class TorrentMigrator:
                                   ensure_ascii=False,
                                   indent=2)
                     print(f"提取的数据已保存到: {save_path}")
+
+                    # [新增] 同时保存原始详情页，供 scripts.extractor_benchmark 做解析基准测试
+                    pages_dir = os.path.join(TEMP_DIR, "detail_pages")
+                    os.makedirs(pages_dir, exist_ok=True)
+                    page_path = os.path.join(
+                        pages_dir, f"{self.SOURCE_SITE_CODE}-{torrent_id}.html")
+                    with open(page_path, "w", encoding="utf-8") as f:
+                        f.write(details_html)
                 except Exception as e:
                     print(f"保存提取数据时出错: {e}")
 
@@ -893,7 +838,7 @@ class TorrentMigrator:
                                                  prefixed_torrent_filename)
 
             with open(original_torrent_path, "wb") as f:
-                f.write(torrent_response.content)
+                f.write(torrent_content)
             self.temp_files.append(original_torrent_path)
 
             self.logger.info(f"种子文件已保存到: {original_torrent_path}")
@@ -1181,6 +1126,14 @@ class TorrentMigrator:
                         )
                         screenshots_sufficient = False
 
+                    # 并发验证全部截图链接，总耗时约等于单张截图的验证时间
+                    shot_urls = [
+                        m.group(1) for shot_tag in screenshot_links
+                        if (m := re.search(r'\[img\](.*?)\[/img\]', shot_tag,
+                                           re.IGNORECASE))
+                    ]
+                    shot_validity = validate_image_urls(shot_urls)
+
                     # 验证每个截图的有效性
                     valid_count = 0
                     invalid_count = 0
@@ -1189,7 +1142,7 @@ class TorrentMigrator:
                                                        shot_tag,
                                                        re.IGNORECASE):
                             shot_url = shot_url_match.group(1)
-                            if is_image_url_valid_robust(shot_url):
+                            if shot_validity.get(shot_url, False):
                                 valid_count += 1
                             else:
                                 invalid_count += 1
@@ -1290,7 +1243,8 @@ class TorrentMigrator:
                     source_info=source_info_for_screenshot,
                     save_path=self.save_path,
                     torrent_name=processed_torrent_name,
-                    downloader_id=self.downloader_id)
+                    downloader_id=self.downloader_id,
+                    task_id=self.task_id)
 
                 if new_screenshots:
                     # 更新 intro 字典中的截图
@@ -1903,6 +1857,7 @@ class TorrentMigrator:
             # self.cleanup() # 此处不清理，因为原始种子文件需要被缓存
             return {"logs": self.log_handler.get_logs()}
 
+    @PUBLISH_SECONDS.timed(stage="publish")
     def publish_prepared_torrent(self, upload_data, modified_torrent_path):
         """第二步：使用准备好的信息和文件执行上传。"""
         try:
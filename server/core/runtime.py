@@ -0,0 +1,67 @@
+# core/runtime.py
+"""
+运行时进程角色判定
+
+后台线程（DataTracker、IYUUThread）在整个服务中只能运行一份：
+- 开发模式 (python app.py)：由 Werkzeug 重载器的子进程运行（WERKZEUG_RUN_MAIN=true）
+- 生产模式 (gunicorn)：多个 worker 中通过文件锁选出唯一的后台服务进程，
+  该进程退出后锁自动释放，由新启动的 worker 接管
+"""
+
+import fcntl
+import logging
+import os
+
+from config import DATA_DIR
+
+# 被选为后台服务进程时设置的环境变量
+BACKGROUND_PROCESS_ENV = "PT_NEXUS_BACKGROUND_PROCESS"
+BACKGROUND_LOCK_FILE = os.path.join(DATA_DIR, "background_services.lock")
+
+# 持有锁的文件句柄需在进程生命周期内保持打开
+_lock_handle = None
+
+
+def is_background_process() -> bool:
+    """当前进程是否负责运行后台线程。"""
+    return (os.environ.get("WERKZEUG_RUN_MAIN") == "true"
+            or os.environ.get(BACKGROUND_PROCESS_ENV) == "true")
+
+
+def claim_background_role() -> bool:
+    """
+    尝试将当前进程注册为后台服务进程（非阻塞文件锁）。
+
+    Returns:
+        True 表示当前进程获得了后台服务角色
+    """
+    global _lock_handle
+    if _lock_handle is not None:
+        return True
+
+    handle = open(BACKGROUND_LOCK_FILE, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _lock_handle = handle
+    os.environ[BACKGROUND_PROCESS_ENV] = "true"
+    logging.info(f"进程 {os.getpid()} 已被指定为后台服务进程。")
+    return True
+
+
+def release_background_role():
+    """释放后台服务进程角色。"""
+    global _lock_handle
+    if _lock_handle is None:
+        return
+    try:
+        fcntl.flock(_lock_handle, fcntl.LOCK_UN)
+        _lock_handle.close()
+    finally:
+        _lock_handle = None
+        os.environ.pop(BACKGROUND_PROCESS_ENV, None)
@@ -20,6 +20,14 @@ from utils import (
     format_state,
     format_bytes,
 )
+from utils.speed_broadcaster import speed_broadcaster
+from utils.pagination import invalidate_counts
+from utils.proxy_client import proxy_client
+from utils.metrics import (TRACKER_TICK_SECONDS, TRAFFIC_FLUSH_SECONDS,
+                           TRAFFIC_FLUSH_ROWS, TORRENT_REFRESH_PHASE_SECONDS,
+                           TORRENT_REFRESH_ERRORS)
+
+logger = logging.getLogger(__name__)
 
 # --- 全局变量和锁 ---
 CACHE_LOCK = Lock()
@@ -140,6 +148,13 @@ class DataTracker(Thread):
         self.TORRENT_UPDATE_INTERVAL = 900
         self.clients = {}
 
+        # 下载器状态快照（版本、连接状态、今日/累计流量），供 /api/downloader_info 直接读取
+        self.downloader_status = {}
+        self.client_versions = {}
+        self.client_errors = {}
+        self._traffic_baselines = {}
+        self._traffic_baseline_day = None
+
         # 数据聚合任务相关变量
         self.aggregation_counter = 0  # 用于计时的计数器
         self.AGGREGATION_INTERVAL = 21600  # 聚合任务的执行间隔（秒），这里是6小时
@@ -157,66 +172,31 @@ class DataTracker(Thread):
             if downloader_config['type'] == 'qbittorrent':
                 client = Client(**api_config)
                 client.auth_log_in()
+                version = client.app.version
             elif downloader_config['type'] == 'transmission':
                 client = TrClient(**api_config)
-                client.get_session()
+                version = client.get_session().version
 
             self.clients[client_id] = client
+            self.client_versions[client_id] = version
+            self.client_errors.pop(client_id, None)
             logging.info(f"客户端 '{downloader_config['name']}' 连接成功并已缓存。")
             return client
         except Exception as e:
             logging.error(f"为 '{downloader_config['name']}' 初始化客户端失败: {e}")
+            self.client_errors[client_id] = str(e)
             if client_id in self.clients:
                 del self.clients[client_id]
             return None
 
     def _get_proxy_stats(self, downloader_config):
-        """通过代理获取下载器的统计信息。"""
+        """通过代理获取下载器的统计信息（复用到代理的持久连接）。"""
         try:
-            # 从下载器配置的host中提取IP地址作为代理服务器地址
-            host_value = downloader_config['host']
-
-            # 如果host已经包含协议，直接解析；否则添加http://前缀
-            if host_value.startswith(('http://', 'https://')):
-                parsed_url = urlparse(host_value)
-            else:
-                parsed_url = urlparse(f"http://{host_value}")
-
-            proxy_ip = parsed_url.hostname
-            if not proxy_ip:
-                # 如果无法解析，使用备用方法
-                if '://' in host_value:
-                    proxy_ip = host_value.split('://')[1].split(':')[0].split(
-                        '/')[0]
-                else:
-                    proxy_ip = host_value.split(':')[0]
-
-            proxy_port = downloader_config.get('proxy_port', 9090)  # 默认9090
-            proxy_base_url = f"http://{proxy_ip}:{proxy_port}"
-
-            # 构造代理请求数据
-            proxy_downloader_config = {
-                "id": downloader_config['id'],
-                "type": downloader_config['type'],
-                "host": "http://127.0.0.1:" + str(parsed_url.port or 8080),
-                "username": downloader_config.get('username', ''),
-                "password": downloader_config.get('password', '')
-            }
-
-            # 发送请求到代理获取统计信息
-            response = requests.post(f"{proxy_base_url}/api/stats/server",
-                                     json=[proxy_downloader_config],
-                                     timeout=30)
-            response.raise_for_status()
-
-            stats_data = response.json()
-            if stats_data and len(stats_data) > 0:
-                return stats_data[0]  # 返回第一个下载器的统计信息
-            else:
+            stats = proxy_client.get_stats(downloader_config)
+            if not stats:
                 logging.warning(
                     f"代理返回空的统计信息 for '{downloader_config['name']}'")
-                return None
-
+            return stats
         except Exception as e:
             logging.error(f"通过代理获取 '{downloader_config['name']}' 统计信息失败: {e}")
             return None
@@ -235,56 +215,9 @@ class DataTracker(Thread):
             return False
 
     def _get_proxy_torrents(self, downloader_config):
-        """通过代理获取下载器的完整种子信息。"""
+        """通过代理获取下载器的完整种子信息（种子详情按种子缓存，只为新种子请求）。"""
         try:
-            # 从下载器配置的host中提取IP地址作为代理服务器地址
-            host_value = downloader_config['host']
-
-            # 如果host已经包含协议，直接解析；否则添加http://前缀
-            if host_value.startswith(('http://', 'https://')):
-                parsed_url = urlparse(host_value)
-            else:
-                parsed_url = urlparse(f"http://{host_value}")
-
-            proxy_ip = parsed_url.hostname
-            if not proxy_ip:
-                # 如果无法解析，使用备用方法
-                if '://' in host_value:
-                    proxy_ip = host_value.split('://')[1].split(':')[0].split(
-                        '/')[0]
-                else:
-                    proxy_ip = host_value.split(':')[0]
-
-            proxy_port = downloader_config.get('proxy_port', 9090)  # 默认9090
-            proxy_base_url = f"http://{proxy_ip}:{proxy_port}"
-
-            # 构造代理请求数据
-            proxy_downloader_config = {
-                "id": downloader_config['id'],
-                "type": downloader_config['type'],
-                "host": "http://127.0.0.1:" + str(parsed_url.port or 8080),
-                "username": downloader_config.get('username', ''),
-                "password": downloader_config.get('password', '')
-            }
-
-            # 构造请求数据，包含comment和trackers
-            request_data = {
-                "downloaders": [proxy_downloader_config],
-                "include_comment": True,
-                "include_trackers": True
-            }
-
-            # 发送请求到代理获取种子信息
-            response = requests.post(
-                f"{proxy_base_url}/api/torrents/all",
-                json=request_data,
-                timeout=180  # 种子信息可能需要更长的时间
-            )
-            response.raise_for_status()
-
-            torrents_data = response.json()
-            return torrents_data
-
+            return proxy_client.get_torrents(downloader_config)
         except Exception as e:
             logging.error(f"通过代理获取 '{downloader_config['name']}' 种子信息失败: {e}")
             return None
@@ -342,6 +275,13 @@ class DataTracker(Thread):
         current_timestamp = datetime.now()
         data_points = []
         latest_speeds_update = {}
+        status_update = {}
+
+        # 跨天或首次运行时重新加载今日流量基线
+        if self._traffic_baseline_day != current_timestamp.date():
+            self._load_traffic_baselines(
+                current_timestamp.date(),
+                [d["id"] for d in enabled_downloaders])
 
         for downloader in enabled_downloaders:
             data_point = {
@@ -351,13 +291,14 @@ class DataTracker(Thread):
                 "dl_speed": 0,
                 "ul_speed": 0
             }
+            tick_started = time.perf_counter()
             try:
                 # 检查是否需要使用代理
                 use_proxy = downloader.get("use_proxy", False)
 
                 if use_proxy and downloader["type"] == "qbittorrent":
                     # 使用代理获取统计数据
-                    logging.info(f"通过代理获取 '{downloader['name']}' 的统计信息...")
+                    logger.debug("通过代理获取 '%s' 的统计信息...", downloader['name'])
                     proxy_stats = self._get_proxy_stats(downloader)
 
                     if proxy_stats:
@@ -387,7 +328,7 @@ class DataTracker(Thread):
                                 'total_ul':
                                 int(proxy_stats.get('total_upload', 0))
                             })
-                            logging.info(
+                            logging.debug(
                                 f"代理数据: 上传速度={data_point['ul_speed']:,}, 下载速度={data_point['dl_speed']:,}, 总上传={data_point['total_ul']:,}, 总下载={data_point['total_dl']:,}"
                             )
 
@@ -400,15 +341,24 @@ class DataTracker(Thread):
                             "download_speed": data_point["dl_speed"]
                         }
                         data_points.append(data_point)
+                        status_update[downloader["id"]] = self._build_status(
+                            downloader["id"], data_point,
+                            version=proxy_stats.get("version", "未知"))
                     else:
                         # 代理获取失败，跳过此下载器
                         logging.warning(
                             f"通过代理获取 '{downloader['name']}' 统计信息失败")
+                        status_update[downloader["id"]] = self._build_status(
+                            downloader["id"], error="通过代理连接失败")
                         continue
                 else:
                     # 使用常规方式获取统计数据
                     client = self._get_client(downloader)
-                    if not client: continue
+                    if not client:
+                        status_update[downloader["id"]] = self._build_status(
+                            downloader["id"],
+                            error=self.client_errors.get(downloader["id"], "连接失败"))
+                        continue
 
                     if downloader["type"] == "qbittorrent":
                         try:
@@ -418,7 +368,11 @@ class DataTracker(Thread):
                                 f"与 '{downloader['name']}' 的连接丢失，正在尝试重新连接...")
                             del self.clients[downloader['id']]
                             client = self._get_client(downloader)
-                            if not client: continue
+                            if not client:
+                                status_update[downloader["id"]] = self._build_status(
+                                    downloader["id"],
+                                    error=self.client_errors.get(downloader["id"], "连接失败"))
+                                continue
                             main_data = client.sync_maindata()
 
                         server_state = main_data.get('server_state', {})
@@ -452,10 +406,15 @@ class DataTracker(Thread):
                     "download_speed": data_point["dl_speed"]
                 }
                 data_points.append(data_point)
+                status_update[downloader["id"]] = self._build_status(
+                    downloader["id"], data_point,
+                    version=self.client_versions.get(downloader["id"], "未知"))
             except Exception as e:
                 logging.warning(f"无法从客户端 '{downloader['name']}' 获取统计信息: {e}")
                 if downloader['id'] in self.clients:
                     del self.clients[downloader['id']]
+                status_update[downloader["id"]] = self._build_status(
+                    downloader["id"], error=str(e))
                 latest_speeds_update[downloader["id"]] = {
                     "name": downloader["name"],
                     "type": downloader["type"],
@@ -463,9 +422,15 @@ class DataTracker(Thread):
                     "upload_speed": 0,
                     "download_speed": 0
                 }
+            finally:
+                tick_error = status_update.get(downloader["id"], {}).get("error")
+                TRACKER_TICK_SECONDS.observe(time.perf_counter() - tick_started,
+                                             downloader=downloader["id"],
+                                             result="error" if tick_error else "ok")
 
         with CACHE_LOCK:
             self.latest_speeds = latest_speeds_update
+            self.downloader_status = status_update
             speeds_for_buffer = {
                 downloader_id: {
                     "upload_speed": data.get("upload_speed", 0),
@@ -478,6 +443,9 @@ class DataTracker(Thread):
                 "speeds": speeds_for_buffer
             })
 
+        # 推送给实时速度订阅者（每个 tick 只序列化一次）
+        speed_broadcaster.publish(current_timestamp, latest_speeds_update)
+
         with self.traffic_buffer_lock:
             self.traffic_buffer.append({
                 "timestamp": current_timestamp,
@@ -487,9 +455,82 @@ class DataTracker(Thread):
                 self._flush_traffic_buffer_to_db(self.traffic_buffer)
                 self.traffic_buffer = []
 
+    def _load_traffic_baselines(self, today, downloader_ids):
+        """从数据库加载每个下载器的累计流量和今日零点后的首个累计值（每天一次）。"""
+        day_start = today.strftime("%Y-%m-%d 00:00:00")
+        try:
+            summary = self.db_manager.get_downloader_traffic_summary(
+                day_start, downloader_ids)
+        except Exception as e:
+            logging.error(f"加载今日流量基线失败: {e}", exc_info=True)
+            summary = {}
+
+        baselines = {}
+        for downloader_id, row in summary.items():
+            baselines[downloader_id] = {
+                "total_dl": row["total_dl"] or 0,
+                "total_ul": row["total_ul"] or 0,
+                "day_start_dl": row["day_start_dl"],
+                "day_start_ul": row["day_start_ul"],
+            }
+        # 跨天时缓冲区中的数据可能尚未写入数据库，沿用内存中更新的累计值
+        for downloader_id, previous in self._traffic_baselines.items():
+            baseline = baselines.setdefault(downloader_id, {
+                "total_dl": 0,
+                "total_ul": 0,
+                "day_start_dl": None,
+                "day_start_ul": None,
+            })
+            baseline["total_dl"] = max(baseline["total_dl"], previous["total_dl"])
+            baseline["total_ul"] = max(baseline["total_ul"], previous["total_ul"])
+        self._traffic_baselines = baselines
+        self._traffic_baseline_day = today
+
+    def _build_status(self, downloader_id, data_point=None, version=None, error=None):
+        """根据本次采集结果生成下载器状态，并维护今日流量基线。"""
+        baseline = self._traffic_baselines.setdefault(downloader_id, {
+            "total_dl": 0,
+            "total_ul": 0,
+            "day_start_dl": None,
+            "day_start_ul": None,
+        })
+        if data_point:
+            # 累计值为 0 时视为客户端返回异常，保留上次的值
+            if data_point["total_dl"] > 0:
+                baseline["total_dl"] = data_point["total_dl"]
+                if baseline["day_start_dl"] is None:
+                    baseline["day_start_dl"] = data_point["total_dl"]
+            if data_point["total_ul"] > 0:
+                baseline["total_ul"] = data_point["total_ul"]
+                if baseline["day_start_ul"] is None:
+                    baseline["day_start_ul"] = data_point["total_ul"]
+
+        today_dl = (max(0, baseline["total_dl"] - baseline["day_start_dl"])
+                    if baseline["day_start_dl"] is not None else 0)
+        today_ul = (max(0, baseline["total_ul"] - baseline["day_start_ul"])
+                    if baseline["day_start_ul"] is not None else 0)
+
+        return {
+            "status": "连接失败" if error else "已连接",
+            "version": None if error else version,
+            "error": error,
+            "today_dl": today_dl,
+            "today_ul": today_ul,
+            "total_dl": baseline["total_dl"],
+            "total_ul": baseline["total_ul"],
+            "updated_at": time.time(),
+        }
+
+    def get_downloader_status(self):
+        """返回最近一次采集得到的下载器状态快照（副本）。"""
+        with CACHE_LOCK:
+            return dict(self.downloader_status)
+
     def _flush_traffic_buffer_to_db(self, buffer):
         if not buffer: return
         conn = None
+        flush_started = time.perf_counter()
+        flush_result = "error"
         try:
             conn = self.db_manager._get_connection()
             cursor = self.db_manager._get_cursor(conn)
@@ -582,6 +623,8 @@ class DataTracker(Thread):
                 logging.info(f"成功插入 {len(params_to_insert)} 条流量记录（已过滤异常数据）")
 
             conn.commit()
+            flush_result = "ok"
+            TRAFFIC_FLUSH_ROWS.observe(len(params_to_insert))
         except Exception as e:
             logging.error(f"将流量缓冲刷新到数据库失败: {e}", exc_info=True)
             if conn: conn.rollback()
@@ -589,21 +632,20 @@ class DataTracker(Thread):
             if conn:
                 cursor.close()
                 conn.close()
+            TRAFFIC_FLUSH_SECONDS.observe(time.perf_counter() - flush_started,
+                                          result=flush_result)
 
+    @TORRENT_REFRESH_PHASE_SECONDS.timed(phase="total", downloader="all")
     def _update_torrents_in_db(self):
         from datetime import datetime
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        logging.info("=== 开始更新数据库中的种子 ===")
-        print(f"【刷新线程】[{current_time}] 开始更新数据库中的种子...")
+        logger.info("=== 开始更新数据库中的种子 ===")
         config = self.config_manager.get()
         enabled_downloaders = [
             d for d in config.get("downloaders", []) if d.get("enabled")
         ]
-        print(f"【刷新线程】找到 {len(enabled_downloaders)} 个启用的下载器")
-        logging.info(f"找到 {len(enabled_downloaders)} 个启用的下载器")
+        logger.info("找到 %d 个启用的下载器", len(enabled_downloaders))
         if not enabled_downloaders:
-            logging.info("没有启用的下载器，跳过种子更新。")
-            print("【刷新线程】没有启用的下载器，跳过种子更新。")
+            logger.info("没有启用的下载器，跳过种子更新。")
             return
 
         core_domain_map, _, group_to_site_map_lower = load_site_maps_from_db(
@@ -613,42 +655,37 @@ class DataTracker(Thread):
         is_mysql = self.db_manager.db_type == "mysql"
 
         for downloader in enabled_downloaders:
-            print(
-                f"【刷新线程】正在处理下载器: {downloader['name']} (类型: {downloader['type']})"
-            )
+            logger.debug("正在处理下载器: %s (类型: %s)", downloader['name'],
+                         downloader['type'])
             torrents_list = []
             client_instance = None
+            fetch_started = time.perf_counter()
             try:
                 # 检查是否需要使用代理
                 use_proxy = downloader.get("use_proxy", False)
 
                 if use_proxy and downloader["type"] == "qbittorrent":
                     # 使用代理获取种子信息
-                    logging.info(f"通过代理获取 '{downloader['name']}' 的种子信息...")
+                    logger.info("通过代理获取 '%s' 的种子信息...", downloader['name'])
                     proxy_torrents = self._get_proxy_torrents(downloader)
 
                     if proxy_torrents is not None:
                         torrents_list = proxy_torrents
-                        print(
-                            f"【刷新线程】通过代理从 '{downloader['name']}' 成功获取到 {len(torrents_list)} 个种子。"
-                        )
-                        logging.info(
-                            f"通过代理从 '{downloader['name']}' 成功获取到 {len(torrents_list)} 个种子。"
-                        )
+                        logger.info("通过代理从 '%s' 成功获取到 %d 个种子。",
+                                    downloader['name'], len(torrents_list))
                     else:
                         # 代理获取失败，跳过此下载器
-                        print(f"【刷新线程】通过代理获取 '{downloader['name']}' 种子信息失败")
-                        logging.warning(
-                            f"通过代理获取 '{downloader['name']}' 种子信息失败")
+                        logger.warning("通过代理获取 '%s' 种子信息失败",
+                                       downloader['name'])
                         continue
                 else:
                     # 使用常规方式获取种子信息
                     client_instance = self._get_client(downloader)
                     if not client_instance:
-                        print(f"【刷新线程】无法连接到下载器 {downloader['name']}")
+                        logger.warning("无法连接到下载器 %s", downloader['name'])
                         continue
 
-                    print(f"【刷新线程】正在从 {downloader['name']} 获取种子列表...")
+                    logger.debug("正在从 %s 获取种子列表...", downloader['name'])
                     if downloader["type"] == "qbittorrent":
                         torrents_list = client_instance.torrents_info(
                             status_filter="all")
@@ -660,18 +697,20 @@ class DataTracker(Thread):
                         ]
                         torrents_list = client_instance.get_torrents(
                             arguments=fields)
-                    print(
-                        f"【刷新线程】从 '{downloader['name']}' 成功获取到 {len(torrents_list)} 个种子。"
-                    )
-                    logging.info(
-                        f"从 '{downloader['name']}' 成功获取到 {len(torrents_list)} 个种子。"
-                    )
+                    logger.info("从 '%s' 成功获取到 %d 个种子。", downloader['name'],
+                                len(torrents_list))
             except Exception as e:
-                print(f"【刷新线程】未能从 '{downloader['name']}' 获取数据: {e}")
-                logging.error(f"未能从 '{downloader['name']}' 获取数据: {e}")
+                logger.error("未能从 '%s' 获取数据: %s", downloader['name'], e)
+                TORRENT_REFRESH_ERRORS.inc(phase="fetch")
                 continue
-
-            print(f"【刷新线程】开始处理 {len(torrents_list)} 个种子...")
+            finally:
+                TORRENT_REFRESH_PHASE_SECONDS.observe(
+                    time.perf_counter() - fetch_started,
+                    phase="fetch",
+                    downloader=downloader["id"])
+
+            logger.debug("开始处理 %d 个种子...", len(torrents_list))
+            normalize_started = time.perf_counter()
             for t in torrents_list:
                 t_info = self._normalize_torrent_info(t, downloader["type"],
                                                       client_instance)
@@ -707,22 +746,35 @@ class DataTracker(Thread):
                 if t_info["uploaded"] > 0:
                     upload_stats_to_upsert.append(
                         (t_info["hash"], downloader["id"], t_info["uploaded"]))
-            print(
-                f"【刷新线程】完成处理下载器 {downloader['name']} 的种子，共收集到 {len(torrents_to_upsert)} 个唯一种子"
-            )
-
-        print(
-            f"【刷新线程】开始将 {len(torrents_to_upsert)} 个种子和 {len(upload_stats_to_upsert)} 条上传统计写入数据库..."
-        )
+            TORRENT_REFRESH_PHASE_SECONDS.observe(
+                time.perf_counter() - normalize_started,
+                phase="normalize",
+                downloader=downloader["id"])
+            logger.debug("完成处理下载器 %s 的种子，共收集到 %d 个唯一种子",
+                         downloader['name'], len(torrents_to_upsert))
+
+        logger.debug("开始将 %d 个种子和 %d 条上传统计写入数据库...",
+                     len(torrents_to_upsert), len(upload_stats_to_upsert))
         conn = None
         try:
             conn = self.db_manager._get_connection()
             cursor = self.db_manager._get_cursor(conn)
             now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            phase_started = time.perf_counter()
 
             # 先清理启用下载器中已删除的种子
-            print(f"【刷新线程】开始清理启用下载器中已删除的种子...")
+            logger.debug("开始清理启用下载器中已删除的种子...")
             enabled_downloader_ids = {d["id"] for d in enabled_downloaders}
+            placeholder = self.db_manager.get_placeholder()
+            inactive_states = ("未做种", "已暂停", "已停止", "错误", "等待", "队列")
+            # 正在做种的种子名称，只在确实有种子需要删除时才统计一次（不再为每个下载器重复查询）
+            current_seeding_names = None
+            # 数据库中各下载器正在做种的种子名称计数 {downloader_id: Counter(name)}
+            db_seeding_name_counts = None
+            # 刷新前数据库中的种子 {hash: (name, sites)}，用于找出名称或站点发生变化的种子
+            db_torrent_rows = {}
+            # 本周期新增、变化或删除的种子名称和已删除的 hash（用于增量维护 torrent_site_presence）
+            presence_names, presence_deleted_hashes = set(), []
             for downloader_id in enabled_downloader_ids:
                 # 获取该下载器当前的种子哈希
                 downloader_current_hashes = {
@@ -732,52 +784,49 @@ class DataTracker(Thread):
                 }
 
                 # 获取数据库中该下载器的历史种子哈希
-                placeholder = "%s" if self.db_manager.db_type in [
-                    "mysql", "postgresql"
-                ] else "?"
                 cursor.execute(
-                    f"SELECT hash, name, state FROM torrents WHERE downloader_id = {placeholder}",
+                    f"SELECT hash, name, state, sites FROM torrents WHERE downloader_id = {placeholder}",
                     (downloader_id, ))
                 db_torrents = {
                     row["hash"]: {
                         "name": row["name"],
-                        "state": row["state"]
+                        "state": row["state"],
+                        "sites": row["sites"]
                     }
                     for row in cursor.fetchall()
                 }
+                db_torrent_rows.update(
+                    (hash_value, (info["name"], info["sites"]))
+                    for hash_value, info in db_torrents.items())
 
                 # 找出需要删除的种子（在数据库中但不在当前下载器中）
                 hashes_to_delete = db_torrents.keys(
                 ) - downloader_current_hashes
 
                 if hashes_to_delete:
-                    print(
-                        f"【刷新线程】发现下载器 {downloader_id} 中有 {len(hashes_to_delete)} 个种子已被删除"
-                    )
-
-                    # 获取当前所有正在做种的种子名称（包括当前正在处理的种子和数据库中其他下载器的种子）
-                    current_seeding_names = set()
-
-                    # 添加当前正在处理的种子中正在做种的名称
-                    for hash_value, torrent_data in torrents_to_upsert.items():
-                        if torrent_data["state"] not in [
-                                "未做种", "已暂停", "已停止", "错误", "等待", "队列"
-                        ]:
-                            current_seeding_names.add(torrent_data["name"])
-
-                    # 添加数据库中其他下载器的正在做种的种子名称
-                    other_downloaders_placeholders = ",".join(
-                        [placeholder] *
-                        len(enabled_downloader_ids - {downloader_id}))
-                    if enabled_downloader_ids - {downloader_id}:  # 如果还有其他下载器
-                        cursor.execute(
-                            f"SELECT DISTINCT name FROM torrents WHERE downloader_id IN ({other_downloaders_placeholders}) AND state NOT IN ('未做种', '已暂停', '已停止', '错误', '等待', '队列')",
-                            tuple(enabled_downloader_ids - {downloader_id}))
-                        other_seeding_names = {
-                            row["name"]
-                            for row in cursor.fetchall()
+                    logger.debug("发现下载器 %s 中有 %d 个种子已被删除", downloader_id,
+                                 len(hashes_to_delete))
+
+                    if current_seeding_names is None:
+                        # 当前正在处理的种子中正在做种的名称
+                        current_seeding_names = {
+                            torrent_data["name"]
+                            for torrent_data in torrents_to_upsert.values()
+                            if torrent_data["state"] not in inactive_states
                         }
-                        current_seeding_names.update(other_seeding_names)
+                        # 数据库中所有启用下载器正在做种的种子名称（一次查询）
+                        downloader_placeholders = ",".join(
+                            [placeholder] * len(enabled_downloader_ids))
+                        state_placeholders = ",".join([placeholder] *
+                                                      len(inactive_states))
+                        cursor.execute(
+                            f"SELECT downloader_id, name, COUNT(*) AS cnt FROM torrents WHERE downloader_id IN ({downloader_placeholders}) AND state NOT IN ({state_placeholders}) GROUP BY downloader_id, name",
+                            tuple(enabled_downloader_ids) + inactive_states)
+                        db_seeding_name_counts = collections.defaultdict(
+                            collections.Counter)
+                        for row in cursor.fetchall():
+                            db_seeding_name_counts[row["downloader_id"]][
+                                row["name"]] += row["cnt"]
 
                     # 分类要删除的种子
                     hashes_to_delete_normal = []  # 状态不是'未做种'的，直接删除
@@ -790,105 +839,68 @@ class DataTracker(Thread):
                             # 状态不是'未做种'，直接删除
                             hashes_to_delete_normal.append(hash_value)
                         else:
-                            # 状态是'未做种'，检查是否有其他同名种子在做种
-                            if torrent_info[
-                                    "name"] not in current_seeding_names:
+                            # 状态是'未做种'，检查是否有其他同名种子在做种（当前种子或数据库中其他下载器）
+                            name = torrent_info["name"]
+                            if name not in current_seeding_names and not any(
+                                    counts.get(name)
+                                    for other_id, counts in
+                                    db_seeding_name_counts.items()
+                                    if other_id != downloader_id):
                                 # 没有其他同名种子在做种，删除这个'未做种'的种子
                                 hashes_to_delete_inactive_seed.append(
                                     hash_value)
 
-                    # 初始化删除计数器
-                    deleted_count_normal = 0
-                    deleted_count_inactive = 0
-
-                    # 删除状态不是'未做种'的种子
-                    if hashes_to_delete_normal:
-                        delete_placeholders = ",".join(
-                            [placeholder] * len(hashes_to_delete_normal))
-                        delete_query = f"DELETE FROM torrents WHERE hash IN ({delete_placeholders}) AND downloader_id = {placeholder}"
-                        cursor.execute(
-                            delete_query,
-                            tuple(hashes_to_delete_normal) + (downloader_id, ))
-                        deleted_count_normal = cursor.rowcount
-                        print(
-                            f"【刷新线程】已删除下载器 {downloader_id} 中的 {deleted_count_normal} 个已移除的非未做种种子"
-                        )
-
-                    # 删除状态是'未做种'但没有其他同名种子在做种的种子
-                    if hashes_to_delete_inactive_seed:
-                        delete_placeholders = ",".join(
-                            [placeholder] *
-                            len(hashes_to_delete_inactive_seed))
-                        delete_query = f"DELETE FROM torrents WHERE hash IN ({delete_placeholders}) AND downloader_id = {placeholder}"
-                        cursor.execute(
-                            delete_query,
-                            tuple(hashes_to_delete_inactive_seed) +
-                            (downloader_id, ))
-                        deleted_count_inactive = cursor.rowcount
-                        print(
-                            f"【刷新线程】已删除下载器 {downloader_id} 中的 {deleted_count_inactive} 个已移除的未做种种子（没有其他同名种子在做种）"
-                        )
+                    # 分批删除，单条语句的参数个数和锁范围都有上限
+                    deleted_count_normal = self.db_manager.delete_where_in(
+                        cursor, "torrents", "hash", hashes_to_delete_normal,
+                        f"downloader_id = {placeholder}", (downloader_id, ))
+                    if deleted_count_normal:
+                        logger.debug("已删除下载器 %s 中的 %d 个已移除的非未做种种子",
+                                     downloader_id, deleted_count_normal)
+                    deleted_count_inactive = self.db_manager.delete_where_in(
+                        cursor, "torrents", "hash",
+                        hashes_to_delete_inactive_seed,
+                        f"downloader_id = {placeholder}", (downloader_id, ))
+                    if deleted_count_inactive:
+                        logger.debug(
+                            "已删除下载器 %s 中的 %d 个已移除的未做种种子（没有其他同名种子在做种）",
+                            downloader_id, deleted_count_inactive)
+
+                    # 已删除的做种记录不再计入后续下载器的同名检查
+                    seeding_counts = db_seeding_name_counts[downloader_id]
+                    for hash_value in hashes_to_delete_normal:
+                        torrent_info = db_torrents[hash_value]
+                        if torrent_info["state"] not in inactive_states:
+                            seeding_counts[torrent_info["name"]] -= 1
 
                     total_deleted = deleted_count_normal + deleted_count_inactive
-                    print(
-                        f"【刷新线程】已删除下载器 {downloader_id} 中的 {total_deleted} 个已移除的种子记录"
-                    )
-                    logging.info(
-                        f"已删除下载器 {downloader_id} 中的 {total_deleted} 个已移除的种子记录")
-
-            # 更新seed_parameters表中的is_deleted字段
-            print("【刷新线程】开始更新seed_parameters表中的is_deleted字段...")
-            # 获取所有seed_parameters表中的hash值
-            cursor.execute("SELECT DISTINCT hash FROM seed_parameters")
-            seed_hashes = {row["hash"] for row in cursor.fetchall()}
-
-            # 获取所有torrents表中的hash值
-            cursor.execute("SELECT DISTINCT hash FROM torrents")
-            torrent_hashes = {row["hash"] for row in cursor.fetchall()}
-
-            # 找出在torrents表中存在的hash值和不存在的hash值
-            hashes_in_torrents = seed_hashes & torrent_hashes
-            hashes_not_in_torrents = seed_hashes - torrent_hashes
-
-            # 更新在torrents表中存在的hash值的is_deleted字段为0
-            if hashes_in_torrents:
-                print(f"【刷新线程】发现 {len(hashes_in_torrents)} 个种子在torrents表中存在")
-                update_placeholders = ",".join([placeholder] *
-                                               len(hashes_in_torrents))
-                # 根据数据库类型使用正确的布尔值
-                if self.db_manager.db_type == 'postgresql':
-                    update_query = f"UPDATE seed_parameters SET is_deleted = FALSE WHERE hash IN ({update_placeholders})"
-                else:
-                    update_query = f"UPDATE seed_parameters SET is_deleted = 0 WHERE hash IN ({update_placeholders})"
-                cursor.execute(update_query, tuple(hashes_in_torrents))
-                print(
-                    f"【刷新线程】已更新 {len(hashes_in_torrents)} 个种子的is_deleted字段为0")
-                logging.info(
-                    f"已更新 {len(hashes_in_torrents)} 个种子的is_deleted字段为0")
-
-            # 更新在torrents表中不存在的hash值的is_deleted字段为1
-            if hashes_not_in_torrents:
-                print(
-                    f"【刷新线程】发现 {len(hashes_not_in_torrents)} 个种子在torrents表中不存在"
-                )
-                update_placeholders = ",".join([placeholder] *
-                                               len(hashes_not_in_torrents))
-                # 根据数据库类型使用正确的布尔值
-                if self.db_manager.db_type == 'postgresql':
-                    update_query = f"UPDATE seed_parameters SET is_deleted = TRUE WHERE hash IN ({update_placeholders})"
-                else:
-                    update_query = f"UPDATE seed_parameters SET is_deleted = 1 WHERE hash IN ({update_placeholders})"
-                cursor.execute(update_query, tuple(hashes_not_in_torrents))
-                print(
-                    f"【刷新线程】已更新 {len(hashes_not_in_torrents)} 个种子的is_deleted字段为1"
-                )
-                logging.info(
-                    f"已更新 {len(hashes_not_in_torrents)} 个种子的is_deleted字段为1")
+                    for hash_value in hashes_to_delete_normal + hashes_to_delete_inactive_seed:
+                        presence_names.add(db_torrents[hash_value]["name"])
+                        presence_deleted_hashes.append(hash_value)
+                    # 清理是幂等的（下个周期会重新计算），每个下载器单独提交，
+                    # 删除持有的行锁不必等到整个刷新周期结束才释放
+                    conn.commit()
+                    logger.info("已删除下载器 %s 中的 %d 个已移除的种子记录", downloader_id,
+                                total_deleted)
+
+            TORRENT_REFRESH_PHASE_SECONDS.observe(
+                time.perf_counter() - phase_started,
+                phase="cleanup",
+                downloader="all")
+            phase_started = time.perf_counter()
+
+            # 新出现的种子，以及名称或站点（站点为空时保留原值）发生变化的种子
+            for hash_value, torrent_data in torrents_to_upsert.items():
+                previous = db_torrent_rows.get(hash_value)
+                if previous is None:
+                    presence_names.add(torrent_data["name"])
+                elif (previous[0] != torrent_data["name"]
+                      or (torrent_data["sites"] or previous[1]) != previous[1]):
+                    presence_names.update((previous[0], torrent_data["name"]))
 
             if torrents_to_upsert:
                 params = [(*d.values(), now_str)
                           for d in torrents_to_upsert.values()]
-                print(f"【刷新线程】准备写入 {len(params)} 条种子主信息到数据库")
                 # 根据数据库类型使用正确的引号和冲突处理语法
                 # save_path 强制覆盖，其他字段保持原有的覆盖/保留逻辑
                 if self.db_manager.db_type == "mysql":
@@ -898,10 +910,8 @@ class DataTracker(Thread):
                 else:  # sqlite
                     sql = """INSERT INTO torrents (hash, name, save_path, size, progress, state, sites, details, "group", downloader_id, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(hash) DO UPDATE SET name=excluded.name, save_path=excluded.save_path, size=excluded.size, progress=excluded.progress, state=excluded.state, sites=COALESCE(NULLIF(excluded.sites, ''), torrents.sites), details=CASE WHEN excluded.details != '' THEN excluded.details ELSE torrents.details END, "group"=COALESCE(NULLIF(excluded."group", ''), torrents."group"), downloader_id=excluded.downloader_id, last_seen=excluded.last_seen"""
                 cursor.executemany(sql, params)
-                print(f"【刷新线程】已批量处理 {len(params)} 条种子主信息。")
-                logging.info(f"已批量处理 {len(params)} 条种子主信息。")
+                logger.info("已批量处理 %d 条种子主信息。", len(params))
             if upload_stats_to_upsert:
-                print(f"【刷新线程】准备写入 {len(upload_stats_to_upsert)} 条种子上传数据到数据库")
                 # 根据数据库类型使用正确的占位符和冲突处理语法
                 if self.db_manager.db_type == "mysql":
                     sql_upload = """INSERT INTO torrent_upload_stats (hash, downloader_id, uploaded) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE uploaded=VALUES(uploaded)"""
@@ -910,14 +920,19 @@ class DataTracker(Thread):
                 else:  # sqlite
                     sql_upload = """INSERT INTO torrent_upload_stats (hash, downloader_id, uploaded) VALUES (?, ?, ?) ON CONFLICT(hash, downloader_id) DO UPDATE SET uploaded=excluded.uploaded"""
                 cursor.executemany(sql_upload, upload_stats_to_upsert)
-                print(f"【刷新线程】已批量处理 {len(upload_stats_to_upsert)} 条种子上传数据。")
-                logging.info(f"已批量处理 {len(upload_stats_to_upsert)} 条种子上传数据。")
+                logger.info("已批量处理 %d 条种子上传数据。", len(upload_stats_to_upsert))
+            TORRENT_REFRESH_PHASE_SECONDS.observe(
+                time.perf_counter() - phase_started,
+                phase="upsert",
+                downloader="all")
+            phase_started = time.perf_counter()
+
             # 根据数据库类型使用正确的占位符
             placeholder = "%s" if self.db_manager.db_type in [
                 "mysql", "postgresql"
             ] else "?"
 
-            print(f"【刷新线程】检查是否需要删除已移除下载器的种子数据...")
+            logger.debug("检查是否需要删除已移除下载器的种子数据...")
             # 修改删除逻辑：只删除已从配置中删除的下载器的种子数据，保留已禁用下载器的种子数据
             # 获取配置中所有下载器的ID（包括启用和禁用的）
             all_configured_downloaders = {
@@ -939,26 +954,48 @@ class DataTracker(Thread):
 
             # 只删除已从配置中删除的下载器的种子数据，保留已禁用下载器的种子数据
             if deleted_downloader_ids:
-                print(
-                    f"【刷新线程】发现 {len(deleted_downloader_ids)} 个已删除的下载器，将移除其种子数据"
-                )
-                # 构建 WHERE 子句
-                downloader_placeholders = ",".join([placeholder] *
-                                                   len(deleted_downloader_ids))
-                delete_query = f"DELETE FROM torrents WHERE downloader_id IN ({downloader_placeholders})"
-                cursor.execute(delete_query, tuple(deleted_downloader_ids))
-                deleted_count = cursor.rowcount
-                print(f"【刷新线程】从 torrents 表中移除了 {deleted_count} 个已删除下载器的种子。")
-                logging.info(f"从 torrents 表中移除了 {deleted_count} 个已删除下载器的种子。")
+                logger.debug("发现 %d 个已删除的下载器，将移除其种子数据",
+                             len(deleted_downloader_ids))
+                removed_placeholders = ",".join([placeholder] *
+                                                len(deleted_downloader_ids))
+                cursor.execute(
+                    f"SELECT hash, name FROM torrents WHERE downloader_id IN ({removed_placeholders})",
+                    tuple(deleted_downloader_ids))
+                for row in cursor.fetchall():
+                    presence_names.add(row["name"])
+                    presence_deleted_hashes.append(row["hash"])
+                deleted_count = self.db_manager.delete_where_in(
+                    cursor, "torrents", "downloader_id",
+                    deleted_downloader_ids)
+                # 与上面的清理一样单独提交，尽早释放行锁
+                conn.commit()
+                logger.info("从 torrents 表中移除了 %d 个已删除下载器的种子。", deleted_count)
             else:
                 deleted_count = 0
-                print("【刷新线程】没有需要删除的已删除下载器的种子数据。")
-                logging.info("没有需要删除的已删除下载器的种子数据。")
+                logger.debug("没有需要删除的已删除下载器的种子数据。")
+
+            # 根据 torrents 表的最终状态更新 seed_parameters 的 is_deleted（只修改状态变化的行）
+            restored_count, marked_deleted_count = self.db_manager.reconcile_seed_parameters_deleted(
+                cursor)
+            if restored_count or marked_deleted_count:
+                logger.info("seed_parameters.is_deleted 已更新: %d 个恢复，%d 个标记为已删除",
+                            restored_count, marked_deleted_count)
+
+            # 同步同名种子站点存在表，供"排除目标站点"筛选使用（只处理本周期变化的名称）
+            if presence_names or presence_deleted_hashes:
+                self.db_manager.refresh_torrent_site_presence(
+                    cursor, presence_names, presence_deleted_hashes)
             conn.commit()
-            print("【刷新线程】=== 种子数据库更新周期成功完成 ===")
-            logging.info("种子数据库更新周期成功完成。")
+            TORRENT_REFRESH_PHASE_SECONDS.observe(
+                time.perf_counter() - phase_started,
+                phase="reconcile",
+                downloader="all")
+            if restored_count or marked_deleted_count:
+                invalidate_counts("seed_parameters")
+            logger.info("种子数据库更新周期成功完成。")
         except Exception as e:
-            logging.error(f"更新数据库中的种子失败: {e}", exc_info=True)
+            logger.error("更新数据库中的种子失败: %s", e, exc_info=True)
+            TORRENT_REFRESH_ERRORS.inc(phase="database")
             if conn: conn.rollback()
         finally:
             if conn:
@@ -1025,7 +1062,7 @@ class DataTracker(Thread):
                 # --- [核心修正] ---
                 # 基于成功的测试脚本，实现可靠的备用方案
                 if not info["comment"] and client_instance:
-                    logging.debug(f"种子 '{t.name[:30]}...' 的注释为空，尝试备用接口获取。")
+                    logger.debug("种子 '%s...' 的注释为空，尝试备用接口获取。", t.name[:30])
                     try:
                         # 1. 从客户端实例中提取 SID cookie
                         sid_cookie = client_instance._session.cookies.get(
@@ -1149,7 +1186,7 @@ class DataTracker(Thread):
         if '@' in name_lower:
             # 分割@符号前后的部分
             parts = name_lower.split('@')
-            logging.debug(f"种子名称包含@符号，分割为: {parts}")
+            logger.debug("种子名称包含@符号，分割为: %s", parts)
             
             for part in parts:
                 # 清理每个部分：
@@ -1163,7 +1200,7 @@ class DataTracker(Thread):
                 clean_part = re.sub(r'\[.*?\]', '', clean_part).strip()
                 
                 if clean_part:
-                    logging.debug(f"检查部分: '{clean_part}'")
+                    logger.debug("检查部分: '%s'", clean_part)
                     
                     # 先检查精确匹配
                     for group_lower, group_info in group_to_site_map_lower.items():
@@ -1174,37 +1211,37 @@ class DataTracker(Thread):
                         if group_lower_clean == clean_part:
                             if group_info["original_case"] not in exact_matches:
                                 exact_matches.append(group_info["original_case"])
-                                logging.debug(f"精确匹配到官组: '{group_info['original_case']}'")
+                                logger.debug("精确匹配到官组: '%s'", group_info['original_case'])
                         # 包含匹配（次优先级）
                         elif group_lower_clean in clean_part or clean_part in group_lower_clean:
                             if group_info["original_case"] not in partial_matches and group_info["original_case"] not in exact_matches:
                                 partial_matches.append(group_info["original_case"])
-                                logging.debug(f"部分匹配到官组: '{group_info['original_case']}'")
+                                logger.debug("部分匹配到官组: '%s'", group_info['original_case'])
         
         # 合并结果：精确匹配优先
         found_matches = exact_matches + partial_matches
         
         # 如果@符号匹配没有结果，或者名称中没有@符号，使用原来的全名匹配逻辑
         if not found_matches:
-            logging.debug(f"@符号匹配无结果，尝试全名匹配: '{name_lower}'")
+            logger.debug("@符号匹配无结果，尝试全名匹配: '%s'", name_lower)
             for group_lower, group_info in group_to_site_map_lower.items():
                 if group_lower in name_lower:
                     if group_info["original_case"] not in found_matches:
                         found_matches.append(group_info["original_case"])
-                        logging.debug(f"匹配到官组: '{group_info['original_case']}' (通过全名匹配)")
+                        logger.debug("匹配到官组: '%s' (通过全名匹配)", group_info['original_case'])
         
         if found_matches:
             # 如果有精确匹配，优先返回最短的精确匹配（最准确）
             # 如果没有精确匹配，返回最长的部分匹配（避免匹配到子串）
             if exact_matches:
                 result = sorted(exact_matches, key=len)[0]  # 最短的精确匹配
-                logging.info(f"种子 '{name[:50]}...' 精确匹配到官组: {result}")
+                logger.debug("种子 '%s...' 精确匹配到官组: %s", name[:50], result)
             else:
                 result = sorted(found_matches, key=len, reverse=True)[0]  # 最长的匹配
-                logging.info(f"种子 '{name[:50]}...' 匹配到官组: {result}")
+                logger.debug("种子 '%s...' 匹配到官组: %s", name[:50], result)
             return result
         
-        logging.debug(f"种子 '{name[:50]}...' 未识别到官组")
+        logger.debug("种子 '%s...' 未识别到官组", name[:50])
         return None
 
     def stop(self):
@@ -1219,11 +1256,10 @@ class DataTracker(Thread):
 def start_data_tracker(db_manager, config_manager):
     """初始化并启动全局 DataTracker 线程实例。"""
     global data_tracker_thread
-    # 检查是否在调试模式下运行，避免重复启动
-    import os
-    if os.environ.get('WERKZEUG_RUN_MAIN') != 'true':
-        # 在调试模式下，这是监控进程，不需要启动线程
-        logging.info("检测到调试监控进程，跳过DataTracker线程启动。")
+    # 只在后台服务进程中启动，避免重载器监控进程或多个 worker 重复启动
+    from core.runtime import is_background_process
+    if not is_background_process():
+        logging.info("当前进程不是后台服务进程，跳过DataTracker线程启动。")
         return data_tracker_thread
 
     if data_tracker_thread is None or not data_tracker_thread.is_alive():
@@ -0,0 +1,107 @@
+# core/startup.py
+"""
+启动流程分阶段执行与耗时记录
+
+- 必须在接收请求前完成的步骤（建表、下载器ID迁移、注册路由）仍在 create_app 中同步执行
+- 与下载器同步统计基线、初始小时流量聚合等耗时步骤放到后台线程中依次执行，
+  完成后再启动 DataTracker / IYUU 线程，Web 界面在容器重启后立即可用
+- 每个阶段的状态和耗时记录在 startup_timings 中，通过 /health 接口查看
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+PHASE_RUNNING = "running"
+PHASE_DONE = "done"
+PHASE_FAILED = "failed"
+
+
+class StartupTimings:
+    """记录启动各阶段的状态与耗时（线程安全）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = []
+        self._started_at = time.time()
+        self._pending_background = False
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        记录一个阶段。阶段内抛出的异常会被记录后继续抛出。
+
+        with 语句返回的字典可写入 "detail"（例如同步失败的下载器列表）。
+        """
+        entry = {
+            "name": name,
+            "status": PHASE_RUNNING,
+            "started_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_ms": None,
+            "detail": None,
+        }
+        with self._lock:
+            self._phases.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        except Exception as e:
+            entry["status"] = PHASE_FAILED
+            entry["detail"] = entry["detail"] or str(e)
+            raise
+        else:
+            entry["status"] = PHASE_DONE
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            logging.info(
+                f"启动阶段 '{name}' {entry['status']}，耗时 {entry['duration_ms']} ms")
+
+    def run_in_background(self, steps, stop_event: threading.Event = None):
+        """
+        在后台线程中依次执行启动步骤。
+
+        :param steps: [(阶段名称, 无参函数)]，某一步失败后继续执行后续步骤
+        :param stop_event: 设置后不再执行尚未开始的步骤（应用正在退出）
+        """
+        with self._lock:
+            self._pending_background = True
+
+        def _run():
+            try:
+                for name, func in steps:
+                    if stop_event is not None and stop_event.is_set():
+                        logging.info(f"应用正在退出，跳过启动阶段 '{name}'。")
+                        break
+                    try:
+                        with self.phase(name) as entry:
+                            result = func()
+                            if result is not None:
+                                entry["detail"] = result
+                    except Exception as e:
+                        logging.error(f"启动阶段 '{name}' 失败: {e}",
+                                      exc_info=True)
+            finally:
+                with self._lock:
+                    self._pending_background = False
+
+        thread = threading.Thread(target=_run,
+                                  name="StartupPipeline",
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self) -> dict:
+        """返回各阶段的状态与耗时。"""
+        with self._lock:
+            phases = [dict(p) for p in self._phases]
+            pending = self._pending_background
+        return {
+            "complete": not pending and all(p["status"] != PHASE_RUNNING
+                                            for p in phases),
+            "uptime_seconds": round(time.time() - self._started_at, 1),
+            "phases": phases,
+        }
+
+
+startup_timings = StartupTimings()
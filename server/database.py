@@ -6,11 +6,13 @@ import mysql.connector
 import psycopg2
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime
 from psycopg2.extras import RealDictCursor
 
 # 从项目根目录导入模块
 from config import SITES_DATA_FILE, config_manager
+from utils.metrics import DB_CONNECT_SECONDS
 
 # 外部库导入
 from qbittorrentapi import Client
@@ -21,12 +23,44 @@ from transmission_rpc import Client as TrClient
 from core.services import _prepare_api_config
 
 
+# seed_parameters 全文搜索覆盖的列
+SEED_SEARCH_COLUMNS = ("title", "subtitle", "name", "team", "torrent_id")
+
+# PostgreSQL 三元组索引使用的表达式（列之间用换行分隔，避免跨列误匹配）
+SEED_SEARCH_PG_EXPRESSION = " || chr(10) || ".join(
+    f"coalesce({col}, '')" for col in SEED_SEARCH_COLUMNS)
+
+# 各索引可用的最短关键词长度（trigram 为 3，MySQL ngram_token_size 默认 2）
+SEED_SEARCH_MIN_TOKEN_LENGTH = {"sqlite_fts5": 3, "mysql_ngram": 2}
+
+# 列表页的排序键（降序，最后的列保证唯一），键集分页的游标即为这些列的值
+SEED_PARAMETERS_SORT_COLUMNS = ("created_at", "hash", "torrent_id", "site_name")
+BATCH_RECORDS_SORT_COLUMNS = ("processed_at", "id")
+
+# 启动同步时单个下载器的连接/读取超时，离线的下载器不会拖慢整个启动过程
+RECONCILE_CLIENT_TIMEOUT_SECONDS = 10
+
+# 批量修改时每条语句 IN 列表的最大长度（低于 SQLite 参数上限）。
+# 分批只限制单条语句的大小，行锁在事务提交前一直持有，需要尽早释放锁的调用方应自行分段提交
+BULK_IN_CHUNK_SIZE = 500
+
+# (表, 索引名, 列)
+LISTING_INDEXES = (
+    ("seed_parameters", "idx_seed_parameters_created_at",
+     SEED_PARAMETERS_SORT_COLUMNS),
+    ("batch_enhance_records", "idx_batch_records_processed_at_id",
+     BATCH_RECORDS_SORT_COLUMNS),
+)
+
+
 class DatabaseManager:
     """处理与配置的数据库（MySQL、PostgreSQL 或 SQLite）的所有交互。"""
 
     def __init__(self, config):
         """根据提供的配置初始化 DatabaseManager。"""
         self.db_type = config.get("db_type", "sqlite")
+        # 全文搜索索引类型，由 init_db 检测并设置
+        self.seed_search_backend = None
         if self.db_type == "mysql":
             self.mysql_config = config.get("mysql", {})
             logging.info("数据库后端设置为 MySQL。")
@@ -118,13 +152,14 @@ class DatabaseManager:
 
     def _get_connection(self):
         """返回一个新的数据库连接。"""
-        if self.db_type == "mysql":
-            return mysql.connector.connect(**self.mysql_config,
-                                           autocommit=False)
-        elif self.db_type == "postgresql":
-            return psycopg2.connect(**self.postgresql_config)
-        else:
-            return sqlite3.connect(self.sqlite_path, timeout=20)
+        with DB_CONNECT_SECONDS.time(db_type=self.db_type):
+            if self.db_type == "mysql":
+                return mysql.connector.connect(**self.mysql_config,
+                                               autocommit=False)
+            elif self.db_type == "postgresql":
+                return psycopg2.connect(**self.postgresql_config)
+            else:
+                return sqlite3.connect(self.sqlite_path, timeout=20)
 
     def _get_cursor(self, conn):
         """从连接中返回一个游标。"""
@@ -520,6 +555,10 @@ class DatabaseManager:
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS seed_parameters (hash VARCHAR(40) NOT NULL, torrent_id VARCHAR(255) NOT NULL, site_name VARCHAR(255) NOT NULL, nickname VARCHAR(255), save_path TEXT, name TEXT, title TEXT, subtitle TEXT, imdb_link TEXT, douban_link TEXT, type VARCHAR(100), medium VARCHAR(100), video_codec VARCHAR(100), audio_codec VARCHAR(100), resolution VARCHAR(100), team VARCHAR(100), source VARCHAR(100), tags TEXT, poster TEXT, screenshots TEXT, statement TEXT, body TEXT, mediainfo TEXT, title_components TEXT, removed_ardtudeclarations TEXT, downloader_id VARCHAR(36), is_deleted TINYINT(1) NOT NULL DEFAULT 0, is_reviewed TINYINT(1) NOT NULL DEFAULT 0, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL, PRIMARY KEY (hash, torrent_id, site_name)) ENGINE=InnoDB ROW_FORMAT=DYNAMIC"
             )
+            # 种子同名站点存在表：hash 对应的同名种子已存在于哪些站点（由 DataTracker 维护）
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS torrent_site_presence (hash VARCHAR(40) NOT NULL, site VARCHAR(255) NOT NULL, PRIMARY KEY (hash, site)) ENGINE=InnoDB ROW_FORMAT=DYNAMIC"
+            )
             # 创建批量转种记录表
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS batch_enhance_records (id INT AUTO_INCREMENT PRIMARY KEY, title TEXT, batch_id VARCHAR(255) NOT NULL, torrent_id VARCHAR(255) NOT NULL, source_site VARCHAR(255) NOT NULL, target_site VARCHAR(255) NOT NULL, video_size_gb DECIMAL(8,2), status VARCHAR(50) NOT NULL, success_url TEXT, error_detail TEXT, downloader_add_result TEXT, processed_at DATETIME DEFAULT CURRENT_TIMESTAMP, progress VARCHAR(20), INDEX idx_batch_records_batch_id (batch_id), INDEX idx_batch_records_torrent_id (torrent_id), INDEX idx_batch_records_status (status), INDEX idx_batch_records_processed_at (processed_at)) ENGINE=InnoDB ROW_FORMAT=DYNAMIC"
@@ -546,6 +585,10 @@ class DatabaseManager:
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS seed_parameters (hash VARCHAR(40) NOT NULL, torrent_id VARCHAR(255) NOT NULL, site_name VARCHAR(255) NOT NULL, nickname VARCHAR(255), save_path TEXT, name TEXT, title TEXT, subtitle TEXT, imdb_link TEXT, douban_link TEXT, type VARCHAR(100), medium VARCHAR(100), video_codec VARCHAR(100), audio_codec VARCHAR(100), resolution VARCHAR(100), team VARCHAR(100), source VARCHAR(100), tags TEXT, poster TEXT, screenshots TEXT, statement TEXT, body TEXT, mediainfo TEXT, title_components TEXT, removed_ardtudeclarations TEXT, downloader_id VARCHAR(36), is_deleted BOOLEAN NOT NULL DEFAULT FALSE, is_reviewed BOOLEAN NOT NULL DEFAULT FALSE, created_at TIMESTAMP NOT NULL, updated_at TIMESTAMP NOT NULL, PRIMARY KEY (hash, torrent_id, site_name))"
             )
+            # 种子同名站点存在表：hash 对应的同名种子已存在于哪些站点（由 DataTracker 维护）
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS torrent_site_presence (hash VARCHAR(40) NOT NULL, site VARCHAR(255) NOT NULL, PRIMARY KEY (hash, site))"
+            )
             # 创建批量转种记录表
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS batch_enhance_records (id SERIAL PRIMARY KEY, title TEXT, batch_id VARCHAR(255) NOT NULL, torrent_id VARCHAR(255) NOT NULL, source_site VARCHAR(255) NOT NULL, target_site VARCHAR(255) NOT NULL, video_size_gb DECIMAL(8,2), status VARCHAR(50) NOT NULL, success_url TEXT, error_detail TEXT, downloader_add_result TEXT, processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, progress VARCHAR(20))"
@@ -584,6 +627,10 @@ class DatabaseManager:
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS seed_parameters (hash TEXT NOT NULL, torrent_id TEXT NOT NULL, site_name TEXT NOT NULL, nickname TEXT, save_path TEXT, name TEXT, title TEXT, subtitle TEXT, imdb_link TEXT, douban_link TEXT, type TEXT, medium TEXT, video_codec TEXT, audio_codec TEXT, resolution TEXT, team TEXT, source TEXT, tags TEXT, poster TEXT, screenshots TEXT, statement TEXT, body TEXT, mediainfo TEXT, title_components TEXT, removed_ardtudeclarations TEXT, downloader_id TEXT, is_deleted INTEGER NOT NULL DEFAULT 0, is_reviewed INTEGER NOT NULL DEFAULT 0, created_at TEXT NOT NULL, updated_at TEXT NOT NULL, PRIMARY KEY (hash, torrent_id, site_name))"
             )
+            # 种子同名站点存在表：hash 对应的同名种子已存在于哪些站点（由 DataTracker 维护）
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS torrent_site_presence (hash TEXT NOT NULL, site TEXT NOT NULL, PRIMARY KEY (hash, site))"
+            )
             # 创建批量转种记录表
             cursor.execute(
                 "CREATE TABLE IF NOT EXISTS batch_enhance_records (id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT, batch_id TEXT NOT NULL, torrent_id TEXT NOT NULL, source_site TEXT NOT NULL, target_site TEXT NOT NULL, video_size_gb REAL, status TEXT NOT NULL, success_url TEXT, error_detail TEXT, downloader_add_result TEXT, processed_at TEXT DEFAULT CURRENT_TIMESTAMP, progress TEXT)"
@@ -606,9 +653,422 @@ class DatabaseManager:
         # 执行数据库迁移：删除 proxy 列
         self._migrate_remove_proxy_column(conn, cursor)
 
+        # 创建 seed_parameters 全文搜索索引
+        self._ensure_seed_parameters_search_index(conn, cursor)
+
+        # 创建列表键集分页使用的复合索引
+        self._ensure_listing_indexes(conn, cursor)
+
+        # 同名种子查找（torrent_site_presence 维护、IYUU）使用的 torrents.name 索引
+        self._ensure_torrent_name_index(conn, cursor)
+
+        # 启动时对齐整张同名站点存在表（之后由 DataTracker 每次刷新时按变化的种子名称增量维护）
+        try:
+            self.refresh_torrent_site_presence(cursor)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.warning(f"初始化 torrent_site_presence 失败: {e}")
+
         # 同步站点数据
         self.sync_sites_from_json()
 
+    def _ensure_seed_parameters_search_index(self, conn, cursor):
+        """
+        为 seed_parameters 的 title/subtitle/name/team/torrent_id 创建全文搜索索引。
+
+        - SQLite: FTS5 外部内容表（trigram 分词，支持中文子串），由触发器在写入时同步
+        - MySQL: FULLTEXT 索引 + ngram 分词器，由 InnoDB 在写入时维护
+        - PostgreSQL: pg_trgm 扩展 + GIN 三元组索引，由 PostgreSQL 在写入时维护
+
+        索引不可用（SQLite 未编译 FTS5、MySQL 版本过低、PostgreSQL 无权限安装扩展等）时
+        self.seed_search_backend 为 None，搜索回退为 LIKE 全表扫描。
+        """
+        self.seed_search_backend = None
+        columns = ", ".join(SEED_SEARCH_COLUMNS)
+        try:
+            if self.db_type == "mysql":
+                cursor.execute(
+                    "SELECT COUNT(*) AS cnt FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'seed_parameters' "
+                    "AND index_name = 'ft_seed_parameters_search'")
+                row = cursor.fetchone()
+                exists = (row["cnt"] if isinstance(row, dict) else row[0]) > 0
+                if not exists:
+                    logging.info("正在为 seed_parameters 创建 FULLTEXT (ngram) 索引...")
+                    cursor.execute(
+                        f"ALTER TABLE seed_parameters ADD FULLTEXT INDEX ft_seed_parameters_search ({columns}) WITH PARSER ngram"
+                    )
+                    conn.commit()
+                self.seed_search_backend = "mysql_ngram"
+
+            elif self.db_type == "postgresql":
+                cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_seed_parameters_search_trgm ON seed_parameters USING gin (({SEED_SEARCH_PG_EXPRESSION}) gin_trgm_ops)"
+                )
+                conn.commit()
+                self.seed_search_backend = "pg_trgm"
+
+            else:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'seed_parameters_fts'"
+                )
+                exists = cursor.fetchone() is not None
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS seed_parameters_fts USING fts5({columns}, content='seed_parameters', content_rowid='rowid', tokenize='trigram')"
+                )
+                new_values = ", ".join(f"new.{col}" for col in SEED_SEARCH_COLUMNS)
+                old_values = ", ".join(f"old.{col}" for col in SEED_SEARCH_COLUMNS)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS seed_parameters_fts_ai AFTER INSERT ON seed_parameters BEGIN
+                        INSERT INTO seed_parameters_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS seed_parameters_fts_ad AFTER DELETE ON seed_parameters BEGIN
+                        INSERT INTO seed_parameters_fts(seed_parameters_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                    END
+                """)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS seed_parameters_fts_au AFTER UPDATE OF {columns} ON seed_parameters BEGIN
+                        INSERT INTO seed_parameters_fts(seed_parameters_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                        INSERT INTO seed_parameters_fts(rowid, {columns}) VALUES (new.rowid, {new_values});
+                    END
+                """)
+                if not exists:
+                    # 首次创建时为已有数据建立索引
+                    logging.info("正在为 seed_parameters 建立 FTS5 全文索引...")
+                    cursor.execute(
+                        "INSERT INTO seed_parameters_fts(seed_parameters_fts) VALUES ('rebuild')"
+                    )
+                conn.commit()
+                self.seed_search_backend = "sqlite_fts5"
+
+            logging.info(f"✓ seed_parameters 全文搜索索引已就绪 ({self.seed_search_backend})")
+        except Exception as e:
+            conn.rollback()
+            logging.warning(f"创建 seed_parameters 全文搜索索引失败，搜索将回退为 LIKE 查询: {e}")
+
+    def _ensure_listing_indexes(self, conn, cursor):
+        """
+        创建列表页排序键上的复合索引，供键集分页直接定位下一页的起点：
+        - seed_parameters: (created_at, hash, torrent_id, site_name)
+        - batch_enhance_records: (processed_at, id)
+        """
+        for table, index_name, columns in LISTING_INDEXES:
+            try:
+                if self.db_type == "mysql":
+                    cursor.execute(
+                        "SELECT COUNT(*) AS cnt FROM information_schema.statistics "
+                        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+                        (table, index_name))
+                    row = cursor.fetchone()
+                    if (row["cnt"] if isinstance(row, dict) else row[0]) == 0:
+                        logging.info(f"正在为 {table} 创建索引 {index_name}...")
+                        cursor.execute(
+                            f"ALTER TABLE {table} ADD INDEX {index_name} ({', '.join(columns)})"
+                        )
+                else:
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({', '.join(columns)})"
+                    )
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.warning(f"创建索引 {index_name} 失败，列表分页将使用全表排序: {e}")
+
+    def _ensure_torrent_name_index(self, conn, cursor):
+        """创建 torrents.name 上的索引（MySQL 的 TEXT 列使用前缀索引）。"""
+        try:
+            if self.db_type == "mysql":
+                cursor.execute(
+                    "SELECT COUNT(*) AS cnt FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = 'torrents' "
+                    "AND index_name = 'idx_torrents_name'")
+                row = cursor.fetchone()
+                if (row["cnt"] if isinstance(row, dict) else row[0]) == 0:
+                    logging.info("正在为 torrents 创建索引 idx_torrents_name...")
+                    cursor.execute(
+                        "ALTER TABLE torrents ADD INDEX idx_torrents_name (name(255))")
+            else:
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_torrents_name ON torrents (name)")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logging.warning(f"创建索引 idx_torrents_name 失败，同名种子查找将使用全表扫描: {e}")
+
+    def build_keyset_condition(self, columns, cursor_values):
+        """
+        构建降序键集分页条件：(列1, 列2, ...) < (游标值1, 游标值2, ...)。
+
+        三种数据库都支持行值比较，且能与同列顺序的复合索引配合做范围扫描。
+
+        Returns:
+            tuple: (WHERE 条件 SQL, 参数列表)
+        """
+        ph = self.get_placeholder()
+        return (f"({', '.join(columns)}) < ({', '.join([ph] * len(columns))})",
+                list(cursor_values))
+
+    def build_seed_search_condition(self, search_query):
+        """
+        构建 seed_parameters 搜索条件，匹配语义与 LIKE '%关键词%' 一致（不区分大小写的子串匹配）。
+
+        关键词作为整体短语处理；长度不足索引最小分词长度的关键词（如单个汉字）直接使用 LIKE。
+        MySQL 的 ngram 短语匹配只用于利用索引缩小范围，结果再用 LIKE 精确过滤。
+
+        Returns:
+            tuple: (WHERE 条件 SQL, 参数列表)
+        """
+        ph = self.get_placeholder()
+        like_value = f"%{search_query}%"
+        backend = self.seed_search_backend
+
+        if self.db_type == "postgresql":
+            if backend == "pg_trgm":
+                # 与索引表达式完全一致，才能使用 GIN 三元组索引
+                return f"({SEED_SEARCH_PG_EXPRESSION}) ILIKE {ph}", [like_value]
+            condition = " OR ".join(f"{col} ILIKE {ph}" for col in SEED_SEARCH_COLUMNS)
+            return f"({condition})", [like_value] * len(SEED_SEARCH_COLUMNS)
+
+        like_condition = " OR ".join(f"{col} LIKE {ph}" for col in SEED_SEARCH_COLUMNS)
+        like_params = [like_value] * len(SEED_SEARCH_COLUMNS)
+        min_length = SEED_SEARCH_MIN_TOKEN_LENGTH.get(backend)
+        if not min_length or len(search_query) < min_length:
+            return f"({like_condition})", like_params
+
+        if backend == "sqlite_fts5":
+            # FTS5 短语中的双引号需要转义为两个双引号
+            phrase = '"' + search_query.replace('"', '""') + '"'
+            return (
+                f"seed_parameters.rowid IN (SELECT rowid FROM seed_parameters_fts WHERE seed_parameters_fts MATCH {ph})",
+                [phrase])
+
+        # MySQL 布尔模式的短语不支持转义，去掉其中的双引号
+        phrase = '"' + search_query.replace('"', ' ') + '"'
+        columns = ", ".join(SEED_SEARCH_COLUMNS)
+        return (
+            f"(MATCH ({columns}) AGAINST ({ph} IN BOOLEAN MODE) AND ({like_condition}))",
+            [phrase] + like_params)
+
+    def delete_where_in(self, cursor, table, column, values,
+                        extra_condition="", extra_params=(),
+                        chunk_size=BULK_IN_CHUNK_SIZE):
+        """
+        按键值列表批量删除（不提交事务，由调用方在同一事务内提交）。
+
+        键值去重排序后按 chunk_size 分批执行 DELETE ... WHERE column IN (...)，
+        每条语句的参数个数有上限，并按主键顺序加锁；锁在调用方提交事务时才释放。
+
+        Args:
+            extra_condition: 附加的 WHERE 条件（以 AND 连接），例如 "downloader_id = %s"
+            extra_params: 附加条件的参数
+
+        Returns:
+            int: 删除的总行数
+        """
+        ph = self.get_placeholder()
+        keys = sorted(set(values))
+        deleted = 0
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            sql = f"DELETE FROM {table} WHERE {column} IN ({', '.join([ph] * len(chunk))})"
+            if extra_condition:
+                sql += f" AND {extra_condition}"
+            cursor.execute(sql, tuple(chunk) + tuple(extra_params))
+            deleted += max(cursor.rowcount, 0)
+        return deleted
+
+    def reconcile_seed_parameters_deleted(self, cursor):
+        """
+        按 torrents 表更新 seed_parameters.is_deleted（不提交事务）。
+
+        两条集合语句分别处理"恢复"和"标记删除"，只修改状态实际变化的行，
+        不需要把所有 hash 读到 Python 里再作为参数传回数据库。
+
+        Returns:
+            tuple: (恢复为未删除的行数, 标记为已删除的行数)
+        """
+        true_value, false_value = ("TRUE", "FALSE") if self.db_type == "postgresql" else ("1", "0")
+        torrent_exists = "EXISTS (SELECT 1 FROM torrents t WHERE t.hash = seed_parameters.hash)"
+
+        cursor.execute(
+            f"UPDATE seed_parameters SET is_deleted = {false_value} "
+            f"WHERE is_deleted = {true_value} AND {torrent_exists}")
+        restored = max(cursor.rowcount, 0)
+
+        cursor.execute(
+            f"UPDATE seed_parameters SET is_deleted = {true_value} "
+            f"WHERE is_deleted = {false_value} AND NOT {torrent_exists}")
+        marked_deleted = max(cursor.rowcount, 0)
+        return restored, marked_deleted
+
+    def refresh_torrent_site_presence(self, cursor, names=None, deleted_hashes=()):
+        """
+        根据 torrents 表维护 torrent_site_presence（不提交事务）。
+
+        对每个种子 hash，记录与其同名的种子所在的全部站点。插入缺失行、删除多余行
+        都由数据库内的 INSERT ... SELECT / DELETE ... NOT EXISTS 完成，不把整表读到 Python 中。
+
+        Args:
+            names: 本次新增、名称或站点发生变化、被删除的种子名称；为 None 时重新对齐整张表
+            deleted_hashes: 本次从 torrents 表删除的种子 hash
+
+        Returns:
+            tuple: (新增行数, 删除行数)
+        """
+        ph = self.get_placeholder()
+        pair_exists = (
+            "SELECT 1 FROM torrents t1 JOIN torrents t2 ON t2.name = t1.name "
+            "WHERE t1.hash = torrent_site_presence.hash AND t2.sites = torrent_site_presence.site")
+        insert_sql = (
+            "INSERT INTO torrent_site_presence (hash, site) "
+            "SELECT DISTINCT t1.hash, t2.sites FROM torrents t1 "
+            "JOIN torrents t2 ON t2.name = t1.name "
+            "WHERE t2.sites IS NOT NULL AND t2.sites <> '' "
+            "AND NOT EXISTS (SELECT 1 FROM torrent_site_presence p "
+            "WHERE p.hash = t1.hash AND p.site = t2.sites)")
+        delete_sql = f"DELETE FROM torrent_site_presence WHERE NOT EXISTS ({pair_exists})"
+
+        inserted = deleted = 0
+        if names is None:
+            cursor.execute(delete_sql)
+            deleted += max(cursor.rowcount, 0)
+            cursor.execute(insert_sql)
+            inserted += max(cursor.rowcount, 0)
+        else:
+            names = sorted(set(names))
+            for start in range(0, len(names), BULK_IN_CHUNK_SIZE):
+                chunk = names[start:start + BULK_IN_CHUNK_SIZE]
+                in_list = ", ".join([ph] * len(chunk))
+                cursor.execute(
+                    f"{delete_sql} AND hash IN (SELECT hash FROM torrents WHERE name IN ({in_list}))",
+                    chunk)
+                deleted += max(cursor.rowcount, 0)
+                cursor.execute(f"{insert_sql} AND t1.name IN ({in_list})", chunk)
+                inserted += max(cursor.rowcount, 0)
+            # 已删除种子的 hash 不再对应任何种子，其站点记录全部移除
+            deleted += self.delete_where_in(cursor, "torrent_site_presence", "hash",
+                                            deleted_hashes,
+                                            f"NOT EXISTS ({pair_exists})")
+
+        if inserted or deleted:
+            logging.info(f"torrent_site_presence 已更新: 新增 {inserted} 行，删除 {deleted} 行")
+        return inserted, deleted
+
+    def build_exclude_sites_condition(self, sites):
+        """
+        构建"同名种子尚未存在于这些站点"的筛选条件（基于 torrent_site_presence 主键查找）。
+
+        Returns:
+            tuple: (WHERE 条件 SQL, 参数列表)
+        """
+        ph = self.get_placeholder()
+        placeholders = ", ".join([ph] * len(sites))
+        return (
+            f"NOT EXISTS (SELECT 1 FROM torrent_site_presence tsp WHERE tsp.hash = seed_parameters.hash AND tsp.site IN ({placeholders}))",
+            list(sites))
+
+    def get_downloader_traffic_summary(self, day_start, downloader_ids=()):
+        """
+        获取每个下载器的累计流量和今日流量基线。
+
+        - 今日统计只读取 stat_datetime >= day_start 的行（主键范围扫描），不扫描全表
+        - 累计流量取每个下载器最新一条有效记录（累计值大于 0）中的累计值：
+          今日有记录的下载器使用今日最新一行；downloader_ids 中今日无记录的下载器
+          按 stat_datetime 倒序查找最近一行，找到即停止
+
+        Args:
+            day_start (str): 今日零点，格式 "YYYY-MM-DD HH:MM:SS"
+            downloader_ids (iterable): 需要返回累计流量的下载器ID；
+                今日无记录且不在其中的下载器不会出现在结果中
+
+        Returns:
+            dict: {下载器ID: {"total_dl", "total_ul", "day_start_dl", "day_start_ul",
+                   "day_max_dl", "day_max_ul"}}，今日无记录时 day_* 为 None
+        """
+        ph = self.get_placeholder()
+        valid_row = "(cumulative_downloaded > 0 OR cumulative_uploaded > 0)"
+        today_query = f"""
+            SELECT downloader_id,
+                   MIN(CASE WHEN cumulative_downloaded > 0
+                            THEN cumulative_downloaded END) AS day_start_dl,
+                   MIN(CASE WHEN cumulative_uploaded > 0
+                            THEN cumulative_uploaded END) AS day_start_ul,
+                   MAX(cumulative_downloaded) AS day_max_dl,
+                   MAX(cumulative_uploaded) AS day_max_ul
+            FROM traffic_stats
+            WHERE stat_datetime >= {ph} AND {valid_row}
+            GROUP BY downloader_id
+        """
+        # 今日每个下载器的最新一行（子查询与外层均为今日范围内的主键查找）
+        today_latest_query = f"""
+            SELECT t.downloader_id,
+                   t.cumulative_downloaded AS total_dl,
+                   t.cumulative_uploaded AS total_ul
+            FROM traffic_stats t
+            JOIN (SELECT downloader_id, MAX(stat_datetime) AS latest
+                  FROM traffic_stats
+                  WHERE stat_datetime >= {ph} AND {valid_row}
+                  GROUP BY downloader_id) l
+              ON t.downloader_id = l.downloader_id AND t.stat_datetime = l.latest
+        """
+        latest_before_query = f"""
+            SELECT cumulative_downloaded AS total_dl,
+                   cumulative_uploaded AS total_ul
+            FROM traffic_stats
+            WHERE downloader_id = {ph} AND stat_datetime < {ph} AND {valid_row}
+            ORDER BY stat_datetime DESC
+            LIMIT 1
+        """
+        empty_day = {
+            "day_start_dl": None,
+            "day_start_ul": None,
+            "day_max_dl": None,
+            "day_max_ul": None,
+        }
+
+        conn = self._get_connection()
+        cursor = self._get_cursor(conn)
+        try:
+            summary = {}
+            cursor.execute(today_query, (day_start, ))
+            for row in cursor.fetchall():
+                row = dict(row)
+                downloader_id = row.pop("downloader_id")
+                summary[downloader_id] = {
+                    "total_dl": None,
+                    "total_ul": None,
+                    **row
+                }
+
+            cursor.execute(today_latest_query, (day_start, ))
+            for row in cursor.fetchall():
+                row = dict(row)
+                summary[row["downloader_id"]].update(total_dl=row["total_dl"],
+                                                     total_ul=row["total_ul"])
+
+            for downloader_id in downloader_ids:
+                if downloader_id in summary:
+                    continue
+                cursor.execute(latest_before_query, (downloader_id, day_start))
+                row = cursor.fetchone()
+                if row:
+                    summary[downloader_id] = {**empty_day, **dict(row)}
+
+            return {
+                downloader_id: {
+                    key: (int(value) if value is not None else None)
+                    for key, value in values.items()
+                }
+                for downloader_id, values in summary.items()
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
     def aggregate_hourly_traffic(self, retention_hours=48):
         """
         聚合小时流量数据并清理原始数据。
@@ -936,41 +1396,74 @@ class DatabaseManager:
 
 
 
-def reconcile_historical_data(db_manager, config):
-    """在启动时同步下载器状态到数据库。"""
+def _fetch_downloader_totals(client_config, timeout):
+    """登录下载器并读取累计下载/上传量，返回 (total_dl, total_ul)。"""
+    api_config = _prepare_api_config(client_config)
+    if client_config["type"] == "qbittorrent":
+        client = Client(**api_config,
+                        REQUESTS_ARGS={"timeout": (timeout, timeout)})
+        client.auth_log_in()
+        server_state = client.sync_maindata().get('server_state', {})
+        return (int(server_state.get('alltime_dl', 0)),
+                int(server_state.get('alltime_ul', 0)))
+    if client_config["type"] == "transmission":
+        client = TrClient(**api_config, timeout=timeout)
+        stats = client.session_stats()
+        return (int(stats.cumulative_stats.downloaded_bytes),
+                int(stats.cumulative_stats.uploaded_bytes))
+    return 0, 0
+
+
+def reconcile_historical_data(db_manager, config,
+                              timeout=RECONCILE_CLIENT_TIMEOUT_SECONDS):
+    """
+    在启动时同步下载器状态到数据库。
+
+    各下载器并发连接，每个下载器的连接和读取都有超时；超过 timeout 仍未完成的下载器
+    本次跳过（由 DataTracker 在后续周期中记录）。
+
+    Returns:
+        dict: {"synced": 成功同步的下载器数, "failed": 失败或超时的下载器名称列表}
+    """
     logging.info("正在同步下载器状态...")
-    conn = db_manager._get_connection()
-    cursor = db_manager._get_cursor(conn)
-    ph = db_manager.get_placeholder()
-
+    enabled_clients = [
+        c for c in config.get("downloaders", []) if c.get("enabled")
+    ]
     records = []
+    failed = []
     current_timestamp_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-    for client_config in config.get("downloaders", []):
-        if not client_config.get("enabled"):
-            continue
-        client_id = client_config["id"]
-        try:
-            total_dl, total_ul = 0, 0
-            if client_config["type"] == "qbittorrent":
-                api_config = _prepare_api_config(client_config)
-                client = Client(**api_config)
-                client.auth_log_in()
-                server_state = client.sync_maindata().get('server_state', {})
-                total_dl = int(server_state.get('alltime_dl', 0))
-                total_ul = int(server_state.get('alltime_ul', 0))
-            elif client_config["type"] == "transmission":
-                api_config = _prepare_api_config(client_config)
-                client = TrClient(**api_config)
-                stats = client.session_stats()
-                total_dl = int(stats.cumulative_stats.downloaded_bytes)
-                total_ul = int(stats.cumulative_stats.uploaded_bytes)
-
-            records.append((current_timestamp_str, client_id, 0, 0, 0, 0,
-                            total_ul, total_dl))
+    if enabled_clients:
+        # 不使用 with 语句：超时的下载器线程不再等待，由其自行结束
+        executor = ThreadPoolExecutor(max_workers=min(8, len(enabled_clients)),
+                                      thread_name_prefix="reconcile")
+        futures = {
+            executor.submit(_fetch_downloader_totals, client_config, timeout):
+            client_config
+            for client_config in enabled_clients
+        }
+        # 连接 + 登录 + 读取各自有超时，这里为整体再加一个上限
+        done, not_done = wait(futures, timeout=timeout * 3)
+        executor.shutdown(wait=False)
+
+        for future, client_config in futures.items():
+            if future in not_done:
+                logging.error(f"[{client_config['name']}] 状态同步超时，已跳过。")
+                failed.append(client_config["name"])
+                continue
+            try:
+                total_dl, total_ul = future.result()
+            except Exception as e:
+                logging.error(f"[{client_config['name']}] 状态同步失败: {e}")
+                failed.append(client_config["name"])
+                continue
+            records.append((current_timestamp_str, client_config["id"], 0, 0,
+                            0, 0, total_ul, total_dl))
             logging.info(f"客户端 '{client_config['name']}' 的状态已同步。")
-        except Exception as e:
-            logging.error(f"[{client_config['name']}] 状态同步失败: {e}")
+
+    conn = db_manager._get_connection()
+    cursor = db_manager._get_cursor(conn)
+    ph = db_manager.get_placeholder()
 
     if records:
         try:
@@ -990,3 +1483,4 @@ def reconcile_historical_data(db_manager, config):
     conn.commit()
     cursor.close()
     conn.close()
+    return {"synced": len(records), "failed": failed}
@@ -0,0 +1,57 @@
+# gunicorn.conf.py
+"""
+生产环境 gunicorn 配置
+
+- preload_app: create_app() 中的一次性启动步骤（建表、数据迁移等）只在主进程执行一次
+- 后台线程（DataTracker、IYUU）在 fork 之后启动，并且只在通过文件锁选出的一个 worker 中运行；
+  下载器统计基线同步和初始流量聚合也在该 worker 的后台启动线程中执行，不阻塞请求处理
+- worker 退出时停止后台线程，DataTracker 会把缓冲区中的流量数据写入数据库
+
+应用的迁移缓存、日志流、实时速度推送和配置都保存在进程内存中，
+因此默认只使用 1 个 worker，通过多线程处理并发请求。
+"""
+
+import os
+
+from app import get_server_port
+
+bind = f"0.0.0.0:{get_server_port()}"
+
+worker_class = "gthread"
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+preload_app = True
+
+# 转种、截图上传等请求耗时较长，SSE 长连接依赖心跳保持活跃
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def post_worker_init(worker):
+    """worker 初始化完成后，尝试成为后台服务进程并启动后台线程。"""
+    from core.runtime import claim_background_role
+    from app import start_background_services
+
+    if not claim_background_role():
+        worker.log.info(f"worker {worker.pid} 未获得后台服务角色，仅处理请求。")
+        return
+
+    flask_app = worker.wsgi
+    start_background_services(flask_app.config["DB_MANAGER"])
+
+
+def worker_exit(server, worker):
+    """worker 退出时停止后台线程并释放后台服务角色。"""
+    from core.runtime import is_background_process, release_background_role
+    from app import stop_background_services
+
+    if not is_background_process():
+        return
+    stop_background_services()
+    release_background_role()
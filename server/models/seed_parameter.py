@@ -5,10 +5,33 @@
 
 import json
 import logging
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from flask import g
 
+from utils.lookup_payloads import invalidate_lookup_payloads
+from utils.pagination import invalidate_counts
+from utils.seed_text_codec import (decode_row, encode_for_storage,
+                                   get_seed_storage_settings)
+
+# UPSERT 写入的列（顺序与 SeedParameter._build_row_params 返回的参数一致）
+UPSERT_COLUMNS = ("hash", "torrent_id", "site_name", "nickname", "save_path",
+                  "name", "title", "subtitle", "imdb_link", "douban_link",
+                  "type", "medium", "video_codec", "audio_codec", "resolution",
+                  "team", "source", "tags", "poster", "screenshots",
+                  "statement", "body", "mediainfo", "title_components",
+                  "removed_ardtudeclarations", "downloader_id", "is_reviewed",
+                  "created_at", "updated_at")
+
+# 每条多行 UPSERT 语句写入的行数（29 列 x 30 行，低于旧版 SQLite 999 个参数的上限）
+UPSERT_ROWS_PER_STATEMENT = 30
+
+# 当前线程启用的批量写入缓冲区（见 batched_writes）
+_write_buffers = threading.local()
+
 
 class SeedParameter:
     """种子参数模型类"""
@@ -38,6 +61,13 @@ class SeedParameter:
             parameters["torrent_id"] = torrent_id
             parameters["site_name"] = site_name
 
+            # 批量写入模式：先放入缓冲区，按数量或时间合并提交
+            buffer = _active_write_buffer(self.db_manager)
+            if buffer:
+                buffer.add(hash, torrent_id, site_name, parameters)
+                logging.info(f"种子参数已加入批量写入队列: {torrent_id} from {site_name}")
+                return True
+
             # 保存到数据库
             if self.db_manager:
                 db_success = self._save_to_database(hash, torrent_id,
@@ -70,36 +100,68 @@ class SeedParameter:
         Returns:
             bool: 保存是否成功
         """
+        return self._save_rows_to_database([(hash, torrent_id, site_name,
+                                             parameters)])
+
+    def _save_rows_to_database(self, rows: List[tuple]) -> bool:
+        """
+        在一个事务中保存多条种子参数，每条语句写入多行（多行 UPSERT）。
+
+        Args:
+            rows: [(hash, torrent_id, site_name, parameters)]
+
+        Returns:
+            bool: 保存是否成功
+        """
+        if not rows:
+            return True
+        conn = None
+        cursor = None
         try:
             conn = self.db_manager._get_connection()
             cursor = self.db_manager._get_cursor(conn)
-            ph = self.db_manager.get_placeholder()
 
-            # 处理tags字段（列表转换为字符串）
-            tags = parameters.get("tags", [])
-            if isinstance(tags, list):
-                tags = json.dumps(tags, ensure_ascii=False)
-            else:
-                tags = str(tags) if tags else ""
+            # 大文本列按配置压缩存储（读取时由 _get_from_database 透明解压）
+            storage_settings = get_seed_storage_settings()
+            row_params = [
+                self._build_row_params(hash, torrent_id, site_name, parameters,
+                                       storage_settings)
+                for hash, torrent_id, site_name, parameters in rows
+            ]
+
+            for start in range(0, len(row_params), UPSERT_ROWS_PER_STATEMENT):
+                chunk = row_params[start:start + UPSERT_ROWS_PER_STATEMENT]
+                cursor.execute(self._build_upsert_sql(len(chunk)),
+                               [value for params in chunk for value in params])
+            conn.commit()
+            invalidate_lookup_payloads("unique_paths")
+            invalidate_counts("seed_parameters")
 
-            # 处理title_components字段（列表转换为字符串）
-            title_components = parameters.get("title_components", [])
-            if isinstance(title_components, list):
-                title_components = json.dumps(title_components,
-                                              ensure_ascii=False)
-            else:
-                title_components = str(
-                    title_components) if title_components else ""
+            return True
 
-            # 根据数据库类型构建UPSERT SQL
-            if self.db_manager.db_type == "postgresql":
-                # PostgreSQL使用ON CONFLICT DO UPDATE
-                insert_sql = f"""
+        except Exception as e:
+            logging.error(f"保存种子参数到数据库失败: {e}", exc_info=True)
+            if conn:
+                conn.rollback()
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            if conn:
+                conn.close()
+
+    def _build_upsert_sql(self, row_count: int) -> str:
+        """根据数据库类型构建写入 row_count 行的 UPSERT SQL。"""
+        ph = self.db_manager.get_placeholder()
+        row_placeholders = "(" + ", ".join([ph] * len(UPSERT_COLUMNS)) + ")"
+        values = ", ".join([row_placeholders] * row_count)
+
+        if self.db_manager.db_type == "postgresql":
+            # PostgreSQL使用ON CONFLICT DO UPDATE
+            return f"""
                     INSERT INTO seed_parameters
-                    (hash, torrent_id, site_name, nickname, save_path, name, title, subtitle, imdb_link, douban_link, type, medium,
-                     video_codec, audio_codec, resolution, team, source, tags, poster, screenshots,
-                     statement, body, mediainfo, title_components, removed_ardtudeclarations, downloader_id, is_reviewed, created_at, updated_at)
-                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+                    ({", ".join(UPSERT_COLUMNS)})
+                    VALUES {values}
                     ON CONFLICT (hash, torrent_id, site_name)
                     DO UPDATE SET
                         nickname = EXCLUDED.nickname,
@@ -128,14 +190,12 @@ class SeedParameter:
                         is_reviewed = EXCLUDED.is_reviewed,
                         updated_at = EXCLUDED.updated_at
                 """
-            elif self.db_manager.db_type == "mysql":
-                # MySQL使用ON DUPLICATE KEY UPDATE
-                insert_sql = f"""
+        elif self.db_manager.db_type == "mysql":
+            # MySQL使用ON DUPLICATE KEY UPDATE
+            return f"""
                     INSERT INTO seed_parameters
-                    (hash, torrent_id, site_name, nickname, save_path, name, title, subtitle, imdb_link, douban_link, type, medium,
-                     video_codec, audio_codec, resolution, team, source, tags, poster, screenshots,
-                     statement, body, mediainfo, title_components, removed_ardtudeclarations, downloader_id, is_reviewed, created_at, updated_at)
-                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+                    ({", ".join(UPSERT_COLUMNS)})
+                    VALUES {values}
                     ON DUPLICATE KEY UPDATE
                         torrent_id = VALUES(torrent_id),
                         nickname = VALUES(nickname),
@@ -164,14 +224,12 @@ class SeedParameter:
                         is_reviewed = VALUES(is_reviewed),
                         updated_at = VALUES(updated_at)
                 """
-            else:  # SQLite
-                # SQLite使用ON CONFLICT DO UPDATE
-                insert_sql = f"""
+        else:  # SQLite
+            # SQLite使用ON CONFLICT DO UPDATE
+            return f"""
                     INSERT INTO seed_parameters
-                    (hash, torrent_id, site_name, nickname, save_path, name, title, subtitle, imdb_link, douban_link, type, medium,
-                     video_codec, audio_codec, resolution, team, source, tags, poster, screenshots,
-                     statement, body, mediainfo, title_components, removed_ardtudeclarations, downloader_id, is_reviewed, created_at, updated_at)
-                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+                    ({", ".join(UPSERT_COLUMNS)})
+                    VALUES {values}
                     ON CONFLICT (hash, torrent_id, site_name)
                     DO UPDATE SET
                         torrent_id = excluded.torrent_id,
@@ -202,57 +260,65 @@ class SeedParameter:
                         updated_at = excluded.updated_at
                 """
 
-            # 准备参数
-            # 处理mediainfo字段（可能为字典，需要转换为字符串）
-            mediainfo = parameters.get("mediainfo", "")
-            if isinstance(mediainfo, dict):
-                mediainfo = json.dumps(mediainfo, ensure_ascii=False)
-            elif not isinstance(mediainfo, str):
-                mediainfo = str(mediainfo) if mediainfo else ""
-
-            # 处理removed_ardtudeclarations字段（列表转换为字符串）
-            removed_ardtudeclarations = parameters.get("removed_ardtudeclarations", [])
-            if isinstance(removed_ardtudeclarations, list):
-                removed_ardtudeclarations = json.dumps(removed_ardtudeclarations, ensure_ascii=False)
-            else:
-                removed_ardtudeclarations = str(removed_ardtudeclarations) if removed_ardtudeclarations else ""
-
-            params = (hash, torrent_id, site_name,
-                      parameters.get("nickname",
-                                     ""), parameters.get("save_path", ""),
-                      parameters.get("name", ""),
-                      parameters.get("title",
-                                     ""), parameters.get("subtitle", ""),
-                      parameters.get("imdb_link",
-                                     ""), parameters.get("douban_link", ""),
-                      parameters.get("type", ""), parameters.get("medium", ""),
-                      parameters.get("video_codec",
-                                     ""), parameters.get("audio_codec", ""),
-                      parameters.get("resolution",
-                                     ""), parameters.get("team", ""),
-                      parameters.get("source",
-                                     ""), tags, parameters.get("poster", ""),
-                      parameters.get("screenshots",
-                                     ""), parameters.get("statement", ""),
-                      parameters.get("body", ""), mediainfo, title_components,
-                      removed_ardtudeclarations, parameters.get("downloader_id"), 
-                      parameters.get("is_reviewed", False), parameters["created_at"], parameters["updated_at"])
-
-            cursor.execute(insert_sql, params)
-            conn.commit()
-
-            return True
-
-        except Exception as e:
-            logging.error(f"保存种子参数到数据库失败: {e}", exc_info=True)
-            if conn:
-                conn.rollback()
-            return False
-        finally:
-            if cursor:
-                cursor.close()
-            if conn:
-                conn.close()
+    @staticmethod
+    def _build_row_params(hash: str, torrent_id: str, site_name: str,
+                          parameters: Dict[str, Any],
+                          storage_settings: Dict[str, Any]) -> tuple:
+        """将参数字典转换为 UPSERT 的一行参数（顺序与 UPSERT_COLUMNS 一致）。"""
+        # 处理tags字段（列表转换为字符串）
+        tags = parameters.get("tags", [])
+        if isinstance(tags, list):
+            tags = json.dumps(tags, ensure_ascii=False)
+        else:
+            tags = str(tags) if tags else ""
+
+        # 处理title_components字段（列表转换为字符串）
+        title_components = parameters.get("title_components", [])
+        if isinstance(title_components, list):
+            title_components = json.dumps(title_components,
+                                          ensure_ascii=False)
+        else:
+            title_components = str(
+                title_components) if title_components else ""
+
+        # 处理mediainfo字段（可能为字典，需要转换为字符串）
+        mediainfo = parameters.get("mediainfo", "")
+        if isinstance(mediainfo, dict):
+            mediainfo = json.dumps(mediainfo, ensure_ascii=False)
+        elif not isinstance(mediainfo, str):
+            mediainfo = str(mediainfo) if mediainfo else ""
+
+        # 处理removed_ardtudeclarations字段（列表转换为字符串）
+        removed_ardtudeclarations = parameters.get("removed_ardtudeclarations", [])
+        if isinstance(removed_ardtudeclarations, list):
+            removed_ardtudeclarations = json.dumps(removed_ardtudeclarations, ensure_ascii=False)
+        else:
+            removed_ardtudeclarations = str(removed_ardtudeclarations) if removed_ardtudeclarations else ""
+
+        screenshots, statement, body, mediainfo = (
+            encode_for_storage(value, storage_settings) for value in (
+                parameters.get("screenshots", ""),
+                parameters.get("statement", ""),
+                parameters.get("body", ""), mediainfo))
+
+        return (hash, torrent_id, site_name,
+                parameters.get("nickname",
+                               ""), parameters.get("save_path", ""),
+                parameters.get("name", ""),
+                parameters.get("title",
+                               ""), parameters.get("subtitle", ""),
+                parameters.get("imdb_link",
+                               ""), parameters.get("douban_link", ""),
+                parameters.get("type", ""), parameters.get("medium", ""),
+                parameters.get("video_codec",
+                               ""), parameters.get("audio_codec", ""),
+                parameters.get("resolution",
+                               ""), parameters.get("team", ""),
+                parameters.get("source",
+                               ""), tags, parameters.get("poster", ""),
+                screenshots, statement, body, mediainfo, title_components,
+                removed_ardtudeclarations, parameters.get("downloader_id"),
+                parameters.get("is_reviewed", False), parameters["created_at"], parameters["updated_at"])
 
     def get_parameters(self, torrent_id: str,
                        site_name: str) -> Optional[Dict[str, Any]]:
@@ -267,6 +333,12 @@ class SeedParameter:
             Dict[str, Any]: 参数字典，如果未找到则返回None
         """
         try:
+            # 批量写入模式下，尚未提交的参数优先从缓冲区读取
+            buffer = _active_write_buffer(self.db_manager)
+            pending = buffer.get(torrent_id, site_name) if buffer else None
+            if pending:
+                return pending
+
             # 从数据库读取
             if self.db_manager:
                 db_params = self._get_from_database(torrent_id, site_name)
@@ -311,7 +383,7 @@ class SeedParameter:
             row = cursor.fetchone()
 
             if row:
-                parameters = dict(row)
+                parameters = decode_row(dict(row))
 
                 # 解析tags字段（如果存在）
                 if "tags" in parameters and isinstance(parameters["tags"],
@@ -410,6 +482,8 @@ class SeedParameter:
 
                 deleted_count = cursor.rowcount
                 conn.commit()
+                invalidate_lookup_payloads("unique_paths")
+                invalidate_counts("seed_parameters")
                 cursor.close()
                 conn.close()
 
@@ -475,3 +549,127 @@ class SeedParameter:
                 cursor.close()
             if conn:
                 conn.close()
+
+
+class SeedParameterWriteBuffer:
+    """
+    种子参数写入缓冲区（线程安全）。
+
+    缓冲的参数按 (hash, torrent_id, site_name) 去重（后写覆盖先写），
+    达到 max_rows 条或最早的一条已等待 max_delay 秒时，在一个事务内以多行 UPSERT 提交。
+    参数在提交成功后才从缓冲区移除，提交期间 get 仍能读到；写入失败的键记录在 failed_keys 中。
+    """
+
+    def __init__(self, db_manager, max_rows: int = 50, max_delay: float = 5.0):
+        self.db_manager = db_manager
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self._model = SeedParameter(db_manager)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}
+        self._failed = set()
+        self._timer = None
+
+    def add(self, hash: str, torrent_id: str, site_name: str,
+            parameters: Dict[str, Any]):
+        with self._lock:
+            self._pending[(hash, torrent_id, site_name)] = dict(parameters)
+            full = len(self._pending) >= self.max_rows
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def get(self, torrent_id: str, site_name: str) -> Optional[Dict[str, Any]]:
+        """返回尚未提交的参数副本（同一种子有多条时取最后更新的一条）。"""
+        with self._lock:
+            matches = [
+                dict(params, hash=key[0])
+                for key, params in self._pending.items()
+                if key[1] == torrent_id and key[2] == site_name
+            ]
+        if not matches:
+            return None
+        return max(matches, key=lambda params: params.get("updated_at", ""))
+
+    @property
+    def failed_keys(self) -> set:
+        """写入失败（逐条重试后仍失败）的 (hash, torrent_id, site_name) 集合。"""
+        with self._lock:
+            return set(self._failed)
+
+    def flush(self) -> set:
+        """
+        提交缓冲区中的全部参数。多行写入失败时逐条重试，避免一条坏数据拖累整批。
+
+        Returns:
+            set: 本次写入失败的 (hash, torrent_id, site_name)，全部成功时为空集合
+        """
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                rows = [key + (params, ) for key, params in self._pending.items()]
+            if not rows:
+                return set()
+
+            start = time.time()
+            if self._model._save_rows_to_database(rows):
+                logging.info(
+                    f"批量写入 {len(rows)} 条种子参数，耗时 {time.time() - start:.2f}s")
+                failed = set()
+            else:
+                logging.warning(f"批量写入 {len(rows)} 条种子参数失败，改为逐条写入")
+                failed = {
+                    tuple(row[:3])
+                    for row in rows if not self._model._save_to_database(*row)
+                }
+                for hash, torrent_id, site_name in failed:
+                    logging.error(f"保存种子参数到数据库失败: {torrent_id} from {site_name} ({hash})")
+
+            with self._lock:
+                for row in rows:
+                    key = tuple(row[:3])
+                    # 提交期间被再次写入的参数保留在缓冲区，等待下次提交
+                    if self._pending.get(key) is row[3]:
+                        del self._pending[key]
+                    if key in failed:
+                        self._failed.add(key)
+                    else:
+                        self._failed.discard(key)
+            return failed
+
+
+def _active_write_buffer(db_manager) -> Optional[SeedParameterWriteBuffer]:
+    buffer = getattr(_write_buffers, "buffer", None)
+    if buffer is not None and buffer.db_manager is db_manager:
+        return buffer
+    return None
+
+
+@contextmanager
+def batched_writes(db_manager, max_rows: int = 50, max_delay: float = 5.0):
+    """
+    在当前线程内启用种子参数的批量写入（write-behind）：
+
+        with batched_writes(db_manager):
+            ...  # 期间的 SeedParameter.save_parameters 只放入缓冲区
+
+    退出时提交剩余的参数。get_parameters 会先查缓冲区，保证读到刚写入的数据。
+    退出后可通过缓冲区的 failed_keys 获取写入失败的参数（包括期间定时或按数量触发的提交）。
+    """
+    previous = getattr(_write_buffers, "buffer", None)
+    buffer = SeedParameterWriteBuffer(db_manager, max_rows, max_delay)
+    _write_buffers.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _write_buffers.buffer = previous
+        buffer.flush()
+        failed_count = len(buffer.failed_keys)
+        if failed_count:
+            logging.warning(f"批量写入结束，共 {failed_count} 条种子参数未能保存到数据库")
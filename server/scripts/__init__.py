@@ -0,0 +1,6 @@
+# scripts/__init__.py
+"""
+开发用的检查与基准测试脚本（不属于应用代码，不会被应用导入，也不打包进镜像）
+
+在 server 目录下以模块方式运行，例如: python -m scripts.proxy_stub
+"""
@@ -0,0 +1,121 @@
+# scripts/extractor_benchmark.py
+"""
+详情页解析基准测试
+
+对已保存的种子详情页（开发环境下由 TorrentMigrator 保存到 TEMP_DIR/detail_pages）
+分别使用各个可用的解析后端进行解析，并统计：
+- 整页解析耗时
+- 简介区域 (div#kdescr) 转换为 BBCode 的耗时
+- 不同解析后端生成的 BBCode 是否一致
+
+用法（在 server 目录下执行）:
+    python -m scripts.extractor_benchmark [页面目录] [--repeat N] [--parsers lxml,html.parser]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+from config import TEMP_DIR
+from utils.html_parser import PARSER_PREFERENCE, is_parser_available, parse_html, html_to_bbcode
+
+DEFAULT_PAGES_DIR = os.path.join(TEMP_DIR, "detail_pages")
+
+
+def _time_call(func, repeat):
+    """执行 func repeat 次，返回 (最后一次的结果, 耗时中位数毫秒)。"""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, statistics.median(timings)
+
+
+def benchmark_page(html, parsers, repeat):
+    """
+    对单个页面执行基准测试。
+
+    :return: {parser: {"parse_ms": float, "bbcode_ms": float, "bbcode": str}}
+    """
+    results = {}
+    for parser in parsers:
+        soup, parse_ms = _time_call(lambda: parse_html(html, parser), repeat)
+        descr = soup.select_one("div#kdescr")
+        bbcode, bbcode_ms = _time_call(
+            lambda: html_to_bbcode(descr) if descr else "", repeat)
+        results[parser] = {
+            "parse_ms": parse_ms,
+            "bbcode_ms": bbcode_ms,
+            "bbcode": bbcode,
+        }
+    return results
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="种子详情页解析基准测试")
+    arg_parser.add_argument("pages_dir",
+                            nargs="?",
+                            default=DEFAULT_PAGES_DIR,
+                            help=f"已保存的详情页目录 (默认: {DEFAULT_PAGES_DIR})")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="每个页面重复次数")
+    arg_parser.add_argument("--parsers",
+                            default=",".join(PARSER_PREFERENCE),
+                            help="要对比的解析后端，逗号分隔")
+    args = arg_parser.parse_args(argv)
+
+    parsers = [p.strip() for p in args.parsers.split(",") if p.strip()]
+    unavailable = [p for p in parsers if not is_parser_available(p)]
+    if unavailable:
+        print(f"跳过不可用的解析后端: {', '.join(unavailable)}")
+        parsers = [p for p in parsers if p not in unavailable]
+    if not parsers:
+        print("没有可用的解析后端。")
+        return 1
+
+    pages = sorted(glob.glob(os.path.join(args.pages_dir, "*.html")))
+    if not pages:
+        print(f"目录中没有找到详情页: {args.pages_dir}")
+        return 1
+
+    totals = {p: {"parse_ms": 0.0, "bbcode_ms": 0.0} for p in parsers}
+    mismatches = []
+
+    header = f"{'页面':<40}" + "".join(
+        f"{p + ' 解析':>18}{p + ' BBCode':>20}" for p in parsers)
+    print(header)
+    for page_path in pages:
+        with open(page_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        results = benchmark_page(html, parsers, max(1, args.repeat))
+
+        row = f"{os.path.basename(page_path)[:40]:<40}"
+        for p in parsers:
+            totals[p]["parse_ms"] += results[p]["parse_ms"]
+            totals[p]["bbcode_ms"] += results[p]["bbcode_ms"]
+            row += f"{results[p]['parse_ms']:>16.2f}ms{results[p]['bbcode_ms']:>18.2f}ms"
+        print(row)
+
+        outputs = {results[p]["bbcode"] for p in parsers}
+        if len(outputs) > 1:
+            mismatches.append(os.path.basename(page_path))
+
+    print("-" * len(header))
+    summary = f"{'合计 (' + str(len(pages)) + ' 个页面)':<40}"
+    for p in parsers:
+        summary += f"{totals[p]['parse_ms']:>16.2f}ms{totals[p]['bbcode_ms']:>18.2f}ms"
+    print(summary)
+
+    if mismatches:
+        print(f"\n以下 {len(mismatches)} 个页面在不同解析后端下生成的 BBCode 不一致:")
+        for name in mismatches:
+            print(f"  - {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
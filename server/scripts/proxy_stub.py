@@ -0,0 +1,227 @@
+# scripts/proxy_stub.py
+"""
+pt-nexus-box-proxy 的本地替身，用于在没有远程代理时检查 utils.proxy_client
+
+- StubProxy 在 127.0.0.1 的随机端口上实现 /api/torrents/all，响应按很小的块分块传输
+- legacy=True 时模拟旧版代理：忽略 detail_hashes，请求详情时返回全部种子的详情
+- 直接运行时依次检查：
+  1. iter_json_array 在任意块边界（包括数字和 UTF-8 多字节字符被截断）下的解析结果
+  2. 新版代理：后续周期只为新增种子请求详情（detail_hashes）
+  3. 旧版代理：返回全部详情时只更新新增或过期的种子，其余使用缓存
+
+用法（在 server 目录下执行）:
+    python -m scripts.proxy_stub
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.proxy_client import ProxyClient, iter_json_array
+
+# 分块传输时每块的字节数，足够小以便数字、字符串跨越块边界
+STUB_CHUNK_BYTES = 7
+
+# 覆盖各类 JSON 元素的数组，用于块边界检查
+BOUNDARY_SAMPLE = [
+    4.5, -12, 1e3, 0.25, True, False, None, "逗号,和]括号", {
+        "size": 123456789,
+        "progress": 0.875,
+        "trackers": [{
+            "url": "https://tracker.example/announce"
+        }]
+    }, [1, 2.75], 1234567
+]
+
+
+class _FakeResponse:
+    """按预先切好的字节块返回内容的响应替身。"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def iter_content(self, chunk_size=None):
+        return iter(self.chunks)
+
+
+class StubProxy:
+    """本地代理替身，记录收到的每个 /api/torrents/all 请求体。"""
+
+    def __init__(self, torrents, legacy: bool = False):
+        self.torrents = torrents  # [{hash, name, size, progress, ..., comment, trackers}]
+        self.legacy = legacy
+        self.requests = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def downloader_config(self) -> dict:
+        return {
+            "id": "stub",
+            "name": "stub",
+            "type": "qbittorrent",
+            "host": "http://127.0.0.1:8080",
+            "proxy_port": self.port
+        }
+
+    def build_response(self, request_data) -> list:
+        include_details = request_data.get("include_comment", False)
+        detail_hashes = request_data.get("detail_hashes")
+        torrents = self.torrents
+        # 新版代理：detail_hashes 不为空时只返回这些种子（带详情）
+        if detail_hashes and not self.legacy:
+            wanted = set(detail_hashes)
+            torrents = [t for t in torrents if t["hash"] in wanted]
+        result = []
+        for torrent in torrents:
+            item = dict(torrent)
+            if not include_details:
+                item.pop("comment", None)
+                item["trackers"] = None
+            result.append(item)
+        return result
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path != "/api/torrents/all":
+                    self.send_error(404)
+                    return
+                request_data = json.loads(body)
+                stub.requests.append(request_data)
+                payload = json.dumps(stub.build_response(request_data),
+                                     ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(payload), STUB_CHUNK_BYTES):
+                    chunk = payload[start:start + STUB_CHUNK_BYTES]
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def _sample_torrents(count: int) -> list:
+    return [{
+        "hash": f"{i:040x}",
+        "name": f"示例种子 {i}",
+        "size": 1073741824 * i + 1,
+        "progress": round(i / (count + 1), 4),
+        "state": "uploading",
+        "save_path": "/downloads",
+        "comment": f"https://site.example/details.php?id={i}",
+        "trackers": [{
+            "url": f"https://tracker{i}.example/announce"
+        }],
+        "uploaded": 1000 * i,
+        "downloader_id": "stub"
+    } for i in range(1, count + 1)]
+
+
+def check_iter_json_array() -> list:
+    """在每个字节位置切分一次，并按单字节切分，解析结果都应与原数组一致。"""
+    errors = []
+    body = json.dumps(BOUNDARY_SAMPLE, ensure_ascii=False).encode("utf-8")
+    splits = [[body[:i], body[i:]] for i in range(1, len(body))]
+    splits.append([body[i:i + 1] for i in range(len(body))])
+    for chunks in splits:
+        try:
+            items = list(iter_json_array(_FakeResponse(chunks)))
+        except ValueError as e:
+            errors.append(f"切分 {[len(c) for c in chunks][:3]}... 解析失败: {e}")
+            continue
+        if items != BOUNDARY_SAMPLE:
+            errors.append(f"切分 {[len(c) for c in chunks][:3]}... 结果不一致: {items!r}")
+    return errors
+
+
+def _check_incremental_details(legacy: bool) -> list:
+    errors = []
+    torrents = _sample_torrents(50)
+    with StubProxy(torrents[:49], legacy=legacy) as stub:
+        client = ProxyClient()
+        config = stub.downloader_config()
+        first = client.get_torrents(config)
+        if len(first) != 49 or stub.requests[0].get("detail_hashes"):
+            errors.append("首次获取应一次请求全部详情")
+
+        # 下一周期：新增一个种子，已缓存种子的 comment 在代理端发生变化（缓存未过期，应保留旧值）
+        stub.torrents = [dict(t, comment=t["comment"] + "&new=1")
+                         for t in torrents[:49]] + [torrents[49]]
+        stub.requests.clear()
+        second = {t["hash"]: t for t in client.get_torrents(config)}
+
+        detail_requests = [r for r in stub.requests if r.get("include_comment")]
+        if len(stub.requests) != 2 or len(detail_requests) != 1:
+            errors.append(f"第二次获取应发送 1 个列表请求和 1 个详情请求，实际 {stub.requests}")
+        elif detail_requests[0].get("detail_hashes") != [torrents[49]["hash"]]:
+            errors.append(
+                f"detail_hashes 应只包含新增种子，实际 {detail_requests[0].get('detail_hashes')}")
+
+        if len(second) != 50:
+            errors.append(f"第二次获取应返回 50 个种子，实际 {len(second)}")
+        for torrent in torrents:
+            result = second.get(torrent["hash"])
+            if not result:
+                continue
+            if (result.get("comment") != torrent["comment"]
+                    or result.get("trackers") != torrent["trackers"]):
+                errors.append(f"种子 {torrent['hash']} 的详情不正确: {result.get('comment')}")
+                break
+    return errors
+
+
+def check_detail_hashes() -> list:
+    """新版代理：后续周期只为新增种子请求并返回详情。"""
+    return _check_incremental_details(legacy=False)
+
+
+def check_legacy_proxy() -> list:
+    """旧版代理：忽略 detail_hashes 返回全部详情，客户端只采用新增种子的详情。"""
+    return _check_incremental_details(legacy=True)
+
+
+def main():
+    checks = [
+        ("iter_json_array 块边界", check_iter_json_array),
+        ("detail_hashes 增量详情", check_detail_hashes),
+        ("旧版代理返回全部详情", check_legacy_proxy),
+    ]
+    failed = 0
+    for title, check in checks:
+        errors = check()
+        if errors:
+            failed += 1
+            print(f"[失败] {title}")
+            for error in errors[:10]:
+                print(f"  - {error}")
+        else:
+            print(f"[通过] {title}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
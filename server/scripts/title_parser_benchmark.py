@@ -0,0 +1,142 @@
+# scripts/title_parser_benchmark.py
+"""
+主标题解析基准测试与结果一致性检查
+
+- 语料: 每行一个标题，可用制表符分隔附带种子文件名；默认使用金标准文件中的标题
+- 冷启动耗时: 绕过 LRU 缓存逐条解析
+- 缓存命中耗时: 同一批标题再次解析（模拟多个目标站点、重试场景）
+- 金标准检查: 与 title_parser_golden.json 中记录的解析结果逐条比对
+
+用法（在 server 目录下执行）:
+    python -m scripts.title_parser_benchmark [--corpus 标题文件] [--repeat N]
+    python -m scripts.title_parser_benchmark --write-golden   # 规则有意调整后重新生成金标准
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+from utils.title_parser import _parse_title_cached, parse_title
+
+DEFAULT_GOLDEN_FILE = os.path.join(os.path.dirname(__file__),
+                                   "title_parser_golden.json")
+
+
+def load_corpus(path):
+    """读取语料文件，返回 [(标题, 种子文件名)]。"""
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.strip():
+                title, _, torrent_filename = line.partition("\t")
+                corpus.append((title, torrent_filename))
+    return corpus
+
+
+def load_golden(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _parse_quietly(title, torrent_filename):
+    # 解析过程中的进度输出会严重干扰计时，这里丢弃
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_title(title, torrent_filename)
+
+
+def _time_pass(corpus, cached):
+    """解析整批语料一次，返回每条标题的耗时（毫秒）。"""
+    timings = []
+    for title, torrent_filename in corpus:
+        if not cached:
+            _parse_title_cached.cache_clear()
+        start = time.perf_counter()
+        _parse_quietly(title, torrent_filename)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def check_golden(golden):
+    """返回与金标准不一致的条目列表 [(标题, 期望, 实际)]。"""
+    _parse_title_cached.cache_clear()
+    mismatches = []
+    for entry in golden:
+        actual = _parse_quietly(entry["title"], entry.get("torrent_filename", ""))
+        if actual != entry["components"]:
+            mismatches.append((entry["title"], entry["components"], actual))
+    return mismatches
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="主标题解析基准测试")
+    arg_parser.add_argument("--corpus", help="语料文件（每行一个标题，可用制表符附带种子文件名）")
+    arg_parser.add_argument("--golden",
+                            default=DEFAULT_GOLDEN_FILE,
+                            help=f"金标准文件 (默认: {DEFAULT_GOLDEN_FILE})")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    arg_parser.add_argument("--write-golden",
+                            action="store_true",
+                            help="用当前解析结果重新生成金标准文件")
+    args = arg_parser.parse_args(argv)
+
+    golden = load_golden(args.golden) if os.path.exists(args.golden) else []
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = [(e["title"], e.get("torrent_filename", "")) for e in golden]
+    if not corpus:
+        print("没有可用的语料。")
+        return 1
+
+    if args.write_golden:
+        _parse_title_cached.cache_clear()
+        golden = [{
+            "title": title,
+            "torrent_filename": torrent_filename,
+            "components": _parse_quietly(title, torrent_filename)
+        } for title, torrent_filename in corpus]
+        with open(args.golden, "w", encoding="utf-8") as f:
+            json.dump(golden, f, ensure_ascii=False, indent=1)
+            f.write("\n")
+        print(f"已写入 {len(golden)} 条金标准结果: {args.golden}")
+        return 0
+
+    cold, warm = [], []
+    for _ in range(max(1, args.repeat)):
+        cold.append(sum(_time_pass(corpus, cached=False)))
+        _parse_title_cached.cache_clear()
+        _time_pass(corpus, cached=True)
+        warm.append(sum(_time_pass(corpus, cached=True)))
+
+    cold_ms, warm_ms = statistics.median(cold), statistics.median(warm)
+    print(f"语料: {len(corpus)} 条标题，重复 {max(1, args.repeat)} 次（取中位数）")
+    print(f"冷启动解析: 合计 {cold_ms:.2f}ms，平均 {cold_ms / len(corpus):.3f}ms/条")
+    print(f"缓存命中:   合计 {warm_ms:.2f}ms，平均 {warm_ms / len(corpus):.3f}ms/条")
+
+    if not golden:
+        print("未找到金标准文件，跳过一致性检查。")
+        return 0
+
+    mismatches = check_golden(golden)
+    if mismatches:
+        print(f"\n{len(mismatches)}/{len(golden)} 条解析结果与金标准不一致:")
+        for title, expected, actual in mismatches:
+            print(f"  - {title}")
+            expected_map = {c["key"]: c["value"] for c in expected}
+            for component in actual:
+                if expected_map.get(component["key"]) != component["value"]:
+                    print(f"      {component['key']}: "
+                          f"{expected_map.get(component['key'])!r} -> {component['value']!r}")
+        return 1
+    print(f"金标准检查通过: {len(golden)} 条解析结果全部一致。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,5 +12,6 @@ from .formatters import (
     cookies_raw2jar,
     ensure_scheme,
 )
+from .html_parser import get_html_parser, parse_html, html_to_bbcode
 from .media_helper import upload_data_mediaInfo, upload_data_title, upload_data_screenshot, upload_data_poster, upload_data_movie_info, add_torrent_to_downloader, extract_tags_from_mediainfo, extract_tags_from_title, extract_origin_from_description, extract_resolution_from_mediainfo, check_intro_completeness, extract_audio_codec_from_mediainfo
 from .image_validator import is_image_url_valid_robust
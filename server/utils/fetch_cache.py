@@ -0,0 +1,450 @@
+# utils/fetch_cache.py
+"""
+源站点详情页与种子文件的本地抓取缓存
+
+缓存目录位于 TEMP_DIR/fetch_cache：
+- pages/     以 (站点, 种子ID) 为键保存 gzip 压缩后的详情页 HTML，
+             TTL 内直接命中；过期后携带 ETag / Last-Modified 进行条件请求复用
+- torrents/  以 infohash 命名保存 .torrent 文件，同一种子只保存一份
+- index.db   SQLite 索引，记录元数据与最近访问时间，超出容量上限时按 LRU 淘汰。
+             gunicorn 多 worker 共用同一个索引：命中只更新一行访问时间，淘汰在写事务内
+             选出并删除条目，不会出现各 worker 用自己的副本互相覆盖的情况
+
+配置项 (config.json -> fetch_cache):
+- enabled:      是否启用缓存
+- ttl_minutes:  详情页无需重新验证即可直接使用的时间
+- max_size_mb:  缓存目录容量上限
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import urllib.parse
+import uuid
+
+from config import TEMP_DIR, config_manager
+from utils.sqlite_cache import SqliteCache
+
+CACHE_DIR = os.path.join(TEMP_DIR, "fetch_cache")
+PAGES_DIR = os.path.join(CACHE_DIR, "pages")
+TORRENTS_DIR = os.path.join(CACHE_DIR, "torrents")
+INDEX_DB_FILE = os.path.join(CACHE_DIR, "index.db")
+# 旧版 JSON 索引，首次打开 SQLite 索引时导入后删除
+LEGACY_INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
+
+DEFAULT_TTL_MINUTES = 60
+DEFAULT_MAX_SIZE_MB = 500
+
+
+def _tmp_path(path):
+    """多个线程或 worker 写同一文件时各自使用不同的临时文件。"""
+    return f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+
+
+def parse_torrent_filename(content_disposition, default_filename):
+    """
+    从 Content-Disposition 响应头中解析种子文件名。
+
+    优先匹配 filename*（UTF-8 编码），其次匹配普通的 filename。
+    """
+    if not content_disposition:
+        return default_filename
+
+    filename_match = re.search(r'filename\*="?UTF-8\'\'([^"]+)"?',
+                               content_disposition, re.IGNORECASE)
+    if filename_match:
+        return urllib.parse.unquote(filename_match.group(1), encoding='utf-8')
+
+    filename_match = re.search(r'filename="?([^"]+)"?', content_disposition)
+    if filename_match:
+        return urllib.parse.unquote(filename_match.group(1))
+
+    return default_filename
+
+
+def _bencode_end(data, pos):
+    """返回从 pos 开始的 bencode 元素的结束位置（不含）。"""
+    token = data[pos:pos + 1]
+    if token == b"i":
+        return data.index(b"e", pos) + 1
+    if token in (b"l", b"d"):
+        pos += 1
+        while data[pos:pos + 1] != b"e":
+            pos = _bencode_end(data, pos)
+        return pos + 1
+    if token.isdigit():
+        colon = data.index(b":", pos)
+        return colon + 1 + int(data[pos:colon])
+    raise ValueError(f"无效的 bencode 数据 (位置 {pos})")
+
+
+def compute_infohash(torrent_content):
+    """
+    计算种子文件的 infohash (v1)。
+
+    直接对原始 info 字典字节做 SHA1，避免重新编码带来的差异。
+    无法解析时返回 None。
+    """
+    try:
+        if not torrent_content.startswith(b"d"):
+            return None
+        pos = 1
+        while torrent_content[pos:pos + 1] != b"e":
+            key_end = _bencode_end(torrent_content, pos)
+            colon = torrent_content.index(b":", pos)
+            key = torrent_content[colon + 1:key_end]
+            value_end = _bencode_end(torrent_content, key_end)
+            if key == b"info":
+                return hashlib.sha1(
+                    torrent_content[key_end:value_end]).hexdigest()
+            pos = value_end
+    except (ValueError, IndexError):
+        pass
+    return None
+
+
+class FetchCache(SqliteCache):
+    """详情页与种子文件的抓取缓存（线程安全，多进程共用同一个 SQLite 索引）。"""
+
+    label = "抓取缓存索引"
+    table = "fetch_cache_pages"
+    schema = """
+        CREATE TABLE IF NOT EXISTS fetch_cache_pages (
+            key TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at REAL,
+            last_access REAL NOT NULL,
+            page_size INTEGER,
+            infohash TEXT,
+            torrent_filename TEXT
+        );
+        CREATE TABLE IF NOT EXISTS fetch_cache_torrents (
+            infohash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            last_access REAL NOT NULL
+        );
+    """
+    timestamp_column = "last_access"
+
+    def __init__(self, db_file: str = INDEX_DB_FILE):
+        os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        super().__init__(db_file)
+
+    def ttl_seconds(self):
+        # 条目按容量上限淘汰，不按时间清理
+        return None
+
+    def _init_db(self, conn):
+        super()._init_db(conn)
+        self._import_legacy_index(conn)
+
+    def _import_legacy_index(self, conn):
+        """导入旧版 index.json 中的条目（已存在的条目不覆盖），然后删除旧文件。"""
+        if not os.path.exists(LEGACY_INDEX_FILE):
+            return
+        try:
+            with open(LEGACY_INDEX_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logging.warning(f"旧版抓取缓存索引无法读取，将忽略: {e}")
+            data = {}
+        pages = data.get("pages", {}) if isinstance(data, dict) else {}
+        torrents = data.get("torrents", {}) if isinstance(data, dict) else {}
+        conn.executemany(
+            "INSERT OR IGNORE INTO fetch_cache_pages (key, etag, last_modified, fetched_at, "
+            "last_access, page_size, infohash, torrent_filename) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [(key, entry.get("etag"), entry.get("last_modified"),
+              entry.get("fetched_at"), entry.get("last_access", 0),
+              entry.get("page_size"), entry.get("infohash"),
+              entry.get("torrent_filename")) for key, entry in pages.items()])
+        conn.executemany(
+            "INSERT OR IGNORE INTO fetch_cache_torrents (infohash, size, last_access) VALUES (?, ?, ?)",
+            [(infohash, entry.get("size", 0), entry.get("last_access", 0))
+             for infohash, entry in torrents.items()])
+        conn.commit()
+        try:
+            os.remove(LEGACY_INDEX_FILE)
+        except FileNotFoundError:
+            pass
+        logging.info(f"已将旧版抓取缓存索引导入 SQLite（{len(pages)} 个页面，{len(torrents)} 个种子）。")
+
+    # ------------------------------------------------------------------
+    # 配置与索引
+    # ------------------------------------------------------------------
+    def _settings(self):
+        settings = config_manager.get().get("fetch_cache", {})
+        return {
+            "enabled": settings.get("enabled", True),
+            "ttl_seconds": settings.get("ttl_minutes", DEFAULT_TTL_MINUTES) * 60,
+            "max_size_bytes": settings.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024,
+        }
+
+    @staticmethod
+    def _key(site, torrent_id):
+        return f"{site}:{torrent_id}"
+
+    @staticmethod
+    def _page_path(key):
+        return os.path.join(PAGES_DIR,
+                            hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html.gz")
+
+    @staticmethod
+    def _torrent_path(infohash):
+        return os.path.join(TORRENTS_DIR, f"{infohash}.torrent")
+
+    def _evict_if_needed(self, max_size_bytes):
+        """
+        超过容量上限时按最近访问时间淘汰。
+
+        在 BEGIN IMMEDIATE 写事务内统计容量并删除条目，多个 worker 同时淘汰时依次执行；
+        条目提交删除后才删除对应文件，其他 worker 读取到已删除的文件时按未命中处理。
+        """
+        removed_paths = []
+        try:
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                total_size = conn.execute(
+                    "SELECT (SELECT COALESCE(SUM(page_size), 0) FROM fetch_cache_pages) + "
+                    "(SELECT COALESCE(SUM(size), 0) FROM fetch_cache_torrents)").fetchone()[0]
+                if total_size <= max_size_bytes:
+                    conn.rollback()
+                    return
+                entries = conn.execute(
+                    "SELECT last_access, 'pages', key, page_size FROM fetch_cache_pages "
+                    "WHERE page_size > 0 "
+                    "UNION ALL SELECT last_access, 'torrents', infohash, size FROM fetch_cache_torrents "
+                    "ORDER BY 1").fetchall()
+                for _, kind, key, size in entries:
+                    if total_size <= max_size_bytes:
+                        break
+                    if kind == "pages":
+                        # 只删除页面内容，保留种子映射，使种子文件仍可按 LRU 独立淘汰
+                        conn.execute(
+                            "UPDATE fetch_cache_pages SET page_size = NULL WHERE key = ?",
+                            (key, ))
+                        removed_paths.append(self._page_path(key))
+                    else:
+                        conn.execute("DELETE FROM fetch_cache_torrents WHERE infohash = ?",
+                                     (key, ))
+                        removed_paths.append(self._torrent_path(key))
+                    total_size -= size
+
+                # 清理页面与种子文件均已被淘汰的索引条目
+                conn.execute(
+                    "DELETE FROM fetch_cache_pages WHERE page_size IS NULL AND "
+                    "(infohash IS NULL OR infohash NOT IN (SELECT infohash FROM fetch_cache_torrents))")
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"抓取缓存淘汰失败: {e}")
+            return
+
+        for path in removed_paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        logging.info(f"抓取缓存超出容量上限，已淘汰 {len(removed_paths)} 个条目。")
+
+    # ------------------------------------------------------------------
+    # 详情页
+    # ------------------------------------------------------------------
+    def get_page(self, site, torrent_id, fetch, is_valid=None):
+        """
+        获取详情页 HTML，优先使用缓存。
+
+        :param site: 站点标识（英文站点名）
+        :param torrent_id: 种子ID
+        :param fetch: 实际请求函数，接收额外请求头字典（用于条件请求），返回 response
+        :param is_valid: 可选，判断页面内容是否可缓存的函数（如检查是否包含下载链接）
+        :return: 详情页 HTML 文本
+        """
+        settings = self._settings()
+        if not settings["enabled"]:
+            response = fetch({})
+            response.raise_for_status()
+            response.encoding = "utf-8"
+            return response.text
+
+        key = self._key(site, torrent_id)
+        page_path = self._page_path(key)
+        now = time.time()
+
+        row = self._query_one(
+            "SELECT etag, last_modified, fetched_at, page_size FROM fetch_cache_pages WHERE key = ?",
+            (key, ))
+        etag, last_modified, fetched_at, page_size = row or (None, None, None, None)
+        has_page = bool(page_size) and os.path.exists(page_path)
+
+        if has_page and now - (fetched_at or 0) < settings["ttl_seconds"]:
+            html = self._read_page(page_path)
+            if html is not None:
+                self._touch_page(key, now)
+                logging.info(f"详情页缓存命中: {key}")
+                return html
+            has_page = False
+
+        conditional_headers = {}
+        if has_page:
+            if etag:
+                conditional_headers["If-None-Match"] = etag
+            if last_modified:
+                conditional_headers["If-Modified-Since"] = last_modified
+
+        response = fetch(conditional_headers)
+        if response.status_code == 304 and has_page:
+            html = self._read_page(page_path)
+            if html is not None:
+                self._touch_page(key, now, fetched_at=now)
+                logging.info(f"详情页未修改，复用缓存: {key}")
+                return html
+            # 缓存文件已损坏，重新完整请求
+            response = fetch({})
+
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        html = response.text
+
+        if is_valid is None or is_valid(html):
+            self._store_page(key, html, response.headers, now,
+                             settings["max_size_bytes"])
+        return html
+
+    def _read_page(self, page_path):
+        try:
+            with gzip.open(page_path, "rt", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, EOFError) as e:
+            logging.warning(f"读取详情页缓存失败 {page_path}: {e}")
+            return None
+
+    def _touch_page(self, key, now, fetched_at=None):
+        if fetched_at is None:
+            self._write("UPDATE fetch_cache_pages SET last_access = ? WHERE key = ?",
+                        (now, key))
+        else:
+            # 重新验证的时间决定 TTL
+            self._write(
+                "UPDATE fetch_cache_pages SET last_access = ?, fetched_at = ? WHERE key = ?",
+                (now, fetched_at, key))
+
+    def _store_page(self, key, html, headers, now, max_size_bytes):
+        try:
+            os.makedirs(PAGES_DIR, exist_ok=True)
+            page_path = self._page_path(key)
+            tmp_path = _tmp_path(page_path)
+            with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+                f.write(html)
+            os.replace(tmp_path, page_path)
+        except Exception as e:
+            logging.warning(f"写入详情页缓存失败 {key}: {e}")
+            return
+
+        if self._write(
+                "INSERT INTO fetch_cache_pages (key, etag, last_modified, fetched_at, last_access, page_size) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "etag = excluded.etag, last_modified = excluded.last_modified, "
+                "fetched_at = excluded.fetched_at, last_access = excluded.last_access, "
+                "page_size = excluded.page_size",
+            (key, headers.get("ETag"), headers.get("Last-Modified"), now, now,
+             os.path.getsize(page_path))):
+            self._evict_if_needed(max_size_bytes)
+
+    # ------------------------------------------------------------------
+    # 种子文件
+    # ------------------------------------------------------------------
+    def get_cached_torrent(self, site, torrent_id):
+        """
+        仅从缓存中获取种子文件，不发起网络请求。
+
+        :return: (种子内容, 文件名)，未命中时返回 None
+        """
+        if not self._settings()["enabled"]:
+            return None
+
+        key = self._key(site, torrent_id)
+        row = self._query_one(
+            "SELECT p.infohash, p.torrent_filename FROM fetch_cache_pages p "
+            "JOIN fetch_cache_torrents t ON t.infohash = p.infohash WHERE p.key = ?",
+            (key, ))
+        if not row:
+            return None
+        infohash, filename = row[0], row[1] or f"{torrent_id}.torrent"
+
+        try:
+            with open(self._torrent_path(infohash), "rb") as f:
+                content = f.read()
+        except OSError:
+            return None
+
+        self._write("UPDATE fetch_cache_torrents SET last_access = ? WHERE infohash = ?",
+                    (time.time(), infohash))
+        logging.info(f"种子文件缓存命中: {key} ({infohash})")
+        return content, filename
+
+    def get_torrent(self, site, torrent_id, fetch, default_filename=None):
+        """
+        获取种子文件，优先使用缓存。
+
+        :param site: 站点标识（英文站点名）
+        :param torrent_id: 种子ID
+        :param fetch: 实际下载函数，返回 response
+        :param default_filename: 响应头中没有文件名时使用的默认文件名
+        :return: (种子内容, 文件名)
+        """
+        cached = self.get_cached_torrent(site, torrent_id)
+        if cached:
+            return cached
+
+        response = fetch()
+        response.raise_for_status()
+        content = response.content
+        filename = parse_torrent_filename(
+            response.headers.get("content-disposition"),
+            default_filename or f"{torrent_id}.torrent")
+
+        if self._settings()["enabled"]:
+            self._store_torrent(self._key(site, torrent_id), content, filename)
+        return content, filename
+
+    def _store_torrent(self, key, content, filename):
+        infohash = compute_infohash(content)
+        if not infohash:
+            # 返回的不是有效的种子文件（如登录页），不写入缓存
+            logging.warning(f"下载内容不是有效的种子文件，跳过缓存: {key}")
+            return
+        try:
+            os.makedirs(TORRENTS_DIR, exist_ok=True)
+            torrent_path = self._torrent_path(infohash)
+            if not os.path.exists(torrent_path):
+                tmp_path = _tmp_path(torrent_path)
+                with open(tmp_path, "wb") as f:
+                    f.write(content)
+                os.replace(tmp_path, torrent_path)
+        except Exception as e:
+            logging.warning(f"写入种子文件缓存失败 {key}: {e}")
+            return
+
+        now = time.time()
+        stored = self._write(
+            "INSERT OR REPLACE INTO fetch_cache_torrents (infohash, size, last_access) VALUES (?, ?, ?)",
+            (infohash, len(content), now))
+        stored = stored and self._write(
+            "INSERT INTO fetch_cache_pages (key, last_access, infohash, torrent_filename) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+            "infohash = excluded.infohash, torrent_filename = excluded.torrent_filename",
+            (key, now, infohash, filename))
+        if stored:
+            self._evict_if_needed(self._settings()["max_size_bytes"])
+
+
+# 全局抓取缓存实例
+fetch_cache = FetchCache()
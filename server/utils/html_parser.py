@@ -0,0 +1,133 @@
+# utils/html_parser.py
+"""
+HTML 解析后端与 HTML -> BBCode 转换工具
+
+- 统一选择 BeautifulSoup 的解析后端：默认优先使用 lxml，未安装时回退到 html.parser，
+  也可以通过环境变量 HTML_PARSER 显式指定（如 HTML_PARSER=html.parser）。
+- 提供非递归的 html_to_bbcode，避免深层嵌套的简介触发递归深度限制。
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+# 解析后端优先级：越靠前越优先
+PARSER_PREFERENCE = ("lxml", "html.parser")
+
+_COLOR_STYLE_RE = re.compile(r"color:\s*([^;]+)")
+
+
+@lru_cache(maxsize=None)
+def is_parser_available(parser: str) -> bool:
+    """检查 BeautifulSoup 是否注册了指定的解析后端。"""
+    return builder_registry.lookup(parser) is not None
+
+
+@lru_cache(maxsize=None)
+def get_html_parser() -> str:
+    """
+    返回当前使用的 HTML 解析后端名称。
+
+    优先使用环境变量 HTML_PARSER 指定的后端，其次按 PARSER_PREFERENCE 顺序选择第一个可用的后端。
+    """
+    requested = os.getenv("HTML_PARSER", "").strip()
+    if requested:
+        if is_parser_available(requested):
+            logging.info(f"HTML 解析后端: {requested} (由 HTML_PARSER 指定)")
+            return requested
+        logging.warning(f"HTML_PARSER='{requested}' 不可用，将自动选择解析后端。")
+
+    for parser in PARSER_PREFERENCE:
+        if is_parser_available(parser):
+            logging.info(f"HTML 解析后端: {parser}")
+            return parser
+    return "html.parser"
+
+
+def parse_html(markup, parser: str | None = None) -> BeautifulSoup:
+    """
+    使用统一的解析后端解析 HTML。
+
+    :param markup: HTML 文本（str 或 bytes）
+    :param parser: 可选，强制使用指定的解析后端（主要用于基准测试）
+    :return: BeautifulSoup 对象
+    """
+    return BeautifulSoup(markup, parser or get_html_parser())
+
+
+def html_to_bbcode(tag) -> str:
+    """
+    将 HTML 标签树转换为 BBCode（使用显式栈迭代遍历，不依赖递归）。
+
+    支持的转换规则：
+    - <br> -> 换行
+    - <fieldset> -> [quote]...[/quote]（内容去除首尾空白，<legend> 被忽略）
+    - <b> -> [b]...[/b]
+    - <img src> -> [img]src[/img]
+    - <a href> -> [url=href]...[/url]
+    - <span style="color: x"> -> [color=x]...[/color]
+    - <font size> -> [size=n]...[/size]
+    - 其他标签只保留其内容
+
+    :param tag: BeautifulSoup 标签
+    :return: BBCode 字符串
+    """
+    if not hasattr(tag, "contents"):
+        return ""
+
+    root_parts = []
+    # 栈帧: [子节点迭代器, 当前输出列表, 前缀, 后缀, 是否去除首尾空白, 父级输出列表]
+    stack = [[iter(tag.contents), root_parts, "", "", False, None]]
+
+    while stack:
+        frame = stack[-1]
+        child = next(frame[0], None)
+
+        if child is None:
+            # 当前节点的子节点已处理完毕，将结果合并到父级输出
+            stack.pop()
+            _, parts, prefix, suffix, strip, parent_parts = frame
+            if parent_parts is not None:
+                inner = "".join(parts)
+                if strip:
+                    inner = inner.strip()
+                parent_parts.append(f"{prefix}{inner}{suffix}")
+            continue
+
+        parts = frame[1]
+        if isinstance(child, str):
+            parts.append(child.replace("\xa0", " "))
+            continue
+
+        name = child.name
+        if name == "br":
+            parts.append("\n")
+            continue
+        if name == "legend":
+            continue
+        if name == "img" and child.get("src"):
+            parts.append(f"[img]{child['src']}[/img]")
+            continue
+        if not hasattr(child, "contents"):
+            continue
+
+        prefix, suffix, strip = "", "", False
+        if name == "fieldset":
+            prefix, suffix, strip = "[quote]", "[/quote]", True
+        elif name == "b":
+            prefix, suffix = "[b]", "[/b]"
+        elif name == "a" and child.get("href"):
+            prefix, suffix = f"[url={child['href']}]", "[/url]"
+        elif (name == "span" and child.get("style")
+              and (match := _COLOR_STYLE_RE.search(child["style"]))):
+            prefix, suffix = f"[color={match.group(1).strip()}]", "[/color]"
+        elif name == "font" and child.get("size"):
+            prefix, suffix = f"[size={child['size']}]", "[/size]"
+
+        stack.append([iter(child.contents), [], prefix, suffix, strip, parts])
+
+    return "".join(root_parts)
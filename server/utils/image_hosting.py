@@ -0,0 +1,299 @@
+# utils/image_hosting.py
+"""
+图床上传客户端（Pixhost / 末日图床）
+
+- 每个图床使用一个持久的 requests.Session（带连接池），不再为每次上传新建连接
+- 末日图床的授权 Token 在有效期内复用，账号变更或接口返回 401 时重新获取
+- 同一图床的并发上传数受信号量限制，多个转种任务同时截图时也不会压垮图床
+- 以 (图床, 图片内容SHA-256) 为键将已上传图片的地址保存到 DATA_DIR 下的 SQLite 数据库中，
+  相同的图片（例如同一张海报转种到多个站点）只会上传一次
+"""
+
+import hashlib
+import logging
+import mimetypes
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import DATA_DIR, config_manager
+from utils.sqlite_cache import SqliteCache
+
+CACHE_DB_FILE = os.path.join(DATA_DIR, "image_hosting_cache.db")
+
+# 已上传图片地址的缓存有效期
+HOSTED_URL_TTL_DAYS = 30
+
+# 每个图床同时进行的上传数上限（跨任务共享）
+MAX_CONCURRENT_UPLOADS = 4
+
+# 末日图床 Token 的复用时间（接口未返回过期时间，401 时也会提前刷新）
+AGSV_TOKEN_TTL_SECONDS = 6 * 3600
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+
+class HostedImageCache(SqliteCache):
+    """基于 SQLite 的 (图床, 图片内容哈希) -> 图片地址 缓存（线程安全）。"""
+
+    label = "图床上传缓存"
+    table = "hosted_images"
+    schema = """
+        CREATE TABLE IF NOT EXISTS hosted_images (
+            hoster TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            url TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            PRIMARY KEY (hoster, content_hash)
+        )
+    """
+    timestamp_column = "created_at"
+
+    def __init__(self, db_file: str = CACHE_DB_FILE):
+        super().__init__(db_file)
+
+    def ttl_seconds(self):
+        return HOSTED_URL_TTL_DAYS * 86400
+
+    def get(self, hoster: str, content_hash: str):
+        row = self._query_one(
+            "SELECT url, created_at FROM hosted_images WHERE hoster = ? AND content_hash = ?",
+            (hoster, content_hash))
+        if not row or time.time() - row[1] > self.ttl_seconds():
+            return None
+        return row[0]
+
+    def set(self, hoster: str, content_hash: str, url: str):
+        self._write(
+            "INSERT OR REPLACE INTO hosted_images (hoster, content_hash, url, created_at) "
+            "VALUES (?, ?, ?, ?)", (hoster, content_hash, url, time.time()))
+
+
+class ImageHostClient(ABC):
+    """
+    图床客户端基类：持久会话、并发上限与内容去重。
+
+    子类实现 _upload(content, filename, mime_type, **options)，返回图片地址或 None。
+    """
+
+    name = ""
+
+    def __init__(self, cache: HostedImageCache,
+                 max_concurrent: int = MAX_CONCURRENT_UPLOADS):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._session = None
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._pool_size = max_concurrent
+
+    @property
+    def session(self) -> requests.Session:
+        # 延迟创建，避免 gunicorn 预加载后 fork 出的 worker 共享父进程的连接
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4,
+                                          pool_maxsize=self._pool_size)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    def upload_file(self, image_path: str, **options):
+        """上传本地图片文件，返回图片地址，失败返回 None。"""
+        try:
+            with open(image_path, 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            print(f"   ❌ 错误: 无法读取图片文件 {image_path}: {e}")
+            return None
+        mime_type = mimetypes.guess_type(image_path)[0] or 'application/octet-stream'
+        return self.upload_bytes(content, os.path.basename(image_path),
+                                 mime_type, **options)
+
+    def upload_bytes(self, content: bytes, filename: str,
+                     mime_type: str = 'application/octet-stream', **options):
+        """上传内存中的图片数据；相同内容之前上传过时直接返回缓存的地址。"""
+        if not content:
+            print("   ❌ 错误: 图片内容为空")
+            return None
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        cached_url = self.cache.get(self.name, content_hash)
+        if cached_url:
+            print(f"   ♻️ 相同图片已上传过，复用地址: {cached_url}")
+            return cached_url
+
+        with self._slots:
+            url = self._upload(content, filename, mime_type, **options)
+        if url:
+            self.cache.set(self.name, content_hash, url)
+        return url
+
+    @abstractmethod
+    def _upload(self, content: bytes, filename: str, mime_type: str, **options):
+        """
+        抽象方法：将图片内容上传到图床，返回图片地址，失败时返回 None。
+        """
+        raise NotImplementedError("每个图床客户端都必须实现 _upload 方法")
+
+
+class PixhostClient(ImageHostClient):
+    """Pixhost.to 上传客户端，返回图片的展示URL (show_url)。"""
+
+    name = "pixhost"
+    api_url = 'https://api.pixhost.to/images'
+
+    def _upload(self, content: bytes, filename: str, mime_type: str,
+                max_th_size: int = None):
+        params = {'content_type': 0}
+        if max_th_size:
+            params['max_th_size'] = max_th_size
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'application/json'}
+
+        try:
+            print("正在发送上传请求到 Pixhost...")
+            response = self.session.post(
+                self.api_url,
+                data=params,
+                files={'img': (filename, content, mime_type)},
+                headers=headers,
+                timeout=30)
+
+            if response.status_code == 200:
+                show_url = response.json().get('show_url')
+                print(f"直接上传成功！图片链接: {show_url}")
+                return show_url
+            else:
+                print(f"   ❌ 直接上传失败 (状态码: {response.status_code})")
+                return None
+        except requests.exceptions.SSLError:
+            print(f"   ❌ 直接上传失败: SSL连接错误")
+            return None
+        except requests.exceptions.ConnectionError:
+            print(f"   ❌ 直接上传失败: 网络连接被重置")
+            return None
+        except requests.exceptions.Timeout:
+            print(f"   ❌ 直接上传失败: 请求超时")
+            return None
+        except Exception as e:
+            # 只打印异常类型和简短描述，不打印完整堆栈
+            print(f"   ❌ 直接上传失败: {type(e).__name__}")
+            return None
+
+
+class AgsvClient(ImageHostClient):
+    """末日图床 (img.seedvault.cn) 上传客户端，Token 在有效期内复用。"""
+
+    name = "agsv"
+    token_url = "https://img.seedvault.cn/api/v1/tokens"
+    upload_url = "https://img.seedvault.cn/api/v1/upload"
+
+    def __init__(self, cache: HostedImageCache,
+                 max_concurrent: int = MAX_CONCURRENT_UPLOADS):
+        super().__init__(cache, max_concurrent)
+        self._token_lock = threading.Lock()
+        self._token = None
+        self._token_account = None
+        self._token_expires_at = 0
+
+    def get_token(self, force_refresh: bool = False):
+        """使用配置文件中的邮箱和密码获取授权 Token（带缓存）。"""
+        config = config_manager.get().get("cross_seed", {})
+        email = config.get("agsv_email")
+        password = config.get("agsv_password")
+
+        if not email or not password:
+            logging.warning("末日图床 邮箱或密码未配置，无法获取 Token。")
+            return None
+
+        account = (email, password)
+        with self._token_lock:
+            if (not force_refresh and self._token
+                    and self._token_account == account
+                    and time.time() < self._token_expires_at):
+                return self._token
+
+            print("正在为 末日图床 获取授权 Token...")
+            try:
+                response = self.session.post(
+                    self.token_url,
+                    headers={"Accept": "application/json"},
+                    json={"email": email, "password": password},
+                    timeout=30)
+                if response.status_code == 200 and response.json().get("status"):
+                    token = response.json().get("data", {}).get("token")
+                    if token:
+                        print("   ✅ 成功获取 末日图床 Token！")
+                        self._token = token
+                        self._token_account = account
+                        self._token_expires_at = time.time() + AGSV_TOKEN_TTL_SECONDS
+                        return token
+
+                logging.error(
+                    f"获取 末日图床 Token 失败。状态码: {response.status_code}, 响应: {response.text}"
+                )
+                print(f"   ❌ 获取 末日图床 Token 失败: {response.text}")
+                return None
+            except requests.exceptions.RequestException as e:
+                logging.error(f"获取 末日图床 Token 时网络请求错误: {e}")
+                print(f"   ❌ 获取 末日图床 Token 时网络请求错误: {e}")
+                return None
+
+    def _upload(self, content: bytes, filename: str, mime_type: str):
+        print(f"准备上传图片到 末日图床: {filename}")
+        token = self.get_token()
+        if not token:
+            return None
+
+        try:
+            response = self._post_image(token, content, filename, mime_type)
+            if response.status_code == 401:
+                # Token 已失效，刷新后重试一次
+                token = self.get_token(force_refresh=True)
+                if not token:
+                    return None
+                response = self._post_image(token, content, filename, mime_type)
+
+            data = response.json()
+            if response.status_code == 200 and data.get("status"):
+                image_url = data.get("data", {}).get("links", {}).get("url")
+                print(f"   ✅ 末日图床 上传成功！URL: {image_url}")
+                return image_url
+            else:
+                message = data.get('message', '无详细信息')
+                logging.error(f"末日图床 上传失败。API 消息: {message}")
+                print(f"   ❌ 末日图床 上传失败: {message}")
+                return None
+        except (requests.exceptions.RequestException,
+                requests.exceptions.JSONDecodeError) as e:
+            logging.error(f"上传到 末日图床 时发生错误: {e}")
+            print(f"   ❌ 上传到 末日图床 时发生错误: {e}")
+            return None
+
+    def _post_image(self, token: str, content: bytes, filename: str,
+                    mime_type: str):
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/json",
+            "User-Agent": USER_AGENT,
+        }
+        return self.session.post(self.upload_url,
+                                 headers=headers,
+                                 files={'file': (filename, content, mime_type)},
+                                 timeout=180)
+
+
+hosted_image_cache = HostedImageCache()
+pixhost_client = PixhostClient(hosted_image_cache)
+agsv_client = AgsvClient(hosted_image_cache)
+
+
+def get_image_host_client(hoster: str) -> ImageHostClient:
+    """按配置中的图床名称返回对应客户端，未知名称回退到 Pixhost。"""
+    return agsv_client if hoster == "agsv" else pixhost_client
@@ -1,11 +1,215 @@
-import requests
+# utils/image_validator.py
+"""
+图片链接有效性验证
+
+- 所有请求复用同一个带连接池的 requests.Session，不再为每个链接重新建立 TCP/TLS 连接
+- 验证结果以 (验证方式, URL) 为键保存到 DATA_DIR 下的 SQLite 数据库中：
+  有效结果缓存 7 天，失效结果只缓存 30 分钟（失效可能只是临时的网络问题）
+- validate_image_urls() 并发验证一批链接（如简介中的全部截图），总耗时约等于单个链接的验证时间
+- find_first_valid_image_url() 并发验证按优先级排列的候选链接（如豆瓣海报的多域名/多清晰度组合），
+  确定优先级最高的有效链接后立即返回，尚未开始的验证直接取消
+"""
+
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import DATA_DIR
+from utils.sqlite_cache import SqliteCache
+
+CACHE_DB_FILE = os.path.join(DATA_DIR, "image_validation_cache.db")
+
+VALID_TTL_SECONDS = 7 * 86400
+INVALID_TTL_SECONDS = 30 * 60
+
+# 并发验证线程数，同时也是连接池中每个主机保留的最大连接数
+MAX_WORKERS = 16
+
+# 更宽松的Content-Type检查
+VALID_CONTENT_TYPES = [
+    'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp',
+    'image/bmp', 'image/svg+xml', 'image/avif', 'image/heic', 'image/heif'
+]
+
+# 允许的通用Content-Type
+GENERIC_CONTENT_TYPES = [
+    'application/octet-stream', 'text/plain', 'application/binary'
+]
+
+
+class ImageValidationCache(SqliteCache):
+    """基于 SQLite 的图片链接验证结果缓存（线程安全）。"""
+
+    label = "图片验证缓存"
+    table = "image_validation_cache"
+    schema = """
+        CREATE TABLE IF NOT EXISTS image_validation_cache (
+            kind TEXT NOT NULL,
+            url TEXT NOT NULL,
+            valid INTEGER NOT NULL,
+            checked_at REAL NOT NULL,
+            PRIMARY KEY (kind, url)
+        )
+    """
+    timestamp_column = "checked_at"
+
+    def __init__(self, db_file: str = CACHE_DB_FILE):
+        super().__init__(db_file)
+
+    def ttl_seconds(self):
+        return VALID_TTL_SECONDS
+
+    def get(self, kind: str, url: str):
+        """返回缓存的验证结果 (True/False)；未命中或已过期时返回 None。"""
+        row = self._query_one(
+            "SELECT valid, checked_at FROM image_validation_cache WHERE kind = ? AND url = ?",
+            (kind, url))
+        if not row:
+            return None
+        valid = bool(row[0])
+        ttl = VALID_TTL_SECONDS if valid else INVALID_TTL_SECONDS
+        if time.time() - row[1] > ttl:
+            return None
+        return valid
+
+    def set(self, kind: str, url: str, valid: bool):
+        self._write(
+            "INSERT OR REPLACE INTO image_validation_cache (kind, url, valid, checked_at) "
+            "VALUES (?, ?, ?, ?)", (kind, url, 1 if valid else 0, time.time()))
+
+
+class ImageValidator:
+    """
+    图片链接验证服务：共享连接池 + 线程池并发验证 + 结果缓存。
+
+    会话和线程池在首次使用时才创建，避免 gunicorn 预加载应用后 fork 出的
+    worker 继承父进程中的连接和线程。
+    """
+
+    def __init__(self, cache: ImageValidationCache, max_workers: int = MAX_WORKERS):
+        self.cache = cache
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._session = None
+        self._executor = None
+        self._checks = {
+            "image": _check_image_url,
+            "poster": _check_poster_url,
+        }
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=32,
+                                          pool_maxsize=self.max_workers)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+        return self._session
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="image-validator")
+        return self._executor
+
+    def validate(self, url: str, kind: str = "image", use_cache: bool = True) -> bool:
+        """
+        验证单个图片链接。
+
+        :param kind: 验证方式，"image" 为通用图片（截图等），"poster" 为海报（要求大于1KB）
+        :param use_cache: 为 False 时跳过缓存读取（验证结果仍会写入缓存）
+        """
+        if not url:
+            return False
+
+        if use_cache:
+            cached = self.cache.get(kind, url)
+            if cached is not None:
+                logging.debug(f"图片验证缓存命中 ({kind}): {url} -> {cached}")
+                return cached
+
+        try:
+            valid = bool(self._checks[kind](self.session, url))
+        except Exception as e:
+            logging.warning(f"图片链接验证异常: {url} - {e}")
+            valid = False
+        self.cache.set(kind, url, valid)
+        return valid
+
+    def validate_many(self, urls, kind: str = "image") -> dict:
+        """
+        并发验证一批图片链接。
+
+        :return: {url: 是否有效}，重复的链接只验证一次
+        """
+        results = {}
+        pending = []
+        for url in dict.fromkeys(u for u in urls if u):
+            cached = self.cache.get(kind, url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending.append(url)
+
+        if len(pending) == 1:
+            results[pending[0]] = self.validate(pending[0], kind, use_cache=False)
+        elif pending:
+            futures = {
+                self.executor.submit(self.validate, url, kind, False): url
+                for url in pending
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def first_valid(self, candidates, kind: str = "image", on_result=None) -> str:
+        """
+        并发验证按优先级排列的候选链接，返回优先级最高的有效链接。
+
+        按优先级顺序等待结果：某个候选有效且排在它前面的候选都已确认失效时立即返回，
+        其余尚未开始的验证会被取消。
+
+        :param on_result: 可选回调 on_result(index, url, valid)，按优先级顺序报告每个已确认的结果
+        :return: 有效链接；全部失效时返回空字符串
+        """
+        candidates = list(dict.fromkeys(c for c in candidates if c))
+        if not candidates:
+            return ""
+
+        futures = [
+            self.executor.submit(self.validate, url, kind) for url in candidates
+        ]
+        try:
+            for index, (url, future) in enumerate(zip(candidates, futures)):
+                valid = future.result()
+                if on_result:
+                    on_result(index, url, valid)
+                if valid:
+                    return url
+            return ""
+        finally:
+            for future in futures:
+                future.cancel()
+
+
 def is_image_url_valid_robust(url: str) -> bool:
     """
     改进版图片链接验证函数，解决误报问题。
-    
+
     主要改进：
     1. 添加标准User-Agent头部
     2. 放宽Content-Type检查
@@ -13,10 +217,45 @@ def is_image_url_valid_robust(url: str) -> bool:
     4. 增加重试机制
     5. 添加文件大小检查
     6. 支持更多图片格式检测
+    7. 复用连接池，并缓存验证结果
     """
-    if not url:
-        return False
-    
+    return image_validator.validate(url)
+
+
+def validate_image_urls(urls, kind: str = "image") -> dict:
+    """并发验证一批图片链接，返回 {url: 是否有效}。"""
+    return image_validator.validate_many(urls, kind)
+
+
+def find_first_valid_image_url(candidates, kind: str = "image", on_result=None) -> str:
+    """并发验证按优先级排列的候选链接，返回优先级最高的有效链接，全部失效时返回空字符串。"""
+    return image_validator.first_valid(candidates, kind, on_result)
+
+
+def _check_content_type(session: requests.Session, url: str, response,
+                        headers: dict, stream: bool) -> bool:
+    """根据响应头判断是否为图片，无法判断时下载少量内容检查文件头。"""
+    content_type = response.headers.get('Content-Type', '').lower()
+    content_length = response.headers.get('Content-Length')
+
+    if any(ct in content_type for ct in VALID_CONTENT_TYPES):
+        return True
+    elif any(ct in content_type for ct in GENERIC_CONTENT_TYPES):
+        # 对于通用Content-Type，检查文件大小
+        if content_length and int(content_length) > 1024:  # 大于1KB
+            logging.info(f"链接有效（通用Content-Type但有合理大小）: {url}")
+            return True
+        else:
+            # 需要进一步验证
+            return _verify_image_content(session, url, headers, stream=stream)
+    else:
+        logging.warning(f"链接有效但Content-Type异常: {url} (Content-Type: {content_type})")
+        # 尝试内容验证
+        return _verify_image_content(session, url, headers, stream=stream)
+
+
+def _check_image_url(session: requests.Session, url: str) -> bool:
+    """通用图片验证：HEAD -> GET（流式）-> 更换User-Agent重试。"""
     # 如果是 pixhost.to 的图片，直接返回 True，跳过检测
     if 'pixhost.to' in url.lower():
         logging.info(f"检测到 pixhost.to 图片，跳过有效性检测: {url}")
@@ -40,95 +279,80 @@ def is_image_url_valid_robust(url: str) -> bool:
 
     # 第一次尝试：HEAD请求
     try:
-        response = requests.head(url, timeout=10, allow_redirects=True, headers=headers)
+        response = session.head(url, timeout=10, allow_redirects=True, headers=headers)
         response.raise_for_status()
-        
-        # 检查Content-Type（放宽条件）
-        content_type = response.headers.get('Content-Type', '').lower()
-        content_length = response.headers.get('Content-Length')
-        
-        # 更宽松的Content-Type检查
-        valid_content_types = [
-            'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp', 
-            'image/bmp', 'image/svg+xml', 'image/avif', 'image/heic', 'image/heif'
-        ]
-        
-        # 允许的通用Content-Type
-        generic_content_types = [
-            'application/octet-stream', 'text/plain', 'application/binary'
-        ]
-        
-        if any(ct in content_type for ct in valid_content_types):
-            return True
-        elif any(ct in content_type for ct in generic_content_types):
-            # 对于通用Content-Type，检查文件大小
-            if content_length and int(content_length) > 1024:  # 大于1KB
-                logging.info(f"链接有效（通用Content-Type但有合理大小）: {url}")
-                return True
-            else:
-                # 需要进一步验证
-                return _verify_image_content(url, headers)
-        else:
-            logging.warning(f"链接有效但Content-Type异常: {url} (Content-Type: {content_type})")
-            # 尝试内容验证
-            return _verify_image_content(url, headers)
+        return _check_content_type(session, url, response, headers, stream=False)
 
     except requests.exceptions.RequestException as e:
         logging.warning(f"HEAD请求失败: {url} - {e}")
-        
-        # 第二次尝试：GET请求（流式）
-        try:
-            response = requests.get(url, stream=True, timeout=10, allow_redirects=True, headers=headers)
+
+    # 第二次尝试：GET请求（流式）
+    try:
+        with session.get(url, stream=True, timeout=10, allow_redirects=True,
+                         headers=headers) as response:
             response.raise_for_status()
-            
-            content_type = response.headers.get('Content-Type', '').lower()
-            content_length = response.headers.get('Content-Length')
-            
-            # 同样的Content-Type检查逻辑
-            valid_content_types = [
-                'image/jpeg', 'image/jpg', 'image/png', 'image/gif', 'image/webp', 
-                'image/bmp', 'image/svg+xml', 'image/avif', 'image/heic', 'image/heif'
-            ]
-            
-            generic_content_types = [
-                'application/octet-stream', 'text/plain', 'application/binary'
-            ]
-            
-            if any(ct in content_type for ct in valid_content_types):
-                return True
-            elif any(ct in content_type for ct in generic_content_types):
-                if content_length and int(content_length) > 1024:
-                    logging.info(f"链接有效（通用Content-Type但有合理大小）: {url}")
-                    return True
-                else:
-                    return _verify_image_content(url, headers, stream=True)
-            else:
-                logging.warning(f"链接有效但Content-Type异常: {url} (Content-Type: {content_type})")
-                return _verify_image_content(url, headers, stream=True)
+            return _check_content_type(session, url, response, headers, stream=True)
 
-        except requests.exceptions.RequestException as e:
-            logging.warning(f"GET请求也失败: {url} - {e}")
-            
-            # 第三次尝试：使用不同的User-Agent重试
-            try:
-                fallback_headers = headers.copy()
-                fallback_headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                
-                response = requests.get(url, stream=True, timeout=15, allow_redirects=True, headers=fallback_headers)
-                response.raise_for_status()
-                
-                return _verify_image_content(url, fallback_headers, stream=True)
-                
-            except requests.exceptions.RequestException as e:
-                logging.error(f"所有尝试都失败: {url} - {e}")
-                return False
+    except requests.exceptions.RequestException as e:
+        logging.warning(f"GET请求也失败: {url} - {e}")
 
+    # 第三次尝试：使用不同的User-Agent重试
+    try:
+        fallback_headers = headers.copy()
+        fallback_headers['User-Agent'] = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
-def _verify_image_content(url: str, headers: dict, stream: bool = False) -> bool:
+        with session.get(url, stream=True, timeout=15, allow_redirects=True,
+                         headers=fallback_headers) as response:
+            response.raise_for_status()
+
+        return _verify_image_content(session, url, fallback_headers, stream=True)
+
+    except requests.exceptions.RequestException as e:
+        logging.error(f"所有尝试都失败: {url} - {e}")
+        return False
+
+
+def _check_poster_url(session: requests.Session, url: str) -> bool:
+    """
+    海报验证：使用豆瓣Referer发送HEAD请求，要求返回图片且大于1KB。
+    """
+    headers = {
+        'User-Agent':
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+        'Referer': 'https://movie.douban.com/'
+    }
+
+    try:
+        response = session.head(url, headers=headers, timeout=10, allow_redirects=True)
+    except Exception as e:
+        logging.info(f"海报验证异常: {url} - {type(e).__name__}")
+        return False
+
+    if response.status_code != 200:
+        logging.info(f"海报验证失败: {url} - HTTP状态码: {response.status_code}")
+        return False
+
+    # 检查Content-Type
+    content_type = response.headers.get('Content-Type', '').lower()
+    if 'image/' not in content_type:
+        logging.info(f"海报验证失败: {url} - 无效的Content-Type: {content_type}")
+        return False
+
+    # 检查Content-Length（至少大于1KB），没有Content-Length时认为有效
+    content_length = response.headers.get('Content-Length')
+    if content_length and int(content_length) <= 1024:
+        logging.info(f"海报验证失败: {url} - 文件太小: {content_length} bytes")
+        return False
+    return True
+
+
+def _verify_image_content(session: requests.Session, url: str, headers: dict,
+                          stream: bool = False) -> bool:
     """
     通过下载少量内容来验证是否为真实图片
     
     Args:
+        session: 复用的请求会话
         url: 图片URL
         headers: 请求头部
         stream: 是否使用流式下载
@@ -138,13 +362,13 @@ def _verify_image_content(url: str, headers: dict, stream: bool = False) -> bool
     """
     try:
         if stream:
-            response = requests.get(url, stream=True, timeout=10, headers=headers)
-            response.raise_for_status()
-            
-            # 只读取前8KB来检测文件头
-            content = response.raw.read(8192)
+            with session.get(url, stream=True, timeout=10, headers=headers) as response:
+                response.raise_for_status()
+
+                # 只读取前8KB来检测文件头
+                content = response.raw.read(8192)
         else:
-            response = requests.get(url, timeout=10, headers=headers)
+            response = session.get(url, timeout=10, headers=headers)
             response.raise_for_status()
             content = response.content[:8192]
         
@@ -227,3 +451,6 @@ def is_image_url_valid_robust_original(url: str) -> bool:
 
             # 不使用全局代理重试，直接返回失败
             return False
+
+
+image_validator = ImageValidator(ImageValidationCache())
@@ -9,6 +9,8 @@ import threading
 import time
 from typing import Dict, Optional, Any
 
+from utils.metrics import MIGRATION_STEP_SECONDS
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +20,8 @@ class LogStreamer:
     def __init__(self):
         self.streams: Dict[str, queue.Queue] = {}
         self.lock = threading.Lock()
+        # (任务ID, 步骤名称) -> 步骤首条日志的时间，步骤结束（success/error）时记录耗时
+        self.step_started: Dict[tuple, float] = {}
         logger.info("日志流管理器已初始化")
     
     def create_stream(self, task_id: str) -> queue.Queue:
@@ -58,6 +62,7 @@ class LogStreamer:
         """
         stream = self.get_stream(task_id)
         if stream:
+            self._record_step_timing(task_id, step, status)
             try:
                 event = {
                     "timestamp": time.time(),
@@ -75,6 +80,18 @@ class LogStreamer:
         else:
             logger.warning(f"未找到日志流: {task_id}")
     
+    def _record_step_timing(self, task_id: str, step: str, status: str):
+        key = (task_id, step)
+        now = time.perf_counter()
+        with self.lock:
+            if status in ("success", "error"):
+                started = self.step_started.pop(key, None)
+            else:
+                self.step_started.setdefault(key, now)
+                return
+        if started is not None:
+            MIGRATION_STEP_SECONDS.observe(now - started, step=step, status=status)
+
     def close_stream(self, task_id: str):
         """关闭并清理日志流
         
@@ -82,6 +99,9 @@ class LogStreamer:
             task_id: 任务ID
         """
         with self.lock:
+            # 未以 success/error 结束的步骤不再计时
+            for key in [k for k in self.step_started if k[0] == task_id]:
+                del self.step_started[key]
             if task_id in self.streams:
                 try:
                     # 发送结束标记
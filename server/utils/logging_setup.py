@@ -0,0 +1,183 @@
+# utils/logging_setup.py
+"""
+日志配置：异步写出、按模块开启详细日志、重复消息限流
+
+- 根 logger 只挂一个 AsyncQueueHandler：日志记录放入有界队列后立即返回，由后台线程格式化并写到
+  stderr。队列已满时丢弃记录并计数（不阻塞种子刷新、本地扫描等循环），之后补写一条丢弃数量的提示
+- 默认级别 INFO（环境变量 LOG_LEVEL）；LOG_VERBOSE_MODULES 中列出的模块单独开启 DEBUG，
+  例如 LOG_VERBOSE_MODULES=core.services,api.routes_local_query
+- 同一位置（logger + 行号）的消息在 LOG_RATE_LIMIT_WINDOW 秒内最多输出 LOG_RATE_LIMIT_BURST 条，
+  其余被抑制，窗口结束后的第一条消息附带被抑制的条数；WARNING 及以上级别不限流
+- 热点代码使用 logger.debug("... %s", value) 形式：级别未开启时既不格式化也不入队
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = "%(asctime)s - [PID:%(process)d] - %(levelname)s - %(message)s"
+
+DEFAULT_LOG_LEVEL = "INFO"
+
+# 队列中最多缓存的日志条数
+LOG_QUEUE_SIZE = 10000
+
+# 限流：时间窗口（秒）与窗口内同一位置最多输出的条数
+DEFAULT_RATE_LIMIT_WINDOW = 10
+DEFAULT_RATE_LIMIT_BURST = 20
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class RateLimitFilter(logging.Filter):
+    """按 (logger, 行号) 对 DEBUG/INFO 日志限流（线程安全）。"""
+
+    def __init__(self, window_seconds: float = DEFAULT_RATE_LIMIT_WINDOW,
+                 burst: int = DEFAULT_RATE_LIMIT_BURST):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._windows = {}  # key -> [窗口开始时间, 已输出条数, 已抑制条数]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.burst <= 0 or record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 4096:
+                    # 清理已结束的窗口，避免调用位置过多时无限增长
+                    self._windows = {
+                        k: v
+                        for k, v in self._windows.items()
+                        if now - v[0] < self.window_seconds
+                    }
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+
+        if suppressed and isinstance(record.msg, str):
+            record.msg = f"{record.msg}（此前 {self.window_seconds} 秒内同类日志已抑制 {suppressed} 条）"
+        return True
+
+
+class AsyncQueueHandler(QueueHandler):
+    """
+    非阻塞的队列日志处理器。
+
+    队列和写出线程按进程延迟创建：gunicorn 预加载后 fork 出的 worker 不会继承父进程的线程，
+    首次写日志时在当前进程中重新创建。
+    """
+
+    def __init__(self, target_handlers, maxsize: int = LOG_QUEUE_SIZE):
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.target_handlers = list(target_handlers)
+        self.maxsize = maxsize
+        self._start_lock = threading.Lock()
+        self._listener = None
+        self._pid = None
+        self._dropped = 0
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            # fork 后父进程的队列可能残留记录或处于加锁状态，直接换成新队列
+            self.queue = queue.Queue(maxsize=self.maxsize)
+            self._listener = QueueListener(self.queue,
+                                           *self.target_handlers,
+                                           respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+            atexit.register(self.flush_and_stop)
+
+    def prepare(self, record):
+        # 同一进程内的队列不需要序列化，消息在写出线程中才格式化
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self._dropped:
+                dropped, self._dropped = self._dropped, 0
+                self.queue.put_nowait(
+                    logging.makeLogRecord({
+                        "name": __name__,
+                        "levelno": logging.WARNING,
+                        "levelname": "WARNING",
+                        "msg": f"日志队列已满，丢弃了 {dropped} 条日志",
+                    }))
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self._dropped += 1
+
+    def emit(self, record):
+        self._ensure_listener()
+        super().emit(record)
+
+    def flush_and_stop(self):
+        """进程退出时写出队列中剩余的日志。"""
+        listener = self._listener
+        if listener is not None and self._pid == os.getpid():
+            self._listener = None
+            self._pid = None
+            try:
+                listener.stop()
+            except Exception:
+                pass
+
+
+def configure_logging():
+    """
+    配置根 logger（在应用启动时调用一次，重复调用不会重复添加处理器）。
+    """
+    root = logging.getLogger()
+    if any(isinstance(h, AsyncQueueHandler) for h in root.handlers):
+        return
+
+    level_name = os.getenv("LOG_LEVEL", DEFAULT_LOG_LEVEL).upper()
+    level = getattr(logging, level_name, None)
+    if not isinstance(level, int):
+        level = logging.INFO
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue_handler = AsyncQueueHandler([stream_handler])
+    queue_handler.addFilter(
+        RateLimitFilter(_env_int("LOG_RATE_LIMIT_WINDOW",
+                                 DEFAULT_RATE_LIMIT_WINDOW),
+                        _env_int("LOG_RATE_LIMIT_BURST",
+                                 DEFAULT_RATE_LIMIT_BURST)))
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    # 按模块开启详细日志
+    verbose_modules = [
+        name.strip()
+        for name in os.getenv("LOG_VERBOSE_MODULES", "").split(",")
+        if name.strip()
+    ]
+    for name in verbose_modules:
+        logging.getLogger(name).setLevel(logging.DEBUG)
@@ -0,0 +1,94 @@
+# utils/lookup_payloads.py
+"""
+查询页面使用的静态查找数据缓存（反向映射表、保存路径列表、目标站点列表等）
+
+这些数据只在配置文件、站点或种子参数变化时才会改变，不再随每一页数据重复计算和传输：
+- 每个部分单独缓存，签名（如 global_mappings.yaml 的修改时间）变化、被显式失效
+  或超过 TTL（兜底多进程部署下其他 worker 的写入）时才重新计算
+- 整体负载序列化一次，内容哈希作为版本号/ETag，前端可用 If-None-Match 条件请求
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+# 兜底有效期：未被显式失效的部分最多缓存这么久
+DEFAULT_TTL_SECONDS = 300
+
+
+class LookupPayloadCache:
+    """按部分缓存查找数据，并缓存序列化后的整体负载与版本号（线程安全）。"""
+
+    def __init__(self, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._parts = {}  # name -> (value, signature, built_at, generation)
+        self._generation = 0
+        self._payload = None  # (part_key, body, version)
+
+    def get(self, name: str, builder, signature=None):
+        """
+        返回缓存的部分数据；缺失、签名变化或已过期时调用 builder() 重新计算。
+        """
+        return self._get_entry(name, builder, signature)[0]
+
+    def _get_entry(self, name: str, builder, signature):
+        with self._lock:
+            cached = self._parts.get(name)
+        if (cached and cached[1] == signature
+                and time.time() - cached[2] < self.ttl_seconds):
+            return cached
+
+        value = builder()
+        with self._lock:
+            self._generation += 1
+            entry = (value, signature, time.time(), self._generation)
+            self._parts[name] = entry
+        return entry
+
+    def invalidate(self, *names):
+        """使指定部分失效；不传参数时使全部失效。"""
+        with self._lock:
+            if names:
+                for name in names:
+                    self._parts.pop(name, None)
+            else:
+                self._parts.clear()
+
+    def build_payload(self, parts: dict):
+        """
+        组装整体负载。
+
+        :param parts: {部分名称: (builder, signature)}
+        :return: (JSON 字节串, 版本号)；各部分内容未变化时复用上次的序列化结果
+        """
+        entries = {
+            name: self._get_entry(name, builder, signature)
+            for name, (builder, signature) in parts.items()
+        }
+        part_key = tuple((name, entry[3]) for name, entry in entries.items())
+        with self._lock:
+            if self._payload and self._payload[0] == part_key:
+                return self._payload[1], self._payload[2]
+
+        values = {name: entry[0] for name, entry in entries.items()}
+        version = hashlib.sha1(
+            json.dumps(values, ensure_ascii=False,
+                       sort_keys=True).encode("utf-8")).hexdigest()[:16]
+        body = json.dumps({
+            "success": True,
+            "version": version,
+            **values
+        }, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            self._payload = (part_key, body, version)
+        return body, version
+
+
+lookup_payloads = LookupPayloadCache()
+
+
+def invalidate_lookup_payloads(*names):
+    """站点、种子参数等数据变化后调用，使对应的查找数据失效。"""
+    lookup_payloads.invalidate(*names)
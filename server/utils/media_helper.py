@@ -1,25 +1,32 @@
 # utils/media_helper.py
 
 import base64
+import io
 import logging
-import mimetypes
 import re
 import os
 import shutil
 import subprocess
-import tempfile
 import requests
 import json
 import time
 import random
 import cloudscraper
-from bs4 import BeautifulSoup
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from urllib.parse import urljoin, urlparse
 from pymediainfo import MediaInfo
 from config import TEMP_DIR, config_manager
 from qbittorrentapi import Client as qbClient
 from transmission_rpc import Client as TrClient
-from utils import ensure_scheme
+from utils import ensure_scheme, parse_html
+from utils.fetch_cache import fetch_cache
+from utils.image_hosting import agsv_client, pixhost_client
+from utils.image_validator import find_first_valid_image_url, image_validator
+from utils.log_streamer import log_streamer
+from utils.media_probe_cache import media_probe_cache
+from utils.ptgen_cache import get_ptgen_cache_settings, provider_stats, ptgen_cache, ptgen_cache_keys
+from utils.mediainfo_analyzer import analyze_mediainfo
+from utils.title_parser import parse_title
 from PIL import Image
 
 
@@ -80,18 +87,11 @@ def translate_path(downloader_id: str, remote_path: str) -> str:
 
 def _upload_to_pixhost(image_path: str):
     """
-    将单个图片文件上传到 Pixhost.to。
+    将单个图片文件上传到 Pixhost.to（复用持久会话，相同图片只上传一次）。
 
     :param image_path: 本地图片文件的路径。
     :return: 成功时返回图片的展示URL，失败时返回None。
     """
-    api_url = 'https://api.pixhost.to/images'
-    params = {'content_type': 0}
-    headers = {
-        'User-Agent':
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-
     print(f"准备上传图片: {image_path}")
 
     if not os.path.exists(image_path):
@@ -99,85 +99,36 @@ def _upload_to_pixhost(image_path: str):
         return None
 
     # 直接上传，不使用全局代理
-    return _upload_to_pixhost_direct(image_path, api_url, params, headers)
+    return pixhost_client.upload_file(image_path)
 
 
 def _get_agsv_auth_token():
-    """使用配置文件中的邮箱和密码获取 末日图床 的授权 Token。"""
-    config = config_manager.get().get("cross_seed", {})
-    email = config.get("agsv_email")
-    password = config.get("agsv_password")
+    """使用配置文件中的邮箱和密码获取 末日图床 的授权 Token（有效期内复用）。"""
+    return agsv_client.get_token()
 
-    if not email or not password:
-        logging.warning("末日图床 邮箱或密码未配置，无法获取 Token。")
-        return None
 
-    token_url = "https://img.seedvault.cn/api/v1/tokens"
-    payload = {"email": email, "password": password}
-    headers = {"Accept": "application/json"}
-    print("正在为 末日图床 获取授权 Token...")
-    try:
-        response = requests.post(token_url,
-                                 headers=headers,
-                                 json=payload,
-                                 timeout=30)
-        if response.status_code == 200 and response.json().get("status"):
-            token = response.json().get("data", {}).get("token")
-            if token:
-                print("   ✅ 成功获取 末日图床 Token！")
-                return token
-
-        logging.error(
-            f"获取 末日图床 Token 失败。状态码: {response.status_code}, 响应: {response.text}"
-        )
-        print(f"   ❌ 获取 末日图床 Token 失败: {response.text}")
-        return None
-    except requests.exceptions.RequestException as e:
-        logging.error(f"获取 末日图床 Token 时网络请求错误: {e}")
-        print(f"   ❌ 获取 末日图床 Token 时网络请求错误: {e}")
-        return None
+def _upload_to_agsv(image_path: str):
+    """上传单个图片到 末日图床（Token 由客户端自动获取和刷新）。"""
+    return agsv_client.upload_file(image_path)
 
 
-def _upload_to_agsv(image_path: str, token: str):
-    """使用给定的 Token 上传单个图片到 末日图床。"""
-    upload_url = "https://img.seedvault.cn/api/v1/upload"
-    headers = {
-        "Authorization":
-        f"Bearer {token}",
-        "Accept":
-        "application/json",
-        "User-Agent":
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-    }
+def _probe_duration(video_path: str) -> float:
+    """使用 ffprobe 获取视频时长（秒），结果按文件持久化缓存。"""
 
-    mime_type = mimetypes.guess_type(
-        image_path)[0] or 'application/octet-stream'
-    image_name = os.path.basename(image_path)
+    def _run_ffprobe():
+        cmd_duration = [
+            "ffprobe", "-v", "error", "-show_entries", "format=duration",
+            "-of", "default=noprint_wrappers=1:nokey=1", video_path
+        ]
+        result = subprocess.run(cmd_duration,
+                                capture_output=True,
+                                text=True,
+                                check=True,
+                                encoding='utf-8')
+        return float(result.stdout.strip())
 
-    print(f"准备上传图片到 末日图床: {image_name}")
-    try:
-        with open(image_path, 'rb') as f:
-            files = {'file': (image_name, f, mime_type)}
-            response = requests.post(upload_url,
-                                     headers=headers,
-                                     files=files,
-                                     timeout=180)
-
-        data = response.json()
-        if response.status_code == 200 and data.get("status"):
-            image_url = data.get("data", {}).get("links", {}).get("url")
-            print(f"   ✅ 末日图床 上传成功！URL: {image_url}")
-            return image_url
-        else:
-            message = data.get('message', '无详细信息')
-            logging.error(f"末日图床 上传失败。API 消息: {message}")
-            print(f"   ❌ 末日图床 上传失败: {message}")
-            return None
-    except (requests.exceptions.RequestException,
-            requests.exceptions.JSONDecodeError) as e:
-        logging.error(f"上传到 末日图床 时发生错误: {e}")
-        print(f"   ❌ 上传到 末日图床 时发生错误: {e}")
-        return None
+    return media_probe_cache.get_or_compute(video_path, "duration",
+                                            _run_ffprobe)
 
 
 def _get_smart_screenshot_points(video_path: str,
@@ -195,16 +146,7 @@ def _get_smart_screenshot_points(video_path: str,
         return []
 
     try:
-        cmd_duration = [
-            "ffprobe", "-v", "error", "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1", video_path
-        ]
-        result = subprocess.run(cmd_duration,
-                                capture_output=True,
-                                text=True,
-                                check=True,
-                                encoding='utf-8')
-        duration = float(result.stdout.strip())
+        duration = _probe_duration(video_path)
         print(f"视频总时长: {duration:.2f} 秒")
     except Exception as e:
         print(f"错误：使用 ffprobe 获取视频时长失败。{e}")
@@ -212,20 +154,25 @@ def _get_smart_screenshot_points(video_path: str,
 
     # 探测字幕流的部分保持不变，因为它本身速度很快
     try:
-        cmd_probe_subs = [
-            "ffprobe", "-v", "quiet", "-print_format", "json", "-show_entries",
-            "stream=index,codec_name,disposition", "-select_streams", "s",
-            video_path
-        ]
-        result = subprocess.run(cmd_probe_subs,
-                                capture_output=True,
-                                text=True,
-                                check=True,
-                                encoding='utf-8')
-        sub_data = json.loads(result.stdout)
+
+        def _probe_subtitle_streams():
+            cmd_probe_subs = [
+                "ffprobe", "-v", "quiet", "-print_format", "json",
+                "-show_entries", "stream=index,codec_name,disposition",
+                "-select_streams", "s", video_path
+            ]
+            result = subprocess.run(cmd_probe_subs,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True,
+                                    encoding='utf-8')
+            return json.loads(result.stdout).get("streams", [])
+
+        subtitle_streams = media_probe_cache.get_or_compute(
+            video_path, "subtitle_streams", _probe_subtitle_streams)
 
         best_ass, best_srt, best_pgs = None, None, None
-        for stream in sub_data.get("streams", []):
+        for stream in subtitle_streams:
             disposition = stream.get("disposition", {})
             is_normal = not any([
                 disposition.get("comment"),
@@ -252,77 +199,84 @@ def _get_smart_screenshot_points(video_path: str,
         print(f"探测字幕流失败: {e}")
         return []
 
-    subtitle_events = []
     try:
-        # --- 【核心修改】 ---
-        # 1. 定义我们要探测的时间点（例如，视频的20%, 40%, 60%, 80%位置）
-        probe_points = [0.2, 0.4, 0.6, 0.8]
-        # 2. 定义在每个探测点附近扫描多长时间（例如，60秒），时间越长，找到字幕事件越多，但耗时也越长
-        probe_duration = 60
-
-        # 3. 构建 -read_intervals 参数
-        # 格式为 "start1%+duration1,start2%+duration2,..."
-        intervals = []
-        for point in probe_points:
-            start_time = duration * point
-            end_time = start_time + probe_duration
-            if end_time > duration:
-                end_time = duration  # 确保不超过视频总长
-            intervals.append(f"{start_time}%{end_time}")
-
-        read_intervals_arg = ",".join(intervals)
-        print(f"   🚀 将只扫描以下时间段来寻找字幕: {read_intervals_arg}")
-
-        # 4. 将 -read_intervals 参数添加到 ffprobe 命令中
-        cmd_extract = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-read_intervals",
-            read_intervals_arg,  # <--- 新增的参数
-            "-print_format",
-            "json",
-            "-show_packets",
-            "-select_streams",
-            str(sub_index),
-            video_path
-        ]
 
-        # 执行命令，现在它会快非常多
-        result = subprocess.run(cmd_extract,
-                                capture_output=True,
-                                text=True,
-                                check=True,
-                                encoding='utf-8')
-        # --- 【核心修改结束】 ---
+        def _extract_subtitle_events():
+            subtitle_events = []
+            # --- 【核心修改】 ---
+            # 1. 定义我们要探测的时间点（例如，视频的20%, 40%, 60%, 80%位置）
+            probe_points = [0.2, 0.4, 0.6, 0.8]
+            # 2. 定义在每个探测点附近扫描多长时间（例如，60秒），时间越长，找到字幕事件越多，但耗时也越长
+            probe_duration = 60
+
+            # 3. 构建 -read_intervals 参数
+            # 格式为 "start1%+duration1,start2%+duration2,..."
+            intervals = []
+            for point in probe_points:
+                start_time = duration * point
+                end_time = start_time + probe_duration
+                if end_time > duration:
+                    end_time = duration  # 确保不超过视频总长
+                intervals.append(f"{start_time}%{end_time}")
+
+            read_intervals_arg = ",".join(intervals)
+            print(f"   🚀 将只扫描以下时间段来寻找字幕: {read_intervals_arg}")
+
+            # 4. 将 -read_intervals 参数添加到 ffprobe 命令中
+            cmd_extract = [
+                "ffprobe",
+                "-v",
+                "quiet",
+                "-read_intervals",
+                read_intervals_arg,  # <--- 新增的参数
+                "-print_format",
+                "json",
+                "-show_packets",
+                "-select_streams",
+                str(sub_index),
+                video_path
+            ]
 
-        events_data = json.loads(result.stdout)
-        packets = events_data.get("packets", [])
+            # 执行命令，现在它会快非常多
+            result = subprocess.run(cmd_extract,
+                                    capture_output=True,
+                                    text=True,
+                                    check=True,
+                                    encoding='utf-8')
+            # --- 【核心修改结束】 ---
 
-        # 后续处理逻辑基本不变
-        if sub_codec in ["ass", "subrip"]:
-            for packet in packets:
-                try:
-                    start, dur = float(packet.get("pts_time")), float(
-                        packet.get("duration_time"))
-                    if dur > 0.1:
-                        subtitle_events.append({
-                            "start": start,
-                            "end": start + dur
-                        })
-                except (ValueError, TypeError):
-                    continue
-        elif sub_codec == "hdmv_pgs_subtitle":
-            for i in range(0, len(packets) - 1, 2):
-                try:
-                    start, end = float(packets[i].get("pts_time")), float(
-                        packets[i + 1].get("pts_time"))
-                    if end > start and (end - start) > 0.1:
-                        subtitle_events.append({"start": start, "end": end})
-                except (ValueError, TypeError):
-                    continue
+            events_data = json.loads(result.stdout)
+            packets = events_data.get("packets", [])
 
-        if not subtitle_events: raise ValueError("在指定区间内未能提取到任何有效的时间事件。")
+            # 后续处理逻辑基本不变
+            if sub_codec in ["ass", "subrip"]:
+                for packet in packets:
+                    try:
+                        start, dur = float(packet.get("pts_time")), float(
+                            packet.get("duration_time"))
+                        if dur > 0.1:
+                            subtitle_events.append({
+                                "start": start,
+                                "end": start + dur
+                            })
+                    except (ValueError, TypeError):
+                        continue
+            elif sub_codec == "hdmv_pgs_subtitle":
+                for i in range(0, len(packets) - 1, 2):
+                    try:
+                        start, end = float(packets[i].get("pts_time")), float(
+                            packets[i + 1].get("pts_time"))
+                        if end > start and (end - start) > 0.1:
+                            subtitle_events.append({"start": start, "end": end})
+                    except (ValueError, TypeError):
+                        continue
+            if not subtitle_events:
+                raise ValueError("在指定区间内未能提取到任何有效的时间事件。")
+            return subtitle_events
+
+        subtitle_events = media_probe_cache.get_or_compute(
+            video_path, f"subtitle_events:{sub_index}",
+            _extract_subtitle_events)
         print(f"   ✅ 成功从指定区间提取到 {len(subtitle_events)} 条有效字幕事件。")
     except Exception as e:
         print(f"智能提取时间事件失败: {e}")
@@ -641,11 +595,11 @@ def upload_data_mediaInfo(mediaInfo: str,
 
     try:
         print(f"准备使用 MediaInfo 工具从 '{target_video_file}' 提取...")
-        media_info_parsed = MediaInfo.parse(target_video_file,
-                                            output="text",
-                                            full=False)
+        # MediaInfo 文本按文件持久化缓存，文件未变化时无需重复解析
+        media_info_str = media_probe_cache.get_or_compute(
+            target_video_file, "mediainfo", lambda: str(
+                MediaInfo.parse(target_video_file, output="text", full=False)))
         # 处理 Complete name，只保留最后一个 / 之后的内容
-        media_info_str = str(media_info_parsed)
         # 使用正则表达式替换 Complete name 行中的完整路径为文件名
         media_info_str = re.sub(
             r'(Complete name\s*:\s*)(.+)',
@@ -661,529 +615,126 @@ def upload_data_mediaInfo(mediaInfo: str,
 def upload_data_title(title: str, torrent_filename: str = ""):
     """
     从种子主标题中提取所有参数，并可选地从种子文件名中补充缺失参数。
+
+    解析规则见 utils/title_parser.py（预编译规则 + LRU 缓存）。
     """
-    print(f"开始从主标题解析参数: {title}")
-
-    # 1. 预处理
-    original_title_str = title.strip()
-    params = {}
-    unrecognized_parts = []
-
-    # 注释掉原有的粗暴截断逻辑，因为它会错误地移除制作组名称中的中文部分
-    # 例如 "-FFans@ws林小凡" 会被错误截断
-    # 现在只在标题中存在独立的中文片段（不与制作组相连）时才标记为无法识别
-    # chinese_junk_match = re.search(r"([\u4e00-\u9fa5].*)$", original_title_str)
-    # if chinese_junk_match:
-    #     unrecognized_parts.append(chinese_junk_match.group(1).strip())
-    #     title = original_title_str[:chinese_junk_match.start()].strip()
-    # else:
-    #     title = original_title_str
-
-    # 保持原始标题，让后续的制作组提取逻辑来处理
-    title = original_title_str
-
-    title = re.sub(r"[￡€]", "", title)
-    title = re.sub(r"\s*剩餘時間.*$", "", title)
-    title = re.sub(r"[\s\.]*(mkv|mp4)$", "", title,
-                   flags=re.IGNORECASE).strip()
-    title = re.sub(r"\[.*?\]|【.*?】", "", title).strip()
-    title = title.replace("（", "(").replace("）", ")")
-    title = title.replace("'", "")
-    title = re.sub(r"(\d+[pi])([A-Z])", r"\1 \2", title)
-
-    # 2. 优先提取制作组信息
-    release_group = ""
-    main_part = title
-
-    # 检查特殊制作组（完整匹配）
-    special_groups = ["mUHD-FRDS", "MNHD-FRDS", "DMG&VCB-Studio", "VCB-Studio"]
-    found_special_group = False
-    for group in special_groups:
-        if title.endswith(f" {group}") or title.endswith(f"-{group}"):
-            release_group = group
-            main_part = title[:-len(group) - 1].strip()
-            found_special_group = True
-            break
+    return parse_title(title, torrent_filename)
 
-    # 如果不是特殊制作组，先尝试匹配 VCB-Studio 变体
-    if not found_special_group:
-        # 匹配类似 -Nekomoe kissaten&VCB-Studio, -LoliHouse&VCB-Studio 等格式
-        # 这个正则会匹配 - 开头，中间可能有多个单词（包含空格）、&符号，最后以 VCB-Studio 结尾
-        vcb_variant_pattern = re.compile(
-            r"^(?P<main_part>.+?)[-](?P<release_group>[\w\s]+&VCB-Studio)$",
-            re.IGNORECASE)
-        vcb_match = vcb_variant_pattern.match(title)
-        if vcb_match:
-            main_part = vcb_match.group("main_part").strip()
-            release_group = vcb_match.group("release_group")
-            found_special_group = True
-            print(f"检测到 VCB-Studio 变体制作组: {release_group}")
-
-    # 如果还不是特殊制作组，使用通用模式匹配
-    if not found_special_group:
-        # 修复：改用贪婪匹配，直接提取最后一个 - 或 @ 之后的所有内容作为制作组
-        # 这样可以正确处理包含中文、@、- 等复杂字符的制作组名称
-        general_regex = re.compile(
-            r"^(?P<main_part>.+?)[-@](?P<release_group>[^\s]+)$",
-            re.IGNORECASE,
-        )
-        print(f"[调试] 尝试匹配制作组，标题: {title}")
-        match = general_regex.match(title)
-        if match:
-            main_part = match.group("main_part").strip()
-            release_group = match.group("release_group").strip()
-            print(f"[调试] 正则匹配成功!")
-            print(f"[调试]   - main_part: {main_part}")
-            print(f"[调试]   - release_group: {release_group}")
-            print(f"[调试] 最终制作组: {release_group}")
-        else:
-            # 检查是否以-NOGROUP结尾
-            if title.upper().endswith("-NOGROUP"):
-                release_group = "NOGROUP"
-                main_part = title[:-8].strip()
-            else:
-                release_group = "N/A (无发布组)"
 
-    # 3. 季集、年份、剪辑版本提取
-    season_match = re.search(
-        r"(?<!\w)(S\d{1,2}(?:(?:[-–~]\s*S?\d{1,2})?|(?:\s*E\d{1,3}(?:[-–~]\s*(?:S\d{1,2})?E?\d{1,3})*)?))(?!\w)",
-        main_part,
-        re.I,
-    )
-    if season_match:
-        season_str = season_match.group(1)
-        main_part = main_part.replace(season_str, " ").strip()
-        params["season_episode"] = re.sub(r"\s", "", season_str.upper())
-
-    title_part = main_part
-    year_match = re.search(r"[\s\.\(]((?:19|20)\d{2})([\s\.\)]|$)", title_part)
-    if year_match:
-        params["year"] = year_match.group(1)
-        title_part = title_part.replace(year_match.group(0), " ", 1).strip()
-
-    # 4.1 提取剪辑版本并拼接到年份
-    cut_version_pattern = re.compile(
-        r"(?<!\w)(Theatrical[\s\.]?Cut|Directors?[\s\.]?Cut|DC|Extended[\s\.]?(?:Cut|Edition)|Special[\s\.]?Edition|SE|Final[\s\.]?Cut|Anniversary[\s\.]?Edition|Restored|Remastered|Criterion[\s\.]?(?:Edition|Collection)|Ultimate[\s\.]?Cut|IMAX[\s\.]?Edition|Open[\s\.]?Matte|Unrated[\s\.]?Cut)(?!\w)",
-        re.IGNORECASE)
-    cut_version_match = cut_version_pattern.search(title_part)
-    if cut_version_match:
-        cut_version = re.sub(r'[\s\.]+', ' ',
-                             cut_version_match.group(1).strip())
-        # 将剪辑版本拼接到年份
-        if "year" in params:
-            params["year"] = f"{params['year']} {cut_version}"
-        else:
-            # 如果没有年份，单独作为年份字段
-            params["year"] = cut_version
-        # 从标题部分移除剪辑版本
-        title_part = title_part.replace(cut_version_match.group(0), " ",
-                                        1).strip()
-        print(f"检测到剪辑版本: {cut_version}，已拼接到年份")
-
-    # 4. 预处理标题：修复音频参数格式
-    # 先处理缺少点的情况，如 FLAC 20 -> FLAC 2.0, FLAC 2 0 -> FLAC 2.0
-    title_part = re.sub(
-        r"((?:DTS|FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))\s*(\d)\s*(\d)",
-        r"\1 \2.\3",
-        title_part,
-        flags=re.I)
-    # 再处理没有空格的情况，如 FLAC2.0 -> FLAC 2.0, DTS5.1 -> DTS 5.1
-    title_part = re.sub(
-        r"((?:DTS|FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))(\d(?:\.\d)?)",
-        r"\1 \2",
-        title_part,
-        flags=re.I)
-
-    # 技术标签提取（排除已识别的制作组名称）
-    tech_patterns_definitions = {
-        "medium":
-        r"UHDTV|UHD\s*Blu-?ray|Blu-?ray\s+DIY|Blu-ray|BluRay\s+DIY|BluRay|BDrip|BD-?rip|WEB-DL|WEBrip|TVrip|DVDRip|HDTV",
-        "audio":
-        r"DTS-HD(?:\s*MA)?(?:\s*\d\.\d)?|(?:Dolby\s*)?TrueHD(?:\s*Atmos)?(?:\s*\d\.\d)?|Atmos(?:\s*TrueHD)?(?:\s*\d\.\d)?|DTS(?:\s*\d\.\d)?|DDP(?:\s*\d\.\d)?|DD\+(?:\s*\d\.\d)?|DD(?:\s*\d\.\d)?|AC3(?:\s*\d\.\d)?|FLAC(?:\s*\d\.\d)?|AAC(?:\s*\d\.\d)?|LPCM(?:\s*\d\.\d)?|AV3A\s*\d\.\d|\d+\s*Audios?|MP2|DUAL",
-        "hdr_format":
-        r"Dolby Vision|DoVi|HDR10\+|HDRVivid|HDR10|HLG|HDR|SDR|DV|Vivid",
-        "resolution": r"\d{3,4}[pi]|4K",
-        "video_codec":
-        r"HEVC|AVC|x265|H\s*[\s\.]?\s*265|x264|H\s*[\s\.]?\s*264|VC-1|AV1|MPEG-2",
-        "source_platform":
-        r"Apple TV\+|ViuTV|MyTVSuper|MyVideo|AMZN|Netflix|NF|DSNP|MAX|ATVP|iTunes|friDay|USA|EUR|JPN|CEE|FRA|LINETV|EDR|PCOK|Hami|GBR|NowPlayer|CR|SEEZN|GER|CHN|MA|Viu|Baha|KKTV|IQ|HKG|ITA|ESP",
-        "bit_depth": r"\b(?:8|10)bit\b",
-        "framerate": r"\d{2,3}fps",
-        "completion_status": r"Complete|COMPLETE",
-        "video_format": r"3D|HSBS",
-        "release_version": r"REMASTERED|REPACK|RERIP|PROPER|REPOST|V\d+",
-        "cut_version":
-        r"Theatrical[\s\.]?Cut|Directors?[\s\.]?Cut|DC|Extended[\s\.]?(?:Cut|Edition)|Special[\s\.]?Edition|SE|Final[\s\.]?Cut|Anniversary[\s\.]?Edition|Restored|Remastered|Criterion[\s\.]?(?:Edition|Collection)|Ultimate[\s\.]?Cut|IMAX[\s\.]?Edition|Open[\s\.]?Matte|Unrated[\s\.]?Cut",
-        "quality_modifier": r"MAXPLUS|HQ|EXTENDED|REMUX|EE|MiniBD",
-    }
-    priority_order = [
-        "completion_status",
-        "release_version",
-        "cut_version",
-        "medium",
-        "resolution",
-        "video_codec",
-        "bit_depth",
-        "hdr_format",
-        "video_format",
-        "framerate",
-        "source_platform",
-        "audio",
-        "quality_modifier",
-    ]
+# 并行执行 mpv 截图的最大进程数（解码较吃 CPU 与磁盘 IO，不宜过多）
+SCREENSHOT_CAPTURE_WORKERS = 3
+# 并行上传截图的最大线程数
+SCREENSHOT_UPLOAD_WORKERS = 5
 
-    title_candidate = title_part
-    first_tech_tag_pos = len(title_candidate)
-    all_found_tags = []
-
-    # 构建制作组的关键词列表，用于后续过滤
-    release_group_keywords = []
-    if release_group and release_group != "N/A (无发布组)":
-        # 将制作组名称按@和其他分隔符拆分，获取所有组成部分
-        # 例如 "DIY@Audies" -> ["DIY", "Audies"]
-        release_group_keywords = re.split(r'[@\-\s]+', release_group)
-        release_group_keywords = [
-            kw.strip() for kw in release_group_keywords if kw.strip()
-        ]
-        print(f"[调试] 制作组关键词列表: {release_group_keywords}")
-
-    for key in priority_order:
-        pattern = tech_patterns_definitions[key]
-        search_pattern = (re.compile(r"(?<!\w)(" + pattern + r")(?!\w)",
-                                     re.IGNORECASE) if r"\b" not in pattern
-                          else re.compile(pattern, re.IGNORECASE))
-        matches = list(search_pattern.finditer(title_candidate))
-        if not matches:
-            continue
 
-        first_tech_tag_pos = min(first_tech_tag_pos, matches[0].start())
-        raw_values = [
-            m.group(0).strip() if r"\b" in pattern else m.group(1).strip()
-            for m in matches
-        ]
+def _capture_screenshot_jpeg(video_file: str, screenshot_time: float,
+                             jpeg_path: str):
+    """
+    使用 mpv 截取单帧，并在内存中直接压缩为 JPEG 保存（不在磁盘上生成中间 PNG）。
 
-        # 过滤掉属于制作组名称的部分
-        filtered_values = []
-        for val in raw_values:
-            # 检查这个值是否是制作组关键词之一
-            is_release_group_part = any(val.upper() == kw.upper()
-                                        for kw in release_group_keywords)
-            if is_release_group_part:
-                print(f"[调试] 过滤掉制作组关键词: {val} (属于 {key})")
-            if not is_release_group_part:
-                filtered_values.append(val)
-
-        all_found_tags.extend(filtered_values)
-        if filtered_values:
-            print(f"[调试] '{key}' 字段提取到技术标签: {filtered_values}")
-        raw_values = filtered_values
-        processed_values = (
-            [re.sub(r"(DD)\+", r"\1+", val, flags=re.I)
-             for val in raw_values] if key == "audio" else raw_values)
-        if key == "audio":
-            processed_values = [
-                # 先处理缺少点的情况，如 FLAC 20 -> FLAC 2.0, FLAC 2 0 -> FLAC 2.0, DTS 51 -> DTS 5.1
-                re.sub(
-                    r"((?:DTS|FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))\s*(\d)\s*(\d)",
-                    r"\1 \2.\3",
-                    val,
-                    flags=re.I) for val in processed_values
-            ]
-            processed_values = [
-                # 再处理没有空格的情况，如 FLAC2.0 -> FLAC 2.0, DTS5.1 -> DTS 5.1
-                re.sub(r"((?:DTS|FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))(\d(?:\.\d)?)",
-                       r"\1 \2",
-                       val,
-                       flags=re.I) for val in processed_values
-            ]
+    :return: 成功时返回 JPEG 路径，失败时返回 None。
+    """
+    cmd_screenshot = [
+        "mpv",
+        "--no-audio",
+        "--no-terminal",
+        f"--start={screenshot_time:.2f}",
+        "--frames=1",
 
-        unique_processed = sorted(
-            list(set(processed_values)),
-            key=lambda x: title_candidate.find(x.replace(" ", "")))
-        if unique_processed:
-            params[key] = unique_processed[0] if len(
-                unique_processed) == 1 else unique_processed
-
-    # --- [新增] 开始: 从种子文件名补充缺失的参数 ---
-    if torrent_filename:
-        print(f"开始从种子文件名补充参数: {torrent_filename}")
-        # 预处理文件名：移除后缀，用空格替换点和其他常用分隔符
-        filename_base = re.sub(r'(\.original)?\.torrent',
-                               '',
-                               torrent_filename,
-                               flags=re.IGNORECASE)
-        filename_candidate = re.sub(r'[\._\[\]\(\)]', ' ', filename_base)
-
-        # 再次遍历所有技术标签定义，以补充信息
-        for key in priority_order:
-            # 如果主标题中已解析出此参数，则跳过，优先使用主标题的结果
-            if key in params and params.get(key):
-                continue
-
-            pattern = tech_patterns_definitions[key]
-            search_pattern = (re.compile(r"(?<!\w)(" + pattern + r")(?!\w)",
-                                         re.IGNORECASE) if r"\b" not in pattern
-                              else re.compile(pattern, re.IGNORECASE))
-
-            matches = list(search_pattern.finditer(filename_candidate))
-            if matches:
-                # 提取所有匹配到的值
-                raw_values = [
-                    m.group(0).strip()
-                    if r"\b" in pattern else m.group(1).strip()
-                    for m in matches
-                ]
-
-                # (复制主解析逻辑中的 audio 特殊处理)
-                processed_values = ([
-                    re.sub(r"(DD)\\+", r"\1+", val, flags=re.I)
-                    for val in raw_values
-                ] if key == "audio" else raw_values)
-                if key == "audio":
-                    processed_values = [
-                        # 先处理缺少点的情况，如 FLAC 20 -> FLAC 2.0, FLAC 2 0 -> FLAC 2.0
-                        re.sub(
-                            r"((?:FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))\s*(\d)\s*(\d)",
-                            r"\1 \2.\3",
-                            val,
-                            flags=re.I) for val in processed_values
-                    ]
-                    processed_values = [
-                        # 再处理没有空格的情况，如 FLAC2.0 -> FLAC 2.0
-                        re.sub(
-                            r"((?:FLAC|DDP|AV3A|AAC|LPCM|AC3|DD))(\d(?:\.\d)?)",
-                            r"\1 \2",
-                            val,
-                            flags=re.I) for val in processed_values
-                    ]
-
-                # 取独一无二的值并按出现顺序排序
-                unique_processed = sorted(
-                    list(set(processed_values)),
-                    key=lambda x: filename_candidate.find(x.replace(" ", "")))
-
-                if unique_processed:
-                    print(f"   [文件名补充] 找到缺失参数 '{key}': {unique_processed}")
-                    # 将补充的参数存入 params 字典
-                    params[key] = unique_processed[0] if len(
-                        unique_processed) == 1 else unique_processed
-                    # 将新找到的标签也加入 all_found_tags，以便后续正确计算"无法识别"部分
-                    all_found_tags.extend(unique_processed)
-    # --- [新增] 结束 ---
-
-    # 将制作组信息添加到最后的参数中
-    params["release_info"] = release_group
-
-    if "quality_modifier" in params:
-        modifiers = params.pop("quality_modifier")
-        if not isinstance(modifiers, list):
-            modifiers = [modifiers]
-        if "medium" in params:
-            medium_str = (params["medium"] if isinstance(
-                params["medium"], str) else params["medium"][0])
-            params["medium"] = f"{medium_str} {' '.join(sorted(modifiers))}"
-
-    # 5. 最终标题和未识别内容确定
-    title_zone = title_part[:first_tech_tag_pos].strip()
-    tech_zone = title_part[first_tech_tag_pos:].strip()
-    params["title"] = re.sub(r"[\s\.]+", " ", title_zone).strip()
-
-    print(f"[调试] 开始清理技术区域，原始技术区: '{tech_zone}'")
-    print(f"[调试] 所有已识别标签: {all_found_tags}")
-
-    cleaned_tech_zone = tech_zone
-    for tag in sorted(all_found_tags, key=len, reverse=True):
-        # 对于包含中文的标签，不使用 \b 词边界
-        # 使用更通用的模式：(?<!\w) 和 (?!\w) 来匹配非字母数字边界
-        # 但中文字符不被 \w 匹配，所以需要特殊处理
-        if re.search(r'[\u4e00-\u9fa5]', tag):
-            # 包含中文，直接使用字面匹配
-            pattern_to_remove = re.escape(tag)
-            print(f"[调试] 清理中文标签: '{tag}' (使用字面匹配)")
-        else:
-            # 纯英文/数字，使用词边界
-            pattern_to_remove = r"\b" + re.escape(tag) + r"(?!\w)"
-            print(f"[调试] 清理英文标签: '{tag}' (使用词边界)")
-
-        before = cleaned_tech_zone
-        cleaned_tech_zone = re.sub(pattern_to_remove,
-                                   " ",
-                                   cleaned_tech_zone,
-                                   flags=re.IGNORECASE)
-        if before != cleaned_tech_zone:
-            print(f"[调试]   已从技术区移除: '{tag}'")
-
-    print(f"[调试] 清理后的技术区: '{cleaned_tech_zone}'")
-    remains = re.split(r"[\s\.]+", cleaned_tech_zone)
-    unrecognized_parts.extend([part for part in remains if part])
-    print(f"[调试] 最终无法识别部分: {unrecognized_parts}")
-    if unrecognized_parts:
-        params["unrecognized"] = " ".join(sorted(list(
-            set(unrecognized_parts))))
-
-    english_params = {}
-    key_order = [
-        "title",
-        "year",
-        "season_episode",
-        "completion_status",
-        "release_version",
-        "resolution",
-        "medium",
-        "source_platform",
-        "video_codec",
-        "video_format",
-        "hdr_format",
-        "bit_depth",
-        "framerate",
-        "audio",
-        "release_info",
-        "unrecognized",
+        # --- HDR 色调映射参数 ---
+        # 指定输出为标准的sRGB色彩空间，这是所有SDR图片的基础
+        "--target-trc=srgb",
+        # 使用 'hable' 算法进行色调映射，它能在保留高光和阴影细节方面取得良好平衡
+        "--tone-mapping=hable",
+        # 将帧以 PNG 编码写到标准输出，由 Pillow 直接在内存中转换为 JPEG
+        "--of=image2pipe",
+        "--ovc=png",
+        "--o=-",
+        video_file
     ]
-    for key in key_order:
-        if key in params and params[key]:
-            if key == "audio" and isinstance(params[key], list):
-                # 处理音频编码列表，将 "数字Audio" 格式移到编码格式后面
-                processed_audio = []
-                for audio_item in params[key]:
-                    # 检查是否包含 "数字Audio" 模式（如 "3Audio DTS" 或 "DTS 3Audio"）
-                    # 匹配模式：(\d+)\s*(Audio[s]?)\s+(.+) 或 (.+)\s+(\d+)\s*(Audio[s]?)
-                    match = re.match(r'^(\d+)\s*(Audio[s]?)\s+(.+)$',
-                                     audio_item, re.IGNORECASE)
-                    if match:
-                        # 如果是 "3Audio DTS" 格式，重排为 "DTS 3Audio"
-                        number = match.group(1)
-                        audio_word = match.group(2)
-                        codec = match.group(3)
-                        processed_audio.append(f"{codec} {number}{audio_word}")
-                    else:
-                        # 检查是否已经是正确格式 "DTS 3Audio"
-                        match_correct = re.match(
-                            r'^(.+?)\s+(\d+)\s*(Audio[s]?)$', audio_item,
-                            re.IGNORECASE)
-                        if match_correct:
-                            # 已经是正确格式，直接使用
-                            processed_audio.append(audio_item)
-                        else:
-                            # 其他格式不变
-                            processed_audio.append(audio_item)
-
-                # 排序：先按是否以数字Audio结尾，再按长度
-                sorted_audio = sorted(
-                    processed_audio,
-                    key=lambda s:
-                    (bool(re.search(r'\d+\s*Audio[s]?$', s, re.IGNORECASE)),
-                     -len(s)))
-                english_params[key] = " ".join(sorted_audio)
-            else:
-                english_params[key] = params[key]
-
-    if "source_platform" in english_params and "audio" in english_params:
-        is_sp_list = isinstance(english_params["source_platform"], list)
-        sp_values = (english_params["source_platform"]
-                     if is_sp_list else [english_params["source_platform"]])
-        if "MA" in sp_values and "MA" in str(english_params["audio"]):
-            sp_values.remove("MA")
-            if not sp_values:
-                del english_params["source_platform"]
-            elif len(sp_values) == 1 and not is_sp_list:
-                english_params["source_platform"] = sp_values[0]
-            elif is_sp_list:
-                english_params["source_platform"] = sp_values
-
-    # 6. 有效性质检
-    is_valid = bool(english_params.get("title"))
-    if is_valid:
-        if not any(
-                key in english_params
-                for key in ["resolution", "medium", "video_codec", "audio"]):
-            is_valid = False
-        release_info = english_params.get("release_info", "")
-        if "N/A" in release_info and "NOGROUP" not in release_info:
-            core_tech_keys = ["resolution", "medium", "video_codec"]
-            if sum(1 for key in core_tech_keys if key in english_params) < 2:
-                is_valid = False
-
-    if not is_valid:
-        print("主标题解析失败或未通过质检。")
-        english_params = {"title": original_title_str, "unrecognized": "解析失败"}
-
-    translation_map = {
-        "title": "主标题",
-        "year": "年份",
-        "season_episode": "季集",
-        "resolution": "分辨率",
-        "medium": "媒介",
-        "source_platform": "片源平台",
-        "video_codec": "视频编码",
-        "hdr_format": "HDR格式",
-        "bit_depth": "色深",
-        "framerate": "帧率",
-        "audio": "音频编码",
-        "release_info": "制作组",
-        "completion_status": "剧集状态",
-        "unrecognized": "无法识别",
-        "video_format": "视频格式",
-        "release_version": "发布版本",
-    }
 
-    chinese_keyed_params = {}
-    for key, value in english_params.items():
-        chinese_key = translation_map.get(key)
-        if chinese_key:
-            chinese_keyed_params[chinese_key] = value
-
-    # 定义前端显示的完整参数列表和固定顺序
-    all_possible_keys_ordered = [
-        "主标题",
-        "年份",
-        "季集",
-        "剧集状态",
-        "发布版本",
-        "分辨率",
-        "媒介",
-        "片源平台",
-        "视频编码",
-        "视频格式",
-        "HDR格式",
-        "色深",
-        "帧率",
-        "音频编码",
-        "制作组",
-        "无法识别",
-    ]
+    try:
+        result = subprocess.run(cmd_screenshot,
+                                check=True,
+                                capture_output=True,
+                                timeout=180)
+    except subprocess.CalledProcessError as e:
+        error_output = e.stderr.decode('utf-8', errors='ignore')
+        print(f"❌ 错误: mpv 截图失败 ({screenshot_time:.2f}s)。")
+        print(f"   -> Stderr: {error_output}")
+        return None
+    except subprocess.TimeoutExpired:
+        print(f"❌ 错误: mpv 截图超时 ({screenshot_time:.2f}s，超过180秒)。")
+        return None
 
-    final_components_list = []
-    for key in all_possible_keys_ordered:
-        final_components_list.append({
-            "key": key,
-            "value": chinese_keyed_params.get(key, "")
-        })
+    if not result.stdout:
+        print(f"❌ 错误: mpv 命令执行成功，但没有输出图像数据 ({screenshot_time:.2f}s)")
+        return None
 
-    print(f"主标题解析成功。")
-    return final_components_list
+    try:
+        with Image.open(io.BytesIO(result.stdout)) as img:
+            img.convert('RGB').save(jpeg_path, 'jpeg', quality=85)
+    except Exception as e:
+        print(f"   ❌ 错误: 截图转换为JPEG失败: {e}")
+        return None
+
+    print(f"   -> JPEG截图生成成功 (质量: 85) -> {os.path.basename(jpeg_path)}")
+    return jpeg_path
+
+
+def _upload_screenshot_with_retry(jpeg_path: str,
+                                  hoster: str,
+                                  max_retries: int = 3):
+    """上传单张截图，失败时重试，返回图片URL或None。"""
+    for attempt in range(max_retries):
+        print(
+            f"   -> 正在上传 {os.path.basename(jpeg_path)} (第 {attempt+1}/{max_retries} 次尝试)..."
+        )
+        try:
+            if hoster == "agsv":
+                image_url = _upload_to_agsv(jpeg_path)
+            else:
+                image_url = _upload_to_pixhost(jpeg_path)
+            if image_url:
+                return image_url
+        except Exception as e:
+            print(f"   -> 上传尝试 {attempt+1} 出现异常: {e}")
+        time.sleep(2)
+
+    print(f"⚠️  {os.path.basename(jpeg_path)} 经过 {max_retries} 次尝试后仍然上传失败。")
+    return None
 
 
 def upload_data_screenshot(source_info,
                            save_path,
                            torrent_name=None,
-                           downloader_id=None):
+                           downloader_id=None,
+                           task_id=None):
     """
     [最终HDR优化版] 使用 mpv 从视频文件中截取多张图片，并上传到图床。
     - 新增HDR色调映射参数，确保HDR视频截图颜色正常。
-    - 按顺序一张一张处理，简化流程。
+    - 多个时间点并行截图，帧数据在内存中直接压缩为 JPEG。
+    - 每张截图生成后立即提交上传，上传并发进行并共享同一个 HTTP 会话。
     - 采用智能时间点分析。
+    - 传入 task_id 时，通过 log_streamer 推送各阶段耗时。
     """
     if Image is None:
         print("错误：Pillow 库未安装，无法执行截图任务。")
         return ""
 
-    print("开始执行截图和上传任务 (引擎: mpv, 输出格式: JPEG, 模式: 顺序执行)...")
+    print("开始执行截图和上传任务 (引擎: mpv, 输出格式: JPEG, 模式: 并行执行)...")
     config = config_manager.get()
     hoster = config.get("cross_seed", {}).get("image_hoster", "pixhost")
     num_screenshots = 5
     print(f"已选择图床服务: {hoster}, 截图数量: {num_screenshots}")
 
+    task_start = time.perf_counter()
+    timings = {}
+
+    def _emit(message, status="processing", extra=None):
+        if task_id:
+            log_streamer.emit_log(task_id, "验证图片链接", message, status, extra)
+
     # 首先应用路径映射转换
     translated_save_path = translate_path(downloader_id, save_path)
     if translated_save_path != save_path:
@@ -1257,21 +808,13 @@ def upload_data_screenshot(source_info,
         print("错误：找不到 mpv。请确保它已安装并已添加到系统环境变量 PATH 中。")
         return ""
 
+    stage_start = time.perf_counter()
     screenshot_points = _get_smart_screenshot_points(target_video_file,
                                                      num_screenshots)
     if len(screenshot_points) < num_screenshots:
         print("警告: 智能分析失败或字幕不足，回退到按百分比截图。")
         try:
-            cmd_duration = [
-                "ffprobe", "-v", "error", "-show_entries", "format=duration",
-                "-of", "default=noprint_wrappers=1:nokey=1", target_video_file
-            ]
-            result = subprocess.run(cmd_duration,
-                                    capture_output=True,
-                                    text=True,
-                                    check=True,
-                                    encoding='utf-8')
-            duration = float(result.stdout.strip())
+            duration = _probe_duration(target_video_file)
             screenshot_points = [
                 duration * p for p in [0.15, 0.30, 0.50, 0.70, 0.85]
             ]
@@ -1279,103 +822,67 @@ def upload_data_screenshot(source_info,
             print(f"错误: 连获取视频时长都失败了，无法截图。{e}")
             return ""
 
-    auth_token = _get_agsv_auth_token() if hoster == "agsv" else None
-    if hoster == "agsv" and not auth_token:
+    timings["时间点分析"] = time.perf_counter() - stage_start
+    _emit(f"截图时间点分析完成，耗时 {timings['时间点分析']:.1f} 秒")
+
+    if hoster == "agsv" and not _get_agsv_auth_token():
         print("❌ 无法获取 末日图床 Token，截图上传任务终止。")
         return ""
 
     uploaded_urls = []
     temp_files_to_cleanup = []
+    timestamp = f"{int(time.time()) % 1000000}"  # 更短的时间戳
+
+    _emit(f"正在并行截取 {len(screenshot_points)} 张截图...")
+    capture_start = time.perf_counter()
+    capture_end = upload_end = capture_start
+
+    with ThreadPoolExecutor(max_workers=SCREENSHOT_CAPTURE_WORKERS) as capture_pool, \
+            ThreadPoolExecutor(max_workers=SCREENSHOT_UPLOAD_WORKERS) as upload_pool:
+        capture_futures = {}
+        for i, screenshot_time in enumerate(screenshot_points):
+            final_jpeg_path = os.path.join(
+                TEMP_DIR, f"s_{i+1}_{timestamp}.jpg")  # 更短的文件名
+            temp_files_to_cleanup.append(final_jpeg_path)
+            future = capture_pool.submit(_capture_screenshot_jpeg,
+                                         target_video_file, screenshot_time,
+                                         final_jpeg_path)
+            capture_futures[future] = i
+
+        # 每张截图完成后立即提交上传，截图与上传流水线并行
+        # 上传任务 -> 截图序号，完成顺序不固定，最终按序号排列以保持时间线顺序
+        upload_futures = {}
+        for future in as_completed(capture_futures):
+            jpeg_path = future.result()
+            if jpeg_path:
+                upload_futures[upload_pool.submit(_upload_screenshot_with_retry,
+                                                  jpeg_path,
+                                                  hoster)] = capture_futures[future]
+        capture_end = time.perf_counter()
+        timings["截图"] = capture_end - capture_start
+        _emit(
+            f"截图完成 {len(upload_futures)}/{len(screenshot_points)} 张，耗时 {timings['截图']:.1f} 秒，正在上传..."
+        )
 
-    for i, screenshot_time in enumerate(screenshot_points):
-        print(f"\n--- 开始处理第 {i+1}/{len(screenshot_points)} 张截图 ---")
-
-        safe_name = re.sub(r'[\\/*?:"<>|\'\s\.]+', '_',
-                           source_info.get('main_title', f's_{i+1}'))  # 更短的文件名
-        timestamp = f"{int(time.time()) % 1000000}"  # 更短的时间戳
-        intermediate_png_path = os.path.join(
-            TEMP_DIR, f"s_{i+1}_{timestamp}.png")  # 更短的文件名
-        final_jpeg_path = os.path.join(TEMP_DIR,
-                                       f"s_{i+1}_{timestamp}.jpg")  # 更短的文件名
-        temp_files_to_cleanup.extend([intermediate_png_path, final_jpeg_path])
-
-        # --- [核心修改] ---
-        # 为 mpv 命令添加 HDR 色调映射参数
-        cmd_screenshot = [
-            "mpv",
-            "--no-audio",
-            f"--start={screenshot_time:.2f}",
-            "--frames=1",
-
-            # --- HDR 色调映射参数 ---
-            # 指定输出为标准的sRGB色彩空间，这是所有SDR图片的基础
-            "--target-trc=srgb",
-            # 使用 'hable' 算法进行色调映射，它能在保留高光和阴影细节方面取得良好平衡
-            "--tone-mapping=hable",
-            # 如果色彩依然不准，可以尝试更现代的 'bt.2390' 算法
-            # "--tone-mapping=bt.2390",
-            f"--o={intermediate_png_path}",
-            target_video_file
-        ]
-        # --- [核心修改结束] ---
-
-        try:
-            subprocess.run(cmd_screenshot,
-                           check=True,
-                           capture_output=True,
-                           timeout=180)
-
-            if not os.path.exists(intermediate_png_path):
-                print(f"❌ 错误: mpv 命令执行成功，但未找到输出文件 {intermediate_png_path}")
-                continue
-
-            print(
-                f"   -> 中间PNG图 {os.path.basename(intermediate_png_path)} 生成成功。"
-            )
-
-            try:
-                with Image.open(intermediate_png_path) as img:
-                    rgb_img = img.convert('RGB')
-                    rgb_img.save(final_jpeg_path, 'jpeg', quality=85)
-                print(
-                    f"   -> JPEG压缩成功 (质量: 85) -> {os.path.basename(final_jpeg_path)}"
-                )
-            except Exception as e:
-                print(f"   ❌ 错误: 图片从PNG转换为JPEG失败: {e}")
-                continue
-
-            max_retries = 3
-            image_url = None
-            for attempt in range(max_retries):
-                print(f"   -> 正在上传 (第 {attempt+1}/{max_retries} 次尝试)...")
-                try:
-                    if hoster == "agsv":
-                        image_url = _upload_to_agsv(final_jpeg_path,
-                                                    auth_token)
-                    else:
-                        image_url = _upload_to_pixhost(final_jpeg_path)
-                    if image_url:
-                        uploaded_urls.append(image_url)
-                        break
-                    else:
-                        time.sleep(2)
-                except Exception as e:
-                    print(f"   -> 上传尝试 {attempt+1} 出现异常: {e}")
-                    time.sleep(2)
-
-            if not image_url:
-                print(f"⚠️  第 {i+1} 张图片经过 {max_retries} 次尝试后仍然上传失败。")
+        uploaded_by_index = {}
+        for future in as_completed(upload_futures):
+            image_url = future.result()
+            if image_url:
+                uploaded_by_index[upload_futures[future]] = image_url
+        uploaded_urls = [url for _, url in sorted(uploaded_by_index.items())]
+        upload_end = time.perf_counter()
 
-        except subprocess.CalledProcessError as e:
-            error_output = e.stderr.decode('utf-8', errors='ignore')
-            print(f"❌ 错误: mpv 截图失败。")
-            print(f"   -> Stderr: {error_output}")
-            continue
-        except subprocess.TimeoutExpired:
-            print(f"❌ 错误: mpv 截图超时 (超过60秒)。")
-            continue
+    # 上传与截图重叠执行，这里统计截图全部完成之后额外等待上传的时间
+    timings["上传"] = upload_end - capture_end
+    timings["总计"] = time.perf_counter() - task_start
 
     print("\n--- 所有截图处理完毕 ---")
+    print("截图各阶段耗时: " +
+          ", ".join(f"{name} {seconds:.1f}s" for name, seconds in timings.items()))
+    _emit(
+        f"截图上传完成 {len(uploaded_urls)}/{len(screenshot_points)} 张，总耗时 {timings['总计']:.1f} 秒",
+        extra={"timings": {name: round(seconds, 2) for name, seconds in timings.items()}})
+
     print(f"正在清理临时目录中的 {len(temp_files_to_cleanup)} 个截图文件...")
     for item_path in temp_files_to_cleanup:
         try:
@@ -1389,7 +896,7 @@ def upload_data_screenshot(source_info,
         return ""
 
     bbcode_links = []
-    for url in sorted(uploaded_urls):
+    for url in uploaded_urls:
         if "pixhost.to/show/" in url:
             bbcode_links.append(
                 f"[img]{url.replace('https://pixhost.to/show/', 'https://img1.pixhost.to/images/')}[/img]"
@@ -1474,48 +981,134 @@ def upload_data_movie_info(douban_link: str, imdb_link: str):
     if not douban_link and not imdb_link:
         return False, "", "", "未提供豆瓣或IMDb链接。"
 
-    # 尝试每个API
-    last_error = ""
-    for api_config in api_configs:
-        try:
-            print(f"尝试使用API: {api_config['name']}")
-
-            if api_config['type'] == 'cspt_format':
-                # CSPT格式API (cspt.top)
-                success, poster, description, imdb_link_result = _call_cspt_format_api(
-                    api_config, douban_link, imdb_link)
-            elif api_config['type'] == 'tju_format':
-                # TJU格式API (ptgen.tju.pt) - 强制使用豆瓣模式
-                success, poster, description, imdb_link_result = _call_tju_format_api(
-                    api_config, douban_link, imdb_link)
-            elif api_config['type'] == 'url_format':
-                # URL格式API (workers.dev, homeqian.top)
-                success, poster, description, imdb_link_result = _call_url_format_api(
-                    api_config, douban_link, imdb_link)
-            elif api_config['type'] == 'iyuu_format':
-                # IYUU格式API (api.iyuu.cn)
-                success, poster, description, imdb_link_result = _call_iyuu_format_api(
-                    api_config, douban_link, imdb_link)
-            else:
-                continue
-
-            if success:
-                print(f"API {api_config['name']} 调用成功")
-                return True, poster, description, imdb_link_result
-            else:
-                last_error = description  # 错误信息存储在description中
-                print(f"API {api_config['name']} 返回失败: {last_error}")
+    # [新增] 优先使用按豆瓣/IMDb ID缓存的结果
+    settings = get_ptgen_cache_settings()
+    cache_keys = ptgen_cache_keys(douban_link, imdb_link)
+    if settings["enabled"]:
+        cached = ptgen_cache.get(cache_keys)
+        if cached:
+            print(f"PT-Gen缓存命中: {cache_keys[0]}")
+            poster, description, imdb_link_result = cached
+            return True, poster, description, imdb_link_result
+
+    success, api_config, poster, description, imdb_link_result = _query_ptgen_hedged(
+        provider_stats.order(api_configs), douban_link, imdb_link,
+        settings["hedge_delay_seconds"])
+    if not success:
+        # 所有API都失败
+        return False, "", "", f"所有PT-Gen API都失败。最后错误: {description}"
+
+    print(f"API {api_config['name']} 调用成功")
+    # 海报的智能验证和转存只对最终采用的结果执行一次
+    if api_config['type'] != 'tju_format':
+        poster = _resolve_ptgen_poster(poster)
+
+    if settings["enabled"]:
+        ptgen_cache.set(
+            cache_keys + [
+                key for key in ptgen_cache_keys(imdb_link=imdb_link_result)
+                if key not in cache_keys
+            ], poster, description, imdb_link_result)
+    return True, poster, description, imdb_link_result
+
+
+def _call_ptgen_api(api_config: dict, douban_link: str, imdb_link: str):
+    """调用单个PT-Gen API（不处理海报转存），并记录耗时与成败统计。"""
+    print(f"尝试使用API: {api_config['name']}")
+    start = time.time()
+    try:
+        if api_config['type'] == 'cspt_format':
+            # CSPT格式API (cspt.top)
+            result = _call_cspt_format_api(api_config, douban_link, imdb_link,
+                                           resolve_poster=False)
+        elif api_config['type'] == 'tju_format':
+            # TJU格式API (ptgen.tju.pt) - 强制使用豆瓣模式
+            result = _call_tju_format_api(api_config, douban_link, imdb_link)
+        elif api_config['type'] == 'url_format':
+            # URL格式API (workers.dev, homeqian.top)
+            result = _call_url_format_api(api_config, douban_link, imdb_link,
+                                          resolve_poster=False)
+        elif api_config['type'] == 'iyuu_format':
+            # IYUU格式API (api.iyuu.cn)
+            result = _call_iyuu_format_api(api_config, douban_link, imdb_link,
+                                           resolve_poster=False)
+        else:
+            result = (False, "", f"未知的API类型: {api_config['type']}", "")
+    except Exception as e:
+        result = (False, "", f"API {api_config['name']} 请求异常: {e}", "")
 
-        except Exception as e:
-            last_error = f"API {api_config['name']} 请求异常: {e}"
-            print(last_error)
-            continue
+    provider_stats.record(api_config['name'], result[0], time.time() - start)
+    if not result[0]:
+        # 错误信息存储在description中
+        print(f"API {api_config['name']} 返回失败: {result[2]}")
+    return result
 
-    # 所有API都失败
-    return False, "", "", f"所有PT-Gen API都失败。最后错误: {last_error}"
 
+def _query_ptgen_hedged(api_configs: list, douban_link: str, imdb_link: str,
+                        hedge_delay: float):
+    """
+    对冲请求多个PT-Gen API：先请求第一个API，若在 hedge_delay 秒内没有返回
+    （或已返回失败）则启动下一个，采用最先返回的成功结果。
+    未被采用的请求在后台自然结束，其耗时仍会计入统计。
 
-def _call_cspt_format_api(api_config: dict, douban_link: str, imdb_link: str):
+    返回: (是否成功, 采用的API配置, 海报, 简介/错误信息, IMDb链接)
+    """
+    executor = ThreadPoolExecutor(max_workers=max(1, len(api_configs)),
+                                  thread_name_prefix="ptgen")
+    futures = {}
+    remaining = list(api_configs)
+    last_error = ""
+    try:
+        while remaining or futures:
+            if remaining:
+                api_config = remaining.pop(0)
+                futures[executor.submit(_call_ptgen_api, api_config,
+                                        douban_link, imdb_link)] = api_config
+
+            done, _ = wait(list(futures),
+                           timeout=hedge_delay if remaining else None,
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                api_config = futures.pop(future)
+                success, poster, description, imdb_link_result = future.result()
+                if success:
+                    return True, api_config, poster, description, imdb_link_result
+                last_error = description
+    finally:
+        executor.shutdown(wait=False)
+
+    return False, None, "", last_error, ""
+
+
+def _resolve_ptgen_poster(poster: str) -> str:
+    """对PT-Gen返回的海报执行智能验证和转存，返回 [img] 标签。"""
+    img_match = re.search(r'\[img\](.*?)\[/img\]', poster or "")
+    if not img_match:
+        return poster
+
+    original_poster_url = img_match.group(1)
+    # 检查是否已经是pixhost图床
+    if 'pixhost.to' in original_poster_url:
+        # 已经是pixhost，直接使用
+        print(f"[*] 海报已是pixhost图床，直接使用: {original_poster_url}")
+        return f"[img]{original_poster_url}[/img]"
+
+    # 非pixhost，进行智能验证和转存
+    print(f"[*] 海报非pixhost图床，执行智能验证和转存...")
+    smart_poster_url = _get_smart_poster_url(original_poster_url)
+
+    if smart_poster_url:
+        print(f"[*] 智能验证和转存成功: {smart_poster_url}")
+        return f"[img]{smart_poster_url}[/img]"
+    # 智能获取失败，保留原URL
+    print(f"[*] 智能验证失败，使用原始URL")
+    return f"[img]{original_poster_url}[/img]"
+
+
+def _call_cspt_format_api(api_config: dict,
+                          douban_link: str,
+                          imdb_link: str,
+                          resolve_poster: bool = True):
     """
     调用CSPT格式API (cspt.top)
     API格式: https://cspt.top/api/ptgen/query/{token}?url=https://movie.douban.com/subject/2254648/
@@ -1543,7 +1136,8 @@ def _call_cspt_format_api(api_config: dict, douban_link: str, imdb_link: str):
             if text_content and ('[img]' in text_content
                                  or '◎' in text_content):
                 # 直接返回文本内容作为format
-                return _parse_format_content(text_content)
+                return _parse_format_content(text_content,
+                                             resolve_poster=resolve_poster)
             else:
                 return False, "", "API返回了无效的内容格式", ""
 
@@ -1558,7 +1152,8 @@ def _call_cspt_format_api(api_config: dict, douban_link: str, imdb_link: str):
             format_data = data.get('format', data.get('content', ''))
             if format_data:
                 return _parse_format_content(format_data,
-                                             data.get('imdb_link', ''))
+                                             data.get('imdb_link', ''),
+                                             resolve_poster=resolve_poster)
             else:
                 return False, "", "API未返回有效的格式化内容", ""
         else:
@@ -1624,7 +1219,10 @@ def _call_tju_format_api(api_config: dict, douban_link: str, imdb_link: str):
         return False, "", f"TJU格式API调用失败: {e}", ""
 
 
-def _call_url_format_api(api_config: dict, douban_link: str, imdb_link: str):
+def _call_url_format_api(api_config: dict,
+                         douban_link: str,
+                         imdb_link: str,
+                         resolve_poster: bool = True):
     """
     调用URL格式API (workers.dev, homeqian.top)
     """
@@ -1644,7 +1242,8 @@ def _call_url_format_api(api_config: dict, douban_link: str, imdb_link: str):
             if text_content and ('[img]' in text_content
                                  or '◎' in text_content):
                 # 直接返回文本内容作为format
-                return _parse_format_content(text_content)
+                return _parse_format_content(text_content,
+                                             resolve_poster=resolve_poster)
             else:
                 return False, "", "API返回了无效的内容格式", ""
 
@@ -1659,7 +1258,8 @@ def _call_url_format_api(api_config: dict, douban_link: str, imdb_link: str):
             format_data = data.get('format', data.get('content', ''))
             if format_data:
                 return _parse_format_content(format_data,
-                                             data.get('imdb_link', ''))
+                                             data.get('imdb_link', ''),
+                                             resolve_poster=resolve_poster)
             else:
                 return False, "", "API未返回有效的格式化内容", ""
         else:
@@ -1669,7 +1269,10 @@ def _call_url_format_api(api_config: dict, douban_link: str, imdb_link: str):
         return False, "", f"URL格式API调用失败: {e}", ""
 
 
-def _call_iyuu_format_api(api_config: dict, douban_link: str, imdb_link: str):
+def _call_iyuu_format_api(api_config: dict,
+                          douban_link: str,
+                          imdb_link: str,
+                          resolve_poster: bool = True):
     """
     调用IYUU格式API (api.iyuu.cn)
     """
@@ -1692,16 +1295,19 @@ def _call_iyuu_format_api(api_config: dict, douban_link: str, imdb_link: str):
         if not format_data:
             return False, "", "API未返回有效的简介内容", ""
 
-        return _parse_format_content(format_data)
+        return _parse_format_content(format_data,
+                                     resolve_poster=resolve_poster)
 
     except Exception as e:
         return False, "", f"IYUU格式API调用失败: {e}", ""
 
 
-def _parse_format_content(format_data: str, provided_imdb_link: str = ""):
+def _parse_format_content(format_data: str,
+                          provided_imdb_link: str = "",
+                          resolve_poster: bool = True):
     """
     解析格式化内容，提取海报、简介和IMDb链接
-    自动对海报进行智能验证和转存到pixhost
+    resolve_poster 为 True 时自动对海报进行智能验证和转存到pixhost
     """
     try:
         # 提取信息
@@ -1717,28 +1323,12 @@ def _parse_format_content(format_data: str, provided_imdb_link: str = ""):
             if imdb_match:
                 extracted_imdb_link = imdb_match.group(1)
 
-        # 提取海报图片并进行智能验证和转存
+        # 提取海报图片
         img_match = re.search(r'\[img\](.*?)\[/img\]', format_data)
         if img_match:
-            original_poster_url = img_match.group(1)
-
-            # 检查是否已经是pixhost图床
-            if 'pixhost.to' in original_poster_url or 'img1.pixhost.to' in original_poster_url:
-                # 已经是pixhost，直接使用
-                print(f"[*] 海报已是pixhost图床，直接使用: {original_poster_url}")
-                poster = f"[img]{original_poster_url}[/img]"
-            else:
-                # 非pixhost，进行智能验证和转存
-                print(f"[*] 海报非pixhost图床，执行智能验证和转存...")
-                smart_poster_url = _get_smart_poster_url(original_poster_url)
-
-                if smart_poster_url:
-                    poster = f"[img]{smart_poster_url}[/img]"
-                    print(f"[*] 智能验证和转存成功: {smart_poster_url}")
-                else:
-                    # 智能获取失败，保留原URL
-                    print(f"[*] 智能验证失败，使用原始URL")
-                    poster = f"[img]{original_poster_url}[/img]"
+            poster = f"[img]{img_match.group(1)}[/img]"
+            if resolve_poster:
+                poster = _resolve_ptgen_poster(poster)
 
         # 提取简介内容（去除海报部分）
         description = re.sub(r'\[img\].*?\[/img\]', '', format_data).strip()
@@ -1786,7 +1376,8 @@ def add_torrent_to_downloader(detail_page_url: str, save_path: str,
     # 1. 查找对应的站点配置
     conn = db_manager._get_connection()
     cursor = db_manager._get_cursor(conn)
-    cursor.execute("SELECT nickname, base_url, cookie, speed_limit FROM sites")
+    cursor.execute(
+        "SELECT nickname, site, base_url, cookie, speed_limit FROM sites")
     site_info = None
     for site in cursor.fetchall():
         # [修复] 确保 base_url 存在且不为空
@@ -1813,92 +1404,101 @@ def add_torrent_to_downloader(detail_page_url: str, save_path: str,
         # 站点级别的代理已不使用全局代理配置
         proxies = None
 
-        # Add retry logic for network requests
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                details_response = scraper.get(detail_page_url,
-                                               headers=common_headers,
-                                               timeout=180,
-                                               proxies=proxies)
-                break  # Success, exit retry loop
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logging.warning(
-                        f"Attempt {attempt + 1} failed to fetch details page: {e}. Retrying..."
-                    )
-                    time.sleep(2**attempt)  # Exponential backoff
-                else:
-                    raise  # Re-raise the exception if all retries failed
-        details_response.raise_for_status()
-
-        soup = BeautifulSoup(details_response.text, "html.parser")
-
         # 检查是否需要使用特殊下载器
         site_base_url = ensure_scheme(site_info['base_url'])
-        full_download_url = None  # 初始化full_download_url
+        is_haidan = 'haidan' in site_base_url
 
         print(f"站点基础URL: {site_base_url}")
 
-        # 检查是否为haidan站点
-        if 'haidan' in site_base_url:
-            # Haidan站点需要提取torrent_id而不是id
+        # 从详情页URL中提取种子ID（Haidan站点使用torrent_id而不是id）
+        if is_haidan:
             torrent_id_match = re.search(r"torrent_id=(\d+)", detail_page_url)
             if not torrent_id_match:
                 raise ValueError("无法从详情页URL中提取种子ID（torrent_id）。")
-            torrent_id = torrent_id_match.group(1)
-            # Haidan站点的特殊逻辑
-            download_link_tag = soup.find(
-                'a', href=re.compile(r"download.php\?id="))
+        else:
+            torrent_id_match = re.search(r"id=(\d+)", detail_page_url)
+            if not torrent_id_match: raise ValueError("无法从详情页URL中提取种子ID。")
+        torrent_id = torrent_id_match.group(1)
+        cache_site = site_info.get("site") or site_info["nickname"]
 
-            if not download_link_tag: raise RuntimeError("在详情页HTML中未能找到下载链接！")
+        max_retries = 3
 
-            download_url_part = str(download_link_tag['href'])  # 显式转换为str
+        def _fetch_details(extra_headers):
+            # Add retry logic for network requests
+            for attempt in range(max_retries):
+                try:
+                    return scraper.get(detail_page_url,
+                                       headers={
+                                           **common_headers,
+                                           **extra_headers
+                                       },
+                                       timeout=180,
+                                       proxies=proxies)
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        logging.warning(
+                            f"Attempt {attempt + 1} failed to fetch details page: {e}. Retrying..."
+                        )
+                        time.sleep(2**attempt)  # Exponential backoff
+                    else:
+                        raise  # Re-raise the exception if all retries failed
 
-            # 替换下载链接中的id为从detail_page_url中提取的torrent_id
-            download_url_part = re.sub(r"id=\d+", f"id={torrent_id}",
-                                       download_url_part)
+        def _build_download_url():
+            details_html = fetch_cache.get_page(
+                cache_site,
+                torrent_id,
+                _fetch_details,
+                is_valid=lambda html: "download.php?id=" in html)
+            soup = parse_html(details_html)
 
-            full_download_url = f"{site_base_url}/{download_url_part}"
-        else:
-            # 其他站点的通用逻辑 - 提取id参数
-            torrent_id_match = re.search(r"id=(\d+)", detail_page_url)
-            if not torrent_id_match: raise ValueError("无法从详情页URL中提取种子ID。")
-            torrent_id = torrent_id_match.group(1)
-
-            download_link_tag = soup.select_one(
-                f'a.index[href^="download.php?id={torrent_id}"]')
-            if not download_link_tag: raise RuntimeError("在详情页HTML中未能找到下载链接！")
-
-            download_url_part = str(download_link_tag['href'])  # 显式转换为str
-            full_download_url = f"{site_base_url}/{download_url_part}"
-
-        # 确保full_download_url已被赋值
-        if not full_download_url:
-            raise RuntimeError("未能成功构建种子下载链接！")
-
-        print(f"种子下载链接: {full_download_url}")
-
-        common_headers["Referer"] = detail_page_url
-        # Add retry logic for torrent download
-        for attempt in range(max_retries):
-            try:
-                torrent_response = scraper.get(full_download_url,
-                                               headers=common_headers,
-                                               timeout=180,
-                                               proxies=proxies)
-                torrent_response.raise_for_status()
-                break  # Success, exit retry loop
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logging.warning(
-                        f"Attempt {attempt + 1} failed to download torrent: {e}. Retrying..."
-                    )
-                    time.sleep(2**attempt)  # Exponential backoff
-                else:
-                    raise  # Re-raise the exception if all retries failed
+            if is_haidan:
+                # Haidan站点的特殊逻辑
+                download_link_tag = soup.find(
+                    'a', href=re.compile(r"download.php\?id="))
 
-        torrent_content = torrent_response.content
+                if not download_link_tag: raise RuntimeError("在详情页HTML中未能找到下载链接！")
+
+                download_url_part = str(download_link_tag['href'])  # 显式转换为str
+
+                # 替换下载链接中的id为从detail_page_url中提取的torrent_id
+                download_url_part = re.sub(r"id=\d+", f"id={torrent_id}",
+                                           download_url_part)
+            else:
+                # 其他站点的通用逻辑
+                download_link_tag = soup.select_one(
+                    f'a.index[href^="download.php?id={torrent_id}"]')
+                if not download_link_tag: raise RuntimeError("在详情页HTML中未能找到下载链接！")
+
+                download_url_part = str(download_link_tag['href'])  # 显式转换为str
+
+            return f"{site_base_url}/{download_url_part}"
+
+        def _fetch_torrent():
+            full_download_url = _build_download_url()
+            print(f"种子下载链接: {full_download_url}")
+
+            headers = {**common_headers, "Referer": detail_page_url}
+            # Add retry logic for torrent download
+            for attempt in range(max_retries):
+                try:
+                    torrent_response = scraper.get(full_download_url,
+                                                   headers=headers,
+                                                   timeout=180,
+                                                   proxies=proxies)
+                    torrent_response.raise_for_status()
+                    return torrent_response
+                except Exception as e:
+                    if attempt < max_retries - 1:
+                        logging.warning(
+                            f"Attempt {attempt + 1} failed to download torrent: {e}. Retrying..."
+                        )
+                        time.sleep(2**attempt)  # Exponential backoff
+                    else:
+                        raise  # Re-raise the exception if all retries failed
+
+        # [新增] 种子文件通过抓取缓存获取，命中时无需再请求详情页和下载链接
+        torrent_content, _ = fetch_cache.get_torrent(cache_site, torrent_id,
+                                                     _fetch_torrent)
         logging.info("已成功下载有效的种子文件内容。")
 
     except Exception as e:
@@ -2257,265 +1857,17 @@ def check_animation_type_from_description(description_text: str) -> bool:
 
 def extract_tags_from_mediainfo(mediainfo_text: str) -> list:
     """
-    从 MediaInfo 文本中提取关键词，并返回一个标准化的标签列表。
+    从 MediaInfo / BDInfo 文本中提取关键词，并返回一个标准化的标签列表。
 
     :param mediainfo_text: 完整的 MediaInfo 报告字符串。
-    :return: 一个包含识别出的标签字符串的列表，例如 ['tag.国语', 'tag.中字', 'tag.HDR10']。
+    :return: 一个包含识别出的标签字符串的列表，例如 ['tag.国语', 'tag.中字']。
     """
     if not mediainfo_text:
         return []
 
-    found_tags = set()
-    lines = mediainfo_text.split('\n')  # 不转小写，保持原始大小写
-
-    # 定义关键词到标准化标签的映射
-    tag_keywords_map = {
-        # 语言标签
-        '国语': ['国语', 'mandarin'],
-        '粤语': ['粤语', 'cantonese'],
-        '英语': ['英语', 'english'],
-        '日语': ['日语', 'Japanese', 'japanese'],
-        '韩语': ['韩语', 'korean'],
-        '法语': ['法语', 'french'],
-        '德语': ['德语', 'german'],
-        '俄语': ['俄语', 'russian'],
-        '印地语': ['印地语', 'hindi'],
-        '西班牙语': ['西班牙语', 'spanish'],
-        '葡萄牙语': ['葡萄牙语', 'portuguese'],
-        '意大利语': ['意大利语', 'italian'],
-        '泰语': ['泰语', 'thai'],
-        '阿拉伯语': ['阿拉伯语', 'arabic'],
-        '外语': ['外语', 'foreign'],
-        # 字幕标签
-        '中字': ['中字', 'chinese', '简', '繁'],
-        '英字': ['英字', 'english'],
-        # HDR 格式标签
-        'Dolby Vision': ['dolby vision', '杜比视界'],
-        'HDR10+': ['hdr10+'],
-        'HDR10': ['hdr10'],
-        'HDR': ['hdr'],  # 作为通用 HDR 的备用选项
-        'HDRVivid': ['hdr vivid'],
-    }
-
-    # 定义检查范围
-    # current_section 用于记录当前 MediaInfo 正在处理的 Section 类型 (General, Video, Audio, Text)
-    current_section = None
-    # 用于收集当前 Audio Section 的所有行，以便后续语言检测
-    current_audio_section_lines = []
-    # 用于收集当前 Video Section 的所有行，以便后续语言检测
-    current_video_section_lines = []
-
-    for line in lines:
-        line_stripped = line.strip()
-        line_lower = line_stripped.lower()
-
-        # 判定当前处于哪个信息块
-        if line_lower.startswith('general'):
-            current_section = 'general'
-            # 在 General Section 结束时处理之前的 Audio/Video Section
-            if current_audio_section_lines:
-                _process_audio_section_languages(current_audio_section_lines,
-                                                 found_tags)
-                current_audio_section_lines = []
-            if current_video_section_lines:
-                _process_video_section_languages(current_video_section_lines,
-                                                 found_tags)
-                current_video_section_lines = []
-            continue
-        elif line_lower.startswith('video'):
-            current_section = 'video'
-            if current_audio_section_lines:
-                _process_audio_section_languages(current_audio_section_lines,
-                                                 found_tags)
-                current_audio_section_lines = []
-            current_video_section_lines = [line_stripped]  # 开始新的 Video 块
-            continue
-        elif line_lower.startswith('audio'):
-            # 先处理之前的 Audio 块
-            if current_audio_section_lines:
-                _process_audio_section_languages(current_audio_section_lines,
-                                                 found_tags)
-            # 处理之前的 Video 块
-            if current_video_section_lines:
-                _process_video_section_languages(current_video_section_lines,
-                                                 found_tags)
-                current_video_section_lines = []
-            # 开始新的 Audio 块
-            current_section = 'audio'
-            current_audio_section_lines = [line_stripped]
-            continue
-        elif line_lower.startswith('text'):
-            current_section = 'text'
-            if current_audio_section_lines:
-                _process_audio_section_languages(current_audio_section_lines,
-                                                 found_tags)
-                current_audio_section_lines = []
-            if current_video_section_lines:
-                _process_video_section_languages(current_video_section_lines,
-                                                 found_tags)
-                current_video_section_lines = []
-            continue
-        # 其他 Section 暂不处理，直接跳过或者可以定义为 'other'
-        elif not line_stripped:  # 空行表示一个Section的结束，可以触发处理
-            if current_audio_section_lines and current_section != 'audio':  # 如果是空行且之前是音频块，则处理
-                _process_audio_section_languages(current_audio_section_lines,
-                                                 found_tags)
-                current_audio_section_lines = []
-            if current_video_section_lines and current_section != 'video':  # 如果是空行且之前是视频块，则处理
-                _process_video_section_languages(current_video_section_lines,
-                                                 found_tags)
-                current_video_section_lines = []
-            current_section = None  # 重置当前section
-            continue
-
-        # 收集当前 Section 的行
-        if current_section == 'audio':
-            current_audio_section_lines.append(line_stripped)
-        elif current_section == 'video':
-            current_video_section_lines.append(line_stripped)
-        elif current_section == 'text':
-            # 仅在 Text 块中检查字幕标签
-            if '中字' in tag_keywords_map and any(
-                    kw in line_lower for kw in tag_keywords_map['中字']):
-                found_tags.add('中字')
-            if '英字' in tag_keywords_map and any(
-                    kw in line_lower for kw in tag_keywords_map['英字']):
-                found_tags.add('英字')
-
-        # 检查 HDR 格式标签 (全局检查)
-        # 注意：这里保持全局检查是因为 HDR 格式可能出现在 General/Video 等多个地方
-        if 'dolby vision' in tag_keywords_map and any(
-                kw in line_lower for kw in tag_keywords_map['Dolby Vision']):
-            found_tags.add('Dolby Vision')
-        if 'hdr10+' in tag_keywords_map and any(
-                kw in line_lower for kw in tag_keywords_map['HDR10+']):
-            found_tags.add('HDR10+')
-        if 'hdr10' in tag_keywords_map and any(
-                kw in line_lower for kw in tag_keywords_map['HDR10']):
-            found_tags.add('HDR10')
-        elif 'hdr' in tag_keywords_map and any(
-                kw in line_lower for kw in tag_keywords_map['HDR']):
-            if not any(hdr_tag in found_tags
-                       for hdr_tag in ['Dolby Vision', 'HDR10+', 'HDR10']):
-                found_tags.add('HDR')
-        if 'hdrvivid' in tag_keywords_map and any(
-                kw in line_lower for kw in tag_keywords_map['HDRVivid']):
-            found_tags.add('HDRVivid')
-
-    # 处理文件末尾可能存在的 Audio/Video Section
-    if current_audio_section_lines:
-        _process_audio_section_languages(current_audio_section_lines,
-                                         found_tags)
-    if current_video_section_lines:
-        _process_video_section_languages(current_video_section_lines,
-                                         found_tags)
-
-    # 为所有标签添加 tag. 前缀
-    prefixed_tags = set()
-    for tag in found_tags:
-        if not tag.startswith('tag.'):  # 避免重复添加 tag.
-            prefixed_tags.add(f'tag.{tag}')
-        else:
-            prefixed_tags.add(tag)
-
-    print(f"从 MediaInfo 中提取到的标签: {list(prefixed_tags)}")
-    return list(prefixed_tags)
-
-
-def _process_audio_section_languages(audio_lines, found_tags):
-    """辅助函数：处理音频块中的语言检测"""
-    language = _check_language_in_section(audio_lines)
-
-    if language:
-        if language == '国语':
-            found_tags.add('国语')
-        elif language == '粤语':
-            found_tags.add('粤语')
-        else:  # 其他语言
-            found_tags.add(language)
-            found_tags.add('外语')
-        print(f"   -> 从音频块中提取到语言: {language}")
-
-
-def _process_video_section_languages(video_lines, found_tags):
-    """辅助函数：处理视频块中的语言检测"""
-    language = _check_language_in_section(video_lines)
-    if language:
-        if language == '国语':
-            found_tags.add('国语')
-        elif language == '粤语':
-            found_tags.add('粤语')
-        else:  # 其他语言
-            found_tags.add(language)
-            found_tags.add('外语')
-        print(f"   -> 从视频块中提取到语言: {language}")
-
-
-def _check_language_in_section(section_lines) -> str | None:
-    """
-    通用函数:检查指定 Section 块中是否包含语言相关标识。
-
-    :param section_lines: Section 块的所有行
-    :return: 如果检测到语言返回具体语言名称,否则返回None
-    """
-    language_keywords_map = {
-        '国语': [
-            '中文', 'chinese', 'mandarin', '国语', '普通话', 'mandrin', 'cmn',
-            'mainland'
-        ],
-        '粤语': ['cantonese', '粤语', '广东话', '香港话', 'canton', 'hk', 'hongkong'],
-        '台配': [
-            '台配国语', '台配', 'tw', 'taiwan', 'twi', '台湾', '台语', '闽南语',
-            'taiwanese', 'taiwan mandarin'
-        ],
-        '英语': ['english', '英语'],
-        '日语': ['japanese', '日语'],
-        '韩语': ['korean', '韩语'],
-        '法语': ['french', '法语'],
-        '德语': ['german', '德语'],
-        '俄语': ['russian', '俄语'],
-        '印地语': ['hindi', '印地语'],
-        '西班牙语': ['spanish', '西班牙语', 'latin america'],
-        '葡萄牙语': ['portuguese', '葡萄牙语', 'br'],
-        '意大利语': ['italian', '意大利语'],
-        '泰语': ['thai', '泰语'],
-        '阿拉伯语': ['arabic', '阿拉伯语', 'sa'],
-    }
-
-    for line in section_lines:
-        if not line:
-            continue
-        line_lower = line.lower()
-
-        # 优先检查 Title: 字段（因为中文音轨常在这里标注）
-        if 'title' in line_lower and ':' in line_lower:
-            # 提取 Title 字段的值
-            title_match = re.search(r'title\s*:\s*(.+)', line_lower,
-                                    re.IGNORECASE)
-            if title_match:
-                title_value = title_match.group(1).strip()
-                # 检查 Title 值中是否包含语言关键词
-                for lang, keywords in language_keywords_map.items():
-                    for keyword in keywords:
-                        keyword_lower = keyword.lower()
-                        if keyword_lower in title_value:
-                            return lang
-
-        # 其次检查 Language: 字段
-        if 'language' in line_lower and ':' in line_lower:
-            # 提取 Language 字段的值
-            lang_match = re.search(r'language\s*:\s*(.+)', line_lower,
-                                   re.IGNORECASE)
-            if lang_match:
-                lang_value = lang_match.group(1).strip()
-                # 检查 Language 值中是否包含语言关键词
-                for lang, keywords in language_keywords_map.items():
-                    for keyword in keywords:
-                        keyword_lower = keyword.lower()
-                        if keyword_lower in lang_value:
-                            return lang
-
-    return None
+    tags = list(analyze_mediainfo(mediainfo_text).tags)
+    print(f"从 MediaInfo 中提取到的标签: {tags}")
+    return tags
 
 
 def extract_origin_from_description(description_text: str) -> str:
@@ -2563,130 +1915,14 @@ def extract_origin_from_description(description_text: str) -> str:
 
 def extract_resolution_from_mediainfo(mediainfo_text: str) -> str:
     """
-    从 MediaInfo 文本中提取分辨率信息。
+    从 MediaInfo / BDInfo 文本中提取分辨率信息。
 
     :param mediainfo_text: 完整的 MediaInfo 报告字符串。
     :return: 分辨率信息，例如 "720p"、"1080p"、"2160p" 等
     """
     if not mediainfo_text:
         return ""
-
-    # 查找 Video 部分
-    video_section_match = re.search(r"Video[\s\S]*?(?=\n\n|\Z)",
-                                    mediainfo_text)
-    if not video_section_match:
-        return ""
-
-    video_section = video_section_match.group(0)
-
-    # 查找分辨率信息
-    # 匹配格式如：Width                                 : 1 920 pixels
-    #            Height                                : 1 080 pixels
-    # 处理带空格的数字格式，如 "1 920" -> "1920"
-    width_match = re.search(r"[Ww]idth\s*:\s*(\d+)\s*(\d*)\s*pixels?",
-                            video_section)
-    height_match = re.search(r"[Hh]eight\s*:\s*(\d+)\s*(\d*)\s*pixels?",
-                             video_section)
-
-    width = None
-    height = None
-
-    if width_match:
-        # 处理带空格的数字格式，如 "1 920" -> "1920"
-        w_groups = width_match.groups()
-        if w_groups and len(w_groups) >= 2 and w_groups[1]:
-            width = int(f"{w_groups[0]}{w_groups[1]}")
-        elif w_groups and len(w_groups) >= 1 and w_groups[0]:
-            width = int(w_groups[0])
-        else:
-            width = None
-
-    if height_match:
-        # 处理带空格的数字格式，如 "1 080" -> "1080"
-        h_groups = height_match.groups()
-        if h_groups and len(h_groups) >= 2 and h_groups[1]:
-            height = int(f"{h_groups[0]}{h_groups[1]}")
-        elif h_groups and len(h_groups) >= 1 and h_groups[0]:
-            height = int(h_groups[0])
-        else:
-            height = None
-
-    # 如果没有找到标准格式，尝试其他格式
-    if not width or not height:
-        # 备用方法：查找类似 "1920 / 1080" 的格式
-        resolution_match = re.search(r"(\d{3,4})\s*/\s*(\d{3,4})",
-                                     video_section)
-        if resolution_match:
-            width = int(resolution_match.group(1))
-            height = int(resolution_match.group(2))
-        else:
-            # 查找其他格式的分辨率信息
-            other_resolution_match = re.search(r"(\d{3,4})\s*[xX]\s*(\d{3,4})",
-                                               mediainfo_text)
-            if other_resolution_match:
-                width = int(other_resolution_match.group(1))
-                height = int(other_resolution_match.group(2))
-
-    # 如果找到了宽度和高度，转换为标准格式
-    if width and height:
-        # 根据高度确定标准分辨率
-        if height <= 480:
-            return "480p"
-        elif height <= 576:
-            return "576p"
-        elif height <= 720:
-            return "720p"
-        elif height <= 1080:
-            return "1080p"
-        elif height <= 1440:
-            return "1440p"
-        elif height <= 2160:
-            return "2160p"
-        else:
-            # 对于其他非标准分辨率，返回原始高度加p
-            return f"{height}p"
-
-    return ""
-
-
-def _upload_to_pixhost_direct(image_path: str, api_url: str, params: dict,
-                              headers: dict):
-    """直接上传图片到Pixhost"""
-    try:
-        with open(image_path, 'rb') as f:
-            files = {'img': f}
-            print("正在发送上传请求到 Pixhost...")
-            response = requests.post(api_url,
-                                     data=params,
-                                     files=files,
-                                     headers=headers,
-                                     timeout=30)
-
-            if response.status_code == 200:
-                data = response.json()
-                show_url = data.get('show_url')
-                print(f"直接上传成功！图片链接: {show_url}")
-                return show_url
-            else:
-                print(f"   ❌ 直接上传失败 (状态码: {response.status_code})")
-                return None
-    except FileNotFoundError:
-        print(f"   ❌ 错误: 找不到图片文件")
-        return None
-    except requests.exceptions.SSLError as e:
-        print(f"   ❌ 直接上传失败: SSL连接错误")
-        return None
-    except requests.exceptions.ConnectionError as e:
-        print(f"   ❌ 直接上传失败: 网络连接被重置")
-        return None
-    except requests.exceptions.Timeout:
-        print(f"   ❌ 直接上传失败: 请求超时")
-        return None
-    except Exception as e:
-        # 只打印异常类型和简短描述，不打印完整堆栈
-        error_type = type(e).__name__
-        print(f"   ❌ 直接上传失败: {error_type}")
-        return None
+    return analyze_mediainfo(mediainfo_text).resolution
 
 
 def _get_downloader_proxy_config(downloader_id: str = None):
@@ -2806,57 +2042,9 @@ def check_intro_completeness(body_text: str) -> dict:
     }
 
 
-def is_image_url_valid_robust(url: str) -> bool:
-    """
-    一个更稳健的方法，当HEAD请求失败时，会尝试使用GET请求（流式）进行验证。
-    如果直接请求失败，会尝试使用全局代理重试一次。
-    """
-    if not url:
-        return False
-
-    # 第一次尝试：不使用代理
-    try:
-        # 首先尝试HEAD请求，允许重定向
-        response = requests.head(url, timeout=5, allow_redirects=True)
-        response.raise_for_status()  # 如果状态码不是2xx，则抛出异常
-
-        # 检查Content-Type
-        content_type = response.headers.get('Content-Type')
-        if content_type and content_type.startswith('image/'):
-            return True
-        else:
-            logging.warning(
-                f"链接有效但内容可能不是图片: {url} (Content-Type: {content_type})")
-            return False
-
-    except requests.exceptions.RequestException:
-        # 如果HEAD请求失败，尝试GET请求
-        try:
-            response = requests.get(url,
-                                    stream=True,
-                                    timeout=5,
-                                    allow_redirects=True)
-            response.raise_for_status()
-
-            # 检查Content-Type
-            content_type = response.headers.get('Content-Type')
-            if content_type and content_type.startswith('image/'):
-                return True
-            else:
-                logging.warning(
-                    f"链接有效但内容可能不是图片: {url} (Content-Type: {content_type})")
-                return False
-
-        except requests.exceptions.RequestException as e:
-            logging.warning(f"图片链接GET请求也失败了: {url} - {e}")
-
-            # 不使用全局代理重试，直接返回失败
-            return False
-
-
 def extract_audio_codec_from_mediainfo(mediainfo_text: str) -> str:
     """
-    从 MediaInfo 文本中提取第一个音频流的格式。
+    从 MediaInfo / BDInfo 文本中提取第一个音频流的格式。
 
     :param mediainfo_text: 完整的 MediaInfo 报告字符串。
     :return: 音频格式字符串 (例如 "DTS", "AC-3", "FLAC")，如果找不到则返回空字符串。
@@ -2864,24 +2052,12 @@ def extract_audio_codec_from_mediainfo(mediainfo_text: str) -> str:
     if not mediainfo_text:
         return ""
 
-    # 查找第一个 Audio 部分 (支持 "Audio" 和 "Audio #1")
-    audio_section_match = re.search(r"Audio(?: #1)?[\s\S]*?(?=\n\n|\Z)",
-                                    mediainfo_text)
-    if not audio_section_match:
-        logging.warning("在MediaInfo中未找到 'Audio' 部分。")
-        return ""
-
-    audio_section = audio_section_match.group(0)
-
-    # 在 Audio 部分查找 Format
-    format_match = re.search(r"Format\s*:\s*(.+)", audio_section)
-    if format_match:
-        audio_format = format_match.group(1).strip()
-        logging.info(f"从MediaInfo的'Audio'部分提取到格式: {audio_format}")
-        return audio_format
-
-    logging.warning("在MediaInfo的'Audio'部分未找到 'Format' 信息。")
-    return ""
+    audio_codec = analyze_mediainfo(mediainfo_text).audio_codec
+    if audio_codec:
+        logging.info(f"从MediaInfo的'Audio'部分提取到格式: {audio_codec}")
+    else:
+        logging.warning("在MediaInfo中未找到音频格式信息。")
+    return audio_codec
 
 
 def _get_smart_poster_url(original_url: str) -> str:
@@ -2937,30 +2113,33 @@ def _get_smart_poster_url(original_url: str) -> str:
 
         print(f"生成 {len(candidates)} 个候选URL")
 
-        # 依次验证候选URL
-        for i, candidate_url in enumerate(candidates):
+        # 并发验证候选URL，按优先级取第一个有效的
+        def _report(i, candidate_url, valid):
             domain_info = re.search(r'img(\d+)\.doubanio\.com', candidate_url)
             path_info = '高清' if 'l_ratio_poster' in candidate_url else '中清'
             domain_num = domain_info.group(1) if domain_info else '?'
-
             print(
                 f"测试 [{i+1}/{len(candidates)}] img{domain_num} ({path_info}): {candidate_url}"
             )
-
-            if _validate_image_url(candidate_url):
+            if valid:
                 print(f"✓ 验证成功！使用 img{domain_num} 域名")
-                print(f"[*] 智能海报获取成功: {candidate_url}")
-
-                # 转存到pixhost
-                pixhost_url = _transfer_poster_to_pixhost(candidate_url)
-                if pixhost_url:
-                    return pixhost_url
-                else:
-                    print("[!] pixhost转存失败，使用原始验证URL")
-                    return candidate_url
             else:
                 print(f"✗ img{domain_num} 验证失败")
 
+        candidate_url = find_first_valid_image_url(candidates,
+                                                   kind="poster",
+                                                   on_result=_report)
+        if candidate_url:
+            print(f"[*] 智能海报获取成功: {candidate_url}")
+
+            # 转存到pixhost
+            pixhost_url = _transfer_poster_to_pixhost(candidate_url)
+            if pixhost_url:
+                return pixhost_url
+            else:
+                print("[!] pixhost转存失败，使用原始验证URL")
+                return candidate_url
+
         # 豆瓣全部失败，尝试第三方托管
         print("豆瓣官方图片全部失败，尝试第三方托管...")
 
@@ -3012,52 +2191,12 @@ def _get_smart_poster_url(original_url: str) -> str:
 def _validate_image_url(url: str) -> bool:
     """
     验证图片URL是否有效
-    使用HEAD请求验证URL是否可访问且返回有效图片
+    使用HEAD请求验证URL是否可访问且返回有效图片（结果会被缓存）
     
     :param url: 图片URL
     :return: URL有效返回True，否则返回False
     """
-    if not url:
-        return False
-
-    try:
-        headers = {
-            'User-Agent':
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Referer': 'https://movie.douban.com/'
-        }
-
-        response = requests.head(url,
-                                 headers=headers,
-                                 timeout=10,
-                                 allow_redirects=True)
-
-        if response.status_code == 200:
-            # 检查Content-Type
-            content_type = response.headers.get('Content-Type', '').lower()
-            if 'image/' in content_type:
-                # 检查Content-Length（至少大于1KB）
-                content_length = response.headers.get('Content-Length')
-                if content_length:
-                    file_size = int(content_length)
-                    if file_size > 1024:
-                        return True
-                    else:
-                        print(f"   文件太小: {file_size} bytes")
-                        return False
-                else:
-                    # 如果没有Content-Length，认为有效
-                    return True
-            else:
-                print(f"   无效的Content-Type: {content_type}")
-                return False
-        else:
-            print(f"   HTTP状态码: {response.status_code}")
-            return False
-
-    except Exception as e:
-        print(f"   验证异常: {type(e).__name__}")
-        return False
+    return image_validator.validate(url, kind="poster")
 
 
 def _transfer_poster_to_pixhost(poster_url: str) -> str:
@@ -3094,61 +2233,24 @@ def _transfer_poster_to_pixhost(poster_url: str) -> str:
 
         print(f"   图片下载成功，大小: {len(response.content)} bytes")
 
-        # 2. 保存到临时文件
-        temp_file = None
-        try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as f:
-                f.write(response.content)
-                temp_file = f.name
-
-            print(f"   临时文件已保存: {temp_file}")
-
-            # 3. 上传到pixhost
-            api_url = 'https://api.pixhost.to/images'
-            params = {'content_type': 0, 'max_th_size': 420}
-            upload_headers = {
-                'User-Agent':
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/json'
-            }
-
-            with open(temp_file, 'rb') as f:
-                files = {'img': ('poster.jpg', f, 'image/jpeg')}
-                upload_response = requests.post(api_url,
-                                                data=params,
-                                                files=files,
-                                                headers=upload_headers,
-                                                timeout=30)
-
-            if upload_response.status_code == 200:
-                data = upload_response.json()
-                show_url = data.get('show_url')
-
-                if not show_url:
-                    print("   API未返回有效URL")
-                    return ""
-
-                # 转换为直链URL
-                direct_url = _convert_pixhost_url_to_direct(show_url)
-
-                if direct_url:
-                    print(f"   上传成功！直链: {direct_url}")
-                    return direct_url
-                else:
-                    print("   URL转换失败")
-                    return ""
-            else:
-                print(f"   上传失败，状态码: {upload_response.status_code}")
-                return ""
+        # 2. 上传到pixhost（同一张海报转种到多个站点时只上传一次）
+        show_url = pixhost_client.upload_bytes(response.content,
+                                               'poster.jpg',
+                                               'image/jpeg',
+                                               max_th_size=420)
+        if not show_url:
+            print("   上传失败，API未返回有效URL")
+            return ""
 
-        finally:
-            # 清理临时文件
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                    print(f"   临时文件已清理: {temp_file}")
-                except:
-                    pass
+        # 转换为直链URL
+        direct_url = _convert_pixhost_url_to_direct(show_url)
+
+        if direct_url:
+            print(f"   上传成功！直链: {direct_url}")
+            return direct_url
+        else:
+            print("   URL转换失败")
+            return ""
 
     except Exception as e:
         print(f"   转存失败: {type(e).__name__} - {e}")
@@ -0,0 +1,102 @@
+# utils/media_probe_cache.py
+"""
+媒体探测结果持久化缓存
+
+ffprobe / MediaInfo 的探测结果（时长、字幕流、字幕事件时间点、MediaInfo 文本等）
+以 (文件路径, 文件大小, 修改时间) 为键保存到 DATA_DIR 下的 SQLite 数据库中。
+同一个视频在文件未发生变化时只需要探测一次，转种到多个站点时可直接复用。
+"""
+
+import json
+import os
+import time
+
+from config import DATA_DIR
+from utils.sqlite_cache import SqliteCache
+
+CACHE_DB_FILE = os.path.join(DATA_DIR, "media_probe_cache.db")
+
+# 超过该天数未更新的缓存条目会在启动时清理
+MAX_AGE_DAYS = 90
+
+
+class MediaProbeCache(SqliteCache):
+    """基于 SQLite 的媒体探测结果缓存（线程安全）。"""
+
+    label = "媒体探测缓存"
+    table = "media_probe_cache"
+    schema = """
+        CREATE TABLE IF NOT EXISTS media_probe_cache (
+            path TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime REAL NOT NULL,
+            value TEXT NOT NULL,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (path, kind)
+        )
+    """
+    timestamp_column = "updated_at"
+
+    def __init__(self, db_file: str = CACHE_DB_FILE):
+        super().__init__(db_file)
+
+    def ttl_seconds(self):
+        return MAX_AGE_DAYS * 86400
+
+    @staticmethod
+    def _file_signature(path: str):
+        """返回文件的 (大小, 修改时间)，文件不存在时返回 None。"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime
+
+    def get(self, path: str, kind: str):
+        """
+        读取缓存的探测结果。
+
+        :param path: 视频文件路径
+        :param kind: 探测结果类型（如 duration、subtitle_streams、mediainfo）
+        :return: 缓存的值；未命中或文件已变化时返回 None
+        """
+        signature = self._file_signature(path)
+        if signature is None:
+            return None
+        row = self._query_one(
+            "SELECT size, mtime, value FROM media_probe_cache WHERE path = ? AND kind = ?",
+            (path, kind))
+        if not row or (row[0], row[1]) != signature:
+            return None
+        return json.loads(row[2])
+
+    def set(self, path: str, kind: str, value):
+        """写入探测结果（value 需可 JSON 序列化）。"""
+        signature = self._file_signature(path)
+        if signature is None:
+            return
+        self._write(
+            "INSERT OR REPLACE INTO media_probe_cache (path, kind, size, mtime, value, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (path, kind, signature[0], signature[1],
+             json.dumps(value, ensure_ascii=False), time.time()))
+
+    def get_or_compute(self, path: str, kind: str, compute):
+        """
+        优先返回缓存结果，未命中时调用 compute() 计算并写入缓存。
+
+        compute() 抛出的异常会直接向上传递；返回 None 时不写入缓存。
+        """
+        value = self.get(path, kind)
+        if value is not None:
+            print(f"   -> 媒体探测缓存命中: {kind} ({os.path.basename(path)})")
+            return value
+        value = compute()
+        if value is not None:
+            self.set(path, kind, value)
+        return value
+
+
+# 全局媒体探测缓存实例
+media_probe_cache = MediaProbeCache()
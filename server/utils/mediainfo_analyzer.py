@@ -0,0 +1,351 @@
+# utils/mediainfo_analyzer.py
+"""
+MediaInfo / BDInfo 报告分析器
+
+将报告文本一次性解析为按信息块划分的结构化模型（General / Video / Audio / Text 等），
+标签、分辨率、音频编码的提取都基于该模型完成，不再各自重复切分和扫描全文。
+分析结果按文本的 SHA-1 缓存，同一份报告在一次转种和多个目标站点之间只分析一次。
+
+支持的 BDInfo 格式:
+- 完整报告: DISC INFO / PLAYLIST REPORT / VIDEO / AUDIO / SUBTITLES 表格
+- 快速摘要: "Video: ..." / "Audio: ..." / "Subtitle: ..." 行
+"""
+
+import collections
+import hashlib
+import re
+import threading
+
+# 缓存的最大报告数
+MAX_CACHED_REPORTS = 256
+
+# MediaInfo 的信息块名称（块标题行以这些单词开头且不含冒号，如 "Audio #1"）
+MEDIAINFO_SECTION_KINDS = ("general", "video", "audio", "text", "menu", "image",
+                           "other")
+
+# BDInfo 完整报告中的表格块与统一后的轨道类型
+BDINFO_TABLE_KINDS = {
+    "VIDEO": "video",
+    "AUDIO": "audio",
+    "SUBTITLES": "text",
+}
+# BDInfo 快速摘要行与统一后的轨道类型
+BDINFO_SUMMARY_KINDS = {
+    "video": "video",
+    "audio": "audio",
+    "subtitle": "text",
+}
+
+# 语言检测关键词（匹配音频/视频轨道的 Title 和 Language 字段，按顺序优先）
+LANGUAGE_KEYWORDS_MAP = {
+    '国语': [
+        '中文', 'chinese', 'mandarin', '国语', '普通话', 'mandrin', 'cmn',
+        'mainland'
+    ],
+    '粤语': ['cantonese', '粤语', '广东话', '香港话', 'canton', 'hk', 'hongkong'],
+    '台配': [
+        '台配国语', '台配', 'tw', 'taiwan', 'twi', '台湾', '台语', '闽南语',
+        'taiwanese', 'taiwan mandarin'
+    ],
+    '英语': ['english', '英语'],
+    '日语': ['japanese', '日语'],
+    '韩语': ['korean', '韩语'],
+    '法语': ['french', '法语'],
+    '德语': ['german', '德语'],
+    '俄语': ['russian', '俄语'],
+    '印地语': ['hindi', '印地语'],
+    '西班牙语': ['spanish', '西班牙语', 'latin america'],
+    '葡萄牙语': ['portuguese', '葡萄牙语', 'br'],
+    '意大利语': ['italian', '意大利语'],
+    '泰语': ['thai', '泰语'],
+    '阿拉伯语': ['arabic', '阿拉伯语', 'sa'],
+}
+
+# 字幕标签关键词（匹配字幕轨道的所有字段）
+SUBTITLE_KEYWORDS_MAP = {
+    '中字': ['中字', 'chinese', '简', '繁'],
+    '英字': ['英字', 'english'],
+}
+
+_BDINFO_RE = re.compile(r"DISC INFO|^\s*Disc (?:Title|Label|Size)\s*:",
+                        re.IGNORECASE | re.MULTILINE)
+_BDINFO_TABLE_HEADER_RE = re.compile(r"^([A-Z][A-Z ]+):\s*$")
+_BDINFO_SUMMARY_RE = re.compile(r"^(Video|Audio|Subtitle)\s*:\s*(.+)$", re.IGNORECASE)
+_COLUMN_SPLIT_RE = re.compile(r"\s{2,}")
+_FIELD_RE = re.compile(r"^([^:]+?)\s*:\s*(.*)$")
+_TITLE_FIELD_RE = re.compile(r'title\s*:\s*(.+)', re.IGNORECASE)
+_LANGUAGE_FIELD_RE = re.compile(r'language\s*:\s*(.+)', re.IGNORECASE)
+_PIXELS_RE = re.compile(r"(\d+)\s*(\d*)\s*pixels?")
+_SLASH_RESOLUTION_RE = re.compile(r"(\d{3,4})\s*/\s*(\d{3,4})")
+_X_RESOLUTION_RE = re.compile(r"(\d{3,4})\s*[xX]\s*(\d{3,4})")
+_SCAN_RESOLUTION_RE = re.compile(r"(?<!\d)(\d{3,4})[pi](?!\w)")
+
+
+class MediaSection:
+    """报告中的一个信息块 / 轨道。"""
+
+    __slots__ = ("kind", "header", "lines", "fields")
+
+    def __init__(self, kind, header):
+        self.kind = kind
+        self.header = header
+        # 块内的原始行（已去除首尾空白，不含标题行和空行）
+        self.lines = []
+        # (字段名, 值) 列表，保持原始顺序
+        self.fields = []
+
+    def add_line(self, line):
+        self.lines.append(line)
+        field_match = _FIELD_RE.match(line)
+        if field_match:
+            self.fields.append((field_match.group(1), field_match.group(2).strip()))
+
+    def get(self, key, default=""):
+        """返回第一个名称与 key 相同（不区分大小写）的字段值。"""
+        key_lower = key.lower()
+        for name, value in self.fields:
+            if name.lower() == key_lower:
+                return value
+        return default
+
+
+class MediaInfoReport:
+    """解析后的 MediaInfo / BDInfo 报告。"""
+
+    def __init__(self, text):
+        self.text = text
+        self.is_bdinfo = bool(_BDINFO_RE.search(text))
+        self.sections = (_parse_bdinfo(text)
+                         if self.is_bdinfo else _parse_mediainfo(text))
+
+    def tracks(self, kind):
+        return [section for section in self.sections if section.kind == kind]
+
+
+class MediaInfoAnalysis:
+    """一份报告的分析结果。"""
+
+    __slots__ = ("report", "tags", "resolution", "audio_codec", "languages")
+
+    def __init__(self, report):
+        self.report = report
+        self.languages = _detect_languages(report)
+        self.tags = _extract_tags(report, self.languages)
+        self.resolution = _extract_resolution(report)
+        self.audio_codec = _extract_audio_codec(report)
+
+
+def _parse_mediainfo(text):
+    sections = []
+    current = None
+    for line in text.split('\n'):
+        line_stripped = line.strip()
+        if not line_stripped:
+            continue
+        line_lower = line_stripped.lower()
+        if ':' not in line_stripped and line_lower.startswith(MEDIAINFO_SECTION_KINDS):
+            current = MediaSection(line_lower.split()[0].split('#')[0], line_stripped)
+            sections.append(current)
+        elif current is not None:
+            current.add_line(line_stripped)
+    return sections
+
+
+def _parse_bdinfo(text):
+    table_tracks = []
+    summary_tracks = []
+    table_kind = None
+    columns = None
+
+    for line in text.split('\n'):
+        line_stripped = line.strip()
+        if not line_stripped:
+            continue
+
+        header_match = _BDINFO_TABLE_HEADER_RE.match(line_stripped)
+        if header_match:
+            table_kind = BDINFO_TABLE_KINDS.get(header_match.group(1).strip())
+            columns = None
+            continue
+
+        if table_kind:
+            if columns is None:
+                # 表头: Codec  Language  Bitrate  Description
+                if line_stripped.startswith("Codec"):
+                    columns = _COLUMN_SPLIT_RE.split(line_stripped)
+                continue
+            if set(line_stripped) <= {'-', ' '}:
+                continue
+            # "* " 开头的是隐藏轨道
+            cells = _COLUMN_SPLIT_RE.split(line_stripped.lstrip('* ').strip())
+            track = MediaSection(table_kind, line_stripped)
+            for name, value in zip(columns, cells):
+                track.add_line(f"{name} : {value}")
+            table_tracks.append(track)
+            continue
+
+        summary_match = _BDINFO_SUMMARY_RE.match(line_stripped)
+        if summary_match:
+            kind = BDINFO_SUMMARY_KINDS[summary_match.group(1).lower()]
+            parts = [p.strip() for p in summary_match.group(2).split(" / ")]
+            track = MediaSection(kind, line_stripped)
+            if kind == "video":
+                names = ["Codec", "Bitrate"]
+            elif kind == "audio":
+                names = ["Language", "Codec"]
+            else:
+                names = ["Language", "Bitrate"]
+            for name, value in zip(names, parts):
+                track.add_line(f"{name} : {value}")
+            if len(parts) > len(names):
+                track.add_line(f"Description : {' / '.join(parts[len(names):])}")
+            summary_tracks.append(track)
+
+    # 完整报告中也可能附带快速摘要，某类轨道在表格中已存在时不再重复计入
+    table_kinds = {track.kind for track in table_tracks}
+    return table_tracks + [
+        track for track in summary_tracks if track.kind not in table_kinds
+    ]
+
+
+def _check_language_in_lines(lines):
+    """检查轨道的 Title / Language 字段，返回检测到的语言名称或 None。"""
+    for line in lines:
+        line_lower = line.lower()
+
+        # 优先检查 Title: 字段（因为中文音轨常在这里标注）
+        if 'title' in line_lower and ':' in line_lower:
+            title_match = _TITLE_FIELD_RE.search(line_lower)
+            if title_match:
+                title_value = title_match.group(1).strip()
+                for lang, keywords in LANGUAGE_KEYWORDS_MAP.items():
+                    if any(keyword in title_value for keyword in keywords):
+                        return lang
+
+        # 其次检查 Language: 字段
+        if 'language' in line_lower and ':' in line_lower:
+            lang_match = _LANGUAGE_FIELD_RE.search(line_lower)
+            if lang_match:
+                lang_value = lang_match.group(1).strip()
+                for lang, keywords in LANGUAGE_KEYWORDS_MAP.items():
+                    if any(keyword in lang_value for keyword in keywords):
+                        return lang
+    return None
+
+
+def _detect_languages(report):
+    """返回音频/视频轨道中检测到的语言列表（按轨道顺序）。"""
+    languages = []
+    for section in report.sections:
+        if section.kind not in ("audio", "video"):
+            continue
+        language = _check_language_in_lines(section.lines)
+        if language:
+            languages.append(language)
+            print(f"   -> 从{'音频' if section.kind == 'audio' else '视频'}块中提取到语言: {language}")
+    return languages
+
+
+def _extract_tags(report, languages):
+    found_tags = set()
+    for language in languages:
+        found_tags.add(language)
+        if language not in ('国语', '粤语'):
+            found_tags.add('外语')
+
+    # 仅在字幕轨道中检查字幕标签
+    for section in report.tracks("text"):
+        for line in section.lines:
+            line_lower = line.lower()
+            for tag, keywords in SUBTITLE_KEYWORDS_MAP.items():
+                if any(kw in line_lower for kw in keywords):
+                    found_tags.add(tag)
+
+    return tuple(sorted(f'tag.{tag}' for tag in found_tags))
+
+
+def _height_to_resolution(height):
+    """根据高度确定标准分辨率。"""
+    if height <= 480:
+        return "480p"
+    elif height <= 576:
+        return "576p"
+    elif height <= 720:
+        return "720p"
+    elif height <= 1080:
+        return "1080p"
+    elif height <= 1440:
+        return "1440p"
+    elif height <= 2160:
+        return "2160p"
+    # 对于其他非标准分辨率，返回原始高度加p
+    return f"{height}p"
+
+
+def _parse_pixels(value):
+    """解析 "1 920 pixels" 这类带空格的数字格式。"""
+    match = _PIXELS_RE.search(value)
+    if not match:
+        return None
+    return int(f"{match.group(1)}{match.group(2)}")
+
+
+def _extract_resolution(report):
+    videos = report.tracks("video")
+    if not videos:
+        return ""
+    video = videos[0]
+
+    if report.is_bdinfo:
+        scan_match = _SCAN_RESOLUTION_RE.search(" / ".join(video.lines))
+        return _height_to_resolution(int(scan_match.group(1))) if scan_match else ""
+
+    width = _parse_pixels(video.get("Width"))
+    height = _parse_pixels(video.get("Height"))
+
+    # 如果没有找到标准格式，尝试其他格式
+    if not width or not height:
+        # 备用方法：查找类似 "1920 / 1080" 的格式
+        resolution_match = _SLASH_RESOLUTION_RE.search("\n".join(video.lines))
+        if not resolution_match:
+            resolution_match = _X_RESOLUTION_RE.search(report.text)
+        if resolution_match:
+            width = int(resolution_match.group(1))
+            height = int(resolution_match.group(2))
+
+    if width and height:
+        return _height_to_resolution(height)
+    return ""
+
+
+def _extract_audio_codec(report):
+    audios = report.tracks("audio")
+    if not audios:
+        return ""
+    return audios[0].get("Codec" if report.is_bdinfo else "Format")
+
+
+_cache = collections.OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def analyze_mediainfo(mediainfo_text: str) -> MediaInfoAnalysis:
+    """
+    分析 MediaInfo / BDInfo 报告，结果按文本哈希缓存。
+
+    :param mediainfo_text: 完整的报告字符串
+    :return: MediaInfoAnalysis（tags / resolution / audio_codec / languages / report）
+    """
+    digest = hashlib.sha1(mediainfo_text.encode("utf-8", "replace")).hexdigest()
+    with _cache_lock:
+        analysis = _cache.get(digest)
+        if analysis is not None:
+            _cache.move_to_end(digest)
+            return analysis
+
+    analysis = MediaInfoAnalysis(MediaInfoReport(mediainfo_text))
+    with _cache_lock:
+        _cache[digest] = analysis
+        while len(_cache) > MAX_CACHED_REPORTS:
+            _cache.popitem(last=False)
+    return analysis
@@ -0,0 +1,246 @@
+# utils/metrics.py
+"""
+进程内性能指标（计数器与直方图），通过 /metrics 以 Prometheus 文本格式导出
+
+- 热点路径通过直方图的 time() 上下文管理器或 timed() 装饰器记录耗时，开销只是一次加锁和若干加法
+- 所有指标在本模块中集中定义，名称统一使用 ptnexus_ 前缀
+- 标签只使用取值有限的字段（下载器ID、路由模板、阶段名称），不使用种子名称等无界取值
+- 指标保存在各进程内存中：gunicorn 多 worker 部署时每个 worker 只导出自己的数据，
+  DataTracker / IYUU 等后台线程的指标只在运行后台服务的 worker 中出现
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import wraps
+
+# 默认直方图分桶（秒），覆盖毫秒级数据库操作到分钟级的种子刷新
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+# 行数类直方图的分桶
+ROW_BUCKETS = (1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape_label(value) -> str:
+    return (str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace(
+        "\n", "\\n"))
+
+
+def _format_labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class _Metric(ABC):
+    """
+    指标基类：按标签值保存数据（线程安全）。
+
+    子类实现 _render_series(pairs, value)，返回单个标签组合对应的导出行。
+    """
+
+    metric_type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}  # 标签值元组 -> 数据
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"指标 {self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.metric_type}"
+        ]
+        with self._lock:
+            series = sorted(self._series.items())
+            series = [(key, self._copy(value)) for key, value in series]
+        for key, value in series:
+            lines.extend(self._render_series(list(zip(self.labelnames, key)),
+                                             value))
+        return lines
+
+    def _copy(self, value):
+        return value
+
+    @abstractmethod
+    def _render_series(self, pairs, value) -> list:
+        """
+        抽象方法：将一个标签组合的数据渲染为 Prometheus 文本格式的行。
+        """
+        raise NotImplementedError("每个指标类型都必须实现 _render_series 方法")
+
+
+class Counter(_Metric):
+    """单调递增的计数器。"""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _render_series(self, pairs, value) -> list:
+        return [f"{self.name}{_format_labels(pairs)} {_format_value(value)}"]
+
+
+class Histogram(_Metric):
+    """分桶直方图，记录耗时或行数的分布。"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [各分桶计数..., 总和, 总次数]
+                series = [0] * len(self.buckets) + [0.0, 0]
+                self._series[key] = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """记录 with 语句块的耗时（秒），块内抛出异常时同样记录。"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """装饰器形式的 time()。"""
+
+        def decorator(func):
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _copy(self, value):
+        return list(value)
+
+    def _render_series(self, pairs, value) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, value):
+            cumulative += count
+            lines.append(
+                f"{self.name}_bucket{_format_labels(pairs + [('le', _format_value(float(bound)))])} {cumulative}"
+            )
+        lines.append(
+            f"{self.name}_bucket{_format_labels(pairs + [('le', '+Inf')])} {value[-1]}"
+        )
+        lines.append(
+            f"{self.name}_sum{_format_labels(pairs)} {_format_value(value[-2])}")
+        lines.append(
+            f"{self.name}_count{_format_labels(pairs)} {value[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """指标注册表，负责按 Prometheus 文本格式导出全部指标。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames=(),
+                  buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"指标 {metric.name} 已注册")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# --- DataTracker ---
+TRACKER_TICK_SECONDS = metrics.histogram(
+    "ptnexus_tracker_tick_seconds", "DataTracker 每个周期获取单个下载器统计信息的耗时",
+    ("downloader", "result"))
+TRAFFIC_FLUSH_SECONDS = metrics.histogram(
+    "ptnexus_traffic_flush_seconds", "流量缓冲写入数据库的耗时", ("result", ))
+TRAFFIC_FLUSH_ROWS = metrics.histogram("ptnexus_traffic_flush_rows",
+                                       "每次流量缓冲写入数据库的记录数",
+                                       buckets=ROW_BUCKETS)
+
+# --- 种子列表刷新 ---
+TORRENT_REFRESH_PHASE_SECONDS = metrics.histogram(
+    "ptnexus_torrent_refresh_phase_seconds",
+    "种子列表刷新各阶段耗时（fetch/normalize 按下载器，其余为整个周期）",
+    ("phase", "downloader"))
+TORRENT_REFRESH_ERRORS = metrics.counter("ptnexus_torrent_refresh_errors_total",
+                                         "种子列表刷新失败次数", ("phase", ))
+
+# --- IYUU ---
+IYUU_REQUEST_SECONDS = metrics.histogram("ptnexus_iyuu_request_seconds",
+                                         "IYUU API 单次 HTTP 请求耗时",
+                                         ("endpoint", "result"))
+IYUU_WAIT_SECONDS = metrics.histogram(
+    "ptnexus_iyuu_wait_seconds", "IYUU 请求前的等待时间（频率控制或失败重试）", ("reason", ))
+
+# --- HTTP ---
+HTTP_REQUEST_SECONDS = metrics.histogram("ptnexus_http_request_seconds",
+                                         "HTTP 请求处理耗时（按路由模板）",
+                                         ("method", "route", "status"))
+
+# --- 数据库 ---
+DB_CONNECT_SECONDS = metrics.histogram(
+    "ptnexus_db_connect_seconds", "获取数据库连接的等待时间（每次操作新建连接）", ("db_type", ))
+
+# --- 转种 ---
+MIGRATION_STEP_SECONDS = metrics.histogram(
+    "ptnexus_migration_step_seconds", "转种任务各步骤耗时（按日志流中的步骤名称）",
+    ("step", "status"))
+PUBLISH_SECONDS = metrics.histogram("ptnexus_publish_seconds",
+                                    "转种流程阶段耗时（获取参数 prepare / 发布 publish）",
+                                    ("stage", ))
@@ -0,0 +1,149 @@
+# utils/pagination.py
+"""
+列表分页辅助：键集（游标）分页与缓存的总数
+
+- 游标: 上一页最后一行的排序键值，编码为 URL 安全的字符串。下一页查询使用
+  (排序列...) < (游标值...) 从复合索引直接定位，不再随页码增大而 OFFSET 扫描更多行
+- 总数: COUNT(*) 结果按 (表, WHERE 条件, 参数) 缓存。过期或被标记为失效后先返回旧值，
+  同时在后台线程重新统计；从未统计过的条件才会同步执行 COUNT(*)
+"""
+
+import base64
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+
+# 缓存的总数在该时间内视为最新
+COUNT_TTL_SECONDS = 60
+
+# 最多缓存的筛选条件组合数（搜索关键词各不相同，需要限制）
+MAX_CACHED_COUNTS = 256
+
+
+def encode_cursor(values) -> str:
+    """将一行的排序键值编码为游标字符串。"""
+
+    def _plain(value):
+        if isinstance(value, (datetime, date)):
+            # 与数据库中的时间字符串格式一致，作为参数回传时可直接比较
+            return str(value)
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    raw = json.dumps([_plain(v) for v in values], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(token: str, length: int):
+    """
+    解析游标字符串。
+
+    :return: 排序键值列表；格式不正确或长度不符时返回 None（调用方回退为 OFFSET 分页）
+    """
+    if not token:
+        return None
+    try:
+        values = json.loads(
+            base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    return values
+
+
+class CountCache:
+    """按查询条件缓存 COUNT(*) 结果，过期后在后台刷新（线程安全）。"""
+
+    def __init__(self, ttl_seconds: int = COUNT_TTL_SECONDS,
+                 max_entries: int = MAX_CACHED_COUNTS):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counts = {}  # key -> (count, counted_at, generation)
+        self._generations = {}  # table -> generation
+        self._refreshing = set()
+        self._executor = None
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # 延迟创建，避免 gunicorn 预加载后 fork 出的 worker 继承父进程的线程池
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=2, thread_name_prefix="count-refresh")
+        return self._executor
+
+    def get(self, db_manager, table: str, where_clause: str, params) -> int:
+        """返回满足条件的行数。"""
+        key = (table, where_clause, tuple(params))
+        refresh = False
+        with self._lock:
+            cached = self._counts.get(key)
+            generation = self._generations.get(table, 0)
+            if cached is not None:
+                fresh = (cached[2] == generation
+                         and time.time() - cached[1] < self.ttl_seconds)
+                if not fresh and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    refresh = True
+
+        if cached is None:
+            return self._count(db_manager, key)
+        if refresh:
+            self.executor.submit(self._refresh, db_manager, key)
+        return cached[0]
+
+    def invalidate(self, *tables):
+        """表数据变化后调用：已缓存的总数继续使用，但下次读取时会在后台重新统计。"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def _refresh(self, db_manager, key):
+        try:
+            self._count(db_manager, key)
+        except Exception as e:
+            logging.warning(f"后台刷新 {key[0]} 总数失败: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def _count(self, db_manager, key) -> int:
+        table, where_clause, params = key
+        with self._lock:
+            generation = self._generations.get(table, 0)
+
+        conn = db_manager._get_connection()
+        cursor = db_manager._get_cursor(conn)
+        try:
+            cursor.execute(
+                f"SELECT COUNT(*) AS total FROM {table} {where_clause}",
+                list(params))
+            row = cursor.fetchone()
+            count = row[0] if isinstance(row, tuple) else row['total']
+        finally:
+            cursor.close()
+            conn.close()
+
+        with self._lock:
+            if key not in self._counts and len(self._counts) >= self.max_entries:
+                # 淘汰最早统计的条目
+                oldest = min(self._counts, key=lambda k: self._counts[k][1])
+                del self._counts[oldest]
+            self._counts[key] = (count, time.time(), generation)
+        return count
+
+
+count_cache = CountCache()
+
+
+def invalidate_counts(*tables):
+    """写入或删除数据后调用，使对应表的缓存总数在后台刷新。"""
+    count_cache.invalidate(*tables)
@@ -0,0 +1,318 @@
+# utils/proxy_client.py
+"""
+pt-nexus-box-proxy 客户端（远程下载器所在服务器上运行的代理）
+
+- 每个代理地址使用一个持久的 requests.Session（Keep-Alive 连接池），
+  每秒一次的统计请求不再每次新建 TCP 连接
+- 响应压缩按本机 urllib3 支持的编码协商（gzip/deflate，安装了 zstandard/brotli 时包含 zstd/br）
+- 种子列表的 comment 和 trackers 按 (下载器, 种子哈希) 缓存：之后的周期先获取不含详情的列表，
+  只为新出现或缓存过期的种子请求详情（代理的 detail_hashes 参数，旧版代理忽略该参数时返回全部详情）
+- 大的种子列表按数组元素流式解析，不需要先把整个响应解码为一个字符串
+- 远程文件存在性检查按固定大小分块、多块并发，超时或失败的块拆半重试，结果随完成合并
+"""
+
+import codecs
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# 代理默认端口
+DEFAULT_PROXY_PORT = 9090
+
+# 种子详情（comment、trackers）缓存有效期，过期后重新获取以反映 Tracker 的变化
+DETAIL_CACHE_TTL_SECONDS = 3600
+
+STATS_TIMEOUT_SECONDS = 10
+TORRENTS_TIMEOUT_SECONDS = 180
+
+# 流式解析时每次读取的字节数
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# 远程文件检查：每个请求的路径数、同时进行的请求数、单个请求超时、每块最多尝试次数
+FILE_CHECK_CHUNK_SIZE = 500
+FILE_CHECK_MAX_WORKERS = 4
+FILE_CHECK_TIMEOUT_SECONDS = 60
+FILE_CHECK_MAX_ATTEMPTS = 3
+
+
+def get_proxy_base_url(downloader_config) -> str:
+    """从下载器配置的 host 中提取IP地址，返回代理服务器地址。"""
+    host_value = downloader_config['host']
+
+    # 如果host已经包含协议，直接解析；否则添加http://前缀
+    if host_value.startswith(('http://', 'https://')):
+        parsed_url = urlparse(host_value)
+    else:
+        parsed_url = urlparse(f"http://{host_value}")
+
+    proxy_ip = parsed_url.hostname
+    if not proxy_ip:
+        # 如果无法解析，使用备用方法
+        if '://' in host_value:
+            proxy_ip = host_value.split('://')[1].split(':')[0].split('/')[0]
+        else:
+            proxy_ip = host_value.split(':')[0]
+
+    proxy_port = downloader_config.get('proxy_port', DEFAULT_PROXY_PORT)
+    return f"http://{proxy_ip}:{proxy_port}"
+
+
+def build_proxy_downloader_config(downloader_config) -> dict:
+    """构造发送给代理的下载器配置（代理与下载器在同一台服务器上，通过 127.0.0.1 访问）。"""
+    host_value = downloader_config['host']
+    if not host_value.startswith(('http://', 'https://')):
+        host_value = f"http://{host_value}"
+    port = urlparse(host_value).port or 8080
+    return {
+        "id": downloader_config['id'],
+        "type": downloader_config['type'],
+        "host": f"http://127.0.0.1:{port}",
+        "username": downloader_config.get('username', ''),
+        "password": downloader_config.get('password', '')
+    }
+
+
+def iter_json_array(response, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    流式解析 JSON 数组响应，逐个返回数组元素。
+
+    响应已按 Content-Encoding 解压；只在内存中保留尚未解析完的部分。
+    """
+    decoder = json.JSONDecoder()
+    utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+    chunks = response.iter_content(chunk_size=chunk_size)
+    buffer, pos = "", 0
+    started = exhausted = False
+
+    while True:
+        # 跳过空白、分隔符和数组起始符
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char in " \t\r\n,":
+                pos += 1
+            elif not started:
+                if char != "[":
+                    raise ValueError("代理响应不是 JSON 数组")
+                started = True
+                pos += 1
+            else:
+                break
+
+        if started and pos < len(buffer):
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # 元素跨越了块边界，读取更多数据后重试
+                if exhausted:
+                    raise
+            else:
+                # 元素之后必须是 "," 或 "]"。数字可能在块边界被截断（"[4." + "5]" 只解析出 4），
+                # 未读到分隔符时先读取更多数据，再从元素开头重新解析
+                next_pos = end
+                while next_pos < len(buffer) and buffer[next_pos] in " \t\r\n":
+                    next_pos += 1
+                if next_pos < len(buffer) and buffer[next_pos] in ",]":
+                    yield item
+                    pos = end
+                    continue
+
+        if exhausted:
+            raise ValueError("代理响应中的 JSON 数组不完整")
+        chunk = next(chunks, None)
+        buffer = buffer[pos:]
+        pos = 0
+        if chunk is None:
+            exhausted = True
+            buffer += utf8_decoder.decode(b"", final=True)
+        else:
+            buffer += utf8_decoder.decode(chunk)
+
+
+class ProxyClient:
+    """pt-nexus-box-proxy 客户端：按代理地址复用连接，并缓存种子详情（线程安全）。"""
+
+    def __init__(self, detail_ttl_seconds: int = DETAIL_CACHE_TTL_SECONDS):
+        self.detail_ttl_seconds = detail_ttl_seconds
+        self._lock = threading.Lock()
+        self._sessions = {}  # base_url -> Session
+        self._details = {}  # downloader_id -> {hash: (comment, trackers, fetched_at)}
+
+    def session(self, base_url: str) -> requests.Session:
+        # 延迟创建，避免 gunicorn 预加载后 fork 出的 worker 共享父进程的连接
+        session = self._sessions.get(base_url)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(base_url)
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+                    self._sessions[base_url] = session
+        return session
+
+    def get_stats(self, downloader_config, timeout=STATS_TIMEOUT_SECONDS):
+        """获取下载器的统计信息（代理返回列表中的第一项），代理返回空列表时返回 None。"""
+        base_url = get_proxy_base_url(downloader_config)
+        response = self.session(base_url).post(
+            f"{base_url}/api/stats/server",
+            json=[build_proxy_downloader_config(downloader_config)],
+            timeout=timeout)
+        response.raise_for_status()
+        stats_data = response.json()
+        return stats_data[0] if stats_data else None
+
+    def get_torrents(self, downloader_config, timeout=TORRENTS_TIMEOUT_SECONDS):
+        """
+        获取下载器的完整种子信息（包含 comment 和 trackers）。
+
+        首次获取时一次请求全部详情；之后只为新种子或详情已过期的种子请求详情，
+        其余种子使用缓存的详情。
+        """
+        downloader_id = downloader_config['id']
+        with self._lock:
+            cache = self._details.get(downloader_id)
+
+        if not cache:
+            torrents = self._fetch_torrents(downloader_config, True, timeout)
+            now = time.time()
+            cache = {
+                t["hash"]: (t.get("comment", ""), t.get("trackers") or [], now)
+                for t in torrents
+            }
+        else:
+            torrents = self._fetch_torrents(downloader_config, False, timeout)
+            now = time.time()
+            stale = [
+                t["hash"] for t in torrents
+                if t["hash"] not in cache
+                or now - cache[t["hash"]][2] > self.detail_ttl_seconds
+            ]
+            if stale:
+                logging.debug(
+                    f"代理 '{downloader_config['name']}': 为 {len(stale)}/{len(torrents)} 个种子获取详情"
+                )
+                stale_set = set(stale)
+                cache = dict(cache)
+                for t in self._fetch_torrents(downloader_config, True, timeout,
+                                              detail_hashes=stale):
+                    if t["hash"] in stale_set:
+                        cache[t["hash"]] = (t.get("comment", ""),
+                                            t.get("trackers") or [], now)
+
+            current_hashes = {t["hash"] for t in torrents}
+            cache = {h: v for h, v in cache.items() if h in current_hashes}
+            for t in torrents:
+                entry = cache.get(t["hash"])
+                if entry:
+                    t["comment"], t["trackers"] = entry[0], entry[1]
+
+        with self._lock:
+            self._details[downloader_id] = cache
+        return torrents
+
+    def check_remote_paths(self, base_url: str, paths,
+                           chunk_size: int = FILE_CHECK_CHUNK_SIZE,
+                           max_workers: int = FILE_CHECK_MAX_WORKERS,
+                           timeout=FILE_CHECK_TIMEOUT_SECONDS,
+                           max_attempts: int = FILE_CHECK_MAX_ATTEMPTS,
+                           progress_callback=None):
+        """
+        通过代理批量检查远程路径是否存在。
+
+        路径按 chunk_size 分块，最多 max_workers 块同时请求；失败（包括超时）的块拆成两半后重试，
+        超过 max_attempts 次仍失败的路径计入未检查列表，而不是当作不存在。
+
+        Args:
+            progress_callback: 可选，每块完成后调用 progress_callback(已检查路径数, 失败路径数, 总路径数)
+
+        Returns:
+            tuple: ({path: (exists, is_file, size)}, [未能检查的路径])
+        """
+        paths = list(dict.fromkeys(paths))
+        results, failed = {}, []
+        if not paths:
+            return results, failed
+
+        total = len(paths)
+        chunks = [paths[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        with ThreadPoolExecutor(max_workers=max_workers,
+                                thread_name_prefix="file-check") as executor:
+            futures = {
+                executor.submit(self._check_paths_chunk, base_url, chunk, timeout):
+                (chunk, 1)
+                for chunk in chunks
+            }
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk, attempt = futures.pop(future)
+                    try:
+                        results.update(future.result())
+                    except Exception as e:
+                        if attempt < max_attempts:
+                            logging.warning(
+                                f"远程文件检查块（{len(chunk)} 个路径）第 {attempt} 次失败: {e}，拆分后重试"
+                            )
+                            middle = (len(chunk) + 1) // 2
+                            for part in (chunk[:middle], chunk[middle:]):
+                                if part:
+                                    futures[executor.submit(
+                                        self._check_paths_chunk, base_url, part,
+                                        timeout)] = (part, attempt + 1)
+                            continue
+                        logging.error(
+                            f"远程文件检查块（{len(chunk)} 个路径）重试 {max_attempts} 次后仍失败: {e}")
+                        failed.extend(chunk)
+
+                    logging.info(
+                        f"远程文件检查进度: {len(results)}/{total}（失败 {len(failed)}）")
+                    if progress_callback:
+                        progress_callback(len(results), len(failed), total)
+        return results, failed
+
+    def _check_paths_chunk(self, base_url: str, paths, timeout):
+        response = self.session(base_url).post(
+            f"{base_url}/api/file/batch-check",
+            json={"remote_paths": paths},
+            timeout=timeout)
+        response.raise_for_status()
+        result = response.json()
+        if not result.get("success"):
+            raise RuntimeError(result.get("message", "未知错误"))
+        return {
+            item.get("path"): (item.get("exists", False),
+                               item.get("is_file", False), item.get("size", 0))
+            for item in result.get("results", [])
+        }
+
+    def _fetch_torrents(self, downloader_config, include_details: bool,
+                        timeout, detail_hashes=None):
+        base_url = get_proxy_base_url(downloader_config)
+        request_data = {
+            "downloaders": [build_proxy_downloader_config(downloader_config)],
+            "include_comment": include_details,
+            "include_trackers": include_details
+        }
+        if detail_hashes:
+            request_data["detail_hashes"] = detail_hashes
+
+        with self.session(base_url).post(f"{base_url}/api/torrents/all",
+                                         json=request_data,
+                                         timeout=timeout,
+                                         stream=True) as response:
+            response.raise_for_status()
+            return list(iter_json_array(response))
+
+
+proxy_client = ProxyClient()
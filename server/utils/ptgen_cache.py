@@ -0,0 +1,178 @@
+# utils/ptgen_cache.py
+"""
+PT-Gen 影片信息缓存与 API 提供方统计
+
+- PtgenCache: 以规范化后的豆瓣/IMDb ID（如 douban:1292052、imdb:tt0111161）为键，
+  将海报、简介、IMDb链接保存到 DATA_DIR 下的 SQLite 数据库中。
+  同一部影片的多个种子（不同版本、多个目标站点）只需调用一次 PT-Gen。
+- ProviderStats: 记录每个 PT-Gen API 的成功率与平均耗时（进程内），
+  用于决定对冲请求时各 API 的尝试顺序。
+
+配置项 (config.json -> ptgen_cache):
+- enabled:             是否启用缓存
+- ttl_days:            缓存有效期（天）
+- hedge_delay_seconds: 上一个 API 在该时间内未返回时，提前启动下一个 API
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+from config import DATA_DIR, config_manager
+from utils.sqlite_cache import SqliteCache
+
+CACHE_DB_FILE = os.path.join(DATA_DIR, "ptgen_cache.db")
+
+DEFAULT_TTL_DAYS = 7
+DEFAULT_HEDGE_DELAY_SECONDS = 3
+
+# 平均耗时使用指数加权移动平均，新样本的权重
+LATENCY_EWMA_ALPHA = 0.3
+
+
+def get_ptgen_cache_settings() -> dict:
+    """返回 ptgen_cache 配置（缺省值已补全）。"""
+    settings = config_manager.get().get("ptgen_cache", {}) or {}
+    return {
+        "enabled": settings.get("enabled", True),
+        "ttl_days": settings.get("ttl_days", DEFAULT_TTL_DAYS),
+        "hedge_delay_seconds": settings.get("hedge_delay_seconds",
+                                            DEFAULT_HEDGE_DELAY_SECONDS),
+    }
+
+
+def ptgen_cache_keys(douban_link: str = "", imdb_link: str = "") -> list:
+    """
+    将豆瓣/IMDb链接规范化为缓存键，豆瓣在前。
+
+    例如: https://movie.douban.com/subject/1292052/ -> douban:1292052
+          https://www.imdb.com/title/tt0111161/     -> imdb:tt0111161
+    """
+    keys = []
+    if douban_link:
+        match = re.search(r'/subject/(\d+)', douban_link)
+        if match:
+            keys.append(f"douban:{match.group(1)}")
+    if imdb_link:
+        match = re.search(r'(tt\d+)', imdb_link)
+        if match:
+            keys.append(f"imdb:{match.group(1)}")
+    return keys
+
+
+class PtgenCache(SqliteCache):
+    """基于 SQLite 的 PT-Gen 结果缓存（线程安全）。"""
+
+    label = "PT-Gen缓存"
+    table = "ptgen_cache"
+    schema = """
+        CREATE TABLE IF NOT EXISTS ptgen_cache (
+            cache_key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        )
+    """
+    timestamp_column = "updated_at"
+
+    def __init__(self, db_file: str = CACHE_DB_FILE):
+        super().__init__(db_file)
+
+    def ttl_seconds(self):
+        return get_ptgen_cache_settings()["ttl_days"] * 86400
+
+    def get(self, keys: list):
+        """
+        按顺序查找第一个未过期的缓存条目。
+
+        :return: (海报, 简介, IMDb链接)；未命中时返回 None
+        """
+        if not keys:
+            return None
+        rows = self._query(
+            f"SELECT cache_key, value, updated_at FROM ptgen_cache WHERE cache_key IN ({', '.join('?' * len(keys))})",
+            keys) or []
+        ttl_seconds = self.ttl_seconds()
+        found = {
+            row[0]: row[1]
+            for row in rows if time.time() - row[2] <= ttl_seconds
+        }
+        for key in keys:
+            if key not in found:
+                continue
+            try:
+                value = json.loads(found[key])
+                return value["poster"], value["description"], value["imdb_link"]
+            except (ValueError, KeyError) as e:
+                logging.warning(f"读取PT-Gen缓存失败: {e}")
+        return None
+
+    def set(self, keys: list, poster: str, description: str, imdb_link: str):
+        """将同一部影片的结果写入所有缓存键下。"""
+        if not keys:
+            return
+        value = json.dumps(
+            {
+                "poster": poster,
+                "description": description,
+                "imdb_link": imdb_link
+            },
+            ensure_ascii=False)
+        now = time.time()
+        self._write(
+            "INSERT OR REPLACE INTO ptgen_cache (cache_key, value, updated_at) "
+            "VALUES (?, ?, ?)", [(key, value, now) for key in keys],
+            many=True)
+
+
+class ProviderStats:
+    """记录各 PT-Gen API 的调用次数、成功次数与平均耗时（线程安全）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, name: str, success: bool, elapsed: float):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                "attempts": 0,
+                "successes": 0,
+                "avg_latency": elapsed
+            })
+            stats["attempts"] += 1
+            if success:
+                stats["successes"] += 1
+            stats["avg_latency"] += LATENCY_EWMA_ALPHA * (elapsed -
+                                                          stats["avg_latency"])
+
+    def order(self, api_configs: list) -> list:
+        """
+        按成功率（带先验平滑）从高到低、平均耗时从低到高排序。
+        没有统计数据的 API 保持配置中的相对顺序。
+        """
+        with self._lock:
+            snapshot = {name: dict(stats) for name, stats in self._stats.items()}
+
+        def sort_key(item):
+            index, api_config = item
+            stats = snapshot.get(api_config['name'])
+            if not stats:
+                return (-0.5, 0, index)
+            success_rate = (stats["successes"] + 1) / (stats["attempts"] + 2)
+            return (-round(success_rate, 2), round(stats["avg_latency"], 1),
+                    index)
+
+        return [
+            api_config
+            for _, api_config in sorted(enumerate(api_configs), key=sort_key)
+        ]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+ptgen_cache = PtgenCache()
+provider_stats = ProviderStats()
@@ -0,0 +1,329 @@
+# utils/seed_text_codec.py
+"""
+seed_parameters 大文本列的压缩存储
+
+body / mediainfo / screenshots / statement 往往有 10-50 KB，其中 MediaInfo 与 BBCode
+的字段名、标签高度重复。启用后这些列以 zlib + 预置字典压缩，再经 Base64 编码存入
+原有的 TEXT 列（三种数据库都无需修改表结构），写入格式为：
+
+    @z<字典版本>:<Base64 数据>
+
+读取时按前缀自动解压，未压缩的旧数据原样返回，因此可以随时开启或关闭。
+预置字典一经发布不可修改，只能新增版本（旧数据仍按其版本号解压）。
+
+title_components 仍以明文存储：列表页和检查状态筛选直接在 SQL 中对它做 LIKE/正则匹配。
+
+配置项 (config.json -> seed_storage):
+- compress_large_text: 是否压缩写入（默认关闭）
+- min_size_bytes:      小于该长度的文本不压缩
+
+对已有数据压缩（在 server 目录下执行）:
+    python -m utils.seed_text_codec [--batch-size N]
+"""
+
+import argparse
+import base64
+import logging
+import re
+import sys
+import zlib
+
+from config import config_manager
+
+# 压缩存储的列
+COMPRESSED_COLUMNS = ("body", "mediainfo", "screenshots", "statement")
+
+DEFAULT_MIN_SIZE_BYTES = 1024
+
+# zlib 预置字典（窗口 32KB）：常见的 MediaInfo 字段、BBCode 标签与声明用语。
+# zlib 会优先匹配距离更近的内容，因此最常见的字符串放在末尾。
+_DICTIONARY_V1 = """\
+[quote][/quote][b][/b][i][/i][u][/u][center][/center][size=3][/size][size=4]
+[color=red][color=blue][color=#ff0000][/color][font=Microsoft YaHei][/font]
+[url=https://][/url][img]https://img.pixhost.to/images/[/img][img]https://img.seedvault.cn/i/
+[*]◎译　　名◎片　　名◎年　　代◎产　　地◎类　　别◎语　　言◎字　　幕◎上映日期
+◎IMDb评分◎IMDb链接https://www.imdb.com/title/tt◎豆瓣评分◎豆瓣链接https://movie.douban.com/subject/
+◎片　　长◎导　　演◎编　　剧◎主　　演◎标　　签◎简　　介
+转载请保留本站信息，本种子来自网络，仅供学习交流，请于下载后24小时内删除。
+官方组作品，感谢原制作者发布。本资源仅限会员测试带宽之用，严禁用于商业用途！
+DISC INFO:Disc Title:Disc Label:Disc Size:Protection: AACS2BD-Java: YesBDInfo:
+PLAYLIST REPORT:Name:Length:Size:Total Bitrate:
+VIDEO:Codec                   Bitrate             Description
+AUDIO:Codec                           Language        Bitrate         Description
+SUBTITLES:Codec                           Language        Bitrate         Description
+MPEG-4 AVC Video        MPEG-H HEVC Video       DTS-HD Master Audio     Dolby TrueHD/Atmos Audio
+Dolby Digital Audio     Presentation Graphics   kbps / 1080p / 23.976 fps / 16:9 / High Profile 4.1
+ / 2160p / 23.976 fps / 16:9 / Main 10 @ Level 5.1 @ High / 4:2:0 / 10 bits / 1000nits / HDR10 / BT.2020
+ / 48 kHz / 24-bit (DTS Core: 5.1 / 48 kHz / 1509 kbps / 24-bit) English Chinese
+General
+Unique ID                                :
+Complete name                            :
+Format                                   : Matroska
+Format version                           : Version 4
+File size                                : GiB
+Duration                                 : h  min
+Overall bit rate mode                    : Variable
+Overall bit rate                         : kb/s
+Frame rate                               : 23.976 (24000/1001) FPS
+Encoded date                             : UTC
+Writing application                      : mkvmerge v
+Writing library                          : libebml v1.4.2 + libmatroska v1.6.4
+Cover                                    : Yes
+Attachments                              : cover.jpg
+Video
+ID                                       : 1
+Format                                   : AVC
+Format/Info                              : Advanced Video Codec
+Format profile                           : High@L4.1
+Format settings                          : CABAC / 4 Ref Frames
+Format settings, CABAC                   : Yes
+Format settings, Reference frames        : 4 frames
+Format                                   : HEVC
+Format/Info                              : High Efficiency Video Coding
+Format profile                           : Main 10@L5.1@High
+HDR format                               : SMPTE ST 2086, HDR10 compatible
+HDR format                               : Dolby Vision, Version 1.0, dvhe.08.06, BL+RPU, HDR10 compatible
+Codec ID                                 : V_MPEG4/ISO/AVC
+Codec ID                                 : V_MPEGH/ISO/HEVC
+Width                                    : 1 920 pixels
+Width                                    : 3 840 pixels
+Height                                   : 1 080 pixels
+Height                                   : 2 160 pixels
+Display aspect ratio                     : 16:9
+Frame rate mode                          : Constant
+Color space                              : YUV
+Chroma subsampling                       : 4:2:0
+Bit depth                                : 8 bits
+Bit depth                                : 10 bits
+Scan type                                : Progressive
+Bits/(Pixel*Frame)                       :
+Stream size                              : GiB (%)
+Writing library                          : x264 core 164 r3095 baf4e1c
+Writing library                          : x265 3.5+1-f0c1022b6:[Linux][GCC 9.3.0][64 bit] 10bit
+Encoding settings                        : cabac=1 / ref=4 / deblock=1:-3:-3 / analyse=0x3:0x133 / me=umh / subme=10 / psy=1 / psy_rd=1.00:0.00 / mixed_ref=1 / me_range=24 / chroma_me=1 / trellis=2 / 8x8dct=1 / cqm=0 / deadzone=21,11 / fast_pskip=0 / chroma_qp_offset=-2 / threads=24 / lookahead_threads=4 / sliced_threads=0 / nr=0 / decimate=0 / interlaced=0 / bluray_compat=0 / constrained_intra=0 / bframes=8 / b_pyramid=2 / b_adapt=2 / b_bias=0 / direct=3 / weightb=1 / open_gop=0 / weightp=2 / keyint=250 / keyint_min=23 / scenecut=40 / intra_refresh=0 / rc_lookahead=60 / rc=2pass / mbtree=0 / bitrate= / ratetol=1.0 / qcomp=0.60 / qpmin=0 / qpmax=69 / qpstep=4 / cplxblur=20.0 / qblur=0.5 / ip_ratio=1.40 / pb_ratio=1.30 / aq=3:0.80
+Default                                  : Yes
+Default                                  : No
+Forced                                   : No
+Color range                              : Limited
+Color primaries                          : BT.709
+Color primaries                          : BT.2020
+Transfer characteristics                 : BT.709
+Transfer characteristics                 : PQ
+Matrix coefficients                      : BT.709
+Matrix coefficients                      : BT.2020 non-constant
+Mastering display color primaries        : Display P3
+Mastering display luminance              : min: 0.0050 cd/m2, max: 1000 cd/m2
+Maximum Content Light Level              : cd/m2
+Maximum Frame-Average Light Level        : cd/m2
+Audio
+ID                                       : 2
+Format                                   : DTS XLL
+Format/Info                              : Digital Theater Systems
+Commercial name                          : DTS-HD Master Audio
+Format                                   : MLP FBA 16-ch
+Commercial name                          : Dolby TrueHD with Dolby Atmos
+Format                                   : E-AC-3 JOC
+Format                                   : AC-3
+Commercial name                          : Dolby Digital
+Format                                   : AAC LC
+Format/Info                              : Advanced Audio Codec Low Complexity
+Format                                   : FLAC
+Format/Info                              : Free Lossless Audio Codec
+Codec ID                                 : A_DTS
+Codec ID                                 : A_TRUEHD
+Codec ID                                 : A_AC3
+Codec ID                                 : A_EAC3
+Codec ID                                 : A_AAC-2
+Codec ID                                 : A_FLAC
+Bit rate mode                            : Constant
+Bit rate mode                            : Variable
+Bit rate                                 : kb/s
+Maximum bit rate                         : kb/s
+Channel(s)                               : 2 channels
+Channel(s)                               : 6 channels
+Channel(s)                               : 8 channels
+Channel layout                           : L R
+Channel layout                           : L R C LFE Ls Rs
+Channel layout                           : L R C LFE Ls Rs Lb Rb
+Sampling rate                            : 48.0 kHz
+Frame rate                               : 93.750 FPS (512 SPF)
+Compression mode                         : Lossless
+Compression mode                         : Lossy
+Delay relative to video                  : 0 ms
+Language                                 : English
+Language                                 : Chinese
+Language                                 : Japanese
+Language                                 : Korean
+Service kind                             : Complete Main
+Text
+ID                                       : 3
+Format                                   : UTF-8
+Format                                   : ASS
+Format                                   : PGS
+Codec ID                                 : S_TEXT/UTF8
+Codec ID                                 : S_TEXT/ASS
+Codec ID                                 : S_HDMV/PGS
+Codec ID/Info                            : Advanced Sub Station Alpha
+Codec ID/Info                            : UTF-8 Plain Text
+Duration                                 :
+Bit rate                                 : b/s
+Count of elements                        :
+Stream size                              : KiB (0%)
+Title                                    : Chinese Simplified
+Title                                    : Chinese Traditional
+Title                                    : 简体中文
+Title                                    : 繁体中文
+Title                                    : 简英双语
+Language                                 : Chinese
+Default                                  : No
+Forced                                   : No
+Menu
+00:00:00.000                             : en:Chapter 01
+00:00:00.000                             : en:00:00:00.000
+""".encode("utf-8")
+
+DICTIONARIES = {1: _DICTIONARY_V1}
+CURRENT_VERSION = 1
+
+_PREFIX = "@z"
+_PREFIX_PATTERN = re.compile(r"@z(\d+):")
+
+
+def get_seed_storage_settings() -> dict:
+    """返回 seed_storage 配置（缺省值已补全）。"""
+    settings = config_manager.get().get("seed_storage", {}) or {}
+    return {
+        "compress_large_text": settings.get("compress_large_text", False),
+        "min_size_bytes": settings.get("min_size_bytes",
+                                       DEFAULT_MIN_SIZE_BYTES),
+    }
+
+
+def is_compressed(value) -> bool:
+    return isinstance(value, str) and _PREFIX_PATTERN.match(value) is not None
+
+
+def compress_text(value: str, version: int = CURRENT_VERSION) -> str:
+    """压缩文本为存储格式（不检查配置与长度）。"""
+    compressor = zlib.compressobj(level=9, zdict=DICTIONARIES[version])
+    data = compressor.compress(value.encode("utf-8")) + compressor.flush()
+    return f"{_PREFIX}{version}:{base64.b64encode(data).decode('ascii')}"
+
+
+def decompress_text(value):
+    """解压存储格式的文本；未压缩的值原样返回。"""
+    if not is_compressed(value):
+        return value
+    match = _PREFIX_PATTERN.match(value)
+    payload = value[match.end():]
+    try:
+        version = int(match.group(1))
+        decompressor = zlib.decompressobj(zdict=DICTIONARIES[version])
+        data = decompressor.decompress(base64.b64decode(payload))
+        data += decompressor.flush()
+        return data.decode("utf-8")
+    except (ValueError, KeyError, zlib.error) as e:
+        # 不是本模块写入的数据（恰好以前缀开头），按原文返回
+        logging.warning(f"解压种子参数文本失败，按原文返回: {e}")
+        return value
+
+
+def encode_for_storage(value, settings: dict = None):
+    """写入前调用：启用压缩且文本足够长时返回压缩后的值，否则原样返回。"""
+    if not isinstance(value, str) or is_compressed(value):
+        return value
+    settings = settings or get_seed_storage_settings()
+    if (not settings["compress_large_text"]
+            or len(value.encode("utf-8")) < settings["min_size_bytes"]):
+        return value
+    encoded = compress_text(value)
+    return encoded if len(encoded) < len(value) else value
+
+
+def decode_row(row: dict) -> dict:
+    """读取后调用：就地解压行中的压缩列。"""
+    for column in COMPRESSED_COLUMNS:
+        if column in row:
+            row[column] = decompress_text(row[column])
+    return row
+
+
+def _byte_length(value) -> int:
+    return len(value.encode("utf-8")) if isinstance(value, str) else 0
+
+
+def compress_existing_rows(db_manager, batch_size: int = 200) -> tuple:
+    """
+    按批压缩 seed_parameters 中已有的未压缩大文本（忽略 compress_large_text 开关）。
+
+    Returns:
+        tuple: (压缩的行数, 压缩前总字节数, 压缩后总字节数)
+    """
+    settings = dict(get_seed_storage_settings(), compress_large_text=True)
+    ph = db_manager.get_placeholder()
+    columns = ", ".join(COMPRESSED_COLUMNS)
+    assignments = ", ".join(f"{col} = {ph}" for col in COMPRESSED_COLUMNS)
+
+    conn = db_manager._get_connection()
+    cursor = db_manager._get_cursor(conn)
+    updated, before, after = 0, 0, 0
+    try:
+        cursor.execute("SELECT hash, torrent_id, site_name FROM seed_parameters")
+        keys = [(row["hash"], row["torrent_id"], row["site_name"])
+                for row in (dict(r) for r in cursor.fetchall())]
+
+        for start in range(0, len(keys), batch_size):
+            updates = []
+            for key in keys[start:start + batch_size]:
+                cursor.execute(
+                    f"SELECT {columns} FROM seed_parameters "
+                    f"WHERE hash = {ph} AND torrent_id = {ph} AND site_name = {ph}",
+                    key)
+                row = cursor.fetchone()
+                if not row:
+                    continue
+                row = dict(row)
+                values = [
+                    encode_for_storage(row[col], settings)
+                    for col in COMPRESSED_COLUMNS
+                ]
+                if values == [row[col] for col in COMPRESSED_COLUMNS]:
+                    continue
+                before += sum(_byte_length(row[col]) for col in COMPRESSED_COLUMNS)
+                after += sum(_byte_length(v) for v in values)
+                updates.append(tuple(values) + key)
+
+            if updates:
+                cursor.executemany(
+                    f"UPDATE seed_parameters SET {assignments} "
+                    f"WHERE hash = {ph} AND torrent_id = {ph} AND site_name = {ph}",
+                    updates)
+                conn.commit()
+                updated += len(updates)
+    finally:
+        cursor.close()
+        conn.close()
+    return updated, before, after
+
+
+def main(argv=None):
+    from config import get_db_config
+    from database import DatabaseManager
+
+    arg_parser = argparse.ArgumentParser(description="压缩 seed_parameters 中已有的大文本列")
+    arg_parser.add_argument("--batch-size", type=int, default=200, help="每批提交的行数")
+    args = arg_parser.parse_args(argv)
+
+    db_manager = DatabaseManager(get_db_config())
+    updated, before, after = compress_existing_rows(db_manager,
+                                                    max(1, args.batch_size))
+    if updated:
+        print(f"已压缩 {updated} 行: {before / 1024:.1f} KB -> {after / 1024:.1f} KB "
+              f"({before / max(after, 1):.1f}x)")
+    else:
+        print("没有需要压缩的数据。")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
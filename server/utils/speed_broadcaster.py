@@ -0,0 +1,142 @@
+# utils/speed_broadcaster.py
+"""
+实时速度推送广播器
+
+由 DataTracker 在每次采集后调用 publish() 发布一次速度数据：
+- 每个 tick 只序列化一次，得到的 SSE 消息直接放入所有订阅者的队列
+- 订阅者消费过慢时丢弃积压的增量，改为推送一次完整状态
+- tick 只包含与上一 tick 相比发生变化的下载器速度（增量）
+- 新订阅者连接时先收到最近 N 秒的完整快照，之后只接收增量
+- 每个 SSE 连接会占用一个 gunicorn 线程，因此同时在线的订阅者数量有上限（MAX_SUBSCRIBERS），
+  超出时 subscribe() 返回 None，由接口返回 503，前端改用轮询
+"""
+
+import collections
+import json
+import logging
+import queue
+import threading
+
+# 保留用于回放的最大 tick 数
+MAX_REPLAY_TICKS = 300
+# 每个订阅者队列的最大长度，消费过慢的订阅者会被丢弃消息
+SUBSCRIBER_QUEUE_SIZE = 120
+# 同时在线的订阅者上限（默认 16 个 gthread 线程，需为普通 API 请求留出足够线程）
+MAX_SUBSCRIBERS = 4
+# 单个推送流的最长持续时间（秒），到期后服务端关闭连接，前端 EventSource 自动重连
+STREAM_MAX_SECONDS = 300
+# 通过 SSE retry: 字段告知 EventSource 的重连间隔（毫秒）
+STREAM_RETRY_MS = 3000
+
+
+def _sse_message(payload: dict) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False, separators=(',', ':'))}\n\n"
+
+
+class SpeedBroadcaster:
+    """实时速度广播器（线程安全）"""
+
+    def __init__(self,
+                 max_replay_ticks: int = MAX_REPLAY_TICKS,
+                 max_subscribers: int = MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._history = collections.deque(maxlen=max_replay_ticks)
+        self._subscribers = set()
+        self._last_speeds = {}
+        self._downloaders = []
+
+    def publish(self, timestamp, speeds_by_downloader: dict):
+        """
+        发布一次速度采集结果。
+
+        Args:
+            timestamp: 采集时间 (datetime)
+            speeds_by_downloader: {下载器ID: {"name", "upload_speed", "download_speed", ...}}
+        """
+        time_label = timestamp.strftime("%H:%M:%S")
+        speeds = {
+            downloader_id: [
+                data.get("upload_speed", 0),
+                data.get("download_speed", 0)
+            ]
+            for downloader_id, data in speeds_by_downloader.items()
+        }
+        downloaders = [{
+            "id": downloader_id,
+            "name": data.get("name", downloader_id)
+        } for downloader_id, data in speeds_by_downloader.items()]
+
+        with self._lock:
+            payload = {
+                "type": "tick",
+                "t": time_label,
+                "d": {
+                    downloader_id: value
+                    for downloader_id, value in speeds.items()
+                    if self._last_speeds.get(downloader_id) != value
+                }
+            }
+            # 下载器列表变化时才附带完整列表
+            if downloaders != self._downloaders:
+                payload["n"] = downloaders
+                self._downloaders = downloaders
+
+            self._history.append({"t": time_label, "s": speeds})
+            self._last_speeds = speeds
+
+            if not self._subscribers:
+                return
+            message = _sse_message(payload)
+            full_message = None
+            for subscriber in self._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # 消费过慢：清空积压的增量，改为推送完整状态，避免前端数据错乱
+                    if full_message is None:
+                        full_message = _sse_message({
+                            "type": "tick",
+                            "t": time_label,
+                            "d": speeds,
+                            "n": downloaders
+                        })
+                    with subscriber.mutex:
+                        subscriber.queue.clear()
+                    subscriber.put_nowait(full_message)
+                    logging.debug("速度推送订阅者消费过慢，已改为推送完整状态。")
+
+    def subscribe(self, replay_seconds: int = 60):
+        """
+        注册订阅者。
+
+        Returns:
+            (订阅队列, 快照消息)。快照包含最近 replay_seconds 个 tick 的完整数据，
+            之后队列中的增量均基于快照中最后一个 tick。
+            订阅者数量已达上限时返回 (None, None)。
+        """
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None, None
+            self._subscribers.add(subscriber)
+            replay = list(self._history)[-replay_seconds:] if replay_seconds > 0 else []
+            snapshot = _sse_message({
+                "type": "snapshot",
+                "downloaders": self._downloaders,
+                "ticks": replay
+            })
+        return subscriber, snapshot
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+
+# 全局实时速度广播器实例
+speed_broadcaster = SpeedBroadcaster()
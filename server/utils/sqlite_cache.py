@@ -0,0 +1,89 @@
+# utils/sqlite_cache.py
+"""
+基于单个 SQLite 文件的本地缓存基类
+
+- 每次操作新建连接（sqlite3 连接不跨线程共享），首次连接时开启 WAL、建表并清理过期条目
+- 读写失败只记录警告：读取返回 None，写入返回 False，缓存不可用时调用方照常走未命中的流程
+- 子类通过类属性提供表名、建表语句、时间戳列和日志名称，通过 ttl_seconds() 提供清理期限
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+
+class SqliteCache(ABC):
+    """SQLite 缓存基类（线程安全）。"""
+
+    # 日志中显示的缓存名称，例如 "媒体探测缓存"
+    label = ""
+    # 需要按时间清理的表名，与建表语句（可包含多条语句）
+    table = ""
+    schema = ""
+    # 启动清理时比较的时间戳列（time.time() 秒）
+    timestamp_column = ""
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @abstractmethod
+    def ttl_seconds(self):
+        """首次连接时清理超过该秒数未更新的条目；返回 None 时不清理。"""
+        raise NotImplementedError("每个 SQLite 缓存都必须实现 ttl_seconds 方法")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file, timeout=10)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_db(conn)
+                    self._initialized = True
+        return conn
+
+    def _init_db(self, conn):
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(self.schema)
+        ttl_seconds = self.ttl_seconds()
+        if ttl_seconds is not None:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE {self.timestamp_column} < ?",
+                (time.time() - ttl_seconds, ))
+        conn.commit()
+
+    def _query(self, sql: str, params=()):
+        """执行查询并返回全部行，失败时返回 None。"""
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"读取{self.label}失败: {e}")
+            return None
+
+    def _query_one(self, sql: str, params=()):
+        """执行查询并返回第一行，未命中或失败时返回 None。"""
+        rows = self._query(sql, params)
+        return rows[0] if rows else None
+
+    def _write(self, sql: str, params=(), many: bool = False) -> bool:
+        """在一个事务中执行写入（many=True 时 params 为参数序列），返回是否成功。"""
+        try:
+            conn = self._connect()
+            try:
+                if many:
+                    conn.executemany(sql, params)
+                else:
+                    conn.execute(sql, params)
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logging.warning(f"写入{self.label}失败: {e}")
+            return False
+        return True
@@ -0,0 +1,439 @@
+# utils/title_parser.py
+"""
+种子主标题解析引擎
+
+- 关键词表（特殊制作组、剪辑版本、各类技术标签）从 configs/global_mappings.yaml 的
+  title_parsing 段加载，启动时一次性编译为交替正则，解析时不再重复构建和编译
+- 其余固定规则同样在模块导入时预编译
+- 解析结果按 (标题, 种子文件名) 做 LRU 缓存，同一标题在多个目标站点、重试之间只解析一次
+
+基准测试与结果一致性检查: python -m scripts.title_parser_benchmark
+"""
+
+import functools
+import logging
+import os
+import re
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_MAPPINGS_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                                    "configs", "global_mappings.yaml")
+
+# 解析结果缓存的最大条目数
+TITLE_CACHE_SIZE = 2048
+
+NO_RELEASE_GROUP = "N/A (无发布组)"
+
+# 技术标签在最终结果中的输出顺序
+KEY_ORDER = [
+    "title",
+    "year",
+    "season_episode",
+    "completion_status",
+    "release_version",
+    "resolution",
+    "medium",
+    "source_platform",
+    "video_codec",
+    "video_format",
+    "hdr_format",
+    "bit_depth",
+    "framerate",
+    "audio",
+    "release_info",
+    "unrecognized",
+]
+
+TRANSLATION_MAP = {
+    "title": "主标题",
+    "year": "年份",
+    "season_episode": "季集",
+    "resolution": "分辨率",
+    "medium": "媒介",
+    "source_platform": "片源平台",
+    "video_codec": "视频编码",
+    "hdr_format": "HDR格式",
+    "bit_depth": "色深",
+    "framerate": "帧率",
+    "audio": "音频编码",
+    "release_info": "制作组",
+    "completion_status": "剧集状态",
+    "unrecognized": "无法识别",
+    "video_format": "视频格式",
+    "release_version": "发布版本",
+}
+
+# 前端显示的完整参数列表和固定顺序
+ALL_POSSIBLE_KEYS_ORDERED = [
+    "主标题",
+    "年份",
+    "季集",
+    "剧集状态",
+    "发布版本",
+    "分辨率",
+    "媒介",
+    "片源平台",
+    "视频编码",
+    "视频格式",
+    "HDR格式",
+    "色深",
+    "帧率",
+    "音频编码",
+    "制作组",
+    "无法识别",
+]
+
+
+def _load_title_keywords():
+    """从 global_mappings.yaml 读取主标题解析关键词表。"""
+    with open(GLOBAL_MAPPINGS_FILE, "r", encoding="utf-8") as f:
+        config_data = yaml.safe_load(f)
+    keywords = config_data.get("title_parsing")
+    if not keywords:
+        raise ValueError(f"{GLOBAL_MAPPINGS_FILE} 中缺少 title_parsing 配置")
+    return keywords
+
+
+_KEYWORDS = _load_title_keywords()
+
+SPECIAL_RELEASE_GROUPS = list(_KEYWORDS["special_release_groups"])
+_CUT_VERSION_ALTERNATION = "|".join(_KEYWORDS["cut_versions"])
+
+# 技术标签按优先级排列: [(字段名, 编译后的正则, 是否使用分组1作为值)]
+TECH_PATTERNS = []
+for _key, _fragments in _KEYWORDS["tech_patterns"].items():
+    _pattern = "|".join(_fragments) if _key != "cut_version" else _CUT_VERSION_ALTERNATION
+    if r"\b" in _pattern:
+        TECH_PATTERNS.append((_key, re.compile(_pattern, re.IGNORECASE), False))
+    else:
+        TECH_PATTERNS.append((_key,
+                              re.compile(r"(?<!\w)(" + _pattern + r")(?!\w)",
+                                         re.IGNORECASE), True))
+
+_AUDIO_CODECS = "|".join(_KEYWORDS["audio_channel_codecs"])
+# 种子文件名补充时的音频修复不包含 DTS（与主标题解析保持原有行为）
+_FILENAME_AUDIO_CODECS = "|".join(c for c in _KEYWORDS["audio_channel_codecs"]
+                                  if c != "DTS")
+
+# --- 预编译的固定规则 ---
+_CURRENCY_RE = re.compile(r"[￡€]")
+_REMAINING_TIME_RE = re.compile(r"\s*剩餘時間.*$")
+_EXTENSION_RE = re.compile(r"[\s\.]*(mkv|mp4)$", re.IGNORECASE)
+_BRACKETS_RE = re.compile(r"\[.*?\]|【.*?】")
+_RESOLUTION_SPACING_RE = re.compile(r"(\d+[pi])([A-Z])")
+_VCB_VARIANT_RE = re.compile(
+    r"^(?P<main_part>.+?)[-](?P<release_group>[\w\s]+&VCB-Studio)$",
+    re.IGNORECASE)
+_GENERAL_GROUP_RE = re.compile(
+    r"^(?P<main_part>.+?)[-@](?P<release_group>[^\s]+)$", re.IGNORECASE)
+_SEASON_RE = re.compile(
+    r"(?<!\w)(S\d{1,2}(?:(?:[-–~]\s*S?\d{1,2})?|(?:\s*E\d{1,3}(?:[-–~]\s*(?:S\d{1,2})?E?\d{1,3})*)?))(?!\w)",
+    re.I,
+)
+_WHITESPACE_RE = re.compile(r"\s")
+_YEAR_RE = re.compile(r"[\s\.\(]((?:19|20)\d{2})([\s\.\)]|$)")
+_CUT_VERSION_RE = re.compile(r"(?<!\w)(" + _CUT_VERSION_ALTERNATION + r")(?!\w)",
+                             re.IGNORECASE)
+_SEPARATORS_RE = re.compile(r"[\s\.]+")
+_AUDIO_MISSING_DOT_RE = re.compile(r"((?:" + _AUDIO_CODECS + r"))\s*(\d)\s*(\d)",
+                                   re.I)
+_AUDIO_MISSING_SPACE_RE = re.compile(r"((?:" + _AUDIO_CODECS + r"))(\d(?:\.\d)?)",
+                                     re.I)
+_FILENAME_AUDIO_MISSING_DOT_RE = re.compile(
+    r"((?:" + _FILENAME_AUDIO_CODECS + r"))\s*(\d)\s*(\d)", re.I)
+_FILENAME_AUDIO_MISSING_SPACE_RE = re.compile(
+    r"((?:" + _FILENAME_AUDIO_CODECS + r"))(\d(?:\.\d)?)", re.I)
+_RELEASE_GROUP_SPLIT_RE = re.compile(r"[@\-\s]+")
+_TORRENT_SUFFIX_RE = re.compile(r"(\.original)?\.torrent", re.IGNORECASE)
+_FILENAME_SEPARATORS_RE = re.compile(r"[\._\[\]\(\)]")
+_CHINESE_RE = re.compile(r"[\u4e00-\u9fa5]")
+_AUDIO_COUNT_PREFIX_RE = re.compile(r"^(\d+)\s*(Audio[s]?)\s+(.+)$", re.IGNORECASE)
+_AUDIO_COUNT_SUFFIX_RE = re.compile(r"\d+\s*Audio[s]?$", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _tag_removal_pattern(tag):
+    """返回从技术区中移除已识别标签所用的正则（按标签缓存）。"""
+    if _CHINESE_RE.search(tag):
+        # 中文字符不被 \w 匹配，包含中文时直接使用字面匹配
+        return re.compile(re.escape(tag), re.IGNORECASE)
+    # 纯英文/数字，使用词边界
+    return re.compile(r"\b" + re.escape(tag) + r"(?!\w)", re.IGNORECASE)
+
+
+def _extract_release_group(title):
+    """提取制作组，返回 (去除制作组后的主体部分, 制作组)。"""
+    # 检查特殊制作组（完整匹配）
+    for group in SPECIAL_RELEASE_GROUPS:
+        if title.endswith(f" {group}") or title.endswith(f"-{group}"):
+            return title[:-len(group) - 1].strip(), group
+
+    # 匹配类似 -Nekomoe kissaten&VCB-Studio, -LoliHouse&VCB-Studio 等格式
+    vcb_match = _VCB_VARIANT_RE.match(title)
+    if vcb_match:
+        release_group = vcb_match.group("release_group")
+        logger.debug("检测到 VCB-Studio 变体制作组: %s", release_group)
+        return vcb_match.group("main_part").strip(), release_group
+
+    # 通用模式：提取最后一个 - 或 @ 之后的所有内容作为制作组
+    match = _GENERAL_GROUP_RE.match(title)
+    if match:
+        logger.debug("制作组匹配成功: %s", match.group('release_group').strip())
+        return match.group("main_part").strip(), match.group("release_group").strip()
+
+    # 检查是否以-NOGROUP结尾
+    if title.upper().endswith("-NOGROUP"):
+        return title[:-8].strip(), "NOGROUP"
+    return title, NO_RELEASE_GROUP
+
+
+def _find_tech_tags(text, compiled, use_group):
+    """返回 text 中所有匹配的技术标签值及首个匹配的位置。"""
+    matches = list(compiled.finditer(text))
+    if not matches:
+        return [], None
+    values = [(m.group(1) if use_group else m.group(0)).strip() for m in matches]
+    return values, matches[0].start()
+
+
+def _unique_in_order(values, text):
+    """去重并按在 text 中出现的位置排序。"""
+    return sorted(list(set(values)), key=lambda x: text.find(x.replace(" ", "")))
+
+
+def _supplement_from_filename(params, torrent_filename, all_found_tags):
+    """从种子文件名补充主标题中缺失的技术参数。"""
+    logger.debug("开始从种子文件名补充参数: %s", torrent_filename)
+    # 预处理文件名：移除后缀，用空格替换点和其他常用分隔符
+    filename_base = _TORRENT_SUFFIX_RE.sub("", torrent_filename)
+    filename_candidate = _FILENAME_SEPARATORS_RE.sub(" ", filename_base)
+
+    for key, compiled, use_group in TECH_PATTERNS:
+        # 如果主标题中已解析出此参数，则跳过，优先使用主标题的结果
+        if key in params and params.get(key):
+            continue
+
+        raw_values, _ = _find_tech_tags(filename_candidate, compiled, use_group)
+        if not raw_values:
+            continue
+
+        processed_values = raw_values
+        if key == "audio":
+            processed_values = [
+                _FILENAME_AUDIO_MISSING_SPACE_RE.sub(
+                    r"\1 \2", _FILENAME_AUDIO_MISSING_DOT_RE.sub(r"\1 \2.\3", val))
+                for val in processed_values
+            ]
+
+        unique_processed = _unique_in_order(processed_values, filename_candidate)
+        if unique_processed:
+            logger.debug("   [文件名补充] 找到缺失参数 '%s': %s", key, unique_processed)
+            params[key] = unique_processed[0] if len(
+                unique_processed) == 1 else unique_processed
+            # 将新找到的标签也加入 all_found_tags，以便后续正确计算"无法识别"部分
+            all_found_tags.extend(unique_processed)
+
+
+def _format_audio(values):
+    """将 "数字Audio" 格式移到编码格式后面，并按是否以数字Audio结尾、长度排序后拼接。"""
+    processed_audio = []
+    for audio_item in values:
+        match = _AUDIO_COUNT_PREFIX_RE.match(audio_item)
+        if match:
+            # 如果是 "3Audio DTS" 格式，重排为 "DTS 3Audio"
+            processed_audio.append(
+                f"{match.group(3)} {match.group(1)}{match.group(2)}")
+        else:
+            processed_audio.append(audio_item)
+    sorted_audio = sorted(
+        processed_audio,
+        key=lambda s: (bool(_AUDIO_COUNT_SUFFIX_RE.search(s)), -len(s)))
+    return " ".join(sorted_audio)
+
+
+@functools.lru_cache(maxsize=TITLE_CACHE_SIZE)
+def _parse_title_cached(original_title_str, torrent_filename):
+    """解析主标题，返回 ((中文字段名, 值), ...)，多值字段的值为元组以便缓存。"""
+    params = {}
+    unrecognized_parts = []
+
+    # 1. 预处理（保持原始标题，让后续的制作组提取逻辑来处理中文部分）
+    title = _CURRENCY_RE.sub("", original_title_str)
+    title = _REMAINING_TIME_RE.sub("", title)
+    title = _EXTENSION_RE.sub("", title).strip()
+    title = _BRACKETS_RE.sub("", title).strip()
+    title = title.replace("（", "(").replace("）", ")")
+    title = title.replace("'", "")
+    title = _RESOLUTION_SPACING_RE.sub(r"\1 \2", title)
+
+    # 2. 优先提取制作组信息
+    main_part, release_group = _extract_release_group(title)
+
+    # 3. 季集、年份、剪辑版本提取
+    season_match = _SEASON_RE.search(main_part)
+    if season_match:
+        season_str = season_match.group(1)
+        main_part = main_part.replace(season_str, " ").strip()
+        params["season_episode"] = _WHITESPACE_RE.sub("", season_str.upper())
+
+    title_part = main_part
+    year_match = _YEAR_RE.search(title_part)
+    if year_match:
+        params["year"] = year_match.group(1)
+        title_part = title_part.replace(year_match.group(0), " ", 1).strip()
+
+    # 3.1 提取剪辑版本并拼接到年份
+    cut_version_match = _CUT_VERSION_RE.search(title_part)
+    if cut_version_match:
+        cut_version = _SEPARATORS_RE.sub(" ", cut_version_match.group(1).strip())
+        if "year" in params:
+            params["year"] = f"{params['year']} {cut_version}"
+        else:
+            # 如果没有年份，单独作为年份字段
+            params["year"] = cut_version
+        title_part = title_part.replace(cut_version_match.group(0), " ", 1).strip()
+        logger.debug("检测到剪辑版本: %s，已拼接到年份", cut_version)
+
+    # 4. 修复音频参数格式: FLAC 20 -> FLAC 2.0, FLAC2.0 -> FLAC 2.0
+    title_part = _AUDIO_MISSING_DOT_RE.sub(r"\1 \2.\3", title_part)
+    title_part = _AUDIO_MISSING_SPACE_RE.sub(r"\1 \2", title_part)
+
+    # 技术标签提取（排除已识别的制作组名称）
+    title_candidate = title_part
+    first_tech_tag_pos = len(title_candidate)
+    all_found_tags = []
+
+    release_group_keywords = set()
+    if release_group and release_group != NO_RELEASE_GROUP:
+        # 例如 "DIY@Audies" -> {"DIY", "AUDIES"}
+        release_group_keywords = {
+            kw.strip().upper()
+            for kw in _RELEASE_GROUP_SPLIT_RE.split(release_group) if kw.strip()
+        }
+
+    for key, compiled, use_group in TECH_PATTERNS:
+        raw_values, first_pos = _find_tech_tags(title_candidate, compiled, use_group)
+        if not raw_values:
+            continue
+        first_tech_tag_pos = min(first_tech_tag_pos, first_pos)
+
+        # 过滤掉属于制作组名称的部分
+        filtered_values = [
+            val for val in raw_values if val.upper() not in release_group_keywords
+        ]
+        all_found_tags.extend(filtered_values)
+
+        processed_values = filtered_values
+        if key == "audio":
+            processed_values = [
+                _AUDIO_MISSING_SPACE_RE.sub(
+                    r"\1 \2", _AUDIO_MISSING_DOT_RE.sub(r"\1 \2.\3", val))
+                for val in processed_values
+            ]
+
+        unique_processed = _unique_in_order(processed_values, title_candidate)
+        if unique_processed:
+            params[key] = unique_processed[0] if len(
+                unique_processed) == 1 else unique_processed
+
+    if torrent_filename:
+        _supplement_from_filename(params, torrent_filename, all_found_tags)
+
+    params["release_info"] = release_group
+
+    if "quality_modifier" in params:
+        modifiers = params.pop("quality_modifier")
+        if not isinstance(modifiers, list):
+            modifiers = [modifiers]
+        if "medium" in params:
+            medium_str = (params["medium"] if isinstance(
+                params["medium"], str) else params["medium"][0])
+            params["medium"] = f"{medium_str} {' '.join(sorted(modifiers))}"
+
+    # 5. 最终标题和未识别内容确定
+    title_zone = title_part[:first_tech_tag_pos].strip()
+    tech_zone = title_part[first_tech_tag_pos:].strip()
+    params["title"] = _SEPARATORS_RE.sub(" ", title_zone).strip()
+
+    cleaned_tech_zone = tech_zone
+    for tag in sorted(all_found_tags, key=len, reverse=True):
+        cleaned_tech_zone = _tag_removal_pattern(tag).sub(" ", cleaned_tech_zone)
+
+    remains = _SEPARATORS_RE.split(cleaned_tech_zone)
+    unrecognized_parts.extend([part for part in remains if part])
+    logger.debug("技术区: '%s' -> '%s'，无法识别部分: %s", tech_zone, cleaned_tech_zone,
+                 unrecognized_parts)
+    if unrecognized_parts:
+        params["unrecognized"] = " ".join(sorted(list(set(unrecognized_parts))))
+
+    english_params = {}
+    for key in KEY_ORDER:
+        if key in params and params[key]:
+            if key == "audio" and isinstance(params[key], list):
+                english_params[key] = _format_audio(params[key])
+            else:
+                english_params[key] = params[key]
+
+    if "source_platform" in english_params and "audio" in english_params:
+        is_sp_list = isinstance(english_params["source_platform"], list)
+        sp_values = (english_params["source_platform"]
+                     if is_sp_list else [english_params["source_platform"]])
+        if "MA" in sp_values and "MA" in str(english_params["audio"]):
+            sp_values.remove("MA")
+            if not sp_values:
+                del english_params["source_platform"]
+            elif len(sp_values) == 1 and not is_sp_list:
+                english_params["source_platform"] = sp_values[0]
+            elif is_sp_list:
+                english_params["source_platform"] = sp_values
+
+    # 6. 有效性质检
+    is_valid = bool(english_params.get("title"))
+    if is_valid:
+        if not any(
+                key in english_params
+                for key in ["resolution", "medium", "video_codec", "audio"]):
+            is_valid = False
+        release_info = english_params.get("release_info", "")
+        if "N/A" in release_info and "NOGROUP" not in release_info:
+            core_tech_keys = ["resolution", "medium", "video_codec"]
+            if sum(1 for key in core_tech_keys if key in english_params) < 2:
+                is_valid = False
+
+    if not is_valid:
+        logger.info("主标题解析失败或未通过质检。")
+        english_params = {"title": original_title_str, "unrecognized": "解析失败"}
+
+    chinese_keyed_params = {}
+    for key, value in english_params.items():
+        chinese_key = TRANSLATION_MAP.get(key)
+        if chinese_key:
+            chinese_keyed_params[chinese_key] = (tuple(value) if isinstance(
+                value, list) else value)
+
+    return tuple((key, chinese_keyed_params.get(key, ""))
+                 for key in ALL_POSSIBLE_KEYS_ORDERED)
+
+
+def parse_title(title: str, torrent_filename: str = ""):
+    """
+    从种子主标题中提取所有参数，并可选地从种子文件名中补充缺失参数。
+
+    :return: [{"key": 中文字段名, "value": 值}, ...]，多值字段的值为列表
+    """
+    logger.debug("开始从主标题解析参数: %s", title)
+    components = _parse_title_cached(title.strip(), torrent_filename or "")
+    logger.debug("主标题解析成功。")
+    # 每次返回新的列表，调用方修改结果不会影响缓存
+    return [{
+        "key": key,
+        "value": list(value) if isinstance(value, tuple) else value
+    } for key, value in components]
+
+
+def clear_title_cache():
+    """清空主标题解析缓存（修改 global_mappings.yaml 后需要重启才会重新加载关键词表）。"""
+    _parse_title_cached.cache_clear()
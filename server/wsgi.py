@@ -0,0 +1,10 @@
+# wsgi.py
+"""
+生产环境 WSGI 入口
+
+使用方式: gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()
@@ -4,12 +4,26 @@
 export no_proxy="localhost,127.0.0.1,::1"
 export NO_PROXY="localhost,127.0.0.1,::1"
 
+# 停止信号转发给子进程，保证 gunicorn 能优雅退出并写入缓冲的流量数据
+terminate() {
+    kill -TERM $(jobs -p) 2>/dev/null
+    wait
+}
+trap terminate TERM INT
+
 # 启动 Python Flask 服务
-echo "正在启动 Flask 应用，端口：5274..."
-python app.py &
+# 设置 APP_SERVER=dev 时使用 Flask 开发服务器（带自动重载）
+if [ "$APP_SERVER" = "dev" ]; then
+    echo "正在以开发模式启动 Flask 应用..."
+    python app.py &
+else
+    echo "正在通过 gunicorn 启动 Flask 应用，端口：5274..."
+    gunicorn -c gunicorn.conf.py wsgi:app &
+fi
 
 # 启动 batch-enhancer (Go 服务)
 echo "正在启动 batch-enhancer 服务，端口：5275..."
 ./batch-enhancer &
 
 wait -n
+terminate